@@ -6,39 +6,171 @@
 # The purpose of this file is to contain the class interfaces of the account, checking, savings, credit,
 # investment, and transaction classes
 
-from datetime import datetime, date
+import base64
+import math
+import re
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime, date, timedelta
+from heapq import merge
+from operator import attrgetter
+from typing import Iterator, NamedTuple
 from utilities import *
 from errors import *
+from fees import getFeeSchedule
+from identifiers import getTransactionIDGenerator
+from ledger import ColumnarLedger
+from schema import *
+
+# Field rules of each transaction type and of accounts (see schema.py)- each schema holds the rules of a class and of
+# the classes it extends, and each class checks its own fields with a validator compiled from them
+TRANSACTION_SCHEMA: Schema = Schema(
+    TransactionError, "Transaction Error",
+    amount=Amount("Amount"),
+    transactionType=Choice("Transaction Type", TRANSACTION_TYPE_CODES, "Invalid Transaction Type", text=True),
+    fee=Amount("Fee", "nonNegative"),
+    origin=Text("Origin", 50, optional=True),
+    description=Text("Description", 100, optional=True))
+DEPOSIT_SCHEMA: Schema = TRANSACTION_SCHEMA.extend(
+    DepositError, "Deposit Error",
+    depositMethod=Choice("Deposit Method", DEPOSIT_METHOD_CODES, "Invalid deposit method"))
+WITHDRAWAL_SCHEMA: Schema = TRANSACTION_SCHEMA.extend(
+    WithdrawalError, "Withdrawal Error",
+    withdrawalMethod=Choice("Withdrawal Method", WITHDRAWAL_METHOD_CODES, "Invalid withdrawal method"))
+INTERNAL_TRANSFER_SCHEMA: Schema = TRANSACTION_SCHEMA.extend(
+    TransferError, "Transfer Error",
+    destinationAccountID=Text("Destination Account ID", 50, alnum=True))
+EXTERNAL_TRANSFER_SCHEMA: Schema = INTERNAL_TRANSFER_SCHEMA.extend(
+    TransferError, "Transfer Error",
+    destinationRoutingNumber=Digits("Destination Routing Number", 9),
+    destinationBank=Text("Destination Bank", 50))
+ACCOUNT_SCHEMA: Schema = Schema(
+    AccountError, "Account ID Error",
+    accountID=Text("Account ID", 50, alnum=True),
+    initialDeposit=Amount("Initial Deposit", "positive", DepositError, "Initial Deposit Error"))
+CREDIT_ACCOUNT_SCHEMA: Schema = ACCOUNT_SCHEMA.extend(
+    AccountError, "Account ID Error",
+    initialDeposit=Amount("Initial Deposit", "nonNegative", DepositError, "Initial Deposit Error"),
+    creditLimit=Amount("Credit Limit", "nonNegative", AccountError, "Credit Limit Error"),
+    minimumPaymentFloor=Amount("Minimum Payment", "nonNegative", AccountError, "Minimum Payment Error"))
+
+_validateTransaction = TRANSACTION_SCHEMA.compile()
+_validateDepositMethod = DEPOSIT_SCHEMA["depositMethod"]
+_validateWithdrawalMethod = WITHDRAWAL_SCHEMA["withdrawalMethod"]
+_validateDestinationAccountID = INTERNAL_TRANSFER_SCHEMA["destinationAccountID"]
+_validateExternalTransfer = EXTERNAL_TRANSFER_SCHEMA.compile("destinationAccountID", "destinationRoutingNumber",
+                                                             "destinationBank")
+_validateAccount = ACCOUNT_SCHEMA.compile()
+_validateCreditAccount = CREDIT_ACCOUNT_SCHEMA.compile("accountID", "initialDeposit")
+_validateCreditTerms = CREDIT_ACCOUNT_SCHEMA.compile("creditLimit", "minimumPaymentFloor")
+_validateTradeFee = Schema(InvestmentError, "Investment Error", fee=Amount("Fee", "nonNegative"))["fee"]
+_validateDescription = TRANSACTION_SCHEMA["description"]
+# Validators of the fields of postBatch entries, checked in the order the Deposit and Withdrawal constructors check them
+_validateBatchDeposit = DEPOSIT_SCHEMA.compile("amount", "fee", "origin", "description", "depositMethod")
+_validateBatchWithdrawal = WITHDRAWAL_SCHEMA.compile("amount", "fee", "origin", "description", "withdrawalMethod")
+
+# Transaction type codes of the records fees are charged on (see fees.py)
+_DEPOSIT_CODE: int = TRANSACTION_TYPE_CODES["Deposit"]
+_WITHDRAWAL_CODE: int = TRANSACTION_TYPE_CODES["Withdrawal"]
+_INTRA_TRANSFER_CODE: int = TRANSACTION_TYPE_CODES["Intra-Transfer"]
+# Method codes of the "Trade" records posted by buying and selling
+_BUY_METHOD_CODE: int = WITHDRAWAL_METHOD_CODES["Trade"]
+_SELL_METHOD_CODE: int = DEPOSIT_METHOD_CODES["Trade"]
+# Methods only the bank's own postings may use- "Interest" records are posted by interest accrual and credit cycles,
+# "Transfer" records by transferTo, and "Trade" records by buying and selling, so makeDeposit, makeWithdrawal and
+# postBatch refuse them
+SYSTEM_METHODS: list[str] = ["Interest", "Transfer", "Trade"]
+_SYSTEM_DEPOSIT_METHOD_CODES: frozenset[int] = frozenset(DEPOSIT_METHOD_CODES[method] for method in SYSTEM_METHODS)
+_SYSTEM_WITHDRAWAL_METHOD_CODES: frozenset[int] = frozenset(WITHDRAWAL_METHOD_CODES[method] for method in SYSTEM_METHODS)
+
+# Stands in for an account's transaction loader while its deferred records are being loaded
+_LOADING: object = object()
+# Time between the stamps of records posted to an account before the clock moves on (see Account._nextTimeStamp)
+_TIME_STAMP_TICK: timedelta = timedelta(microseconds=1)
+
+# Number of transaction records in a page of Account.iterTransactions by default, and the most a page can hold
+DEFAULT_PAGE_SIZE: int = 100
+MAX_PAGE_SIZE: int = 10_000
+# Number of the most recent transaction records shown in the string representation of an account
+RECENT_TRANSACTIONS_SHOWN: int = 5
+# Number of days interest rates are divided over
+DAYS_PER_YEAR: int = 365
+# Fraction of a cent of accrued interest treated as a whole cent when posting, so floating point error in the interest
+# worked out (such as 9.999999999 cents for 10) does not hold back a cent
+INTEREST_TOLERANCE: float = 1e-6
+# Latest day of the month a credit account's statement cycle can end on, so every month has a closing day
+MAX_STATEMENT_DAY: int = 28
+# Number of days after a credit account's statement closes that its minimum payment is due
+PAYMENT_DUE_DAYS: int = 21
+# Pattern of a valid ticker symbol, such as "AAPL" or "BRK.B"
+SYMBOL_PATTERN: re.Pattern = re.compile(r"[A-Z][A-Z0-9.\-]{0,11}")
+
+# Codes of the symbols held by investment accounts- positions store each symbol as its code, shared by every account,
+# so the positions of many accounts can be valued against a price table at once (see valuation.py)
+_symbolCodes: dict[str, int] = {}
+_symbols: list[str] = []
+_symbolLock: threading.Lock = threading.Lock()
+
+# Returns the code of the passed symbol, adding it if it is new
+def symbolCode(symbol: str) -> int:
+    code = _symbolCodes.get(symbol)
+    if code is None:
+        with _symbolLock:
+            code = _symbolCodes.get(symbol)
+            if code is None:
+                # The symbol is added before its code, so a reader that finds the code finds its symbol
+                code = len(_symbols)
+                _symbols.append(symbol)
+                _symbolCodes[symbol] = code
+    return code
+
+# Returns the symbol of the passed code
+def symbolOf(code: int) -> str:
+    return _symbols[code]
 
 # The transaction class is used to represent a transaction record in the bank management system
 # Each transaction has a transaction ID, the user ID of the user that made the transaction, the account
 # ID of the account that the transaction was made on, the amount of the transaction, the type of the
 # transaction, and the date and time of the transaction. 
+# Transactions use __slots__ rather than a per-instance dictionary, and store their transaction type (and the
+# deposit or withdrawal method of subclasses) as the small integer codes defined in utilities.py
 class Transaction:
+    __slots__ = ("_timeStamp", "_userID", "_accountID", "_amount", "_transactionTypeCode", "_fee", "_origin",
+                 "_description", "_transactionID")
+
+    # When set to True, new transactions store their time stamp as an integer count of epoch microseconds
+    # instead of a datetime object, which is smaller- the timeStamp getter still returns a datetime
+    storeEpochTimeStamps: bool = False
+
     # The constructor for the transaction class takes in the transaction ID, user ID, account ID, amount, and
     # transaction type, and initializes the transaction with the given values after validating that the transaction
-    # ID is valid, the amount is a floating point number, and the transaction type is a valid type
-    def __init__(self, userID: str, accountID: str, amount: float, transactionType: str, description: str = None,
-                  origin: str = None, fee: float = 0.00):
+    # ID is valid, the amount is a number or Money amount, and the transaction type is a valid type
+    # The fields are validated together with the validator compiled from TRANSACTION_SCHEMA. The transaction is stamped
+    # with the passed time stamp (default is None, for the current time), and its ID is generated from it
+    def __init__(self, userID: str, accountID: str, amount: float | Money, transactionType: str, description: str = None,
+                  origin: str = None, fee: float | Money = 0.00, timeStamp: datetime = None):
+        amount, transactionType, fee, origin, description = _validateTransaction(amount, transactionType, fee, origin,
+                                                                                 description)
         # Time Stamp: The date and time the transaction was made
-        self._timeStamp = datetime.now()
+        timeStamp = datetime.now() if timeStamp is None else timeStamp
+        self._timeStamp: datetime | int = toEpochMicros(timeStamp) if self.storeEpochTimeStamps else timeStamp
         # User ID: The ID of the user that made the transaction
         self._userID: str = userID
         # Account ID: The ID of the account that the transaction was made on
         self._accountID: str = accountID
-        # Amount: The floating point amount of the transaction
-        self._amount: float = self._validateAmount(amount)
-        # Transaction Type: The type of the transaction- list of acceptable transaction types in utilities.py
-        self._transactionType: str = self._validateTransactionType(transactionType)
-        # Fee: The fee charged for the transaction (default is 0.00)
-        self._fee = self._validateFee(fee)
+        # Amount: The amount of the transaction, stored as an exact whole number of cents (see money.py)
+        self._amount: int = amount
+        # Transaction Type: The code of the type of the transaction- list of acceptable transaction types in utilities.py
+        self._transactionTypeCode: int = transactionType
+        # Fee: The fee charged for the transaction (default is 0.00), in cents
+        self._fee: int = fee
         # Origin: The origin of the transaction (if supplied)
-        self._origin = self._validateOrigin(origin) if origin else None
+        self._origin = origin
         # Description: A description of the transaction (if supplied)
-        self._description = self._validateDescription(description) if description else None
-        # Transaction ID: A unique alphanumeric string that identifies the transaction
-        # Transaction ID format: userID-transactionType-timeStamp.isoformat()
-        # The stored transaction ID is hashed using bcrypt for security
+        self._description = description
+        # Transaction ID: A unique alphanumeric string that identifies the transaction, created by the
+        # transaction ID generator installed in identifiers.py (sortable IDs by default)
         self._transactionID: str = self._generateTransactionID()
 
     # Getter for the transaction ID
@@ -58,18 +190,18 @@ class Transaction:
     
     # Getter for the amount
     @property
-    def amount(self) -> float:
-        return self._amount
+    def amount(self) -> Money:
+        return Money.fromCents(self._amount)
     
     # Getter for the transaction type
     @property
     def transactionType(self) -> str:
-        return self._transactionType
+        return VALID_TRANSACTION_TYPES[self._transactionTypeCode]
     
     # Getter for the fee
     @property
-    def fee(self) -> float:
-        return self._fee
+    def fee(self) -> Money:
+        return Money.fromCents(self._fee)
     
     # Getter for the origin
     @property
@@ -84,7 +216,8 @@ class Transaction:
     # Getter for the time stamp
     @property
     def timeStamp(self) -> datetime:
-        return self._timeStamp
+        timeStamp = self._timeStamp
+        return fromEpochMicros(timeStamp) if type(timeStamp) is int else timeStamp
 
     # Validates that the userID, transactionType, and timeStamp are present in the transaction
     # object at time of transaction ID creation- throws a transaction error if any of the metadata
@@ -92,68 +225,21 @@ class Transaction:
     def _validateTransactionMetadata(self) -> None:
         if not self._userID:
             raise TransactionError("Transaction Error: User ID is required to generate a transaction ID")
-        if not self._transactionType:
+        if self._transactionTypeCode is None:
             raise TransactionError("Transaction Error: Transaction type is required to generate a transaction ID")
-        if not self._timeStamp:
+        if self._timeStamp is None:
             raise TransactionError("Transaction Error: Time stamp is required to generate a transaction ID")
 
-    # Generates a unique transaction ID for the transaction object- the transaction ID is a string
-    # in the format userID-transactionType-timeStamp.isoformat(), hashed using bcrpyt 
+    # Generates a unique transaction ID for the transaction object using the installed transaction ID
+    # generator (see identifiers.py)
     def _generateTransactionID(self) -> str:
         # Validate that the transaction metadata is present
         self._validateTransactionMetadata()
-        # Metadata string format: userID-transactionType-timeStamp.isoformat()
-        metaData: str = f"{self._userID}-{self._transactionType}-{self._timeStamp.isoformat()}"
-        # Hash the metadata string using bcrypt
-        return bcrypt.hash(metaData.encode())
-
-    # Validates that the amount of the transaction is a floating point number- throws
-    # a transaction error exception if the amount is not a float
-    def _validateAmount(self, amount: float) -> float:
-        if not isinstance(amount, float):
-            raise TransactionError("Transaction Error: Amount must be a floating point number")
-        return amount
-
-    # Ensures that the transaction type is a non-empty string and is a valid transaction type- throws 
-    # an invalid transaction type error if the transaction type is not a string, is empty, or is not a valid
-    # transaction type
-    def _validateTransactionType(self, transactionType: str) -> str:
-        # Validate the transactionType string
-        try: transactionType = validateString(transactionType, "Transaction Type", 50, False)
-        except InputError as e: raise TransactionError(f"Transaction Error: {e}")
-        if transactionType not in VALID_TRANSACTION_TYPES:
-            raise TransactionError("Transaction Error: Invalid Transaction Type")
-        return transactionType
-    
-    # Ensures that the fee is a non-negative floating point number- if the fee is negative, throws a TransactionError
-    def _validateFee(self, fee: float) -> float:
-        if not isinstance(fee, float):
-            raise TransactionError("Transaction Erorr: Fee must be a floating point number")
-        if fee < 0:
-            raise TransactionError("Transaction Error: Fee must be greater than or equal to 0")
-        return fee
-
-    # Ensures that the origin is a non-empty string- if the origin is empty or non alpha-numeric,
-    # throws a TransactionError
-    def _validateOrigin(self, origin: str) -> str:
-        try: origin = validateString(origin, "Origin", 50, True)
-        except InputError as e: raise TransactionError(f"Transaction Error: {e}")
-        return origin
- 
-    # Ensures that the description is a non-empty string- if the description is empty or non alpha-numeric,
-    # throws a TransactionError
-    def _validateDescription(self, description: str) -> str:
-        try: description = validateString(description, "Description", 100, True)
-        except InputError as e: raise TransactionError(f"Transaction Error: {e}")
-        return description
-    
-    # Ensures that the destination account ID is a non-empty string, is alphanumeric, and is not the same as the source account ID
-    # For use in transfer transactions
-    def _validateDestinationAccountID(self, destinationAccountID: str) -> str:
-        # Validate that destinationAccountID is a non-empty alphanumeric string
-        try: destinationAccountID = validateAlnumString(destinationAccountID, "Destination Account ID", 50, False)
-        except InputError as e: raise TransferError(f"Transfer Error: {e}")
-        # Ensure destinationAccountID is not the same as the source account ID
+        return getTransactionIDGenerator().generate(self._userID, self.transactionType, self.timeStamp)
+
+    # Ensures that the destination account ID (already checked against the transfer's schema) is not the same as
+    # the source account ID- for use in transfer transactions
+    def _checkDestinationAccountID(self, destinationAccountID: str) -> str:
         if destinationAccountID == self._accountID:
             raise TransferError("Transfer Error: Destination Account ID cannot be the same as the source account ID")
         return destinationAccountID
@@ -167,26 +253,21 @@ class Transaction:
 # Each deposit has a transaction ID, the user ID of the user that made the deposit, the account ID of the account
 # that the deposit was made on, the amount of the deposit, the type of transaction (deposit), and the date and time of the deposit
 class Deposit(Transaction):
+    __slots__ = ("_depositMethodCode",)
+
     # The constructor for the deposit class takes in the user ID, account ID, and amount of the deposit, and initializes
-    # the deposit with the given values after validating that the amount is a valid floating point number
-    def __init__(self, userID: str, accountID: str, amount: float, depositMethod: str, fee: float = 0.00,
-                 transactionType: str = "Deposit", origin: str = None, description: str = None):
+    # the deposit with the given values after validating that the amount is a valid amount of money
+    def __init__(self, userID: str, accountID: str, amount: float | Money, depositMethod: str, fee: float | Money = 0.00,
+                 transactionType: str = "Deposit", origin: str = None, description: str = None, timeStamp: datetime = None):
         # Call the Transaction class constructor
-        super().__init__(userID, accountID, amount, transactionType, description, origin, fee)
+        super().__init__(userID, accountID, amount, transactionType, description, origin, fee, timeStamp)
         # Deposit Method: The method used to make the deposit
-        self._depositMethod: str = self._validateDepositMethod(depositMethod)
+        self._depositMethodCode: int = _validateDepositMethod(depositMethod)
         
     # Getter for the deposit method
     @property
     def depositMethod(self) -> str:
-        return self._depositMethod
-    
-    # Ensures that the deposit method is a valid deposit method as defined in the utilities.py file
-    # If deposit method is invalid, throws DepositError exception
-    def _validateDepositMethod(self, depositMethod: str) -> str:
-        if depositMethod not in VALID_DEPOSIT_METHODS:
-            raise DepositError("Deposit Error: Invalid deposit method")
-        return depositMethod
+        return VALID_DEPOSIT_METHODS[self._depositMethodCode]
 
     # Returns a string representation of the deposit object
     def __str__(self):
@@ -197,27 +278,23 @@ class Deposit(Transaction):
 # Each withdrawal has a transaction ID, the user ID of the user that made the withdrawal, the account ID of the account
 # that the withdrawal was made on, the amount of the withdrawal, the type of transaction (withdrawal), and the date and time of the withdrawal
 class Withdrawal(Transaction):
+    __slots__ = ("_withdrawalMethodCode",)
+
     # The constructor for the withdrawal class takes in the user ID, account ID, and amount of the withdrawal, as well as optional
     # information like fee (defaults to 0.00), origin, and description, and initializes the withdrawal with the given values
     # after validating the passed data
-    def __init__(self, userID: str, accountID: str, amount: float, withdrawalMethod: str, fee: float = 0.00,
-                 transactionType: str = "Withdrawal", origin: str = None, description: str = None):
+    def __init__(self, userID: str, accountID: str, amount: float | Money, withdrawalMethod: str, fee: float | Money = 0.00,
+                 transactionType: str = "Withdrawal", origin: str = None, description: str = None,
+                 timeStamp: datetime = None):
         # Call the Transaction class constructor
-        super().__init__(userID, accountID, amount, transactionType, description, origin, fee)
+        super().__init__(userID, accountID, amount, transactionType, description, origin, fee, timeStamp)
         # Withdrawal Method: The method used to make the withdrawal
-        self._withdrawalMethod: str = self._validateWithdrawalMethod(withdrawalMethod)
+        self._withdrawalMethodCode: int = _validateWithdrawalMethod(withdrawalMethod)
     
     # Getter for the withdrawal method
     @property
     def withdrawalMethod(self) -> str:
-        return self._withdrawalMethod
-
-    # Ensures that the withdrawal method is a valid withdrawal method as defined in the utilities.py file
-    # If withdrawal method is invalid, throws WithdrawalError exception
-    def _validateWithdrawalMethod(self, withdrawalMethod: str) -> str:
-        if withdrawalMethod not in VALID_WITHDRAWAL_METHODS:
-            raise WithdrawalError("Withdrawal Error: Invalid withdrawal method")
-        return withdrawalMethod
+        return VALID_WITHDRAWAL_METHODS[self._withdrawalMethodCode]
     
     # Returns a string representation of the withdrawal object
     def __str__(self):
@@ -230,12 +307,14 @@ class Withdrawal(Transaction):
 # the type of transaction (which must be "Intra-Transfer" or "External-Transfer"), the date and time of the transfer, and optional
 # information like fee, origin, and description
 class InternalTransfer(Transaction):
-    def __init__(self, userID: str, accountID: str, destinationAccountID: str, amount: float, transactionType: str = "Intra-Transfer",
-                 fee: float = 0.00, origin: str = None, description: str = None):
+    __slots__ = ("_destinationAccountID",)
+
+    def __init__(self, userID: str, accountID: str, destinationAccountID: str, amount: float | Money, transactionType: str = "Intra-Transfer",
+                 fee: float | Money = 0.00, origin: str = None, description: str = None, timeStamp: datetime = None):
         # Call the Transaction class constructor
-        super().__init__(userID, accountID, amount, transactionType, description, origin, fee)
+        super().__init__(userID, accountID, amount, transactionType, description, origin, fee, timeStamp)
         # Destination Account ID: The account ID of the account that the transfer is being made to
-        self._destinationAccountID: str = self._validateDestinationAccountID(destinationAccountID)
+        self._destinationAccountID: str = self._checkDestinationAccountID(_validateDestinationAccountID(destinationAccountID))
     
     # Getter for the destination account ID
     @property
@@ -243,63 +322,191 @@ class InternalTransfer(Transaction):
         return self._destinationAccountID
 
     def __str__(self):
-        return super().str() + f"\nDestination Account ID: {self._destinationAccountID}"
+        return super().__str__() + f"\nDestination Account ID: {self._destinationAccountID}"
 
 class ExternalTransfer(Transaction):
+    __slots__ = ("_destinationAccountID", "_destinationRoutingNumber", "_destinationBank")
+
     def __init__(self, userID: str, accountID: str, destinationAccountID: str, destinationRoutingNumber: str, destinationBank:str, 
-                 amount: float, transactionType: str = "External-Transfer", fee: float = 0.00, origin: str = None, description: str = None):
+                 amount: float | Money, transactionType: str = "External-Transfer", fee: float | Money = 0.00, origin: str = None, description: str = None,
+                 timeStamp: datetime = None):
         # Call the Transaction class constructor
-        super().__init__(userID, accountID, amount, transactionType, description, origin, fee)
+        super().__init__(userID, accountID, amount, transactionType, description, origin, fee, timeStamp)
+        destinationAccountID, destinationRoutingNumber, destinationBank = _validateExternalTransfer(
+            destinationAccountID, destinationRoutingNumber, destinationBank)
         # Destination Account ID: The account ID of the account that the transfer is being made to
-        self._destinationAccountID: str = self._validateDestinationAccountID(destinationAccountID)
+        self._destinationAccountID: str = self._checkDestinationAccountID(destinationAccountID)
         # Destination Routing Number: The routing number of the destination bank
-        self._destinationRoutingNumber: str = self._validateDestinationRoutingNumber(destinationRoutingNumber)
+        self._destinationRoutingNumber: str = destinationRoutingNumber
         # Destination Bank: The name of the destination bank
-        self._destinationBank: str = self._validateDestinationBank(destinationBank)
-
-    # Ensures that the destination routing number is a 9 digit numeric string 
-    def _validateDestinationRoutingNumber(self, destinationRoutingNumber: str) -> str:
-        if not isinstance(destinationRoutingNumber, str):
-            raise TransferError("Transfer Error: Destination Routing Number must be a string")
-        if len(destinationRoutingNumber) != 9:
-            raise TransferError("Transfer Error: Destination Routing Number must be 9 digits")
-        if not destinationRoutingNumber.isnumeric():
-            raise TransferError("Transfer Error: Destination Routing Number must be numeric")
-        return destinationRoutingNumber
-    
-    # Ensures that the destination bank is a non-empty string
-    def _validateDestinationBank(self, destinationBank: str) -> str:
-        # Ensure the destinationBank is a non-empty string
-        try: destinationBank = validateString(destinationBank, "Destination Bank", 50, False)
-        except InputError as e: raise TransferError(f"Transfer Error: {e}")
-        return destinationBank
-    
+        self._destinationBank: str = destinationBank
+
+    # Getter for the destination account ID
+    @property
+    def destinationAccountID(self) -> str:
+        return self._destinationAccountID
+
+    # Getter for the destination routing number
+    @property
+    def destinationRoutingNumber(self) -> str:
+        return self._destinationRoutingNumber
+
+    # Getter for the destination bank
+    @property
+    def destinationBank(self) -> str:
+        return self._destinationBank
+
     def __str__(self):
         return super().__str__() + f"\nDestination Account ID: {self._destinationAccountID}\nDestination Routing Number: {self._destinationRoutingNumber}\nDestination Bank: {self._destinationBank}"
     
    
 
 
+# The restoreTransaction function rebuilds a transaction record from its saved fields (such as those read back from
+# a write-ahead log) without validating them again or creating a new transaction ID- the amount and fee are whole
+# cents, and the method and destination fields are only used by the transaction types that have them
+def restoreTransaction(transactionType: str, transactionID: str, timeStamp: datetime, userID: str, accountID: str,
+                       amount: int, fee: int = 0, method: str = None, origin: str = None, description: str = None,
+                       destinationAccountID: str = None, destinationRoutingNumber: str = None,
+                       destinationBank: str = None) -> Transaction:
+    if transactionType == "Deposit":
+        transaction = object.__new__(Deposit)
+        transaction._depositMethodCode = DEPOSIT_METHOD_CODES[method]
+    elif transactionType == "Withdrawal":
+        transaction = object.__new__(Withdrawal)
+        transaction._withdrawalMethodCode = WITHDRAWAL_METHOD_CODES[method]
+    elif transactionType == "Intra-Transfer":
+        transaction = object.__new__(InternalTransfer)
+        transaction._destinationAccountID = destinationAccountID
+    elif transactionType == "External-Transfer":
+        transaction = object.__new__(ExternalTransfer)
+        transaction._destinationAccountID = destinationAccountID
+        transaction._destinationRoutingNumber = destinationRoutingNumber
+        transaction._destinationBank = destinationBank
+    else:
+        raise InvalidTransactionTypeError(f"Invalid transaction type: {transactionType}")
+    transaction._timeStamp = toEpochMicros(timeStamp) if Transaction.storeEpochTimeStamps else timeStamp
+    transaction._userID = userID
+    transaction._accountID = accountID
+    transaction._amount = amount
+    transaction._transactionTypeCode = TRANSACTION_TYPE_CODES[transactionType]
+    transaction._fee = fee
+    transaction._origin = origin
+    transaction._description = description
+    transaction._transactionID = transactionID
+    return transaction
+
+
 # The account class is the base class for the checking, savings, credit, and investment account classes
 # Each account has an account ID, the user ID of the user that owns the account, the balance of the account,
 # a list of transaction records, the date the account was created, and the status of the account.
+# Accounts are safe to share between threads- each account has its own re-entrant lock, held while a posting is
+# checked against the balance and applied, so concurrent postings cannot overdraw the account or lose updates.
+# Records are time stamped, and given the transaction IDs generated from their time stamps, while the lock is held, so
+# each account's records are posted in time order. Reads do not take the lock: the balance is an immutable Money
+# replaced in a single assignment, and records are only ever appended
 class Account:
+    # The amount (in cents) the balance may go below zero- only credit accounts can be overdrawn
+    _creditLimit: int = 0
+    # Validates the account ID and initial deposit of a new account
+    _validateOpening = staticmethod(_validateAccount)
+    # The kind of account, saved with the account so it is restored as the same class (see restoreAccount)
+    _kind: str = "Account"
+
     # The constructor for the account class takes in the account ID, user ID, and initial deposit, 
     # and initializes the account with the given values after validating that the account ID and initial
-    # deposit are valid
-    def __init__(self, accountID: str, userID: str, initialDeposit: float):
+    # deposit are valid- an optional ledger (such as a ColumnarLedger) can be passed to store the account's
+    # transaction records in place of the default list
+    # Balance checkpoints are recorded every checkpointInterval postings and, if dailyCheckpoints is set, at the
+    # first posting of each new day, so historical balances can be found without replaying the whole history
+    # An optional write-ahead log (see wal.py) can be passed to make the account durable- the opening of the account,
+    # every posting, and every status and tier change are written to the log before they are applied
+    # The account's tier (default "Standard") sets the fees charged on its postings (see fees.py)
+    # Derived classes set their own state before calling this constructor, so the opening written to the log has it
+    def __init__(self, accountID: str, userID: str, initialDeposit: float | Money, ledger: ColumnarLedger = None,
+                 checkpointInterval: int = 1000, dailyCheckpoints: bool = True, wal: "WriteAheadLog" = None,
+                 tier: str = "Standard"):
+        accountID, initialDeposit = self._validateOpening(accountID, initialDeposit)
+        tierCode = self._validateTier(tier)
+        self._initialize(accountID, userID, Money.fromCents(initialDeposit), ledger, checkpointInterval=checkpointInterval,
+                         dailyCheckpoints=dailyCheckpoints, wal=wal, tierCode=tierCode)
+        if wal is not None:
+            wal.logOpen(self)
+
+    # Sets up the fields of a new or restored account from its (already validated) account ID, user ID, and opening
+    # balance- nothing is written to the log
+    def _initialize(self, accountID: str, userID: str, openingBalance: Money, ledger: ColumnarLedger = None,
+                    checkpointInterval: int = 1000, dailyCheckpoints: bool = True, wal: "WriteAheadLog" = None,
+                    tierCode: int = 0) -> None:
         # Account ID: The first 4 digits of the UserID, followed by the a 4 digit number starting at 0001
         # for all accounts in the simulated banking system
-        self._accountID: str = self._validateAccountID(accountID)
+        self._accountID: str = accountID
         # User ID: The ID of the user that owns the account
         self._userID: str = userID
         # Balance: The balance of the account, initialized to the initial deposit provided at the time
         # of account creation
-        self._balance : float = self._validateInitialDeposit(initialDeposit)
+        self._balance : Money = openingBalance
+        self._openingBalance: Money = self._balance
         # Transactions: A list of transaction records for the account
-        self._transactions: list[Transaction] = []
+        self._transactions: list[Transaction] | ColumnarLedger = ledger if ledger is not None else []
+        # Secondary indexes: the positions of the account's transaction records, by transaction type and by
+        # deposit or withdrawal method, kept in time order as records are added
+        self._typeIndex: dict[str, list[int]] = {}
+        self._methodIndex: dict[str, list[int]] = {}
+        # Balance checkpoints: the balance (in cents) before the record at each checkpoint position- the first
+        # checkpoint is the opening balance, before any records
+        self._checkpointInterval: int = self._validateCheckpointInterval(checkpointInterval)
+        self._dailyCheckpoints: bool = bool(dailyCheckpoints)
+        self._checkpointPositions: list[int] = [len(self._transactions)]
+        self._checkpointBalances: list[int] = [self._balance.cents]
+        self._lastPostingDate: date = None
+        # The time stamp of the last record posted, which later records are stamped after (see _nextTimeStamp)
+        self._lastTimeStamp: datetime = self._transactions[-1].timeStamp if len(self._transactions) else None
         self._dateCreated: date = date.today()
         self._status: str = "Active"
+        # Tier: the code of the account's tier (see utilities.py)
+        self._tierCode: int = tierCode
+        # Write-Ahead Log: The log the account's changes are written to, if any
+        self._wal: "WriteAheadLog" = wal
+        # Transaction Loader: Loads the account's transaction records the first time they are needed, if they are
+        # stored elsewhere (see deferTransactions)
+        self._transactionLoader = None
+        # Lock: Held while postings and status changes are checked and applied
+        self._lock = threading.RLock()
+
+    # The restore method rebuilds an account from saved state (such as a write-ahead log)- the account is created with
+    # its opening balance, creation date, the state of its kind (see _savedState), and its tier, and the restored records
+    # are added with restoreTransactions. The saved values are not validated again, and the opening is not written to
+    # any log. Any other keyword arguments (such as checkpointInterval) are the account constructor's
+    @classmethod
+    def restore(cls, accountID: str, userID: str, openingBalance: Money, dateCreated: date, ledger: ColumnarLedger = None,
+                state: dict = None, tier: str = "Standard", **options) -> "Account":
+        account = object.__new__(cls)
+        account._initialize(accountID, userID, openingBalance, ledger, tierCode=ACCOUNT_TIER_CODES[tier], **options)
+        account._dateCreated = dateCreated
+        account._restoreState(state or {})
+        return account
+
+    # Returns the state of the account's kind that is saved with it (such as the terms of a credit account) as a
+    # dictionary of JSON values- a plain account has none
+    def _savedState(self) -> dict:
+        return {}
+
+    # Sets the state of the account's kind from a dictionary made by _savedState
+    def _restoreState(self, state: dict) -> None:
+        pass
+
+    # Writes the passed records (if any) and the state of the account's kind to the account's write-ahead log, if it has
+    # one, as a single frame- used when a change to the state must be recovered together with the records posted for it
+    # Called with the lock held, after the state is changed and before the records are added
+    def _logState(self, records: list[Transaction] = ()) -> None:
+        if self._wal is None:
+            return
+        states = {self._accountID: self._savedState()}
+        if records:
+            self._wal.logPostings(records, states)
+        else:
+            self._wal.logStates(states)
 
     # Getter for the account ID
     @property
@@ -310,17 +517,52 @@ class Account:
     @property
     def userID(self) -> str:
         return self._userID
+
+    # Getter for the kind of account
+    @property
+    def kind(self) -> str:
+        return self._kind
     
     # Getter for the balance
     @property
-    def balance(self) -> float:
+    def balance(self) -> Money:
         return self._balance
     
-    # Getter for the transactions
+    # Getter for the opening balance
     @property
-    def transactions(self) -> list[Transaction]:
+    def openingBalance(self) -> Money:
+        return self._openingBalance
+
+    # Getter for the transactions- deferred transactions are loaded first
+    @property
+    def transactions(self) -> list[Transaction] | ColumnarLedger:
+        self._loadTransactions()
         return self._transactions
+
+    # Getter for whether the account's transaction records are in memory
+    @property
+    def transactionsLoaded(self) -> bool:
+        return self._transactionLoader is None
     
+    # Getter for the number of postings between balance checkpoints
+    @property
+    def checkpointInterval(self) -> int:
+        return self._checkpointInterval
+
+    # Getter for the account's lock- hold it to make several operations on the account atomic
+    @property
+    def lock(self) -> threading.RLock:
+        return self._lock
+
+    # Getter for the write-ahead log
+    @property
+    def wal(self) -> "WriteAheadLog":
+        return self._wal
+    # Setter for the write-ahead log- used to attach a log to a restored account, so later changes are written to it
+    @wal.setter
+    def wal(self, wal: "WriteAheadLog"):
+        self._wal = wal
+
     # Getter for date created
     @property
     def dateCreated(self) -> date:
@@ -334,63 +576,1082 @@ class Account:
     @status.setter
     def status(self, newStatus: str):
         # Verify status is within the list of valid statuses
-        if newStatus not in VALID_STATUSES:
+        if not isinstance(newStatus, str) or newStatus not in STATUS_CODES:
             raise ValueError("Status must be 'Active', 'Frozen', or 'Closed'")
-        self._status = newStatus
- 
-    # Validates that the account ID is a non empty string
-    def _validateAccountID(self, accountID: str) -> str:
-        # Check that the accountID is a non-empty alphanumeric string
-        try: accountID = validateAlnumString(accountID, "Account ID", 50, False)
-        except InputError as e: raise AccountError(f"Account ID Error: {e}")
-        return accountID
-
-    # Validates that the intial balance allocated to an account is a non-negative float 
-    def _validateInitialDeposit(self, deposit: float) -> float:
-        # Check that the deposit is a positive float
-        try: deposit = validatePositiveFloat(deposit, "Initial Deposit")
-        except InputError as e: raise DepositError(f"Initial Deposit Error: {e}")
-        return deposit
+        with self._lock:
+            if self._wal is not None:
+                self._wal.logStatus(self._accountID, newStatus)
+            self._status = newStatus
+
+    # Getter for the tier
+    @property
+    def tier(self) -> str:
+        return VALID_ACCOUNT_TIERS[self._tierCode]
+    # Setter for the tier- postings made after the change are charged the fees of the new tier
+    @tier.setter
+    def tier(self, newTier: str):
+        tierCode = self._validateTier(newTier)
+        with self._lock:
+            if self._wal is not None:
+                self._wal.logTier(self._accountID, newTier)
+            self._tierCode = tierCode
+
+    # Validates that the tier is a valid account tier (see utilities.py), returning its code
+    @staticmethod
+    def _validateTier(tier: str) -> int:
+        if not isinstance(tier, str) or tier not in ACCOUNT_TIER_CODES:
+            raise AccountError(f"Tier Error: Tier must be one of {', '.join(VALID_ACCOUNT_TIERS)}")
+        return ACCOUNT_TIER_CODES[tier]
+
+    # Validates that the checkpoint interval is a positive whole number of postings
+    def _validateCheckpointInterval(self, interval: int) -> int:
+        if isinstance(interval, bool) or not isinstance(interval, int) or interval <= 0:
+            raise AccountError("Checkpoint Interval Error: Checkpoint interval must be a positive integer")
+        return interval
 
     # The makeDeposit method is used to add funds to the account balance
     # The method takes in the user ID of the user making the deposit, the amount of the deposit, the deposit method,
-    # the fee charged for the deposit (default is 0.00), the origin of the deposit (default is None), and a description
-    # of the deposit (default is None) 
-    # The method creates a new deposit record, adds the deposit to the account's transaction list, and updates the account balance
-    def makeDeposit(self, userID: str, amount: float, depositMethod: str, fee: float = 0.00, origin: str = None, description: str = None) -> None:
+    # the fee charged for the deposit (default is None, for the fee schedule's fee- see fees.py), the origin of the
+    # deposit (default is None), and a description of the deposit (default is None)
+    # The method creates a new deposit record, adds the deposit to the account's transaction list, and updates the account
+    # balance by the amount less the fee
+    def makeDeposit(self, userID: str, amount: float | Money, depositMethod: str, fee: float | Money = None, origin: str = None, description: str = None) -> None:
         # Ensure the account is active
         if not self.isActive():
             raise AccountError("Account Error: Account is not active")
-        # Create a new deposit record
-        deposit = Deposit(userID, self._accountID, amount, depositMethod, fee, origin, description)
-        # Add the deposit to the account's transaction list
-        self._transactions.append(deposit)
-        # Update the account balance
-        self._balance += amount
+        with self._lock:
+            # Ensure the account is still active now that the lock is held
+            if self._status != "Active":
+                raise AccountError("Account Error: Account is not active")
+            # Create a new deposit record, stamped while the lock is held (see _nextTimeStamp)
+            deposit = Deposit(userID, self._accountID, amount, depositMethod, 0.00 if fee is None else fee, origin=origin,
+                              description=description, timeStamp=self._nextTimeStamp())
+            # Ensure the deposit amount is positive, so a deposit can only add funds to the account
+            if deposit._amount <= 0:
+                raise DepositError("Deposit Error: Deposit amount must be greater than 0")
+            if deposit._depositMethodCode in _SYSTEM_DEPOSIT_METHOD_CODES:
+                raise DepositError(f"Deposit Error: {deposit.depositMethod} deposits can only be posted by the bank")
+            if fee is None:
+                deposit._fee = getFeeSchedule().feeOf(_DEPOSIT_CODE, deposit._depositMethodCode, self._tierCode, deposit._amount)
+            # Ensure a fee larger than the deposit does not take the balance past the credit limit
+            if deposit._fee - deposit._amount > self._balance.cents + self._creditLimit:
+                raise DepositError("Deposit Error: Deposit fee exceeds account balance")
+            # Add the deposit to the account's transaction list and update the account balance
+            self._recordTransactions([deposit])
     
     # The makeWithdrawal method is used to remove funds from the account balance
     # The method takes in the user ID of the user making the withdrawal, the amount of the withdrawal, the withdrawal method,
-    # the fee charged for the withdrawal (default is 0.00), the origin of the withdrawal (default is None), and a description
-    # of the withdrawal (default is None)
-    # The method creates a new withdrawal record, adds the withdrawal to the account's transaction list, and updates the account balance
-    def makeWithdrawal(self, userID: str, amount: float, withdrawalMethod: str, fee: float = 0.00, origin: str = None, description: str = None) -> None:
+    # the fee charged for the withdrawal (default is None, for the fee schedule's fee- see fees.py), the origin of the
+    # withdrawal (default is None), and a description of the withdrawal (default is None)
+    # The method creates a new withdrawal record, adds the withdrawal to the account's transaction list, and updates the account
+    # balance by the amount and the fee
+    def makeWithdrawal(self, userID: str, amount: float | Money, withdrawalMethod: str, fee: float | Money = None, origin: str = None, description: str = None) -> None:
+        # Ensure the account is active
+        if not self.isActive():
+            raise AccountError("Account Error: Account is not active")
+        # Check the balance and post the withdrawal as one step, so no other posting can change the balance in between
+        with self._lock:
+            if self._status != "Active":
+                raise AccountError("Account Error: Account is not active")
+            # Create a new withdrawal record, stamped while the lock is held (see _nextTimeStamp)
+            withdrawal = Withdrawal(userID, self._accountID, amount, withdrawalMethod, 0.00 if fee is None else fee,
+                                    origin=origin, description=description, timeStamp=self._nextTimeStamp())
+            # Ensure the withdrawal amount is positive, so a withdrawal can only remove funds from the account
+            if withdrawal._amount <= 0:
+                raise WithdrawalError("Withdrawal Error: Withdrawal amount must be greater than 0")
+            if withdrawal._withdrawalMethodCode in _SYSTEM_WITHDRAWAL_METHOD_CODES:
+                raise WithdrawalError(f"Withdrawal Error: {withdrawal.withdrawalMethod} withdrawals can only be posted by the bank")
+            if fee is None:
+                withdrawal._fee = getFeeSchedule().feeOf(_WITHDRAWAL_CODE, withdrawal._withdrawalMethodCode, self._tierCode,
+                                                         withdrawal._amount)
+            # Ensure the withdrawal amount and fee are less than the account balance (and credit limit)
+            if withdrawal._amount + withdrawal._fee > self._balance.cents + self._creditLimit:
+                raise WithdrawalError("Withdrawal Error: Withdrawal amount exceeds account balance")
+            # Add the withdrawal to the account's transaction list and update the account balance
+            self._recordTransactions([withdrawal])
+
+    # The postBatch method is used to post many deposits and withdrawals to the account at once
+    # Each entry is a dictionary with the keys transactionType ("Deposit" or "Withdrawal"), userID, amount, and method,
+    # and optionally fee (entries without one are charged the fee schedule's fee- see fees.py), origin, and description
+    # The whole batch is validated and checked for overdrafts (against the running balance) before anything is posted-
+    # if any entry fails, an exception of the same type is raised naming the first failing entry, and the account is
+    # left unchanged
+    # Each entry is checked with a single call to a validator compiled from the deposit or withdrawal schema before the
+    # account's lock is taken. Once the overdraft checks pass, the records are stamped and built while the lock is held-
+    # the IDs of the whole batch are reserved together (see identifiers.py), and the records are built directly rather
+    # than through the Deposit and Withdrawal constructors
+    def postBatch(self, entries: list[dict]) -> None:
         # Ensure the account is active
         if not self.isActive():
             raise AccountError("Account Error: Account is not active")
-        # Ensure the withdrawal amount is less than the account balance
-        if amount > self._balance:
-            raise WithdrawalError("Withdrawal Error: Withdrawal amount exceeds account balance")
-        # Create a new withdrawal record
-        withdrawal = Withdrawal(userID, self._accountID, amount, withdrawalMethod, fee, origin, description)
-        # Add the withdrawal to the account's transaction list
-        self._transactions.append(withdrawal)
-        # Update the account balance
-        self._balance -= amount
+        # The validated fields of each entry- its transaction type code, user ID, amount and fee in cents, origin,
+        # description, and method code
+        rows: list[tuple] = []
+        append = rows.append
+        # Fees are found from the fee schedule as the entries are validated, so the batch is read only once
+        feeOf, tierCode = getFeeSchedule().feeOf, self._tierCode
+        # The error to raise for the first entry that is not valid- entries before it are still checked for
+        # overdrafts, so an earlier overdraft is reported first
+        failure = None
+        index = 0
+        try:
+            for index, entry in enumerate(entries):
+                if not isinstance(entry, dict):
+                    raise TransactionError("Transaction Error: Batch entries must be dictionaries")
+                transactionType = entry["transactionType"]
+                userID = entry["userID"]
+                fee = entry.get("fee")
+                if transactionType == "Deposit":
+                    amount, explicitFee, origin, description, methodCode = _validateBatchDeposit(
+                        entry["amount"], 0 if fee is None else fee, entry.get("origin"), entry.get("description"), entry["method"])
+                    if amount <= 0:
+                        raise DepositError("Deposit Error: Deposit amount must be greater than 0")
+                    if methodCode in _SYSTEM_DEPOSIT_METHOD_CODES:
+                        raise DepositError(f"Deposit Error: {VALID_DEPOSIT_METHODS[methodCode]} deposits can only be posted by the bank")
+                    typeCode = _DEPOSIT_CODE
+                elif transactionType == "Withdrawal":
+                    amount, explicitFee, origin, description, methodCode = _validateBatchWithdrawal(
+                        entry["amount"], 0 if fee is None else fee, entry.get("origin"), entry.get("description"), entry["method"])
+                    if amount <= 0:
+                        raise WithdrawalError("Withdrawal Error: Withdrawal amount must be greater than 0")
+                    if methodCode in _SYSTEM_WITHDRAWAL_METHOD_CODES:
+                        raise WithdrawalError(f"Withdrawal Error: {VALID_WITHDRAWAL_METHODS[methodCode]} withdrawals can only be posted by the bank")
+                    typeCode = _WITHDRAWAL_CODE
+                else:
+                    raise TransactionError("Transaction Error: Batch entries must be a Deposit or Withdrawal")
+                if not userID:
+                    raise TransactionError("Transaction Error: User ID is required to generate a transaction ID")
+                append((typeCode, userID, amount, explicitFee if fee is not None else feeOf(typeCode, methodCode, tierCode, amount),
+                        origin, description, methodCode))
+        except KeyError as e:
+            failure = TransactionError(f"Batch Error: Entry {index}: Entry is missing required field {e}")
+            failure.__cause__ = e
+        except ValueError as e:
+            failure = type(e)(f"Batch Error: Entry {index}: {e}")
+            failure.__cause__ = e
+        with self._lock:
+            if not self.isActive():
+                raise AccountError("Account Error: Account is not active")
+            # The running balance of the batch is kept in whole cents
+            balance = self._balance.cents
+            creditLimit = self._creditLimit
+            for index, (typeCode, _, amount, fee, *_) in enumerate(rows):
+                if typeCode == _DEPOSIT_CODE:
+                    balance += amount - fee
+                    # Ensure a fee larger than the deposit does not take the running balance past the credit limit
+                    if balance < -creditLimit:
+                        raise DepositError(f"Batch Error: Entry {index}: Deposit Error: Deposit fee exceeds account balance")
+                else:
+                    # Ensure the withdrawal amount and fee are less than the running balance of the batch
+                    if amount + fee > balance + creditLimit:
+                        raise WithdrawalError(f"Batch Error: Entry {index}: Withdrawal Error: Withdrawal amount exceeds account balance")
+                    balance -= amount + fee
+            if failure is not None:
+                raise failure
+            # Every entry is valid- add the records and update the balance together
+            self._recordTransactions(self._batchRecords(rows))
+
+    # Builds the records of the passed validated postBatch entries on this account, each stamped as it is made- the
+    # transaction IDs are reserved together, and the records' fields are set directly, as restoreTransaction does
+    # Records are made faster than the clock ticks, so each is stamped as _nextTimeStamp would stamp it, a microsecond
+    # after the record before it if the clock has not moved on. Called with the lock held
+    def _batchRecords(self, rows: list[tuple]) -> list[Transaction]:
+        now, tick = datetime.now, _TIME_STAMP_TICK
+        timeStamps = []
+        self._loadTransactions()
+        last = self._lastTimeStamp or datetime.min
+        for _ in rows:
+            timeStamp = now()
+            last = timeStamp if timeStamp > last else last + tick
+            timeStamps.append(last)
+        transactionIDs = getTransactionIDGenerator().generateMany([row[1] for row in rows],
+                                                                  [VALID_TRANSACTION_TYPES[row[0]] for row in rows], timeStamps)
+        if Transaction.storeEpochTimeStamps:
+            storedTimeStamps = [toEpochMicros(timeStamp) for timeStamp in timeStamps]
+        else:
+            storedTimeStamps = timeStamps
+        accountID = self._accountID
+        newRecord = object.__new__
+        records = []
+        append = records.append
+        for (typeCode, userID, amount, fee, origin, description, methodCode), transactionID, timeStamp in zip(
+                rows, transactionIDs, storedTimeStamps):
+            if typeCode == _DEPOSIT_CODE:
+                record = newRecord(Deposit)
+                record._depositMethodCode = methodCode
+            else:
+                record = newRecord(Withdrawal)
+                record._withdrawalMethodCode = methodCode
+            record._timeStamp = timeStamp
+            record._userID = userID
+            record._accountID = accountID
+            record._amount = amount
+            record._transactionTypeCode = typeCode
+            record._fee = fee
+            record._origin = origin
+            record._description = description
+            record._transactionID = transactionID
+            append(record)
+        return records
+
+    # The transferTo method is used to move funds from this account to another account
+    # The method takes in the destination account, the user ID of the user making the transfer, the amount of the
+    # transfer, the fee charged for the transfer (default is None, for the fee schedule's fee- see fees.py), and a
+    # description of the transfer (default is None)- the fee is taken from this account
+    # The transfer is posted as two linked records- an Intra-Transfer debiting this account and a Transfer deposit
+    # crediting the destination, each with the other's transaction ID as its origin- and returns both
+    # Both accounts' locks are taken in order of account ID, so transfers in opposite directions cannot deadlock
+    # Everything that can fail (loading deferred records and writing to the write-ahead log) is done before either
+    # account is changed, so either both records are posted or neither is. The two records are logged as a single
+    # frame, so recovery also finds both or neither- accounts on different write-ahead logs can not be logged together,
+    # so transfers between them are refused
+    def transferTo(self, destination: "Account", userID: str, amount: float | Money, fee: float | Money = None,
+                   description: str = None) -> tuple[InternalTransfer, Deposit]:
+        if not isinstance(destination, Account):
+            raise TransferError("Transfer Error: Destination must be an account")
+        # Ensure both accounts are active
+        if not self.isActive() or not destination.isActive():
+            raise AccountError("Account Error: Account is not active")
+        first, second = (self, destination) if self._accountID < destination._accountID else (destination, self)
+        with first._lock, second._lock:
+            if not self.isActive() or not destination.isActive():
+                raise AccountError("Account Error: Account is not active")
+            wal, destinationWAL = self._wal, destination._wal
+            if wal is not None and destinationWAL is not None and wal is not destinationWAL:
+                raise TransferError("Transfer Error: Accounts on different write-ahead logs can not be transferred between")
+            # Create both records, linked by their transaction IDs, stamped at a time after the last record of either
+            # account (see _nextTimeStamp)
+            timeStamp = max(self._nextTimeStamp(), destination._nextTimeStamp())
+            debit = InternalTransfer(userID, self._accountID, destination._accountID, amount, fee=0.00 if fee is None else fee,
+                                     description=description, timeStamp=timeStamp)
+            # Ensure the transfer amount is positive, so a transfer can only move funds out of this account
+            if debit._amount <= 0:
+                raise TransferError("Transfer Error: Transfer amount must be greater than 0")
+            if fee is None:
+                debit._fee = getFeeSchedule().feeOf(_INTRA_TRANSFER_CODE, -1, self._tierCode, debit._amount)
+            credit = Deposit(userID, destination._accountID, Money.fromCents(debit._amount), "Transfer", description=description,
+                             timeStamp=timeStamp)
+            debit._origin, credit._origin = credit._transactionID, debit._transactionID
+            # Ensure the transfer amount and fee are less than the account balance (and credit limit)
+            if debit._amount + debit._fee > self._balance.cents + self._creditLimit:
+                raise TransferError("Transfer Error: Transfer amount exceeds account balance")
+            # Log the records of the accounts on a log as one frame- both, or the record of the only account with a log
+            if wal is not None and wal is destinationWAL:
+                wal.logPostings([debit, credit])
+            elif wal is not None:
+                wal.logPostings([debit])
+            elif destinationWAL is not None:
+                destinationWAL.logPostings([credit])
+            self._recordTransactions([debit], False)
+            destination._recordTransactions([credit], False)
+        return debit, credit
+
+    # The restoreTransactions method adds records that were already posted (such as records read back from a
+    # write-ahead log) to the account, updating the balance without validating or logging them again
+    def restoreTransactions(self, records: list[Transaction]) -> None:
+        self._recordTransactions(records, False)
+
+    # The deferTransactions method is used by restored accounts whose transaction records are stored elsewhere (such
+    # as a database)- the account takes the stored balance now, and calls the loader to get its records (in posting
+    # order) the first time they are needed
+    def deferTransactions(self, loader, balance: Money) -> None:
+        self._transactionLoader = loader
+        self._balance = balance
+
+    # Loads deferred transaction records, replaying them from the opening balance- the replayed balance must match
+    # the stored balance
+    # The records are loaded while the account's lock is held, so concurrent readers only load them once. The loader
+    # is only cleared once the records are in place- until then it is _LOADING, so readers that do not take the lock
+    # wait for the load rather than reading the list while it is being filled
+    def _loadTransactions(self) -> None:
+        if self._transactionLoader is None:
+            return
+        with self._lock:
+            loader = self._transactionLoader
+            # Nothing to load, or this thread is already loading (the records are added with _recordTransactions)
+            if loader is None or loader is _LOADING:
+                return
+            records = loader()
+            stored = self._balance
+            self._transactionLoader = _LOADING
+            try:
+                self._balance = self._openingBalance
+                self._recordTransactions(records, False)
+            finally:
+                self._transactionLoader = None
+            if self._balance != stored:
+                raise AccountError(f"Account Error: Stored balance {stored} does not match the transaction history ({self._balance})")
+
+    # Adds the passed records to the end of the account's transaction list, applies them to the balance, and
+    # updates the secondary indexes and balance checkpoints- the records are written to the account's write-ahead
+    # log first, so nothing is changed if they cannot be logged
+    # The account's lock is held throughout. Readers that do not take it see the records appended before the indexes,
+    # checkpoints, and balance that refer to them, so every position they read is already there
+    def _recordTransactions(self, records: list[Transaction], log: bool = True) -> None:
+        with self._lock:
+            self._loadTransactions()
+            if log and self._wal is not None:
+                self._wal.logPostings(records)
+            position = len(self._transactions)
+            self._transactions.extend(records)
+            typeIndex = self._typeIndex
+            methodIndex = self._methodIndex
+            balance = self._balance.cents
+            nextCheckpoint = self._checkpointPositions[-1] + self._checkpointInterval
+            lastDate = self._lastPostingDate
+            dailyCheckpoints = self._dailyCheckpoints
+            # The records' fields are read from their slots, so no Money or strings are made for each record
+            for record in records:
+                typeCode = record._transactionTypeCode
+                # Checkpoint the balance before this record if enough postings have passed or a new day has started
+                postingDate = record.timeStamp.date() if dailyCheckpoints else None
+                if position >= nextCheckpoint or (postingDate != lastDate and lastDate is not None):
+                    # The balance is added before its position, so a reader that finds the position finds its balance
+                    self._checkpointBalances.append(balance)
+                    self._checkpointPositions.append(position)
+                    nextCheckpoint = position + self._checkpointInterval
+                lastDate = postingDate
+                typeIndex.setdefault(VALID_TRANSACTION_TYPES[typeCode], []).append(position)
+                if typeCode == _DEPOSIT_CODE:
+                    methodIndex.setdefault(VALID_DEPOSIT_METHODS[record._depositMethodCode], []).append(position)
+                    balance += record._amount - record._fee
+                else:
+                    if typeCode == _WITHDRAWAL_CODE:
+                        methodIndex.setdefault(VALID_WITHDRAWAL_METHODS[record._withdrawalMethodCode], []).append(position)
+                    balance -= record._amount + record._fee
+                position += 1
+            self._lastPostingDate = lastDate
+            if records:
+                self._lastTimeStamp = records[-1].timeStamp
+            self._balance = Money.fromCents(balance)
+
+    # Returns the time stamp for a new record posted to the account, at the passed time (default is None, for the
+    # current time)- a time no later than the last record posted (as when the clock is set back, or two records are
+    # posted within a clock tick) is moved to a microsecond after it, so the records stay in time order for the binary
+    # searches over them (see _positionRange). Called with the lock held, before the record's ID is generated from it
+    def _nextTimeStamp(self, timeStamp: datetime = None) -> datetime:
+        timeStamp = datetime.now() if timeStamp is None else timeStamp
+        self._loadTransactions()
+        last = self._lastTimeStamp
+        return last + _TIME_STAMP_TICK if last is not None and timeStamp <= last else timeStamp
+
+    # The balanceAt method returns the balance of the account as of the passed time, after every transaction made
+    # at or before that time- times before the first transaction return the opening balance
+    # The number of records made by that time is found by binary search, and the balance is replayed forward
+    # from the nearest earlier checkpoint, so at most checkpointInterval records are read
+    def balanceAt(self, timeStamp: datetime) -> Money:
+        if not isinstance(timeStamp, datetime):
+            raise AccountError("Balance Error: Time stamp must be a datetime")
+        self._loadTransactions()
+        position = self._positionRange(None, timeStamp).stop
+        checkpoint = bisect_right(self._checkpointPositions, position) - 1
+        start = self._checkpointPositions[checkpoint]
+        balance = self._checkpointBalances[checkpoint]
+        if isinstance(self._transactions, ColumnarLedger):
+            return Money.fromCents(balance + self._transactions.netAmount(start, position).cents)
+        for record in self._transactions[start:position]:
+            if record.transactionType == "Deposit":
+                balance += record.amount.cents - record.fee.cents
+            else:
+                balance -= record.amount.cents + record.fee.cents
+        return Money.fromCents(balance)
+
+    # The iterTransactions method yields the account's transaction records made between start and end (inclusive,
+    # either can be None for an open range) in pages of at most pageSize records, in time order
+    # Each page holds an opaque cursor- passing it back (with the same range) resumes after that page, even from
+    # another call or process, as records are only ever added to the end of an account's history. The records to
+    # page through are fixed when the first page is read, so records posted while paging are left for a later cursor
+    # Only one page of records is held at a time
+    def iterTransactions(self, cursor: str = None, pageSize: int = DEFAULT_PAGE_SIZE, start: datetime = None,
+                         end: datetime = None) -> Iterator["TransactionPage"]:
+        if isinstance(pageSize, bool) or not isinstance(pageSize, int) or not 0 < pageSize <= MAX_PAGE_SIZE:
+            raise AccountError(f"Page Size Error: Page size must be an integer between 1 and {MAX_PAGE_SIZE}")
+        self._loadTransactions()
+        window = self._positionRange(start, end)
+        return self._pages(max(self._decodeCursor(cursor), window.start), window.stop, pageSize)
+
+    # Yields the pages of the records from the passed position up to the passed stop (see iterTransactions)
+    def _pages(self, position: int, stop: int, pageSize: int) -> Iterator["TransactionPage"]:
+        transactions = self._transactions
+        while True:
+            pageStop = min(position + pageSize, stop)
+            records = transactions[position:pageStop] if pageStop > position else []
+            position = max(position, pageStop)
+            yield TransactionPage(records, self._encodeCursor(position), position < stop)
+            if position >= stop:
+                return
+
+    # Returns a single page of the account's transaction records (see iterTransactions)
+    def transactionPage(self, cursor: str = None, pageSize: int = DEFAULT_PAGE_SIZE, start: datetime = None,
+                        end: datetime = None) -> "TransactionPage":
+        return next(self.iterTransactions(cursor, pageSize, start, end))
+
+    # Returns a cursor for the passed position- the position and the transaction ID of the record before it, so a
+    # cursor from another account is rejected
+    def _encodeCursor(self, position: int) -> str:
+        previousID = self._transactions[position - 1].transactionID if position > 0 else ""
+        return base64.urlsafe_b64encode(f"{position}:{previousID}".encode()).decode().rstrip("=")
+
+    # Returns the position of the passed cursor (0 for None)- throws an account error if the cursor is not one of
+    # this account's cursors
+    def _decodeCursor(self, cursor: str) -> int:
+        if cursor is None:
+            return 0
+        try:
+            text = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+            position, previousID = text.split(":", 1)
+            position = int(position)
+        except (TypeError, ValueError):
+            raise AccountError("Cursor Error: Cursor is not valid")
+        if not 0 <= position <= len(self._transactions) or position == 0 and previousID \
+                or position > 0 and self._transactions[position - 1].transactionID != previousID:
+            raise AccountError("Cursor Error: Cursor does not belong to this account")
+        return position
+
+    # Returns the range of positions of the transaction records made between start and end (inclusive)- the
+    # records are in time order, so the range is found by binary search
+    def _positionRange(self, start: datetime = None, end: datetime = None) -> range:
+        if isinstance(self._transactions, ColumnarLedger):
+            return self._transactions.indexRange(start, end)
+        low = bisect_left(self._transactions, start, key=_timeStampOf) if start else 0
+        high = bisect_right(self._transactions, end, key=_timeStampOf) if end else len(self._transactions)
+        return range(low, max(low, high))
+
+    # Returns the positions in the passed index lists that fall within the passed range, in order
+    @staticmethod
+    def _positionsWithin(index: dict[str, list[int]], keys: list[str], window: range) -> list[int]:
+        slices = []
+        for key in keys:
+            positions = index.get(key)
+            if positions:
+                slices.append(positions[bisect_left(positions, window.start):bisect_left(positions, window.stop)])
+        return slices[0] if len(slices) == 1 else list(merge(*slices))
+
+    # The transactionsBetween method returns the account's transaction records made between start and end (inclusive,
+    # either can be None for an open range), optionally only including records of the passed transaction types and
+    # deposit or withdrawal methods
+    # The time window is found by binary search and the types and methods are looked up in the secondary indexes,
+    # so the cost grows with the number of matching records rather than the size of the account's history
+    def transactionsBetween(self, start: datetime = None, end: datetime = None, types: list[str] = None,
+                            methods: list[str] = None) -> list[Transaction]:
+        if isinstance(types, str): types = [types]
+        if isinstance(methods, str): methods = [methods]
+        self._loadTransactions()
+        window = self._positionRange(start, end)
+        if types is None and methods is None:
+            return self._transactions[window.start:window.stop]
+        positions = None
+        if types is not None:
+            positions = self._positionsWithin(self._typeIndex, types, window)
+        if methods is not None:
+            methodPositions = self._positionsWithin(self._methodIndex, methods, window)
+            if positions is None:
+                positions = methodPositions
+            else:
+                matches = set(methodPositions)
+                positions = [position for position in positions if position in matches]
+        transactions = self._transactions
+        return [transactions[position] for position in positions]
 
     def isActive(self) -> bool:
         return self._status == "Active"
 
-    # Returns a string representation of the account object 
+    # Locks cannot be copied or pickled, so an account's lock is left out of its state and a new one is made when
+    # the state is restored
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.RLock()
+
+    # Returns a string representation of the account object- a summary with the number of transaction records and
+    # only the most recent few (see RECENT_TRANSACTIONS_SHOWN), so it stays short however long the history is
     def __str__(self) -> str:
-        return f"Account ID: {self.accountID}\nUser ID: {self.userID}\nBalance: {self.balance}\nDate Created: {self.dateCreated}\nStatus: {self.status}\nTransactions: {self.transactions}"
-    
\ No newline at end of file
+        transactions = self.transactions
+        count = len(transactions)
+        recent = transactions[max(count - RECENT_TRANSACTIONS_SHOWN, 0):count]
+        lines = [f"Account ID: {self.accountID}", f"User ID: {self.userID}", f"Balance: {self.balance}",
+                 f"Date Created: {self.dateCreated}", f"Status: {self.status}", f"Transactions: {count}"]
+        if count > len(recent):
+            lines.append(f"Most Recent {len(recent)}:")
+        lines += [f"  {record.timeStamp:%Y-%m-%d %H:%M:%S} {record.transactionType} {record.amount} ({record.transactionID})"
+                  for record in reversed(recent)]
+        return "\n".join(lines)
+
+# Returns the time stamp of a transaction record, the key the account's transaction list is ordered by
+_timeStampOf = attrgetter("timeStamp")
+
+
+# The savings account class is a derived class of the account class for accounts that earn interest
+# Interest rates are tiered- each tier is a minimum balance and the annual rate paid on the whole balance once it
+# reaches that minimum. Interest is accrued a day at a time and compounds either daily (the interest accrued so far
+# earns interest too) or monthly (only the posted balance earns interest until the accrued interest is posted)
+# Accrued interest is kept in fractional cents until it is posted as an "Interest" deposit- only whole cents are
+# posted, and the remainder is carried forward. Only active accounts accrue interest
+# accrueInterest accrues a single account- interest.py accrues many accounts at once. The interest accrued is written
+# to the account's write-ahead log, with the deposit posting it if there is one
+class SavingsAccount(Account):
+    _kind: str = "SavingsAccount"
+
+    # The constructor takes the same values as the account class constructor, as well as the interest rates (a
+    # single annual rate, or a list of tiers of minimum balance and annual rate) and the compounding period
+    def __init__(self, accountID: str, userID: str, initialDeposit: float | Money, ledger: ColumnarLedger = None,
+                 interestRates: float | list[tuple[float | Money, float]] = 0.00, compounding: str = "daily", **options):
+        # Interest Tiers: the minimum balance (in cents) and annual rate of each tier, lowest first
+        self._interestTiers: tuple[tuple[int, float], ...] = self._validateInterestTiers(interestRates)
+        self._compounding: str = self._validateCompounding(compounding)
+        # Accrued Interest: interest accrued but not yet posted, in fractional cents
+        self._accruedInterest: float = 0.0
+        super().__init__(accountID, userID, initialDeposit, ledger, **options)
+
+    # Returns the interest tiers, compounding period, and accrued interest of the account, as they are saved with it
+    def _savedState(self) -> dict:
+        return {"interestTiers": [list(tier) for tier in self._interestTiers], "compounding": self._compounding,
+                "accruedInterest": self._accruedInterest}
+
+    # Sets the interest tiers, compounding period, and accrued interest of the account from the state saved with it-
+    # the interest accrual engine saves only the accrued interest (see interest.py)
+    def _restoreState(self, state: dict) -> None:
+        if "interestTiers" in state:
+            self._interestTiers = tuple((minimum, rate) for minimum, rate in state["interestTiers"])
+            self._compounding = state["compounding"]
+        self._accruedInterest = state["accruedInterest"]
+
+    # Getter for the interest tiers- pairs of the minimum balance (in cents) and annual rate of each tier
+    @property
+    def interestTiers(self) -> tuple[tuple[int, float], ...]:
+        return self._interestTiers
+
+    # Getter for the compounding period
+    @property
+    def compounding(self) -> str:
+        return self._compounding
+
+    # Getter for the interest accrued but not yet posted, in fractional cents
+    @property
+    def accruedInterest(self) -> float:
+        return self._accruedInterest
+
+    # Validates the interest rates, returning them as tiers of minimum balance (in cents) and annual rate- a single
+    # rate is one tier from a zero balance. Tiers are sorted by minimum balance, and the lowest must start at zero
+    @staticmethod
+    def _validateInterestTiers(interestRates: float | list[tuple[float | Money, float]]) -> tuple[tuple[int, float], ...]:
+        if isinstance(interestRates, (int, float)) and not isinstance(interestRates, bool):
+            interestRates = [(0, interestRates)]
+        if not isinstance(interestRates, (list, tuple)) or not interestRates:
+            raise AccountError("Interest Rate Error: Interest rates must be a rate or a list of tiers")
+        tiers = []
+        for tier in interestRates:
+            if not isinstance(tier, (list, tuple)) or len(tier) != 2:
+                raise AccountError("Interest Rate Error: Each tier must be a minimum balance and a rate")
+            minimum, rate = tier
+            try:
+                minimum = validateNonNegativeMoney(minimum, "Minimum Balance").cents
+            except InputError as e:
+                raise AccountError(f"Interest Rate Error: {e}")
+            if isinstance(rate, bool) or not isinstance(rate, (int, float)) or not 0 <= rate <= 1:
+                raise AccountError("Interest Rate Error: Rates must be between 0 and 1")
+            tiers.append((minimum, float(rate)))
+        tiers.sort()
+        if tiers[0][0] != 0 or len({minimum for minimum, _ in tiers}) != len(tiers):
+            raise AccountError("Interest Rate Error: Tiers must start at a zero balance and have distinct minimums")
+        return tuple(tiers)
+
+    # Validates that the compounding period is a valid compounding period (see utilities.py)
+    @staticmethod
+    def _validateCompounding(compounding: str) -> str:
+        if compounding not in VALID_COMPOUNDING:
+            raise AccountError(f"Interest Rate Error: Compounding must be one of {', '.join(VALID_COMPOUNDING)}")
+        return compounding
+
+    # Returns the annual rate paid on the passed balance (default is the account balance)
+    def interestRate(self, balance: Money = None) -> float:
+        cents = (self._balance if balance is None else balance).cents
+        rate = 0.0
+        for minimum, tierRate in self._interestTiers:
+            if cents < minimum:
+                break
+            rate = tierRate
+        return rate
+
+    # Accrues the passed number of days of interest, and posts the whole cents accrued as an "Interest" deposit if
+    # post is set (such as at the end of the month)- returns the posted deposit, or None if nothing was posted
+    def accrueInterest(self, days: int = 1, post: bool = True, description: str = "Interest") -> "Deposit | None":
+        if isinstance(days, bool) or not isinstance(days, int) or days < 0:
+            raise AccountError("Interest Error: Days must be a non-negative integer")
+        description = _validateDescription(description)
+        with self._lock:
+            if self._status != "Active":
+                return None
+            balance = self._balance.cents
+            rate = self.interestRate()
+            if self._compounding == "daily":
+                accrued = self._accruedInterest
+                accrued += (balance + accrued) * ((1 + rate / DAYS_PER_YEAR) ** days - 1)
+            else:
+                accrued = self._accruedInterest + balance * rate / DAYS_PER_YEAR * days
+            cents = int(accrued + INTEREST_TOLERANCE) if post else 0
+            previous = self._accruedInterest
+            self._accruedInterest = max(accrued - cents, 0.0) if cents > 0 else accrued
+            try:
+                return self._postInterest(cents, description)
+            except BaseException:
+                self._accruedInterest = previous
+                raise
+
+    # Posts the passed whole cents of accrued interest as an "Interest" deposit with the passed (already validated)
+    # description- the amount was calculated from the account's own balance, so the deposit is made without validating
+    # it again. The caller takes the posted cents off the accrued interest first, and the interest left accrued is
+    # logged with the deposit (or alone, if nothing is posted). Returns the deposit, or None for nothing
+    def _postInterest(self, cents: int, description: str = "Interest", timeStamp: datetime = None) -> "Deposit | None":
+        with self._lock:
+            if cents <= 0:
+                self._logState()
+                return None
+            timeStamp = self._nextTimeStamp(timeStamp)
+            transactionID = getTransactionIDGenerator().generate(self._userID, "Deposit", timeStamp)
+            deposit = restoreTransaction("Deposit", transactionID, timeStamp, self._userID, self._accountID, cents,
+                                         method="Interest", description=description)
+            self._logState([deposit])
+            self._recordTransactions([deposit], False)
+        return deposit
+
+
+# The credit account class is a derived class of the account class for revolving credit
+# The balance of a credit account is what the customer holds in it- purchases (withdrawals) take it below zero, down to
+# the negative of the credit limit, and payments (deposits) bring it back up. Statements are made a cycle at a time:
+# each cycle ends on the statement day of the month, when interest is charged at the APR on the average daily balance
+# owed, and a minimum payment (a share of the balance owed, but at least the minimum payment floor) is set
+# The net change to the balance on each day of the open cycle is kept as postings are made, so a cycle can be closed
+# without reading its transaction records- credit.py closes the cycles of many accounts at once
+class CreditAccount(Account):
+    _validateOpening = staticmethod(_validateCreditAccount)
+    _kind: str = "CreditAccount"
+
+    # The constructor takes the same values as the account class constructor (the initial deposit can be 0.00), as
+    # well as the credit limit, the APR, the day of the month statements close on, the share of the balance owed and
+    # the floor of the minimum payment, and the first day of the open cycle (defaults to today)
+    def __init__(self, accountID: str, userID: str, initialDeposit: float | Money = 0.00, ledger: ColumnarLedger = None,
+                 creditLimit: float | Money = 0.00, apr: float = 0.00, statementDay: int = 1,
+                 minimumPaymentRate: float = 0.01, minimumPaymentFloor: float | Money = 25.00, cycleStart: date = None,
+                 **options):
+        creditLimit, minimumPaymentFloor = _validateCreditTerms(creditLimit, minimumPaymentFloor)
+        apr = self._validateRate(apr, "Interest Rate Error: APR")
+        minimumPaymentRate = self._validateRate(minimumPaymentRate, "Minimum Payment Error: Minimum payment rate")
+        if isinstance(statementDay, bool) or not isinstance(statementDay, int) or not 1 <= statementDay <= MAX_STATEMENT_DAY:
+            raise AccountError(f"Statement Day Error: Statement day must be a day of the month from 1 to {MAX_STATEMENT_DAY}")
+        if cycleStart is not None and (isinstance(cycleStart, datetime) or not isinstance(cycleStart, date)):
+            raise AccountError("Statement Cycle Error: Cycle start must be a date")
+        # Credit Limit: the amount (in cents) the balance may go below zero
+        self._creditLimit: int = creditLimit
+        self._apr: float = apr
+        self._statementDay: int = statementDay
+        self._minimumPaymentRate: float = minimumPaymentRate
+        self._minimumPaymentFloor: int = minimumPaymentFloor
+        # Open Cycle: the first day of the cycle, the balance (in cents) before it (set from the opening balance by
+        # _initialize), and the net change to the balance (in cents) on each day of it so far- postings dated before
+        # the cycle are added to its opening balance
+        self._cycleStart: date = cycleStart if cycleStart is not None else date.today()
+        self._dailyChanges: array = array("q")
+        # Last Statement: the statement of the last cycle closed, if any
+        self._lastStatement: "Statement" = None
+        super().__init__(accountID, userID, initialDeposit, ledger, **options)
+
+    # Sets up the fields of the account (see Account._initialize)- the open cycle starts at the opening balance
+    def _initialize(self, accountID: str, userID: str, openingBalance: Money, ledger: ColumnarLedger = None,
+                    **options) -> None:
+        super()._initialize(accountID, userID, openingBalance, ledger, **options)
+        self._cycleOpening: int = openingBalance.cents
+
+    # Returns the terms and open cycle of the account, and its last statement (with amounts in cents and dates in ISO
+    # format), as they are saved with it
+    def _savedState(self) -> dict:
+        statement = self._lastStatement
+        if statement is not None:
+            statement = [value.isoformat() if isinstance(value, date) else value.cents if isinstance(value, Money)
+                         else value for value in statement]
+        return {"creditLimit": self._creditLimit, "apr": self._apr, "statementDay": self._statementDay,
+                "minimumPaymentRate": self._minimumPaymentRate, "minimumPaymentFloor": self._minimumPaymentFloor,
+                "cycleStart": self._cycleStart.isoformat(), "cycleOpening": self._cycleOpening,
+                "dailyChanges": self._dailyChanges.tolist(), "lastStatement": statement}
+
+    # Sets the terms and open cycle of the account, and its last statement, from the state saved with it
+    def _restoreState(self, state: dict) -> None:
+        self._creditLimit = state["creditLimit"]
+        self._apr = state["apr"]
+        self._statementDay = state["statementDay"]
+        self._minimumPaymentRate = state["minimumPaymentRate"]
+        self._minimumPaymentFloor = state["minimumPaymentFloor"]
+        self._cycleStart = date.fromisoformat(state["cycleStart"])
+        self._cycleOpening = state["cycleOpening"]
+        self._dailyChanges = array("q", state["dailyChanges"])
+        statement = state["lastStatement"]
+        if statement is not None:
+            accountID, periodStart, periodEnd, *amounts, paymentDueDate = statement
+            statement = Statement(accountID, date.fromisoformat(periodStart), date.fromisoformat(periodEnd),
+                                  *map(Money.fromCents, amounts), date.fromisoformat(paymentDueDate))
+        self._lastStatement = statement
+
+    # Getter for the credit limit
+    @property
+    def creditLimit(self) -> Money:
+        return Money.fromCents(self._creditLimit)
+
+    # Getter for the credit still available- the balance plus the credit limit
+    @property
+    def availableCredit(self) -> Money:
+        return Money.fromCents(self._balance.cents + self._creditLimit)
+
+    # Getter for the APR
+    @property
+    def apr(self) -> float:
+        return self._apr
+
+    # Getter for the day of the month statements close on
+    @property
+    def statementDay(self) -> int:
+        return self._statementDay
+
+    # Getter for the share of the balance owed due as the minimum payment
+    @property
+    def minimumPaymentRate(self) -> float:
+        return self._minimumPaymentRate
+
+    # Getter for the least minimum payment due on a balance owed
+    @property
+    def minimumPaymentFloor(self) -> Money:
+        return Money.fromCents(self._minimumPaymentFloor)
+
+    # Getter for the first day of the open cycle
+    @property
+    def cycleStart(self) -> date:
+        return self._cycleStart
+
+    # Getter for the statement of the last cycle closed
+    @property
+    def lastStatement(self) -> "Statement":
+        return self._lastStatement
+
+    # Validates that the passed rate is a number between 0 and 1
+    @staticmethod
+    def _validateRate(rate: float, label: str) -> float:
+        if isinstance(rate, bool) or not isinstance(rate, (int, float)) or not 0 <= rate <= 1:
+            raise AccountError(f"{label} must be between 0 and 1")
+        return float(rate)
+
+    # Returns the first day the passed date's statement cycle could close on- the next statement day on or after it
+    def nextClosingDate(self, day: date = None) -> date:
+        day = self._cycleStart if day is None else day
+        if day.day <= self._statementDay:
+            return day.replace(day=self._statementDay)
+        return (day.replace(day=1) + timedelta(days=32)).replace(day=self._statementDay)
+
+    # Adds the passed records to the account (see Account._recordTransactions), and adds the change each makes to the
+    # balance to the day of the open cycle it was made on- records made on a single day (as most are) are added as
+    # one change. Deferred records being loaded are already counted in the open cycle restored with the account
+    def _recordTransactions(self, records: list[Transaction], log: bool = True) -> None:
+        with self._lock:
+            before = self._balance.cents
+            loading = self._transactionLoader is _LOADING
+            super()._recordTransactions(records, log)
+            if not records or loading:
+                return
+            start = self._cycleStart.toordinal()
+            day = records[0].timeStamp.toordinal()
+            if day == records[-1].timeStamp.toordinal():
+                self._addDailyChange(day - start, self._balance.cents - before)
+                return
+            for record in records:
+                if record.transactionType == "Deposit":
+                    change = record.amount.cents - record.fee.cents
+                else:
+                    change = -record.amount.cents - record.fee.cents
+                self._addDailyChange(record.timeStamp.toordinal() - start, change)
+
+    # Adds the passed change (in cents) to the passed day of the open cycle
+    def _addDailyChange(self, day: int, change: int) -> None:
+        if day < 0:
+            self._cycleOpening += change
+            return
+        changes = self._dailyChanges
+        if day >= len(changes):
+            changes.frombytes(bytes(changes.itemsize * (day + 1 - len(changes))))
+        changes[day] += change
+
+    # Returns the balance (in cents) before the open cycle, the daily changes of the open cycle up to and including
+    # the passed closing date, and the number of days from the start of the cycle to that date- or None if the cycle
+    # starts after it (such as when it has already been closed)
+    def _cycleSnapshot(self, closingDate: date) -> tuple[int, array, int] | None:
+        with self._lock:
+            days = closingDate.toordinal() - self._cycleStart.toordinal() + 1
+            if days <= 0:
+                return None
+            return self._cycleOpening, self._dailyChanges[:days], days
+
+    # Closes the open cycle on the passed closing date with the passed statement, and charges the statement's interest
+    # as an "Interest" withdrawal- the new cycle and the withdrawal are written to the log as one frame, so if they can
+    # not be logged the cycle is left open to be closed again
+    # Changes after the closing date are carried into the new cycle, which starts the day after- the withdrawal is
+    # added to the new cycle's opening balance or to the day it was made on, as it is for any posting
+    def _closeCycle(self, statement: "Statement", interest: int, timeStamp: datetime = None) -> None:
+        with self._lock:
+            records = []
+            if interest > 0:
+                timeStamp = self._nextTimeStamp(timeStamp)
+                transactionID = getTransactionIDGenerator().generate(self._userID, "Withdrawal", timeStamp)
+                records.append(restoreTransaction("Withdrawal", transactionID, timeStamp, self._userID, self._accountID,
+                                                  interest, method="Interest", description="Interest Charge"))
+            cycle = self._cycleStart, self._cycleOpening, self._dailyChanges, self._lastStatement
+            days = statement.periodEnd.toordinal() - self._cycleStart.toordinal() + 1
+            self._cycleOpening += sum(self._dailyChanges[:days])
+            self._dailyChanges = self._dailyChanges[days:]
+            self._cycleStart = statement.periodEnd + timedelta(days=1)
+            self._lastStatement = statement
+            try:
+                self._logState(records)
+            except BaseException:
+                self._cycleStart, self._cycleOpening, self._dailyChanges, self._lastStatement = cycle
+                raise
+            self._recordTransactions(records, False)
+
+# The investment account class is a derived class of the account class for accounts that hold securities
+# The balance of an investment account is its cash- buying a security takes its cost (and fee) from the cash as a
+# "Trade" withdrawal, and selling one adds its proceeds as a "Trade" deposit. Each position is a symbol, a quantity
+# (which can be fractional), and a cost basis (what was paid for it, including fees, in cents). Selling part of a
+# position takes the same share of its cost basis, so the cost basis is always the average cost of what is held
+# Positions are kept in three compact arrays (symbol codes, quantities, and cost bases) in place of a list of objects,
+# so valuation.py can value the positions of many accounts at once. A trade replaces the arrays with changed copies, which
+# are written to the account's write-ahead log with the trade's record
+class InvestmentAccount(Account):
+    _kind: str = "InvestmentAccount"
+
+    # The constructor takes the same values as the account class constructor- the initial deposit is cash
+    def __init__(self, accountID: str, userID: str, initialDeposit: float | Money, ledger: ColumnarLedger = None,
+                 **options):
+        # Positions: the symbol code (see symbolCode), quantity, and cost basis (in cents) of each position held
+        self._positionSymbols: array = array("q")
+        self._positionQuantities: array = array("d")
+        self._positionCosts: array = array("q")
+        super().__init__(accountID, userID, initialDeposit, ledger, **options)
+
+    # Returns the positions of the account, as lists of the symbol, quantity, and cost basis (in cents) saved with it
+    def _savedState(self) -> dict:
+        return {"positions": [[_symbols[code], quantity, cost] for code, quantity, cost
+                              in zip(self._positionSymbols, self._positionQuantities, self._positionCosts)]}
+
+    # Sets the positions of the account from the state saved with it (see restorePositions)
+    def _restoreState(self, state: dict) -> None:
+        self._positionSymbols, self._positionQuantities, self._positionCosts = array("q"), array("d"), array("q")
+        self.restorePositions([(symbol, quantity, Money.fromCents(cost)) for symbol, quantity, cost in state["positions"]])
+
+    # Getter for the positions held, in the order they were opened
+    @property
+    def positions(self) -> list["Position"]:
+        with self._lock:
+            return [Position(_symbols[code], quantity, Money.fromCents(cost)) for code, quantity, cost
+                    in zip(self._positionSymbols, self._positionQuantities, self._positionCosts)]
+
+    # Returns the position held in the passed symbol, or None if none is held
+    def position(self, symbol: str) -> "Position | None":
+        with self._lock:
+            index = self._positionIndex(symbolCode(self._validateSymbol(symbol)))
+            if index is None:
+                return None
+            return Position(_symbols[self._positionSymbols[index]], self._positionQuantities[index],
+                            Money.fromCents(self._positionCosts[index]))
+
+    # Validates that the passed symbol is a ticker symbol, returning it in upper case
+    @staticmethod
+    def _validateSymbol(symbol: str) -> str:
+        if not isinstance(symbol, str) or not SYMBOL_PATTERN.fullmatch(symbol.upper()):
+            raise InvestmentError("Investment Error: Symbol must be a ticker symbol of at most 12 characters")
+        return symbol.upper()
+
+    # Validates that the passed quantity is a positive, finite number of shares
+    @staticmethod
+    def _validateQuantity(quantity: float) -> float:
+        if isinstance(quantity, bool) or not isinstance(quantity, (int, float)) or not math.isfinite(quantity) \
+                or quantity <= 0:
+            raise InvestmentError("Investment Error: Quantity must be a positive number")
+        return float(quantity)
+
+    # Validates that the passed price per share is a positive, finite amount, returning it in (fractional) cents- prices
+    # are not rounded to the cent, as in the price tables of valuation.py, and only the value of a trade is
+    @staticmethod
+    def _validatePrice(price: float | Money) -> float:
+        if type(price) is Money:
+            cents = float(price.cents)
+        elif isinstance(price, bool) or not isinstance(price, (int, float, Decimal)):
+            raise InvestmentError("Investment Error: Price must be a positive number")
+        else:
+            cents = float(price) * 100
+        if not math.isfinite(cents) or cents <= 0:
+            raise InvestmentError("Investment Error: Price must be a positive number")
+        return cents
+
+    # Returns the passed price in cents as dollars, with at least two decimal places and any fractions of a cent
+    @staticmethod
+    def _formatPrice(cents: float) -> str:
+        dollars = f"{cents / 100:.6f}".rstrip("0")
+        return dollars + "0" * (3 - len(dollars) + dollars.index("."))
+
+    # Returns the index of the position in the passed symbol code, or None if none is held
+    def _positionIndex(self, code: int) -> int | None:
+        try:
+            return self._positionSymbols.index(code)
+        except ValueError:
+            return None
+
+    # The buy method is used to buy the passed quantity of a security at the passed price per share, with the fee
+    # charged for the trade (default is None, for the fee schedule's fee- see fees.py)- the cost (rounded to the cent)
+    # and fee are taken from the cash, and added to the position's cost basis. Returns the "Trade" withdrawal posted
+    def buy(self, userID: str, symbol: str, quantity: float, price: float | Money, fee: float | Money = None) -> Withdrawal:
+        symbol, quantity = self._validateSymbol(symbol), self._validateQuantity(quantity)
+        price, explicitFee = self._validatePrice(price), _validateTradeFee(0.00 if fee is None else fee)
+        cost = round(quantity * price)
+        if cost <= 0:
+            raise InvestmentError("Investment Error: Trade value must be at least 0.01")
+        fee = explicitFee if fee is not None else getFeeSchedule().feeOf(_WITHDRAWAL_CODE, _BUY_METHOD_CODE, self._tierCode, cost)
+        if not self.isActive():
+            raise AccountError("Account Error: Account is not active")
+        code = symbolCode(symbol)
+        with self._lock:
+            if self._status != "Active":
+                raise AccountError("Account Error: Account is not active")
+            withdrawal = Withdrawal(userID, self._accountID, Money.fromCents(cost), "Trade", Money.fromCents(fee),
+                                    description=f"Buy {quantity:g} {symbol} @ {self._formatPrice(price)}",
+                                    timeStamp=self._nextTimeStamp())
+            # Ensure the cost and fee are less than the cash balance
+            if cost + fee > self._balance.cents:
+                raise InvestmentError("Investment Error: Trade cost exceeds account balance")
+            index = self._positionIndex(code)
+            symbols, quantities, costs = self._copyPositions()
+            if index is None:
+                symbols.append(code)
+                quantities.append(quantity)
+                costs.append(cost + fee)
+            else:
+                quantities[index] += quantity
+                costs[index] += cost + fee
+            self._replacePositions(symbols, quantities, costs, [withdrawal])
+        return withdrawal
+
+    # The sell method is used to sell the passed quantity of a security held at the passed price per share, with the
+    # fee charged for the trade (default is None, for the fee schedule's fee- see fees.py)- the proceeds (rounded to the
+    # cent) less the fee are added to the cash, and the same share of the position's cost basis is taken off it.
+    # Returns the "Trade" deposit posted
+    def sell(self, userID: str, symbol: str, quantity: float, price: float | Money, fee: float | Money = None) -> Deposit:
+        symbol, quantity = self._validateSymbol(symbol), self._validateQuantity(quantity)
+        price, explicitFee = self._validatePrice(price), _validateTradeFee(0.00 if fee is None else fee)
+        if not self.isActive():
+            raise AccountError("Account Error: Account is not active")
+        proceeds = round(quantity * price)
+        if proceeds <= 0:
+            raise InvestmentError("Investment Error: Trade value must be at least 0.01")
+        fee = explicitFee if fee is not None else getFeeSchedule().feeOf(_DEPOSIT_CODE, _SELL_METHOD_CODE, self._tierCode, proceeds)
+        code = symbolCode(symbol)
+        with self._lock:
+            if self._status != "Active":
+                raise AccountError("Account Error: Account is not active")
+            deposit = Deposit(userID, self._accountID, Money.fromCents(proceeds), "Trade", Money.fromCents(fee),
+                              description=f"Sell {quantity:g} {symbol} @ {self._formatPrice(price)}",
+                              timeStamp=self._nextTimeStamp())
+            index = self._positionIndex(code)
+            held = self._positionQuantities[index] if index is not None else 0.0
+            # Ensure the quantity sold is held- a sale within a rounding error of the whole position closes it
+            if quantity > held * (1 + 1e-12):
+                raise InvestmentError(f"Investment Error: Quantity exceeds the {held:g} {symbol} held")
+            # Ensure a fee larger than the proceeds is less than the cash balance
+            if fee - proceeds > self._balance.cents:
+                raise InvestmentError("Investment Error: Trade fee exceeds account balance")
+            symbols, quantities, costs = self._copyPositions()
+            if quantity >= held * (1 - 1e-12):
+                del symbols[index], quantities[index], costs[index]
+            else:
+                costs[index] -= round(costs[index] * quantity / held)
+                quantities[index] = held - quantity
+            self._replacePositions(symbols, quantities, costs, [deposit])
+        return deposit
+
+    # Returns copies of the position arrays, to be changed and passed to _replacePositions
+    def _copyPositions(self) -> tuple[array, array, array]:
+        return array("q", self._positionSymbols), array("d", self._positionQuantities), array("q", self._positionCosts)
+
+    # Replaces the position arrays with the passed arrays, and writes the new positions to the account's write-ahead log
+    # with the passed records (see Account._logState) before the records are added- if they can not be logged, the
+    # positions are left as they were and nothing is posted. Called with the lock held
+    def _replacePositions(self, symbols: array, quantities: array, costs: array, records: list[Transaction] = ()) -> None:
+        previous = self._positionSymbols, self._positionQuantities, self._positionCosts
+        self._positionSymbols, self._positionQuantities, self._positionCosts = symbols, quantities, costs
+        try:
+            self._logState(records)
+        except BaseException:
+            self._positionSymbols, self._positionQuantities, self._positionCosts = previous
+            raise
+        if records:
+            self._recordTransactions(records, False)
+
+    # The restorePositions method sets the positions held from saved state (such as a database)- each position is a
+    # symbol, quantity, and cost basis, with no cash moved or records posted. The positions are written to the
+    # account's write-ahead log, if it has one
+    def restorePositions(self, positions: list[tuple[str, float, float | Money]]) -> None:
+        symbols, quantities, costs = array("q"), array("d"), array("q")
+        for symbol, quantity, costBasis in positions:
+            code = symbolCode(self._validateSymbol(symbol))
+            if code in symbols:
+                raise InvestmentError(f"Investment Error: Position in {symbol} is listed more than once")
+            symbols.append(code)
+            quantities.append(self._validateQuantity(quantity))
+            try:
+                costs.append(validateNonNegativeMoney(costBasis, "Cost Basis").cents)
+            except InputError as e:
+                raise InvestmentError(f"Investment Error: {e}")
+        with self._lock:
+            self._replacePositions(symbols, quantities, costs)
+
+    # Returns copies of the position arrays (as bytes) and the cash balance (in cents), all read at once
+    def _positionSnapshot(self) -> tuple[bytes, bytes, bytes, int]:
+        with self._lock:
+            return (self._positionSymbols.tobytes(), self._positionQuantities.tobytes(),
+                    self._positionCosts.tobytes(), self._balance.cents)
+
+# The account classes, by the kind saved with their accounts
+ACCOUNT_KINDS: dict[str, type[Account]] = {cls._kind: cls for cls in (Account, SavingsAccount, CreditAccount,
+                                                                        InvestmentAccount)}
+
+# The restoreAccount function rebuilds an account of the passed kind from saved state (see Account.restore), such as a
+# write-ahead log or a database row- the saved values are not validated again
+def restoreAccount(kind: str, accountID: str, userID: str, openingBalance: Money, dateCreated: date,
+                   ledger: ColumnarLedger = None, state: dict = None, tier: str = "Standard", **options) -> Account:
+    if kind not in ACCOUNT_KINDS:
+        raise AccountError(f"Account Error: Unknown account kind {kind}")
+    return ACCOUNT_KINDS[kind].restore(accountID, userID, openingBalance, dateCreated, ledger, state, tier, **options)
+
+# A page of an account's transaction records (see Account.iterTransactions)- the cursor resumes after the page, and
+# hasMore is whether any records in the range come after it
+class TransactionPage(NamedTuple):
+    transactions: list[Transaction]
+    cursor: str
+    hasMore: bool
+
+# A statement of a closed cycle of a credit account (see CreditAccount)- balances are amounts owed, so a credit balance
+# is negative. The new balance includes the interest charged, and the minimum payment is due by the payment due date
+class Statement(NamedTuple):
+    accountID: str
+    periodStart: date
+    periodEnd: date
+    previousBalance: Money
+    newBalance: Money
+    averageDailyBalance: Money
+    interestCharged: Money
+    minimumDue: Money
+    paymentDueDate: date
+
+# A position of an investment account- the symbol, the quantity held, and the cost basis
+class Position(NamedTuple):
+    symbol: str
+    quantity: float
+    costBasis: Money
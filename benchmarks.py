@@ -0,0 +1,601 @@
+# Jack Timmons, 27 Dec 2024, Winter Break
+# The purpose of this program is to provide users with a simulated bank managment interface, gaining
+# expierence with OOP, full-stack development, and my first expierence creating both a local GUI and
+# web-based application
+
+# The purpose of this file is to contain performance benchmarks for the hot paths of the program
+# Run with: python benchmarks.py
+
+import asyncio
+import gc
+import os
+import random
+import tempfile
+import threading
+import time
+import timeit
+import tracemalloc
+from accounts import *
+from credit import closeCycles
+from fees import *
+from email_validator import validate_email
+from emails import EmailNormalizer
+from identifiers import *
+from interest import accrueInterest
+from ledger import ColumnarLedger
+from ledgerfile import *
+from metrics import *
+from onboarding import *
+from repository import Repository
+from settlement import *
+from statements import *
+from user import Customer
+from valuation import PriceTable, valuePortfolios
+from wal import *
+
+
+# Measures how many deposits per second can be posted to a single account using the passed transaction
+# ID generator
+def benchmarkPostings(generator: TransactionIDGenerator, count: int) -> float:
+    previous = setTransactionIDGenerator(generator)
+    try:
+        account = Account("Bench0001", "BenchUser", 1000.00)
+        start = time.perf_counter()
+        for _ in range(count):
+            account.makeDeposit("BenchUser", 1.00, "Cash")
+        elapsed = time.perf_counter() - start
+    finally:
+        setTransactionIDGenerator(previous)
+    return count / elapsed
+
+
+# Compares posting throughput for each transaction ID generator
+def runPostingBenchmarks() -> None:
+    print("Postings per second by transaction ID generator:")
+    for name, generator, count in [("bcrypt (legacy)", BcryptIDGenerator(), 20),
+                                   ("sortable (default)", SortableIDGenerator(), 100_000),
+                                   ("hmac", HMACIDGenerator(b"benchmark-key"), 100_000)]:
+        print(f"  {name:<20} {benchmarkPostings(generator, count):>12,.0f}")
+
+
+# Compares the time per entry of posting deposits one call at a time against a single postBatch call
+def runBatchBenchmarks(count: int = 100_000) -> None:
+    entries = [{"transactionType": "Deposit", "userID": "BenchUser", "amount": 1.00, "method": "Cash"}] * count
+    account = Account("Bench0001", "BenchUser", 1000.00)
+    start = time.perf_counter()
+    for entry in entries:
+        account.makeDeposit("BenchUser", 1.00, "Cash")
+    single = (time.perf_counter() - start) / count
+    account = Account("Bench0002", "BenchUser", 1000.00)
+    start = time.perf_counter()
+    account.postBatch(entries)
+    batch = (time.perf_counter() - start) / count
+    print(f"Microseconds per posting ({count:,} entries):")
+    print(f"  {'makeDeposit':<20} {single * 1e6:>12.2f}")
+    print(f"  {'postBatch':<20} {batch * 1e6:>12.2f}")
+
+
+# Compares the memory used and the time taken to sum deposits for a list-backed and a columnar ledger
+def runLedgerBenchmarks(count: int = 100_000) -> None:
+    entries = [{"transactionType": "Deposit", "userID": "BenchUser", "amount": 1.00, "method": "Cash"}] * count
+    print(f"Ledger backends ({count:,} records):")
+    for name, ledger in [("list", None), ("columnar", ColumnarLedger())]:
+        account = Account("Bench0001", "BenchUser", 1000.00, ledger)
+        tracemalloc.start()
+        account.postBatch(entries)
+        memory = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        start = time.perf_counter()
+        if ledger is None:
+            total = sum(t.amount for t in account.transactions if t.transactionType == "Deposit")
+        else:
+            total = ledger.totalAmount("Deposit")
+        elapsed = time.perf_counter() - start
+        print(f"  {name:<20} {memory / count:>8.0f} bytes/record   sum deposits {elapsed * 1e3:>8.2f} ms")
+
+
+# Measures the memory used by each deposit object (with tracemalloc) and the time taken to construct one (with timeit),
+# with time stamps stored as datetimes and as epoch integers
+def runTransactionObjectBenchmarks(count: int = 1_000_000) -> None:
+    print(f"Deposit objects ({count:,} objects):")
+    for name, epoch in [("datetime stamps", False), ("epoch stamps", True)]:
+        Transaction.storeEpochTimeStamps = epoch
+        try:
+            gc.collect()
+            tracemalloc.start()
+            deposits = [Deposit("BenchUser", "Bench0001", 1.00, "Cash") for _ in range(count)]
+            memory = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            del deposits
+            gc.collect()
+            elapsed = timeit.timeit(lambda: Deposit("BenchUser", "Bench0001", 1.00, "Cash"), number=count)
+        finally:
+            Transaction.storeEpochTimeStamps = False
+        print(f"  {name:<20} {memory / count:>8.0f} bytes/object   {elapsed / count * 1e6:>8.2f} us/object")
+
+
+# Compares a one day, withdrawals only lookup done by scanning every record against transactionsBetween
+def runQueryBenchmarks(count: int = 200_000) -> None:
+    entries = [{"transactionType": "Deposit" if i % 10 else "Withdrawal", "userID": "BenchUser", "amount": 1.00, "method": "Cash"}
+               for i in range(count)]
+    account = Account("Bench0001", "BenchUser", 1000.00)
+    account.postBatch(entries)
+    start = account.transactions[count // 2].timeStamp
+    end = account.transactions[count // 2 + 1000].timeStamp
+    began = time.perf_counter()
+    scanned = [t for t in account.transactions if start <= t.timeStamp <= end and t.transactionType == "Withdrawal"]
+    scan = time.perf_counter() - began
+    began = time.perf_counter()
+    indexed = account.transactionsBetween(start, end, types=["Withdrawal"])
+    lookup = time.perf_counter() - began
+    assert len(scanned) == len(indexed)
+    print(f"Withdrawals in a window ({count:,} records, {len(indexed)} matches):")
+    print(f"  {'full scan':<20} {scan * 1e3:>12.3f} ms")
+    print(f"  {'transactionsBetween':<20} {lookup * 1e3:>12.3f} ms")
+
+
+# Compares historical balance lookups done by replaying every record against balanceAt, for several checkpoint
+# densities- the records are spread over a year so daily checkpoints are recorded as well
+def runBalanceAtBenchmarks(count: int = 1_000_000, lookups: int = 200) -> None:
+    print(f"Historical balance lookups ({count:,} records, {lookups} lookups):")
+    first = datetime(2024, 1, 1)
+    step = timedelta(days=365) / count
+    records = []
+    for i in range(count):
+        record = Deposit("BenchUser", "Bench0001", 1.00, "Cash") if i % 4 else Withdrawal("BenchUser", "Bench0001", 1.00, "Cash")
+        record._timeStamp = first + step * i
+        records.append(record)
+    # Random lookup times, so lookups do not line up with checkpoints
+    rng = random.Random(7)
+    times = [first + step * rng.randrange(count) for _ in range(lookups)]
+    for name, interval, daily in [("every 100", 100, False), ("every 1,000", 1000, False),
+                                  ("every 10,000", 10_000, False), ("daily + 10,000", 10_000, True)]:
+        account = Account("Bench0001", "BenchUser", 1_000_000.00, checkpointInterval=interval, dailyCheckpoints=daily)
+        account._recordTransactions(records)
+        began = time.perf_counter()
+        for timeStamp in times:
+            account.balanceAt(timeStamp)
+        elapsed = time.perf_counter() - began
+        print(f"  {name:<20} {elapsed / lookups * 1e3:>12.3f} ms/lookup   {len(account._checkpointPositions):>8,} checkpoints")
+    # Full replay, for comparison- only a few lookups, as each one reads the history up to the lookup time
+    began = time.perf_counter()
+    for timeStamp in times[::lookups // 10]:
+        balance = 1_000_000_00
+        for record in records:
+            if record.timeStamp > timeStamp:
+                break
+            balance += record.amount.cents if record.transactionType == "Deposit" else -record.amount.cents
+    elapsed = time.perf_counter() - began
+    print(f"  {'full replay':<20} {elapsed / 10 * 1e3:>12.3f} ms/lookup")
+
+
+# Compares posting throughput with no log and with a write-ahead log at each durability level, for single postings
+# from several threads and for batches
+def runWriteAheadLogBenchmarks(count: int = 20_000, threads: int = 8) -> None:
+    print(f"Postings per second with a write-ahead log ({count:,} postings, {threads} threads):")
+    entries = [{"transactionType": "Deposit", "userID": "BenchUser", "amount": 1.00, "method": "Cash"}] * 100
+    for durability in [None] + DURABILITY_LEVELS:
+        with tempfile.TemporaryDirectory() as directory:
+            log = WriteAheadLog(directory, durability) if durability else None
+            accounts = [Account(f"Bench{i:04d}", "BenchUser", 1000.00, wal=log) for i in range(threads)]
+            def post(account):
+                for _ in range(count // threads):
+                    account.makeDeposit("BenchUser", 1.00, "Cash")
+            workers = [threading.Thread(target=post, args=(account,)) for account in accounts]
+            began = time.perf_counter()
+            for worker in workers: worker.start()
+            for worker in workers: worker.join()
+            single = count / (time.perf_counter() - began)
+            syncs = log.syncCount if log else 0
+            began = time.perf_counter()
+            for _ in range(count // len(entries)):
+                accounts[0].postBatch(entries)
+            batched = count / (time.perf_counter() - began)
+            if log: log.close()
+        print(f"  {durability or 'no log':<20} {single:>12,.0f} single   {batched:>12,.0f} batched   {syncs:>8,} fsyncs")
+
+
+# Compares reading a year of history for reporting from transaction objects against reading it from a memory mapped
+# ledger file
+def runLedgerFileBenchmarks(count: int = 1_000_000) -> None:
+    entries = [{"transactionType": "Deposit" if i % 4 else "Withdrawal", "userID": "BenchUser", "amount": 1.00, "method": "Cash"}
+               for i in range(count)]
+    account = Account("Bench0001", "BenchUser", 1_000_000.00, ColumnarLedger())
+    account.postBatch(entries)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "bench.ledger")
+        began = time.perf_counter()
+        writeLedgerFile(path, account.transactions)
+        written = time.perf_counter() - began
+        print(f"Ledger file ({count:,} records, {os.path.getsize(path) / count:.0f} bytes/record, written in {written:.2f} s):")
+        began = time.perf_counter()
+        objects = [restoreTransaction(t.transactionType, t.transactionID, t.timeStamp, t.userID, t.accountID, t.amount.cents,
+                                      t.fee.cents, "Cash", t.origin, t.description) for t in account.transactions]
+        total = sum(t.amount.cents for t in objects if t.transactionType == "Deposit")
+        loaded = time.perf_counter() - began
+        began = time.perf_counter()
+        with MappedLedger(path) as ledger:
+            mappedTotal = ledger.totalAmount("Deposit")
+            ledger.count("Withdrawal")
+        mapped = time.perf_counter() - began
+        assert mappedTotal.cents == total
+        print(f"  {'build objects + sum':<20} {loaded * 1e3:>12.1f} ms")
+        print(f"  {'mmap + sum':<20} {mapped * 1e3:>12.1f} ms")
+
+
+# Compares saving postings to the repository one at a time against saving them in bulk, and times loading an account
+# without and with its history
+def runRepositoryBenchmarks(count: int = 100_000) -> None:
+    entries = [{"transactionType": "Deposit", "userID": "BenchUser", "amount": 1.00, "method": "Cash"}] * count
+    print(f"SQLite repository ({count:,} postings):")
+    with tempfile.TemporaryDirectory() as directory, Repository(os.path.join(directory, "bench.db")) as repository:
+        account = Account("Bench0001", "BenchUser", 1000.00)
+        repository.saveAccount(account)
+        single = count // 10
+        began = time.perf_counter()
+        for _ in range(single):
+            account.makeDeposit("BenchUser", 1.00, "Cash")
+            repository.saveAccount(account)
+        print(f"  {'save per posting':<20} {single / (time.perf_counter() - began):>12,.0f} postings/s")
+        began = time.perf_counter()
+        account.postBatch(entries)
+        repository.saveAccount(account)
+        print(f"  {'save batch':<20} {count / (time.perf_counter() - began):>12,.0f} postings/s")
+        began = time.perf_counter()
+        loaded = repository.loadAccount("Bench0001")
+        print(f"  {'load account':<20} {(time.perf_counter() - began) * 1e3:>12.3f} ms")
+        began = time.perf_counter()
+        loaded.transactions
+        print(f"  {'load history':<20} {(time.perf_counter() - began) * 1e3:>12.3f} ms")
+
+
+# Measures a burst of concurrent logins on an event loop, checking passwords synchronously and with the async variant,
+# reporting login latency and the longest time the event loop could not run anything else
+def runLoginBenchmarks(logins: int = 16) -> None:
+    hashedPassword = PasswordService.hashPassword("Password123!")
+    async def measure(check) -> tuple[list[float], float]:
+        stalls = [0.0]
+        stop = asyncio.Event()
+        async def heartbeat():
+            while not stop.is_set():
+                began = time.perf_counter()
+                await asyncio.sleep(0.001)
+                stalls[0] = max(stalls[0], time.perf_counter() - began - 0.001)
+        async def login(began: float) -> float:
+            await check("Password123!", hashedPassword)
+            return time.perf_counter() - began
+        monitor = asyncio.ensure_future(heartbeat())
+        await asyncio.sleep(0.01)
+        began = time.perf_counter()
+        latencies = sorted(await asyncio.gather(*(login(began) for _ in range(logins))))
+        stop.set()
+        await monitor
+        return latencies, stalls[0]
+    async def checkSync(rawPassword: str, hashed: str) -> bool:
+        return PasswordService.checkPassword(rawPassword, hashed)
+    print(f"Concurrent logins ({logins} logins, {PasswordService.getExecutor().workers} password workers):")
+    for name, check in [("checkPassword", checkSync), ("checkPasswordAsync", PasswordService.checkPasswordAsync)]:
+        latencies, stall = asyncio.run(measure(check))
+        print(f"  {name:<20} p50 {latencies[len(latencies) // 2] * 1e3:>8.0f} ms   p99 {latencies[-1] * 1e3:>8.0f} ms"
+              f"   longest loop stall {stall * 1e3:>8.0f} ms")
+
+
+# Compares creating customers one at a time against bulk onboarding on a process pool
+def runOnboardingBenchmarks(count: int = 32) -> None:
+    records = [{"userID": f"Bench{i:05d}", "rawPassword": "J@cksPassword1234", "firstName": "Jack", "lastName": "Timmons",
+                "DOB": "03/27/1996", "email": "jacktimmonsemail@gmail.com"} for i in range(count)]
+    print(f"Customer onboarding ({count} customers, {os.cpu_count()} cores):")
+    began = time.perf_counter()
+    for record in records:
+        Customer(*(record[field] for field in CUSTOMER_FIELDS))
+    print(f"  {'serial':<20} {count / (time.perf_counter() - began):>12,.1f} customers/s")
+    began = time.perf_counter()
+    assert all(result.ok for result in onboardCustomers(records))
+    print(f"  {'onboardCustomers':<20} {count / (time.perf_counter() - began):>12,.1f} customers/s")
+
+
+# Calibrates each password hashing scheme to a target verify latency on this host and reports the cost picked
+def runPasswordCalibration(targetMillis: float = 250) -> None:
+    print(f"Password hash calibration (target verify latency {targetMillis:.0f} ms):")
+    for scheme in VALID_HASH_SCHEMES:
+        policy = PasswordPolicy.calibrate(targetMillis, scheme)
+        hashedPassword = policy.hash("Password123!")
+        verify = timeit.timeit(lambda: policy.verify("Password123!", hashedPassword), number=3) / 3
+        print(f"  {scheme:<20} cost {policy.cost:>12,}   verify {verify * 1e3:>8.0f} ms")
+
+
+# Compares validating a bulk import's email addresses with the email_validator library against the cached normalizer,
+# with addresses drawn from a small set of domains and some repeated
+def runEmailBenchmarks(count: int = 50_000, domains: int = 50) -> None:
+    rng = random.Random(1)
+    emails = [f"customer{rng.randrange(count // 2)}@Domain{rng.randrange(domains)}.com" for _ in range(count)]
+    print(f"Email validation ({count:,} addresses, {domains} domains):")
+    began = time.perf_counter()
+    for email in emails:
+        validate_email(email, check_deliverability=False)
+    print(f"  {'email_validator':<20} {count / (time.perf_counter() - began):>12,.0f} addresses/s")
+    normalizer = EmailNormalizer()
+    began = time.perf_counter()
+    for email in emails:
+        normalizer.normalize(email)
+    stats = normalizer.stats
+    print(f"  {'EmailNormalizer':<20} {count / (time.perf_counter() - began):>12,.0f} addresses/s"
+          f"   hit rate {stats['hitRate']:.0%}, {stats['fullValidations']} full validations")
+
+
+# Compares checking a transaction's fields with the validate* chain in utilities.py against the validator compiled
+# from TRANSACTION_SCHEMA, and checking a bulk input by constructing each row against validateMany
+def runValidationBenchmarks(count: int = 200_000) -> None:
+    def chain(amount, transactionType, fee, origin, description):
+        return (validateMoney(amount, "Amount").cents, TRANSACTION_TYPE_CODES[validateString(transactionType, "Transaction Type", 50)],
+                validateNonNegativeMoney(fee, "Fee").cents, validateString(origin, "Origin", 50, True),
+                validateString(description, "Description", 100, True))
+    compiled = TRANSACTION_SCHEMA.compile()
+    print(f"Transaction field validation ({count:,} transactions):")
+    for name, validate in [("validate* chain", chain), ("compiled schema", compiled)]:
+        elapsed = timeit.timeit(lambda: validate(12.50, "Deposit", 0.00, "XYZ Corporation", "Payroll"), number=count)
+        print(f"  {name:<20} {count / elapsed:>12,.0f} transactions/s")
+    elapsed = timeit.timeit(lambda: Deposit("BenchUser", "Bench0001", 12.50, "Cash", 0.00, "Deposit", "XYZ Corporation", "Payroll"),
+                            number=count)
+    print(f"  {'Deposit()':<20} {count / elapsed:>12,.0f} constructions/s")
+    rows = [{"amount": 12.50 if i % 10 else -1.00, "transactionType": "Deposit", "fee": 0.00, "origin": None,
+             "description": "Payroll", "depositMethod": "Cash" if i % 7 else "Crypto"} for i in range(count)]
+    began = time.perf_counter()
+    errors = 0
+    for row in rows:
+        try: Deposit("BenchUser", "Bench0001", row["amount"], row["depositMethod"], row["fee"], row["transactionType"],
+                     row["origin"], row["description"])
+        except ValueError: errors += 1
+    print(f"  {'construct each row':<20} {count / (time.perf_counter() - began):>12,.0f} rows/s")
+    began = time.perf_counter()
+    assert sum(1 for codes in DEPOSIT_SCHEMA.validateMany(rows) if codes) >= errors
+    print(f"  {'validateMany':<20} {count / (time.perf_counter() - began):>12,.0f} rows/s")
+
+
+# Measures makeDeposit throughput with metrics disabled and enabled, and prints the recorded percentiles
+def runMetricsBenchmarks(count: int = 100_000) -> None:
+    print(f"Posting instrumentation ({count:,} deposits):")
+    for name, enabled in [("metrics disabled", False), ("metrics enabled", True)]:
+        if enabled:
+            enableMetrics()
+        try:
+            account = Account("Bench0001", "BenchUser", 1000.00)
+            elapsed = timeit.timeit(lambda: account.makeDeposit("BenchUser", 1.00, "Cash"), number=count)
+        finally:
+            disableMetrics()
+        print(f"  {name:<20} {count / elapsed:>12,.0f} postings/s")
+    deposits = getRegistry().snapshot()["operations"]["makeDeposit"]
+    print(f"  {'makeDeposit':<20} p50 {deposits['p50'] * 1e6:>8.2f} us   p99 {deposits['p99'] * 1e6:>8.2f} us")
+
+
+# Compares posting throughput from several threads to one shared account and to one account per thread, against a
+# single thread, with the per-account locks taken on every posting
+def runConcurrencyBenchmarks(count: int = 100_000, threads: int = 8) -> None:
+    def post(accounts: list[Account], perThread: int) -> float:
+        def run(account: Account) -> None:
+            for _ in range(perThread):
+                account.makeDeposit("BenchUser", 1.00, "Cash")
+        workers = [threading.Thread(target=run, args=(account,)) for account in accounts]
+        began = time.perf_counter()
+        for worker in workers: worker.start()
+        for worker in workers: worker.join()
+        return time.perf_counter() - began
+    print(f"Concurrent postings ({count:,} deposits, {os.cpu_count()} cores):")
+    for name, accounts in [("1 thread", [Account("Bench0001", "BenchUser", 1000.00)]),
+                           (f"{threads} threads, shared", [Account("Bench0001", "BenchUser", 1000.00)] * threads),
+                           (f"{threads} threads, own", [Account(f"Bench000{i}", "BenchUser", 1000.00) for i in range(threads)])]:
+        elapsed = post(accounts, count // len(accounts))
+        assert sum(len(account.transactions) for account in set(accounts)) == count // len(accounts) * len(accounts)
+        print(f"  {name:<20} {count / elapsed:>12,.0f} postings/s")
+
+
+# Measures transfer throughput between a customer's accounts from one thread and from several threads at once, both
+# on separate pairs of accounts and on a few shared accounts transferring in every direction
+def runTransferBenchmarks(count: int = 100_000, threads: int = 8) -> None:
+    customer = Customer.restore("BenchUser", "hashedPassword", "Bench", "User", date(1996, 3, 27), "bench@example.com")
+    for i in range(2 * threads):
+        customer.addAccount(Account(f"Bench{i:04d}", "BenchUser", float(count)))
+    def transfer(pairs: list[tuple[str, str]], perThread: int) -> float:
+        def run(index: int) -> None:
+            fromID, toID = pairs[index]
+            for i in range(perThread):
+                if i % 2:
+                    customer.transfer(fromID, toID, 1.00)
+                else:
+                    customer.transfer(toID, fromID, 1.00)
+        workers = [threading.Thread(target=run, args=(index,)) for index in range(len(pairs))]
+        began = time.perf_counter()
+        for worker in workers: worker.start()
+        for worker in workers: worker.join()
+        return time.perf_counter() - began
+    print(f"Transfers ({count:,} transfers, {os.cpu_count()} cores):")
+    for name, pairs in [("1 thread", [("Bench0000", "Bench0001")]),
+                        (f"{threads} threads, own", [(f"Bench{2 * i:04d}", f"Bench{2 * i + 1:04d}") for i in range(threads)]),
+                        (f"{threads} threads, shared", [(f"Bench{i % 3:04d}", f"Bench{(i + 1) % 3:04d}") for i in range(threads)])]:
+        elapsed = transfer(pairs, count // len(pairs))
+        print(f"  {name:<20} {count / elapsed:>12,.0f} transfers/s")
+
+
+# Measures how many external transfers per second can be queued and streamed into a settlement batch file, and the
+# memory taken while the file is written
+def runSettlementBenchmarks(count: int = 100_000) -> None:
+    routingNumbers = ["021000021", "011000015", "121000248"]
+    transfers = [ExternalTransfer("BenchUser", "Bench0001", f"Dest{i % 1000:04d}", routingNumbers[i % 3], "First Bank", 12.50)
+                 for i in range(count)]
+    writer = NachaWriter("011000015", "Bench Origin Bank", "Bench Company", "1234567890")
+    print(f"Settlement ({count:,} external transfers):")
+    queue = SettlementQueue()
+    began = time.perf_counter()
+    queue.enqueueMany(transfers)
+    elapsed = time.perf_counter() - began
+    print(f"  {'enqueue':<20} {count / elapsed:>12,.0f} transfers/s")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "settlement.ach")
+        for window in queue.windows():
+            batches = queue.take(window)
+            gc.collect()
+            began = time.perf_counter()
+            totals = writer.write(path, batches, window.date())
+            elapsed = time.perf_counter() - began
+            # Measured on a second run, as tracing slows the writer down
+            tracemalloc.start()
+            writer.write(path, batches, window.date())
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print(f"  {'write file':<20} {totals.entryCount / elapsed:>12,.0f} transfers/s   "
+                  f"{os.path.getsize(path) / 2 ** 20:.1f} MiB file, {peak / 2 ** 10:.0f} KiB peak")
+
+
+# Measures how many records per second are paged through and streamed into CSV and JSON lines statements for a busy
+# account, the memory taken while a statement is written, and the cost of the account's string representation
+def runStatementBenchmarks(count: int = 1_000_000) -> None:
+    account = Account("Bench0001", "BenchUser", 1000.00)
+    account.postBatch([{"transactionType": "Deposit", "userID": "BenchUser", "amount": 1.00, "method": "Cash"}] * count)
+    print(f"Statements ({count:,} records):")
+    began = time.perf_counter()
+    pages = sum(1 for _ in account.iterTransactions(pageSize=DEFAULT_PAGE_SIZE))
+    elapsed = time.perf_counter() - began
+    print(f"  {'iterTransactions':<20} {count / elapsed:>12,.0f} records/s   ({pages:,} pages)")
+    with tempfile.TemporaryDirectory() as directory:
+        for name, write in [("CSV", writeStatementCSV), ("JSON lines", writeStatementJSONLines)]:
+            path = os.path.join(directory, "statement")
+            gc.collect()
+            began = time.perf_counter()
+            write(account, path)
+            elapsed = time.perf_counter() - began
+            # Measured on a smaller range, as tracing slows the writer down
+            tracemalloc.start()
+            write(account, path, end=account.transactions[count // 10].timeStamp)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print(f"  {name:<20} {count / elapsed:>12,.0f} records/s   {peak / 2 ** 10:.0f} KiB peak")
+    print(f"  {'str(account)':<20} {timeit.timeit(lambda: str(account), number=100) / 100 * 1e6:>12,.1f} us")
+
+
+# Times a nightly accrual run (interest accrued but not posted) and a month-end run (accrued and posted) over many
+# savings accounts, against accruing each account on its own
+def runInterestBenchmarks(count: int = 200_000) -> None:
+    tiers = [(0, 0.01), (1_000.00, 0.025), (10_000.00, 0.04)]
+    accounts = [SavingsAccount(f"Save{index:06d}", "BenchUser", 10.00 + index % 20_000, interestRates=tiers)
+                for index in range(count)]
+    print(f"Interest ({count:,} savings accounts):")
+    began = time.perf_counter()
+    for account in accounts[:count // 10]:
+        account.accrueInterest(post=False)
+    elapsed = time.perf_counter() - began
+    print(f"  {'per account':<20} {count // 10 / elapsed:>12,.0f} accounts/s")
+    for name, post in [("nightly", False), ("month-end", True)]:
+        gc.collect()
+        began = time.perf_counter()
+        result = accrueInterest(accounts, 30 if post else 1, post=post)
+        elapsed = time.perf_counter() - began
+        print(f"  {name:<20} {count / elapsed:>12,.0f} accounts/s   ({result.posted:,} deposits posted)")
+
+
+# Times closing the statement cycle of many credit accounts with a month of purchases and payments each
+def runCreditBenchmarks(count: int = 100_000, postings: int = 10) -> None:
+    rng = random.Random(23)
+    cycleStart, closingDate = date(2025, 1, 16), date(2025, 2, 15)
+    accounts = []
+    for index in range(count):
+        account = CreditAccount(f"Cred{index:06d}", "BenchUser", creditLimit=5_000.00, apr=0.2499, statementDay=15,
+                                cycleStart=cycleStart)
+        timeStamps = sorted(datetime(2025, 1, 16) + timedelta(minutes=rng.randrange(60 * 24 * 31))
+                            for _ in range(postings))
+        account.restoreTransactions([restoreTransaction("Withdrawal" if number % 3 else "Deposit", f"{index}-{number}",
+                                                        timeStamp, "BenchUser", account.accountID,
+                                                        rng.randrange(1, 20_000), method="Check")
+                                     for number, timeStamp in enumerate(timeStamps)])
+        accounts.append(account)
+    print(f"Credit cycle close ({count:,} accounts, {count * postings:,} postings):")
+    gc.collect()
+    began = time.perf_counter()
+    statements = closeCycles(accounts, closingDate)
+    elapsed = time.perf_counter() - began
+    charged = sum(1 for statement in statements if statement.interestCharged > 0)
+    print(f"  {'closeCycles':<20} {count / elapsed:>12,.0f} accounts/s   ({charged:,} interest charges)")
+
+
+# Times loading a price table from a file and valuing many investment accounts against it
+def runValuationBenchmarks(count: int = 200_000, symbols: int = 10_000, positions: int = 10) -> None:
+    rng = random.Random(24)
+    names = [f"S{index:05d}" for index in range(symbols)]
+    accounts = []
+    for index in range(count):
+        account = InvestmentAccount(f"Inve{index:07d}", "BenchUser", 1_000.00)
+        account.restorePositions([(symbol, rng.randrange(1, 1_000), rng.randrange(100, 1_000_000) / 100)
+                                  for symbol in rng.sample(names, positions)])
+        accounts.append(account)
+    print(f"Valuation ({count:,} accounts, {count * positions:,} positions, {symbols:,} symbols):")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "prices.csv")
+        with open(path, "w") as file:
+            file.write("symbol,price,assetClass\n")
+            for number, symbol in enumerate(names):
+                file.write(f"{symbol},{rng.randrange(100, 100_000) / 100},{['Equity', 'Bond', 'Fund'][number % 3]}\n")
+        began = time.perf_counter()
+        prices = PriceTable.fromCSV(path)
+        print(f"  {'PriceTable.fromCSV':<20} {(time.perf_counter() - began) * 1e3:>12,.1f} ms")
+    gc.collect()
+    began = time.perf_counter()
+    result = valuePortfolios(accounts, prices)
+    elapsed = time.perf_counter() - began
+    print(f"  {'valuePortfolios':<20} {count / elapsed:>12,.0f} accounts/s   ({elapsed:.2f}s, "
+          f"{int(result.unrealizedGain.sum()) / 100:,.2f} unrealized)")
+
+
+# Compares the time per posting with no fee schedule against a schedule with a rule for every combination of
+# transaction type, method, and tier, for single postings and batches
+def runFeeBenchmarks(count: int = 100_000) -> None:
+    rules = [{"transactionType": "Deposit", "method": method, "tier": tier, "flat": 0.25}
+             for method in VALID_DEPOSIT_METHODS for tier in VALID_ACCOUNT_TIERS]
+    rules += [{"transactionType": "Withdrawal", "method": method, "tier": tier, "rate": 0.001, "minimum": 0.10}
+              for method in VALID_WITHDRAWAL_METHODS for tier in VALID_ACCOUNT_TIERS]
+    entries = [{"transactionType": "Deposit", "userID": "BenchUser", "amount": 1.00, "method": "Cash"},
+               {"transactionType": "Withdrawal", "userID": "BenchUser", "amount": 0.50, "method": "Wire"}] * (count // 2)
+    print(f"Microseconds per posting with a fee schedule ({count:,} postings, {len(rules)} rules):")
+    began = time.perf_counter()
+    schedule = FeeSchedule(rules)
+    print(f"  {'compile':<20} {(time.perf_counter() - began) * 1e6:>12.2f}")
+    for name, current in [("no schedule", FeeSchedule()), ("schedule", schedule)]:
+        previous = setFeeSchedule(current)
+        try:
+            account = Account("Bench0001", "BenchUser", 1_000_000.00)
+            start = time.perf_counter()
+            for _ in range(count // 2):
+                account.makeDeposit("BenchUser", 1.00, "Cash")
+                account.makeWithdrawal("BenchUser", 0.50, "Wire")
+            single = (time.perf_counter() - start) / count
+            account = Account("Bench0002", "BenchUser", 1_000_000.00)
+            start = time.perf_counter()
+            account.postBatch(entries)
+            batch = (time.perf_counter() - start) / count
+        finally:
+            setFeeSchedule(previous)
+        print(f"  {name:<20} {single * 1e6:>12.2f} single {batch * 1e6:>12.2f} batch   ({account.balance} balance)")
+
+
+if __name__ == "__main__":
+    runPostingBenchmarks()
+    runBatchBenchmarks()
+    runLedgerBenchmarks()
+    runTransactionObjectBenchmarks()
+    runQueryBenchmarks()
+    runBalanceAtBenchmarks()
+    runWriteAheadLogBenchmarks()
+    runLedgerFileBenchmarks()
+    runRepositoryBenchmarks()
+    runLoginBenchmarks()
+    runOnboardingBenchmarks()
+    runPasswordCalibration()
+    runEmailBenchmarks()
+    runValidationBenchmarks()
+    runMetricsBenchmarks()
+    runConcurrencyBenchmarks()
+    runTransferBenchmarks()
+    runSettlementBenchmarks()
+    runStatementBenchmarks()
+    runInterestBenchmarks()
+    runCreditBenchmarks()
+    runValuationBenchmarks()
+    runFeeBenchmarks()
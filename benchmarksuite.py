@@ -0,0 +1,232 @@
+# Jack Timmons, 27 Dec 2024, Winter Break
+# The purpose of this program is to provide users with a simulated bank managment interface, gaining
+# expierence with OOP, full-stack development, and my first expierence creating both a local GUI and
+# web-based application
+
+# The purpose of this file is to contain the benchmark suite, which measures the posting, onboarding, and login hot
+# paths at several scales, saves the results as JSON, and compares them against a saved baseline to flag regressions
+# Run with: python benchmarksuite.py --output results.json [--baseline baseline.json] [--threshold 0.10]
+
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Callable, NamedTuple
+from accounts import *
+from errors import *
+from user import Customer
+
+# Number of records each scaled benchmark is run with by default
+DEFAULT_SCALES: list[int] = [1_000, 100_000, 1_000_000]
+# Relative change from the baseline beyond which a result is flagged as a regression
+DEFAULT_THRESHOLD: float = 0.10
+# Number of customers created and passwords checked by the unscaled benchmarks (each takes a full password hash)
+DEFAULT_SAMPLES: int = 8
+# Version of the results file format
+RESULTS_VERSION: int = 1
+
+
+# The result of one benchmark at one scale- the scale is None for benchmarks that do not depend on the number of records
+class BenchmarkResult(NamedTuple):
+    name: str
+    scale: int | None
+    value: float
+    unit: str
+    higherIsBetter: bool
+
+
+# A result that is worse than its baseline by more than the threshold- change is the relative change from the
+# baseline (negative for throughput that dropped, positive for latency or memory that grew)
+class Regression(NamedTuple):
+    name: str
+    scale: int | None
+    baseline: float
+    value: float
+    change: float
+
+    def __str__(self) -> str:
+        scale = f" @ {self.scale:,}" if self.scale is not None else ""
+        return f"{self.name}{scale}: {self.baseline:,.2f} -> {self.value:,.2f} ({self.change:+.1%})"
+
+
+# Returns the time taken by the fastest of repeat runs of the passed function
+def _bestTime(function: Callable[[], None], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        began = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - began)
+    return best
+
+# Returns the number of runs to take the best of at the passed scale- small scales are noisier, so are run more often
+def _repeatsFor(scale: int) -> int:
+    return 5 if scale <= 10_000 else 3 if scale <= 100_000 else 1
+
+
+# Measures how many Transaction, Deposit, and Withdrawal objects can be constructed per second
+def benchmarkConstruction(scale: int) -> list[BenchmarkResult]:
+    results = []
+    for name, construct in [
+            ("construct.transaction", lambda: Transaction("BenchUser", "Bench0001", 12.50, "Deposit")),
+            ("construct.deposit", lambda: Deposit("BenchUser", "Bench0001", 12.50, "Cash", 0.00, "Deposit", "XYZ Corporation", "Payroll")),
+            ("construct.withdrawal", lambda: Withdrawal("BenchUser", "Bench0001", 12.50, "Cash", 1.00))]:
+        def run():
+            for _ in range(scale):
+                construct()
+        results.append(BenchmarkResult(name, scale, scale / _bestTime(run, _repeatsFor(scale)), "ops/s", True))
+    return results
+
+# Measures how many makeDeposit and makeWithdrawal calls per second can be made on a single account
+def benchmarkPostings(scale: int) -> list[BenchmarkResult]:
+    results = []
+    for name, post in [("account.makeDeposit", lambda account: account.makeDeposit("BenchUser", 1.00, "Cash")),
+                       ("account.makeWithdrawal", lambda account: account.makeWithdrawal("BenchUser", 1.00, "Cash"))]:
+        best = float("inf")
+        for _ in range(_repeatsFor(scale)):
+            account = Account("Bench0001", "BenchUser", float(scale + 1))
+            gc.collect()
+            began = time.perf_counter()
+            for _ in range(scale):
+                post(account)
+            best = min(best, time.perf_counter() - began)
+            del account
+        results.append(BenchmarkResult(name, scale, scale / best, "ops/s", True))
+    return results
+
+# Measures the memory held by each Deposit object, with tracemalloc
+def benchmarkTransactionMemory(scale: int) -> list[BenchmarkResult]:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        deposits = [Deposit("BenchUser", "Bench0001", 1.00, "Cash") for _ in range(scale)]
+        memory = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del deposits
+    return [BenchmarkResult("memory.deposit", scale, memory / scale, "bytes", False)]
+
+# Measures how many customers can be constructed per second- each construction validates and hashes a password, so
+# only a few samples are taken whatever the scale
+def benchmarkCustomers(samples: int) -> list[BenchmarkResult]:
+    def run():
+        for i in range(samples):
+            Customer(f"Bench{i:05d}", "J@cksPassword1234", "Jack", "Timmons", "03/27/1996", "jacktimmonsemail@gmail.com")
+    return [BenchmarkResult("construct.customer", None, samples / _bestTime(run, 1), "ops/s", True)]
+
+# Measures the latency of PasswordService.checkPassword under the current password policy
+def benchmarkCheckPassword(samples: int) -> list[BenchmarkResult]:
+    hashedPassword = PasswordService.hashPassword("J@cksPassword1234")
+    def run():
+        for _ in range(samples):
+            PasswordService.checkPassword("J@cksPassword1234", hashedPassword)
+    return [BenchmarkResult("login.checkPassword", None, _bestTime(run, 1) / samples * 1e3, "ms", False)]
+
+
+# Runs every benchmark at each of the passed scales (and the unscaled benchmarks once, with the passed number of
+# samples), calling report with each result as it is measured
+def runSuite(scales: list[int] = None, samples: int = DEFAULT_SAMPLES,
+             report: Callable[[BenchmarkResult], None] = None) -> list[BenchmarkResult]:
+    scales = DEFAULT_SCALES if scales is None else scales
+    for scale in scales:
+        if isinstance(scale, bool) or not isinstance(scale, int) or scale <= 0:
+            raise BenchmarkError("Benchmark Error: Scales must be positive integers")
+    if isinstance(samples, bool) or not isinstance(samples, int) or samples <= 0:
+        raise BenchmarkError("Benchmark Error: Samples must be a positive integer")
+    runs = [lambda: benchmarkCustomers(samples), lambda: benchmarkCheckPassword(samples)]
+    for scale in scales:
+        runs += [lambda scale=scale: benchmarkConstruction(scale), lambda scale=scale: benchmarkPostings(scale),
+                 lambda scale=scale: benchmarkTransactionMemory(scale)]
+    results = []
+    for run in runs:
+        for result in run():
+            results.append(result)
+            if report is not None:
+                report(result)
+    return results
+
+
+# Saves the passed results as JSON, with details of the machine and Python version they were measured on
+def saveResults(results: list[BenchmarkResult], path: str) -> None:
+    document = {"version": RESULTS_VERSION,
+                "created": datetime.now().isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "cpuCount": os.cpu_count(),
+                "results": [result._asdict() for result in results]}
+    temporaryPath = f"{path}.tmp"
+    with open(temporaryPath, "w") as file:
+        json.dump(document, file, indent=2)
+    os.replace(temporaryPath, path)
+
+# Loads results saved by saveResults
+def loadResults(path: str) -> list[BenchmarkResult]:
+    try:
+        with open(path) as file:
+            document = json.load(file)
+    except (OSError, json.JSONDecodeError) as e:
+        raise BenchmarkError(f"Benchmark Error: Cannot read results from {path}: {e}")
+    if not isinstance(document, dict) or document.get("version") != RESULTS_VERSION:
+        raise BenchmarkError(f"Benchmark Error: {path} is not a version {RESULTS_VERSION} results file")
+    try:
+        return [BenchmarkResult(**result) for result in document["results"]]
+    except (KeyError, TypeError) as e:
+        raise BenchmarkError(f"Benchmark Error: {path} has an invalid result: {e}")
+
+# Compares the passed results against a baseline, returning a Regression for every result that is worse than the
+# baseline result of the same benchmark and scale by more than threshold (a fraction of the baseline value)- results
+# without a baseline are not compared
+def compareResults(results: list[BenchmarkResult], baseline: list[BenchmarkResult],
+                   threshold: float = DEFAULT_THRESHOLD) -> list[Regression]:
+    if isinstance(threshold, bool) or not isinstance(threshold, (int, float)) or threshold < 0:
+        raise BenchmarkError("Benchmark Error: Threshold must be a non-negative number")
+    baselines = {(result.name, result.scale): result for result in baseline}
+    regressions = []
+    for result in results:
+        base = baselines.get((result.name, result.scale))
+        if base is None or base.value <= 0:
+            continue
+        change = (result.value - base.value) / base.value
+        worse = -change if result.higherIsBetter else change
+        if worse > threshold:
+            regressions.append(Regression(result.name, result.scale, base.value, result.value, change))
+    return regressions
+
+
+# Runs the suite from the command line- exits with status 1 if any result regressed against the baseline
+def main(arguments: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the posting, onboarding, and login hot paths")
+    parser.add_argument("--scales", type=int, nargs="+", default=DEFAULT_SCALES, help="numbers of records to run with")
+    parser.add_argument("--samples", type=int, default=DEFAULT_SAMPLES, help="customers and logins to time")
+    parser.add_argument("--output", help="file to save the results to, as JSON")
+    parser.add_argument("--baseline", help="results file to compare against")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="relative change flagged as a regression")
+    options = parser.parse_args(arguments)
+    baseline = loadResults(options.baseline) if options.baseline else None
+    def report(result: BenchmarkResult) -> None:
+        scale = f"{result.scale:>10,}" if result.scale is not None else f"{'-':>10}"
+        print(f"  {result.name:<24} {scale} {result.value:>14,.2f} {result.unit}")
+    print(f"Benchmark suite (Python {platform.python_version()}, {os.cpu_count()} cores):")
+    results = runSuite(options.scales, options.samples, report)
+    if options.output:
+        saveResults(results, options.output)
+        print(f"Results saved to {options.output}")
+    if baseline is None:
+        return 0
+    regressions = compareResults(results, baseline, options.threshold)
+    if not regressions:
+        print(f"No regressions beyond {options.threshold:.0%} against {options.baseline}")
+        return 0
+    print(f"{len(regressions)} regressions beyond {options.threshold:.0%} against {options.baseline}:")
+    for regression in regressions:
+        print(f"  {regression}")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,88 @@
+# Jack Timmons, 27 Dec 2024, Winter Break
+# The purpose of this program is to provide users with a simulated bank managment interface, gaining
+# expierence with OOP, full-stack development, and my first expierence creating both a local GUI and
+# web-based application
+
+# The purpose of this file is to contain the statement cycle close- the daily balance changes of every credit account
+# in a cycle group are pulled into NumPy arrays, the statement balances, interest, and minimum payments of all of them
+# are worked out in one vectorized pass, and the interest is charged back to the accounts
+
+from datetime import date, datetime, timedelta
+from typing import Iterable
+import numpy as np
+from accounts import Account, CreditAccount, Statement, DAYS_PER_YEAR, PAYMENT_DUE_DAYS
+from errors import *
+from money import Money
+
+# Number of accounts whose daily balances are worked out together- each holds a row of a day's balance per day of
+# its cycle, so this bounds the memory a cycle close uses
+CLOSE_CHUNK_SIZE: int = 65_536
+
+
+# The closeCycles function closes the statement cycle of every credit account passed whose statement day is the day
+# of the passed closing date (the cycle group closing that day)- other accounts, closed accounts, and accounts whose
+# open cycle starts after the closing date (such as cycles already closed) are skipped, so the function can be run
+# over every account each night, and run again after a failure. Returns the statements made
+# Each statement covers the account's open cycle up to and including the closing date: interest is charged at the
+# APR on the average daily balance owed (days with a credit balance count as nothing owed), and the minimum payment
+# is the minimum payment rate of the new balance owed, but at least the minimum payment floor and at most the balance
+# Postings dated after the closing date carry into the next cycle- run the close once the closing date has ended, so
+# no postings dated within the cycle arrive during it
+def closeCycles(accounts: Iterable[Account], closingDate: date) -> list[Statement]:
+    if isinstance(closingDate, datetime) or not isinstance(closingDate, date):
+        raise AccountError("Statement Cycle Error: Closing date must be a date")
+    day = closingDate.day
+    group = []
+    for account in accounts:
+        if isinstance(account, CreditAccount) and account._statementDay == day and account._status != "Closed":
+            snapshot = account._cycleSnapshot(closingDate)
+            if snapshot is not None:
+                group.append((account, snapshot))
+    timeStamp = datetime.now()
+    statements = []
+    for offset in range(0, len(group), CLOSE_CHUNK_SIZE):
+        chunk = group[offset:offset + CLOSE_CHUNK_SIZE]
+        for (account, _), statement, interest in zip(chunk, *_statements(chunk, closingDate)):
+            account._closeCycle(statement, interest, timeStamp)
+            statements.append(statement)
+    return statements
+
+# Returns the statements of the passed accounts and snapshots of their open cycles (see CreditAccount._cycleSnapshot)
+# closing on the passed date, and the interest (in cents) charged to each
+# The daily changes are laid out as a row per account, so each account's balance at the end of every day is a
+# cumulative sum along its row- days past the end of an account's cycle (a shorter cycle, such as that of a new
+# account) are left out of its total
+def _statements(chunk: list[tuple[CreditAccount, tuple]], closingDate: date) -> tuple[list[Statement], list[int]]:
+    size = len(chunk)
+    days = np.fromiter([snapshot[2] for _, snapshot in chunk], np.int64, size)
+    openings = np.fromiter([snapshot[0] for _, snapshot in chunk], np.int64, size)
+    # The daily changes of every account are joined into one buffer and scattered into their rows
+    lengths = np.fromiter([len(snapshot[1]) for _, snapshot in chunk], np.int64, size)
+    flat = np.frombuffer(b"".join([snapshot[1] for _, snapshot in chunk]), np.int64)
+    changes = np.zeros((size, int(days.max())), np.int64)
+    rows = np.repeat(np.arange(size), lengths)
+    columns = np.arange(len(flat)) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    changes[rows, columns] = flat
+    balances = np.cumsum(changes, axis=1, out=changes)
+    balances += openings[:, None]
+    owed = np.maximum(-balances, 0)
+    owed[np.arange(owed.shape[1]) >= days[:, None]] = 0
+    totalOwed = owed.sum(axis=1)
+    aprs = np.fromiter([account._apr for account, _ in chunk], np.float64, size)
+    rates = np.fromiter([account._minimumPaymentRate for account, _ in chunk], np.float64, size)
+    floors = np.fromiter([account._minimumPaymentFloor for account, _ in chunk], np.int64, size)
+    interest = np.rint(totalOwed * aprs / DAYS_PER_YEAR).astype(np.int64)
+    newBalances = interest - balances[np.arange(size), days - 1]
+    minimums = np.minimum(newBalances, np.maximum(floors, np.ceil(newBalances * rates).astype(np.int64)))
+    minimums[newBalances <= 0] = 0
+    averages = np.rint(totalOwed / days).astype(np.int64)
+    dueDate = closingDate + timedelta(days=PAYMENT_DUE_DAYS)
+    closingOrdinal = closingDate.toordinal()
+    fromCents = Money.fromCents
+    statements = [Statement(account._accountID, date.fromordinal(closingOrdinal - length + 1), closingDate,
+                            fromCents(-opening), fromCents(newBalance), fromCents(average), fromCents(charge),
+                            fromCents(minimum), dueDate)
+                  for (account, _), length, opening, newBalance, average, charge, minimum
+                  in zip(chunk, days.tolist(), openings.tolist(), newBalances.tolist(), averages.tolist(),
+                         interest.tolist(), minimums.tolist())]
+    return statements, interest.tolist()
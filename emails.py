@@ -0,0 +1,161 @@
+# Jack Timmons, 27 Dec 2024, Winter Break
+# The purpose of this program is to provide users with a simulated bank managment interface, gaining
+# expierence with OOP, full-stack development, and my first expierence creating both a local GUI and
+# web-based application
+
+# The purpose of this file is to contain the cached email validation used when users are created or change their
+# email, so repeated addresses and domains are only parsed by the email_validator library once
+
+import re
+import threading
+from collections import OrderedDict
+from email_validator import validate_email, EmailNotValidError
+
+# Unquoted ASCII local part (dot separated atoms) and ASCII domain with at least one period- addresses of any other
+# shape are passed to the email_validator library as a whole
+_FAST_ADDRESS = re.compile(r"([A-Za-z0-9!#$%&'*+/=?^_`{|}~-]+(?:\.[A-Za-z0-9!#$%&'*+/=?^_`{|}~-]+)*)"
+                           r"@((?:[A-Za-z0-9-]+\.)+[A-Za-z0-9-]+)")
+# Longest local part and address allowed by the email_validator library
+_MAX_LOCAL_LENGTH: int = 64
+_MAX_ADDRESS_LENGTH: int = 254
+
+
+# A least recently used cache with a fixed number of entries, counting its hits and misses
+class _LRUCache:
+    def __init__(self, maxSize: int):
+        self._maxSize: int = maxSize
+        self._entries: OrderedDict = OrderedDict()
+        self.hits: int = 0
+        self.misses: int = 0
+
+    # Returns the cached value for the passed key, or None if it is not cached
+    def get(self, key):
+        value = self._entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    # Caches the passed value, dropping the least recently used entry if the cache is full
+    def put(self, key, value) -> None:
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        if len(self._entries) > self._maxSize:
+            self._entries.popitem(last=False)
+
+    # Removes every entry and resets the counters
+    def clear(self) -> None:
+        self._entries.clear()
+        self.hits = self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# The email normalizer validates email addresses and returns their normalized form, exactly as the email_validator
+# library does without a deliverability check, while caching results so that repeated work is skipped:
+#   - Every address seen (valid or not) is kept in a bounded least recently used cache
+#   - Addresses of the common ASCII local@domain.tld shape are checked with a precompiled pattern, and only their
+#     domain is checked by the email_validator library- once per domain, in a second bounded cache
+#   - Every other address is checked as a whole by the email_validator library
+# Invalid addresses raise EmailNotValidError, as the email_validator library does
+class EmailNormalizer:
+    # The constructor takes the number of addresses and domains to cache
+    def __init__(self, maxAddresses: int = 65536, maxDomains: int = 4096):
+        for name, size in (("Address", maxAddresses), ("Domain", maxDomains)):
+            if isinstance(size, bool) or not isinstance(size, int) or size <= 0:
+                raise ValueError(f"{name} cache size must be a positive integer")
+        self._addresses: _LRUCache = _LRUCache(maxAddresses)
+        self._domains: _LRUCache = _LRUCache(maxDomains)
+        self._lock = threading.Lock()
+        self._fastPath: int = 0
+        self._fullValidations: int = 0
+
+    # Returns the normalized form of the passed email address, raising EmailNotValidError if it is not valid
+    def normalize(self, email: str) -> str:
+        with self._lock:
+            result = self._addresses.get(email)
+        if result is None:
+            result = self._validate(email)
+            with self._lock:
+                self._addresses.put(email, result)
+        normalized, error = result
+        if error is not None:
+            raise EmailNotValidError(error)
+        return normalized
+
+    # Validates an address that is not cached, returning its normalized form or the reason it is not valid
+    def _validate(self, email: str) -> tuple[str | None, str | None]:
+        match = _FAST_ADDRESS.fullmatch(email)
+        if match is None or len(match.group(1)) > _MAX_LOCAL_LENGTH or len(email) > _MAX_ADDRESS_LENGTH:
+            return self._validateFully(email)
+        local, domain = match.groups()
+        with self._lock:
+            result = self._domains.get(domain)
+        if result is None:
+            # Check the domain alone, with a local part that is always valid
+            result = self._validateFully(f"a@{domain}")
+            if result[0] is not None:
+                result = (result[0][2:], None)
+            with self._lock:
+                self._domains.put(domain, result)
+        normalizedDomain, error = result
+        with self._lock:
+            self._fastPath += 1
+        if error is not None:
+            return None, error
+        # An internationalized domain changes length when normalized, so the whole address is checked instead
+        if normalizedDomain != domain.lower():
+            return self._validateFully(email)
+        return f"{local}@{normalizedDomain}", None
+
+    # Validates an address with the email_validator library
+    def _validateFully(self, email: str) -> tuple[str | None, str | None]:
+        with self._lock:
+            self._fullValidations += 1
+        try:
+            return validate_email(email, check_deliverability=False).normalized, None
+        except EmailNotValidError as e:
+            return None, str(e)
+
+    # Returns the cache counters- hits and misses of each cache, the number of uncached addresses checked with the
+    # fast path and with the email_validator library, and the address cache hit rate
+    @property
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._addresses.hits + self._addresses.misses
+            return {"addressHits": self._addresses.hits, "addressMisses": self._addresses.misses,
+                    "domainHits": self._domains.hits, "domainMisses": self._domains.misses,
+                    "fastPath": self._fastPath, "fullValidations": self._fullValidations,
+                    "addresses": len(self._addresses), "domains": len(self._domains),
+                    "hitRate": self._addresses.hits / lookups if lookups else 0.0}
+
+    # Removes every cached address and domain and resets the counters
+    def clear(self) -> None:
+        with self._lock:
+            self._addresses.clear()
+            self._domains.clear()
+            self._fastPath = self._fullValidations = 0
+
+
+# The normalizer used when users are created or change their email
+_defaultNormalizer: EmailNormalizer = EmailNormalizer()
+
+# Returns the normalized form of the passed email address with the shared normalizer, raising EmailNotValidError if
+# it is not valid
+def normalizeEmail(email: str) -> str:
+    return _defaultNormalizer.normalize(email)
+
+# Getter and setter for the shared normalizer- the setter returns the previous normalizer
+def getEmailNormalizer() -> EmailNormalizer:
+    return _defaultNormalizer
+
+def setEmailNormalizer(normalizer: EmailNormalizer) -> EmailNormalizer:
+    global _defaultNormalizer
+    if not isinstance(normalizer, EmailNormalizer):
+        raise TypeError("Normalizer must be an EmailNormalizer")
+    previous = _defaultNormalizer
+    _defaultNormalizer = normalizer
+    return previous
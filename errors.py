@@ -41,3 +41,35 @@ class AccountError(ValueError):
     def __init__(self, message: str):
         super().__init__(message)
 
+
+class WriteAheadLogError(ValueError):
+    def __init__(self, message: str):
+        super().__init__(message)
+
+class LedgerFileError(ValueError):
+    def __init__(self, message: str):
+        super().__init__(message)
+
+class RepositoryError(ValueError):
+    def __init__(self, message: str):
+        super().__init__(message)
+
+class ExecutorBusyError(ValueError):
+    def __init__(self, message: str):
+        super().__init__(message)
+
+class BenchmarkError(ValueError):
+    def __init__(self, message: str):
+        super().__init__(message)
+
+class SettlementError(ValueError):
+    def __init__(self, message: str):
+        super().__init__(message)
+
+class InvestmentError(ValueError):
+    def __init__(self, message: str):
+        super().__init__(message)
+
+class FeeError(ValueError):
+    def __init__(self, message: str):
+        super().__init__(message)
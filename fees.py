@@ -0,0 +1,146 @@
+# Jack Timmons, 27 Dec 2024, Winter Break
+# The purpose of this program is to provide users with a simulated bank managment interface, gaining
+# expierence with OOP, full-stack development, and my first expierence creating both a local GUI and
+# web-based application
+
+# The purpose of this file is to contain the fee schedule- the fees charged on postings by transaction type, deposit or
+# withdrawal method, and account tier, compiled into a lookup table so a posting's fee is found with a single index
+
+from errors import *
+from utilities import *
+
+# Matches every method or account tier in a fee rule
+ANY: str = "*"
+# Number of method slots of each transaction type in the lookup table- slot 0 is for records with no method
+# (transfers), and each deposit or withdrawal method code is at its code plus one
+_METHOD_SLOTS: int = max(len(VALID_DEPOSIT_METHODS), len(VALID_WITHDRAWAL_METHODS)) + 1
+_TIERS: int = len(VALID_ACCOUNT_TIERS)
+# Method codes of each transaction type
+_METHOD_CODES: dict[str, dict[str, int]] = {"Deposit": DEPOSIT_METHOD_CODES, "Withdrawal": WITHDRAWAL_METHOD_CODES}
+
+
+# The fee schedule class holds the rules that set the fee charged on each posting, compiled into a lookup table
+# Each rule is a dictionary with the keys transactionType, and optionally method and tier (default ANY, matching
+# every method or tier), flat (a fixed fee, default 0.00), rate (a share of the amount, default 0.0), minimum (default
+# 0.00), and maximum (default None, for no maximum)- the fee is the flat fee plus the rate of the amount (rounded to the
+# cent), kept between the minimum and maximum. Where several rules match a posting, the rule naming its method wins
+# over a rule naming its tier, which wins over a rule naming neither. Postings no rule matches are charged nothing
+# Every combination of transaction type, method, and tier is worked out when the schedule is made- flat fees are
+# stored as the fee itself, so most postings find their fee without any arithmetic
+class FeeSchedule:
+    def __init__(self, rules: list[dict] = None):
+        rules = [] if rules is None else rules
+        if not isinstance(rules, list):
+            raise FeeError("Fee Error: Fee rules must be a list of dictionaries")
+        # Matches: for each table index, the most specific rule matching it so far and how specific that rule is
+        matches: dict[int, tuple[int, int]] = {}
+        compiled = []
+        for number, rule in enumerate(rules):
+            try:
+                indices, specificity, fee = self._compileRule(rule)
+            except FeeError as e:
+                raise FeeError(f"Fee Error: Rule {number}: {e}") from None
+            for index in indices:
+                match = matches.get(index)
+                if match is not None and match[1] == specificity:
+                    raise FeeError(f"Fee Error: Rule {number}: Rule overlaps rule {match[0]}")
+                if match is None or match[1] < specificity:
+                    matches[index] = (number, specificity)
+            compiled.append(fee)
+        self._rules: list[dict] = [dict(rule) for rule in rules]
+        # Table: the fee of each combination of transaction type, method slot, and tier- an int for a flat fee, or
+        # a tuple of flat fee, rate, minimum, and maximum (all in cents but the rate)
+        self._table: list[int | tuple] = [0] * (len(VALID_TRANSACTION_TYPES) * _METHOD_SLOTS * _TIERS)
+        for index, (number, _) in matches.items():
+            self._table[index] = compiled[number]
+
+    # Getter for copies of the rules of the schedule
+    @property
+    def rules(self) -> list[dict]:
+        return [dict(rule) for rule in self._rules]
+
+    # Validates the passed rule, returning the table indices it matches, how specific it is, and its compiled fee
+    @staticmethod
+    def _compileRule(rule: dict) -> tuple[list[int], int, int | tuple]:
+        if not isinstance(rule, dict):
+            raise FeeError("Rule must be a dictionary")
+        unknown = set(rule) - {"transactionType", "method", "tier", "flat", "rate", "minimum", "maximum"}
+        if unknown:
+            raise FeeError(f"Unknown rule field {sorted(unknown)[0]}")
+        transactionType = rule.get("transactionType")
+        if transactionType not in TRANSACTION_TYPE_CODES:
+            raise FeeError(f"Transaction type must be one of {', '.join(VALID_TRANSACTION_TYPES)}")
+        method, tier = rule.get("method", ANY), rule.get("tier", ANY)
+        methodCodes = _METHOD_CODES.get(transactionType, {})
+        if method != ANY and method not in methodCodes:
+            raise FeeError(f"Invalid method for {transactionType}")
+        if tier != ANY and tier not in ACCOUNT_TIER_CODES:
+            raise FeeError(f"Tier must be one of {', '.join(VALID_ACCOUNT_TIERS)}")
+        try:
+            flat = validateNonNegativeMoney(rule.get("flat", 0.00), "Flat fee").cents
+            minimum = validateNonNegativeMoney(rule.get("minimum", 0.00), "Minimum").cents
+            maximum = rule.get("maximum")
+            maximum = None if maximum is None else validateNonNegativeMoney(maximum, "Maximum").cents
+        except InputError as e:
+            raise FeeError(str(e)) from None
+        rate = rule.get("rate", 0.0)
+        if isinstance(rate, bool) or not isinstance(rate, (int, float)) or not 0 <= rate <= 1:
+            raise FeeError("Rate must be between 0 and 1")
+        if maximum is not None and maximum < minimum:
+            raise FeeError("Maximum must not be less than the minimum")
+        typeCode = TRANSACTION_TYPE_CODES[transactionType]
+        if method != ANY:
+            slots = [methodCodes[method] + 1]
+        else:
+            slots = [code + 1 for code in methodCodes.values()] if methodCodes else [0]
+        tiers = [ACCOUNT_TIER_CODES[tier]] if tier != ANY else range(_TIERS)
+        indices = [(typeCode * _METHOD_SLOTS + slot) * _TIERS + tierCode for slot in slots for tierCode in tiers]
+        specificity = (method != ANY) * 2 + (tier != ANY)
+        if rate == 0:
+            fee = max(flat, minimum)
+            return indices, specificity, fee if maximum is None else min(fee, maximum)
+        return indices, specificity, (flat, float(rate), minimum, maximum)
+
+    # Returns the fee (in cents) charged on a posting of the passed amount (in cents), with the passed transaction
+    # type code, method code (-1 for none), and account tier code (see utilities.py)
+    def feeOf(self, typeCode: int, methodCode: int, tierCode: int, amount: int) -> int:
+        fee = self._table[(typeCode * _METHOD_SLOTS + methodCode + 1) * _TIERS + tierCode]
+        if fee.__class__ is int:
+            return fee
+        flat, rate, minimum, maximum = fee
+        fee = flat + round(amount * rate)
+        if fee < minimum:
+            return minimum
+        return fee if maximum is None or fee <= maximum else maximum
+
+    # Returns the fee charged on a posting of the passed amount with the passed transaction type, method (None for
+    # none), and account tier
+    def fee(self, transactionType: str, method: str | None, tier: str, amount: float | Money) -> Money:
+        if transactionType not in TRANSACTION_TYPE_CODES or tier not in ACCOUNT_TIER_CODES:
+            raise FeeError("Fee Error: Invalid transaction type or tier")
+        methodCode = -1 if method is None else _METHOD_CODES.get(transactionType, {}).get(method)
+        if methodCode is None:
+            raise FeeError(f"Fee Error: Invalid method for {transactionType}")
+        try:
+            amount = validateMoney(amount, "Amount").cents
+        except InputError as e:
+            raise FeeError(f"Fee Error: {e}") from None
+        return Money.fromCents(self.feeOf(TRANSACTION_TYPE_CODES[transactionType], methodCode,
+                                          ACCOUNT_TIER_CODES[tier], amount))
+
+
+# The fee schedule applied to postings- it charges nothing until one is set
+_feeSchedule: FeeSchedule = FeeSchedule()
+
+# Returns the fee schedule applied to postings
+def getFeeSchedule() -> FeeSchedule:
+    return _feeSchedule
+
+# Sets the fee schedule applied to postings (such as at startup), returning the schedule it replaces- postings already
+# made keep the fees they were charged
+def setFeeSchedule(schedule: FeeSchedule) -> FeeSchedule:
+    global _feeSchedule
+    if not isinstance(schedule, FeeSchedule):
+        raise FeeError("Fee Error: Fee schedule must be a FeeSchedule")
+    previous, _feeSchedule = _feeSchedule, schedule
+    return previous
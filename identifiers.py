@@ -0,0 +1,204 @@
+# Jack Timmons, 27 Dec 2024, Winter Break
+# The purpose of this program is to provide users with a simulated bank managment interface, gaining
+# expierence with OOP, full-stack development, and my first expierence creating both a local GUI and
+# web-based application
+
+# The purpose of this file is to contain the transaction ID generation strategies used by the transaction
+# classes- a fast sortable default, a keyed HMAC mode for opaque IDs, and the legacy bcrypt mode
+
+import os
+import hmac
+import hashlib
+import random
+import threading
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime
+from passlib.hash import bcrypt
+
+# Crockford base32 alphabet used to encode sortable IDs (no I, L, O, or U so IDs are easy to read back)
+CROCKFORD_ALPHABET: str = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+# Length of an encoded sortable ID (128 bits in base32)
+SORTABLE_ID_LENGTH: int = 26
+# Every pair of base32 characters, indexed by the 10 bit value they encode- lets the sortable ID generator encode the
+# sequence number of each new ID 10 bits at a time
+_CROCKFORD_PAIRS: tuple[str, ...] = tuple(a + b for a in CROCKFORD_ALPHABET for b in CROCKFORD_ALPHABET)
+
+
+# Base class for all transaction ID strategies- subclasses implement generate, which is passed the
+# metadata of the transaction the ID is being created for
+class TransactionIDGenerator(ABC):
+    # Returns a new transaction ID for the transaction described by the passed metadata
+    @abstractmethod
+    def generate(self, userID: str, transactionType: str, timeStamp: datetime) -> str:
+        pass
+
+    # Returns new transaction IDs for many transactions, one for each of the passed user IDs, transaction types, and
+    # time stamps in order- generators that can create IDs in bulk override this
+    def generateMany(self, userIDs: list[str], transactionTypes: list[str], timeStamps: list[datetime]) -> list[str]:
+        generate = self.generate
+        return [generate(userID, transactionType, timeStamp)
+                for userID, transactionType, timeStamp in zip(userIDs, transactionTypes, timeStamps)]
+
+
+# The sortable ID generator is the default strategy- each ID is a 128 bit ULID-style value made of a 48 bit
+# millisecond timestamp, a 16 bit node ID, and a 64 bit sequence number, encoded as 26 base32 characters
+# IDs from one generator are strictly increasing, so they sort in the order they were created and never
+# collide, even when many are created within the same microsecond
+# The first 13 characters (the timestamp and all but the lowest bit of the node ID) only change once per
+# millisecond, so they are cached and only the last 13 characters are encoded for each new ID
+class SortableIDGenerator(TransactionIDGenerator):
+    # The constructor takes an optional node ID (0 - 65535) identifying this process- if no node ID is
+    # supplied, one is derived from the process ID and a random value
+    def __init__(self, nodeID: int = None):
+        if nodeID is None:
+            nodeID = (os.getpid() ^ random.getrandbits(16)) & 0xFFFF
+        if not isinstance(nodeID, int) or not 0 <= nodeID <= 0xFFFF:
+            raise ValueError("Node ID must be an integer between 0 and 65535")
+        self._nodeID: int = nodeID
+        self._lastMillis: int = 0
+        self._sequence: int = 0
+        # The top 63 bits and the encoded first 13 characters of the last ID, kept together so they can be read
+        # and replaced atomically
+        self._prefix: tuple[int, str] = (-1, "")
+        self._lock = threading.Lock()
+
+    # Getter for the node ID
+    @property
+    def nodeID(self) -> int:
+        return self._nodeID
+
+    # Returns the next 128 bit ID value- the timestamp never moves backwards, and the sequence number is
+    # incremented for every ID created within the same millisecond
+    def nextValue(self) -> int:
+        millis = time.time_ns() // 1_000_000
+        with self._lock:
+            if millis > self._lastMillis:
+                self._lastMillis = millis
+                self._sequence = 0
+            else:
+                millis = self._lastMillis
+                self._sequence += 1
+                # Borrow the next millisecond if the sequence is exhausted
+                if self._sequence > 0xFFFFFFFFFFFFFFFF:
+                    millis = self._lastMillis = millis + 1
+                    self._sequence = 0
+            sequence = self._sequence
+        return ((millis & 0xFFFFFFFFFFFF) << 80) | (self._nodeID << 64) | sequence
+
+    # Reserves the passed number of consecutive sequence numbers at once, returning the first of the 128 bit ID values
+    # reserved- the values only differ in their sequence numbers, so they are the first value plus 0 to count - 1
+    def nextValues(self, count: int) -> int:
+        millis = time.time_ns() // 1_000_000
+        with self._lock:
+            if millis > self._lastMillis:
+                self._lastMillis = millis
+                sequence = 0
+            else:
+                millis = self._lastMillis
+                sequence = self._sequence + 1
+                # Borrow the next millisecond if the sequence can not hold every value reserved
+                if sequence + count - 1 > 0xFFFFFFFFFFFFFFFF:
+                    millis = self._lastMillis = millis + 1
+                    sequence = 0
+            self._sequence = sequence + count - 1
+        return ((millis & 0xFFFFFFFFFFFF) << 80) | (self._nodeID << 64) | sequence
+
+    # The metadata is not needed to build a sortable ID, the timestamp and sequence make it unique
+    def generate(self, userID: str, transactionType: str, timeStamp: datetime) -> str:
+        value = self.nextValue()
+        head = value >> 65
+        prefixHead, prefix = self._prefix
+        if prefixHead != head:
+            prefix = encodeSortableID(value)[:13]
+            self._prefix = (head, prefix)
+        # The 14th character holds the lowest bit of the node ID and the top 4 bits of the sequence, and the
+        # rest of the sequence is encoded 10 bits (two characters) at a time
+        pairs = _CROCKFORD_PAIRS
+        return (prefix + CROCKFORD_ALPHABET[(value >> 60) & 0x1F] + pairs[(value >> 50) & 0x3FF]
+                + pairs[(value >> 40) & 0x3FF] + pairs[(value >> 30) & 0x3FF] + pairs[(value >> 20) & 0x3FF]
+                + pairs[(value >> 10) & 0x3FF] + pairs[value & 0x3FF])
+
+    # The IDs are reserved with a single lock, and share the first 13 characters- within each run of 1024 values,
+    # only the last two characters change, so the first 24 are encoded once per run
+    def generateMany(self, userIDs: list[str], transactionTypes: list[str], timeStamps: list[datetime]) -> list[str]:
+        count = len(userIDs)
+        if not count:
+            return []
+        first = self.nextValues(count)
+        prefix = encodeSortableID(first)[:13]
+        alphabet, pairs = CROCKFORD_ALPHABET, _CROCKFORD_PAIRS
+        ids = []
+        end = first + count
+        for run in range(first >> 10, ((end - 1) >> 10) + 1):
+            value = run << 10
+            stem = (prefix + alphabet[(value >> 60) & 0x1F] + pairs[(value >> 50) & 0x3FF] + pairs[(value >> 40) & 0x3FF]
+                    + pairs[(value >> 30) & 0x3FF] + pairs[(value >> 20) & 0x3FF] + pairs[(value >> 10) & 0x3FF])
+            ids += [stem + pair for pair in pairs[max(first - value, 0):min(end - value, 1024)]]
+        return ids
+
+# The HMAC ID generator creates opaque IDs that do not reveal when or where a transaction was made- each ID
+# is the keyed SHA-256 HMAC of a unique sortable ID, truncated to 32 hex characters
+class HMACIDGenerator(TransactionIDGenerator):
+    # The constructor takes the secret key used to sign IDs, and optionally the generator used for the
+    # unique values that are signed
+    def __init__(self, key: bytes, baseGenerator: SortableIDGenerator = None):
+        if not isinstance(key, bytes) or not key:
+            raise ValueError("HMAC key must be a non-empty bytes value")
+        self._key: bytes = key
+        self._baseGenerator: SortableIDGenerator = baseGenerator if baseGenerator else SortableIDGenerator()
+
+    def generate(self, userID: str, transactionType: str, timeStamp: datetime) -> str:
+        value = self._baseGenerator.nextValue().to_bytes(16, "big")
+        return hmac.new(self._key, value, hashlib.sha256).hexdigest()[:32]
+
+
+# The bcrypt ID generator is the legacy strategy- the ID is the bcrypt hash of the string
+# userID-transactionType-timeStamp.isoformat(). It is very slow and is only kept so existing
+# IDs can still be reproduced and verified
+class BcryptIDGenerator(TransactionIDGenerator):
+    def generate(self, userID: str, transactionType: str, timeStamp: datetime) -> str:
+        metaData: str = f"{userID}-{transactionType}-{timeStamp.isoformat()}"
+        return bcrypt.hash(metaData.encode())
+
+
+# Encodes a 128 bit ID value as a 26 character Crockford base32 string
+def encodeSortableID(value: int) -> str:
+    chars = []
+    for _ in range(SORTABLE_ID_LENGTH):
+        chars.append(CROCKFORD_ALPHABET[value & 0x1F])
+        value >>= 5
+    return "".join(reversed(chars))
+
+# Decodes a 26 character Crockford base32 string back into its 128 bit ID value
+def decodeSortableID(transactionID: str) -> int:
+    if not isinstance(transactionID, str) or len(transactionID) != SORTABLE_ID_LENGTH:
+        raise ValueError("Sortable ID must be a 26 character string")
+    value = 0
+    for char in transactionID.upper():
+        index = CROCKFORD_ALPHABET.find(char)
+        if index < 0:
+            raise ValueError(f"Sortable ID contains an invalid character: {char}")
+        value = (value << 5) | index
+    return value
+
+# Returns the creation time of a sortable ID, to millisecond precision
+def sortableIDTime(transactionID: str) -> datetime:
+    return datetime.fromtimestamp((decodeSortableID(transactionID) >> 80) / 1000)
+
+
+# The generator used by every new transaction- defaults to the sortable ID generator
+_transactionIDGenerator: TransactionIDGenerator = SortableIDGenerator()
+
+# Getter for the generator used by new transactions
+def getTransactionIDGenerator() -> TransactionIDGenerator:
+    return _transactionIDGenerator
+
+# Sets the generator used by new transactions, returning the previously installed generator
+def setTransactionIDGenerator(generator: TransactionIDGenerator) -> TransactionIDGenerator:
+    global _transactionIDGenerator
+    if not isinstance(generator, TransactionIDGenerator):
+        raise TypeError("Generator must be a TransactionIDGenerator")
+    previous = _transactionIDGenerator
+    _transactionIDGenerator = generator
+    return previous
@@ -0,0 +1,176 @@
+# Jack Timmons, 27 Dec 2024, Winter Break
+# The purpose of this program is to provide users with a simulated bank managment interface, gaining
+# expierence with OOP, full-stack development, and my first expierence creating both a local GUI and
+# web-based application
+
+# The purpose of this file is to contain the interest accrual engine- the balances of many savings accounts are pulled
+# into NumPy arrays, a run of interest is worked out for all of them in one vectorized pass, and the interest is
+# posted back as "Interest" deposits
+
+from contextlib import ExitStack
+from datetime import datetime
+from typing import Iterable, NamedTuple
+import numpy as np
+from accounts import Account, SavingsAccount, DAYS_PER_YEAR, INTEREST_TOLERANCE, _validateDescription, restoreTransaction
+from errors import *
+from identifiers import getTransactionIDGenerator
+from wal import WriteAheadLog
+
+# Largest number of interest deposits posted (and written to a write-ahead log) together
+POSTING_BATCH_SIZE: int = 65_536
+
+
+# The result of an accrual run- the number of accounts accrued, the interest accrued by the run (in fractional
+# cents), and the number and total (in cents) of the interest deposits posted
+class AccrualResult(NamedTuple):
+    accounts: int
+    accrued: float
+    posted: int
+    postedCents: int
+
+
+# The accrueInterest function accrues the passed number of days of interest on every active savings account passed
+# (other accounts are skipped), and posts the whole cents accrued by each account as an "Interest" deposit if post is
+# set (such as at the end of the month)- see SavingsAccount for how interest is worked out
+# Accounts are grouped by their interest tiers and compounding, and each group is worked out in one vectorized pass
+# over arrays of its balances and accrued interest- the results match SavingsAccount.accrueInterest, which accrues a
+# single account. Balances are read without taking the accounts' locks, so postings made during the run may or may
+# not earn interest until the next run, and a run should not overlap another accrual of the same accounts
+# Interest deposits are posted in batches of the accounts of a group on the same write-ahead log (see _postInterestBatch)-
+# accounts closed or frozen since they were accrued keep their interest accrued, and if a batch can not be posted, the
+# interest of its accounts and of every later batch is left accrued, to post on a later run, and the error is raised
+# The interest left accrued by each account is written to its write-ahead log- with its deposit if it is paid, and in
+# frames of their own for the accounts that are not (see _logAccruals)
+def accrueInterest(accounts: Iterable[Account], days: int = 1, post: bool = True,
+                   description: str = "Interest") -> AccrualResult:
+    if isinstance(days, bool) or not isinstance(days, int) or days < 0:
+        raise AccountError("Interest Error: Days must be a non-negative integer")
+    description = _validateDescription(description)
+    groups: dict[tuple, list[SavingsAccount]] = {}
+    for account in accounts:
+        if isinstance(account, SavingsAccount) and account._status == "Active":
+            key = (account._interestTiers, account._compounding)
+            group = groups.get(key)
+            if group is None:
+                group = groups[key] = []
+            group.append(account)
+    timeStamp = datetime.now()
+    count = posted = postedCents = 0
+    accruedTotal = 0.0
+    for (tiers, compounding), group in groups.items():
+        size = len(group)
+        balances = np.fromiter([account._balance.cents for account in group], np.int64, size)
+        accrued = np.fromiter([account._accruedInterest for account in group], np.float64, size)
+        interest = _interest(balances, accrued, tiers, compounding, days)
+        accrued += interest
+        payments = np.floor(accrued + INTEREST_TOLERANCE).astype(np.int64) if post else np.zeros(size, np.int64)
+        accrued = np.maximum(accrued - payments, 0.0)
+        for account, value in zip(group, accrued.tolist()):
+            account._accruedInterest = value
+        _logAccruals([group[index] for index in np.flatnonzero(payments == 0).tolist()])
+        if post:
+            paying = np.flatnonzero(payments > 0)
+            batches = _postingBatches(group, paying.tolist(), payments[paying].tolist())
+            for position, (log, batchAccounts, amounts) in enumerate(batches):
+                try:
+                    skipped = _postInterestBatch(log, batchAccounts, amounts, description, timeStamp)
+                except Exception:
+                    # Leave the interest of this and every later batch accrued, to post on a later run
+                    for _, laterAccounts, laterAmounts in batches[position:]:
+                        for account, cents in zip(laterAccounts, laterAmounts):
+                            account._accruedInterest += cents
+                    raise
+                # Leave the interest of accounts that were not active when the batch was posted accrued
+                for account, cents in skipped:
+                    account._accruedInterest += cents
+                    posted -= 1
+                    postedCents -= cents
+                _logAccruals([account for account, _ in skipped])
+            posted += len(paying)
+            postedCents += int(payments.sum())
+        count += size
+        accruedTotal += float(interest.sum())
+    return AccrualResult(count, accruedTotal, posted, postedCents)
+
+# Splits the paying accounts of a group (the passed indices into the group, paying the passed cents) into batches of
+# at most POSTING_BATCH_SIZE accounts on the same write-ahead log (or on none), in order of the log's first account-
+# returns a list of the log, accounts, and cents of each batch
+def _postingBatches(group: list[SavingsAccount], indices: list[int],
+                    amounts: list[int]) -> list[tuple[WriteAheadLog | None, list[SavingsAccount], list[int]]]:
+    byLog: dict[int, tuple[WriteAheadLog | None, list[SavingsAccount], list[int]]] = {}
+    for index, cents in zip(indices, amounts):
+        account = group[index]
+        log = account._wal
+        entry = byLog.get(id(log))
+        if entry is None:
+            entry = byLog[id(log)] = (log, [], [])
+        entry[1].append(account)
+        entry[2].append(cents)
+    return [(log, accounts[start:start + POSTING_BATCH_SIZE], amounts[start:start + POSTING_BATCH_SIZE])
+            for log, accounts, amounts in byLog.values() for start in range(0, len(accounts), POSTING_BATCH_SIZE)]
+
+# Writes the interest accrued by the passed accounts to their write-ahead logs, in a frame for each log of at most
+# POSTING_BATCH_SIZE accounts- only the accrued interest is written (see SavingsAccount._restoreState)
+def _logAccruals(accounts: list[SavingsAccount]) -> None:
+    byLog: dict[int, tuple[WriteAheadLog, list[SavingsAccount]]] = {}
+    for account in accounts:
+        log = account._wal
+        if log is not None:
+            entry = byLog.get(id(log))
+            if entry is None:
+                entry = byLog[id(log)] = (log, [])
+            entry[1].append(account)
+    for log, logged in byLog.values():
+        for start in range(0, len(logged), POSTING_BATCH_SIZE):
+            log.logStates(_accrualStates(logged[start:start + POSTING_BATCH_SIZE]))
+
+# Returns the states written to a write-ahead log for the interest accrued by the passed accounts, by account ID
+def _accrualStates(accounts: list[SavingsAccount]) -> dict[str, dict]:
+    return {account._accountID: {"accruedInterest": account._accruedInterest} for account in accounts}
+
+# Posts the passed whole cents of interest to the passed accounts (all on the passed write-ahead log, or on none) as
+# "Interest" deposits made at the passed time, with the passed (already validated) description- as
+# SavingsAccount._postInterest does for one account, but in bulk: the transaction IDs are reserved together, the
+# records are built directly, and the whole batch is written to the log as a single frame, with the interest the
+# accounts have left accrued
+# Every account's lock is taken (in order of account ID, as transferTo takes them) before anything else is done, and
+# held until the deposits are posted- accounts that are no longer active are skipped, and each deposit is stamped no
+# earlier than its account's last record (see Account._nextTimeStamp) before its ID is generated and it is logged.
+# Deferred records are loaded and the batch is logged before any account is changed, so either every deposit of the
+# batch is posted or none. Returns the accounts skipped, with the cents they were not paid
+def _postInterestBatch(log: WriteAheadLog | None, accounts: list[SavingsAccount], amounts: list[int], description: str,
+                       timeStamp: datetime) -> list[tuple[SavingsAccount, int]]:
+    with ExitStack() as locks:
+        for account in sorted(accounts, key=lambda account: account._accountID):
+            locks.enter_context(account._lock)
+        paying, payingAmounts, skipped = [], [], []
+        for account, cents in zip(accounts, amounts):
+            if account._status == "Active":
+                paying.append(account)
+                payingAmounts.append(cents)
+            else:
+                skipped.append((account, cents))
+        timeStamps = [account._nextTimeStamp(timeStamp) for account in paying]
+        transactionIDs = getTransactionIDGenerator().generateMany([account._userID for account in paying],
+                                                                  ["Deposit"] * len(paying), timeStamps)
+        deposits = [restoreTransaction("Deposit", transactionID, stamp, account._userID, account._accountID, cents,
+                                       method="Interest", description=description)
+                    for transactionID, stamp, account, cents in zip(transactionIDs, timeStamps, paying, payingAmounts)]
+        if log is not None and deposits:
+            log.logPostings(deposits, _accrualStates(paying))
+        for account, deposit in zip(paying, deposits):
+            account._recordTransactions([deposit], False)
+    return skipped
+
+# Returns the interest (in fractional cents) earned over the passed number of days by accounts with the passed
+# balances and accrued interest, sharing the passed interest tiers and compounding period
+# Each balance's rate is that of the highest tier whose minimum it reaches, found by binary search over the tiers
+def _interest(balances: np.ndarray, accrued: np.ndarray, tiers: tuple[tuple[int, float], ...], compounding: str,
+              days: int) -> np.ndarray:
+    minimums = np.array([minimum for minimum, _ in tiers], np.int64)
+    rates = np.array([rate for _, rate in tiers], np.float64)
+    rate = rates[np.maximum(np.searchsorted(minimums, balances, side="right") - 1, 0)]
+    rate[balances < 0] = 0.0
+    if compounding == "daily":
+        return (balances + accrued) * (np.power(1 + rate / DAYS_PER_YEAR, days) - 1)
+    return balances * rate / DAYS_PER_YEAR * days
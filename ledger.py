@@ -0,0 +1,271 @@
+# Jack Timmons, 27 Dec 2024, Winter Break
+# The purpose of this program is to provide users with a simulated bank managment interface, gaining
+# expierence with OOP, full-stack development, and my first expierence creating both a local GUI and
+# web-based application
+
+# The purpose of this file is to contain the columnar ledger, an optional compact backend for an account's
+# transaction records, and the lightweight transaction views it hands out
+
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from itertools import compress
+from utilities import *
+
+
+# The transaction view is a lightweight, read-only stand in for a transaction stored in a columnar ledger
+# Each view only holds the ledger and a record index- the fields of the transaction are read from the
+# ledger's arrays when they are accessed
+class TransactionView:
+    __slots__ = ("_ledger", "_index")
+
+    def __init__(self, ledger: "ColumnarLedger", index: int):
+        self._ledger = ledger
+        self._index: int = index
+
+    # Getter for the transaction ID
+    @property
+    def transactionID(self) -> str:
+        return self._ledger._transactionIDs[self._index]
+
+    # Getter for the user ID
+    @property
+    def userID(self) -> str:
+        return self._ledger._strings[self._ledger._userCodes[self._index]]
+
+    # Getter for the account ID
+    @property
+    def accountID(self) -> str:
+        return self._ledger._strings[self._ledger._accountCodes[self._index]]
+
+    # Getter for the amount
+    @property
+    def amount(self) -> Money:
+        return Money.fromCents(self._ledger._amounts[self._index])
+
+    # Getter for the transaction type
+    @property
+    def transactionType(self) -> str:
+        return self._ledger._strings[self._ledger._typeCodes[self._index]]
+
+    # Getter for the fee
+    @property
+    def fee(self) -> Money:
+        return Money.fromCents(self._ledger._fees[self._index])
+
+    # Getter for the origin
+    @property
+    def origin(self) -> str:
+        return self._ledger._strings[self._ledger._originCodes[self._index]]
+
+    # Getter for the description
+    @property
+    def description(self) -> str:
+        return self._ledger._strings[self._ledger._descriptionCodes[self._index]]
+
+    # Getter for the time stamp
+    @property
+    def timeStamp(self) -> datetime:
+        return fromEpochMicros(self._ledger._timeStamps[self._index])
+
+    # Getter for the deposit method- only deposits have a deposit method
+    @property
+    def depositMethod(self) -> str:
+        if self.transactionType != "Deposit":
+            raise AttributeError("Only deposits have a deposit method")
+        return self._ledger._strings[self._ledger._methodCodes[self._index]]
+
+    # Getter for the withdrawal method- only withdrawals have a withdrawal method
+    @property
+    def withdrawalMethod(self) -> str:
+        if self.transactionType != "Withdrawal":
+            raise AttributeError("Only withdrawals have a withdrawal method")
+        return self._ledger._strings[self._ledger._methodCodes[self._index]]
+
+    # Getter for the destination account ID- only transfers have a destination account ID
+    @property
+    def destinationAccountID(self) -> str:
+        return self._transferField("destinationAccountID")
+
+    # Getter for the destination routing number- only external transfers have a destination routing number
+    @property
+    def destinationRoutingNumber(self) -> str:
+        return self._transferField("destinationRoutingNumber")
+
+    # Getter for the destination bank- only external transfers have a destination bank
+    @property
+    def destinationBank(self) -> str:
+        return self._transferField("destinationBank")
+
+    # Reads a field from the ledger's side table of transfer details
+    def _transferField(self, name: str) -> str:
+        details = self._ledger._transferDetails.get(self._index)
+        if not details or name not in details:
+            raise AttributeError(f"Transaction has no {name}")
+        return details[name]
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, TransactionView):
+            return NotImplemented
+        return self.transactionID == other.transactionID
+
+    def __hash__(self) -> int:
+        return hash(self.transactionID)
+
+    def __repr__(self) -> str:
+        return f"TransactionView({self.transactionID!r})"
+
+    # Returns a string representation of the transaction, in the same format as the transaction classes
+    def __str__(self) -> str:
+        return f"Transaction ID: {self.transactionID}\nUser ID: {self.userID}\nAccount ID: {self.accountID}\nAmount: {self.amount}\nTransaction Type: {self.transactionType}"
+
+
+# The columnar ledger stores an account's transaction records in parallel typed arrays instead of a list of
+# transaction objects- amounts and fees are stored as whole cents, timestamps as epoch microseconds, and the type,
+# method, user, origin, and description of each record as codes into an interned string table
+# It behaves like a read-only list of TransactionView objects, supports append and extend so it can be used
+# in place of an account's transaction list, and can sum, count, and filter records without building objects
+class ColumnarLedger:
+    def __init__(self, transactions: list = None):
+        # Interned strings shared by every string column- code 0 is reserved for None
+        self._strings: list[str] = [None]
+        self._stringCodes: dict[str, int] = {}
+        # Columns
+        self._timeStamps = array("q")
+        self._amounts = array("q")
+        self._fees = array("q")
+        self._typeCodes = array("I")
+        self._methodCodes = array("I")
+        self._userCodes = array("I")
+        self._accountCodes = array("I")
+        self._originCodes = array("I")
+        self._descriptionCodes = array("I")
+        # Transaction IDs are unique to each record, so they are kept in a plain list rather than interned
+        self._transactionIDs: list[str] = []
+        # Destination details of transfer records, indexed by record index
+        self._transferDetails: dict[int, dict[str, str]] = {}
+        if transactions:
+            self.extend(transactions)
+
+    # Returns the code of the passed string in the interned string table, adding it if it is new
+    def _intern(self, value: str) -> int:
+        if value is None:
+            return 0
+        code = self._stringCodes.get(value)
+        if code is None:
+            code = self._stringCodes[value] = len(self._strings)
+            self._strings.append(value)
+        return code
+
+    # Returns the code of the passed string if it has been interned, or -1 if no record uses it
+    def _codeOf(self, value: str) -> int:
+        return self._stringCodes.get(value, -1)
+
+    # Adds the passed transaction to the end of the ledger- the transaction object is not kept
+    def append(self, transaction) -> None:
+        intern = self._intern
+        index = len(self._transactionIDs)
+        transactionType = transaction.transactionType
+        if transactionType == "Deposit":
+            method = transaction.depositMethod
+        elif transactionType == "Withdrawal":
+            method = transaction.withdrawalMethod
+        else:
+            method = None
+            details = {"destinationAccountID": transaction.destinationAccountID}
+            if transactionType == "External-Transfer":
+                details["destinationRoutingNumber"] = transaction.destinationRoutingNumber
+                details["destinationBank"] = transaction.destinationBank
+            self._transferDetails[index] = details
+        self._timeStamps.append(toEpochMicros(transaction.timeStamp))
+        self._amounts.append(transaction.amount.cents)
+        self._fees.append(transaction.fee.cents)
+        self._typeCodes.append(intern(transactionType))
+        self._methodCodes.append(intern(method))
+        self._userCodes.append(intern(transaction.userID))
+        self._accountCodes.append(intern(transaction.accountID))
+        self._originCodes.append(intern(transaction.origin))
+        self._descriptionCodes.append(intern(transaction.description))
+        self._transactionIDs.append(transaction.transactionID)
+
+    # Adds each of the passed transactions to the end of the ledger
+    def extend(self, transactions) -> None:
+        for transaction in transactions:
+            self.append(transaction)
+
+    def __len__(self) -> int:
+        return len(self._transactionIDs)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [TransactionView(self, i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("Ledger index out of range")
+        return TransactionView(self, index)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield TransactionView(self, index)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (list, ColumnarLedger)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"ColumnarLedger({len(self)} records)"
+
+    # Returns the range of record indices whose timestamps fall between start and end (inclusive)- the ledger
+    # is ordered by time, so the range is found by binary search
+    def indexRange(self, start: datetime = None, end: datetime = None) -> range:
+        low = bisect_left(self._timeStamps, toEpochMicros(start)) if start else 0
+        high = bisect_right(self._timeStamps, toEpochMicros(end)) if end else len(self)
+        return range(low, max(low, high))
+
+    # Returns the indices of the records matching all of the passed filters- transaction type and method are
+    # compared by code, and the time window is found by binary search
+    def indicesWhere(self, transactionType: str = None, method: str = None, start: datetime = None,
+                     end: datetime = None) -> list[int]:
+        window = self.indexRange(start, end)
+        indices = window
+        if transactionType is not None:
+            code = self._codeOf(transactionType)
+            indices = [i for i in indices if self._typeCodes[i] == code]
+        if method is not None:
+            code = self._codeOf(method)
+            indices = [i for i in indices if self._methodCodes[i] == code]
+        return list(indices)
+
+    # Returns views of the records matching all of the passed filters
+    def filter(self, transactionType: str = None, method: str = None, start: datetime = None,
+               end: datetime = None) -> list[TransactionView]:
+        return [TransactionView(self, i) for i in self.indicesWhere(transactionType, method, start, end)]
+
+    # Returns the number of records, optionally only counting records of the passed transaction type
+    def count(self, transactionType: str = None) -> int:
+        if transactionType is None:
+            return len(self)
+        return self._typeCodes.count(self._codeOf(transactionType))
+
+    # Returns the sum of the amounts of all records, optionally only summing records of the passed transaction type
+    def totalAmount(self, transactionType: str = None) -> Money:
+        return self._sumColumn(self._amounts, transactionType)
+
+    # Returns the sum of the fees of all records, optionally only summing records of the passed transaction type
+    def totalFees(self, transactionType: str = None) -> Money:
+        return self._sumColumn(self._fees, transactionType)
+
+    # Returns the net effect on the balance of the records from start up to (but not including) stop- deposits
+    # are added and every other transaction type is subtracted, and every fee is subtracted
+    def netAmount(self, start: int = 0, stop: int = None) -> Money:
+        amounts = self._amounts[start:stop]
+        outgoing = compress(amounts, map(self._codeOf("Deposit").__ne__, self._typeCodes[start:stop]))
+        return Money.fromCents(sum(amounts) - 2 * sum(outgoing) - sum(self._fees[start:stop]))
+
+    # Sums a numeric column, using the type code column as a mask when a transaction type is passed
+    def _sumColumn(self, column: array, transactionType: str = None) -> Money:
+        if transactionType is None:
+            return Money.fromCents(sum(column))
+        return Money.fromCents(sum(compress(column, map(self._codeOf(transactionType).__eq__, self._typeCodes))))
@@ -0,0 +1,262 @@
+# Jack Timmons, 27 Dec 2024, Winter Break
+# The purpose of this program is to provide users with a simulated bank managment interface, gaining
+# expierence with OOP, full-stack development, and my first expierence creating both a local GUI and
+# web-based application
+
+# The purpose of this file is to contain the binary ledger file format- transaction records are written as fixed
+# width columns with their strings in side heaps, and read back through a memory map without copying them
+
+import mmap
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from datetime import datetime
+from operator import attrgetter, countOf
+from errors import *
+from ledger import ColumnarLedger, TransactionView
+
+# Every ledger file starts with this marker
+LEDGER_FILE_MAGIC: bytes = b"BMLEDGER"
+LEDGER_FILE_VERSION: int = 1
+
+# Sections of a ledger file, in the order they are stored, with the array type code of their items
+# The string heap holds the interned strings of the ledger (codes index the string offsets), and the ID heap holds
+# the transaction ID of every record. Each account in the account directory has a code, and the start and count of
+# its record positions in the account positions section
+_SECTIONS: list[tuple[str, str]] = [
+    ("stringHeap", "B"), ("stringOffsets", "Q"), ("idHeap", "B"), ("idOffsets", "Q"),
+    ("timeStamps", "q"), ("amounts", "q"), ("fees", "q"),
+    ("typeCodes", "I"), ("methodCodes", "I"), ("userCodes", "I"), ("accountCodes", "I"), ("originCodes", "I"),
+    ("descriptionCodes", "I"), ("destinationAccountCodes", "I"), ("destinationRoutingCodes", "I"),
+    ("destinationBankCodes", "I"), ("accountDirectory", "I"), ("accountPositions", "I"),
+]
+# Header: marker, version, byte order (0 little, 1 big), record count, followed by the offset and length of each section
+_HEADER = struct.Struct("<8sIIQ")
+_SECTION = struct.Struct("<QQ")
+# Sections start on 8 byte boundaries so every column can be read in place
+_ALIGNMENT: int = 8
+
+
+# The writeLedgerFile function writes the passed transaction records (transactions, transaction views, or a whole
+# ColumnarLedger) to a ledger file at the passed path, in time order, with an index of the records of each account
+# The file is written beside the path and moved into place, so readers never see a partly written file
+def writeLedgerFile(path: str, transactions) -> None:
+    if isinstance(transactions, MappedLedger) or not isinstance(transactions, ColumnarLedger):
+        transactions = ColumnarLedger(sorted(transactions, key=attrgetter("timeStamp")))
+    ledger = transactions
+    count = len(ledger)
+    # Transfer details are stored as three more string code columns (0 for records that are not transfers)- their
+    # strings are interned into a copy of the ledger's string table
+    strings = list(ledger._strings)
+    codes = dict(ledger._stringCodes)
+    destinations = [array("I", bytes(4 * count)) for _ in range(3)]
+    for index, details in ledger._transferDetails.items():
+        for column, name in zip(destinations, ("destinationAccountID", "destinationRoutingNumber", "destinationBank")):
+            value = details.get(name)
+            if value is not None:
+                if value not in codes:
+                    codes[value] = len(strings)
+                    strings.append(value)
+                column[index] = codes[value]
+    stringHeap, stringOffsets = _buildHeap(strings[1:])
+    idHeap, idOffsets = _buildHeap(ledger._transactionIDs)
+    # The positions of each account's records, grouped by account
+    accounts: dict[int, array] = {}
+    for position, code in enumerate(ledger._accountCodes):
+        accounts.setdefault(code, array("I")).append(position)
+    directory = array("I")
+    positions = array("I")
+    for code, accountPositions in accounts.items():
+        directory.extend((code, len(positions), len(accountPositions)))
+        positions.extend(accountPositions)
+    sections = [stringHeap, stringOffsets, idHeap, idOffsets, ledger._timeStamps, ledger._amounts, ledger._fees,
+                ledger._typeCodes, ledger._methodCodes, ledger._userCodes, ledger._accountCodes, ledger._originCodes,
+                ledger._descriptionCodes, *destinations, directory, positions]
+    offset = _align(_HEADER.size + _SECTION.size * len(_SECTIONS))
+    table = []
+    for section in sections:
+        length = len(section) * section.itemsize
+        table.append((offset, length))
+        offset = _align(offset + length)
+    temporary = f"{path}.tmp"
+    with open(temporary, "wb") as file:
+        file.write(_HEADER.pack(LEDGER_FILE_MAGIC, LEDGER_FILE_VERSION, sys.byteorder == "big", count))
+        for sectionOffset, length in table:
+            file.write(_SECTION.pack(sectionOffset, length))
+        for section, (sectionOffset, _) in zip(sections, table):
+            file.write(bytes(sectionOffset - file.tell()))
+            section.tofile(file)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temporary, path)
+
+
+# The mapped ledger is a read-only ColumnarLedger whose columns are read in place from a memory mapped ledger file
+# Records are handed out as the same lightweight TransactionView objects, and counts, sums, filters, and time window
+# lookups run directly over the mapped columns, so nothing is copied or built until a field is read. Processes that
+# open the same file share its pages
+class MappedLedger(ColumnarLedger):
+    # The constructor takes the path of a ledger file written by writeLedgerFile
+    def __init__(self, path: str):
+        self._path: str = path
+        with open(path, "rb") as file:
+            try: self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError: raise LedgerFileError(f"Ledger File Error: {path} is empty")
+        self._views: list[memoryview] = []
+        try:
+            self._readSections()
+        except (LedgerFileError, struct.error, TypeError, ValueError) as e:
+            self.close()
+            if isinstance(e, LedgerFileError):
+                raise
+            raise LedgerFileError(f"Ledger File Error: {path} is damaged: {e}")
+
+    # Reads the header and maps every section of the file
+    def _readSections(self) -> None:
+        magic, version, bigEndian, count = _HEADER.unpack_from(self._map)
+        if magic != LEDGER_FILE_MAGIC:
+            raise LedgerFileError(f"Ledger File Error: {self._path} is not a ledger file")
+        if version != LEDGER_FILE_VERSION:
+            raise LedgerFileError(f"Ledger File Error: Unsupported ledger file version {version}")
+        if bool(bigEndian) != (sys.byteorder == "big"):
+            raise LedgerFileError("Ledger File Error: Ledger file was written with a different byte order")
+        self._count: int = count
+        sections = {}
+        for number, (name, typeCode) in enumerate(_SECTIONS):
+            offset, length = _SECTION.unpack_from(self._map, _HEADER.size + number * _SECTION.size)
+            if offset + length > len(self._map):
+                raise LedgerFileError(f"Ledger File Error: {self._path} is truncated")
+            view = memoryview(self._map)[offset:offset + length]
+            self._views.append(view)
+            if typeCode != "B":
+                view = view.cast(typeCode)
+                self._views.append(view)
+            sections[name] = view
+        # The interned strings are few (types, methods, users, accounts), so they are decoded up front
+        heap, offsets = sections["stringHeap"], sections["stringOffsets"]
+        self._strings: list[str] = [None] + [str(heap[offsets[i]:offsets[i + 1]], "utf-8") for i in range(len(offsets) - 1)]
+        self._stringCodes: dict[str, int] = {value: code for code, value in enumerate(self._strings) if code}
+        self._timeStamps = sections["timeStamps"]
+        self._amounts = sections["amounts"]
+        self._fees = sections["fees"]
+        self._typeCodes = sections["typeCodes"]
+        self._methodCodes = sections["methodCodes"]
+        self._userCodes = sections["userCodes"]
+        self._accountCodes = sections["accountCodes"]
+        self._originCodes = sections["originCodes"]
+        self._descriptionCodes = sections["descriptionCodes"]
+        self._transactionIDs = _HeapColumn(sections["idHeap"], sections["idOffsets"])
+        self._transferDetails = _TransferColumn(self._strings, sections["destinationAccountCodes"],
+                                                sections["destinationRoutingCodes"], sections["destinationBankCodes"])
+        self._accountPositions = sections["accountPositions"]
+        directory = sections["accountDirectory"]
+        self._accountIndex: dict[str, tuple[int, int]] = {
+            self._strings[directory[i]]: (directory[i + 1], directory[i + 2]) for i in range(0, len(directory), 3)}
+
+    # Getter for the path of the ledger file
+    @property
+    def path(self) -> str:
+        return self._path
+
+    # Getter for the IDs of the accounts with records in the file
+    @property
+    def accountIDs(self) -> list[str]:
+        return list(self._accountIndex)
+
+    def append(self, transaction) -> None:
+        raise LedgerFileError("Ledger File Error: Mapped ledgers are read-only")
+
+    def extend(self, transactions) -> None:
+        raise LedgerFileError("Ledger File Error: Mapped ledgers are read-only")
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __repr__(self) -> str:
+        return f"MappedLedger({self._path!r}, {len(self)} records)"
+
+    # Returns the number of records, optionally only counting records of the passed transaction type
+    def count(self, transactionType: str = None) -> int:
+        if transactionType is None:
+            return len(self)
+        return countOf(self._typeCodes, self._codeOf(transactionType))
+
+    # Returns the positions of the records of the passed account, in time order, read in place from the file
+    def accountPositions(self, accountID: str) -> memoryview:
+        start, count = self._accountIndex.get(accountID, (0, 0))
+        return self._accountPositions[start:start + count]
+
+    # Returns views of the records of the passed account made between start and end (inclusive, either can be None
+    # for an open range)- the window is found by binary search over the account's positions
+    def accountTransactions(self, accountID: str, start: datetime = None, end: datetime = None) -> list[TransactionView]:
+        positions = self.accountPositions(accountID)
+        window = self.indexRange(start, end)
+        low = bisect_left(positions, window.start)
+        high = bisect_left(positions, window.stop)
+        return [TransactionView(self, position) for position in positions[low:high]]
+
+    # Unmaps the file- views handed out by the ledger cannot be read after it is closed
+    def close(self) -> None:
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        self._map.close()
+
+    def __enter__(self) -> "MappedLedger":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+# A read-only sequence of the strings in a heap, decoded when they are read
+class _HeapColumn:
+    __slots__ = ("_heap", "_offsets")
+
+    def __init__(self, heap: memoryview, offsets: memoryview):
+        self._heap = heap
+        self._offsets = offsets
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index: int) -> str:
+        return str(self._heap[self._offsets[index]:self._offsets[index + 1]], "utf-8")
+
+
+# A read-only stand in for the transfer details table of a ColumnarLedger, built from the destination code columns
+class _TransferColumn:
+    __slots__ = ("_strings", "_accounts", "_routingNumbers", "_banks")
+
+    def __init__(self, strings: list[str], accounts: memoryview, routingNumbers: memoryview, banks: memoryview):
+        self._strings = strings
+        self._accounts = accounts
+        self._routingNumbers = routingNumbers
+        self._banks = banks
+
+    # Returns the transfer details of the record at the passed index, or None if it is not a transfer
+    def get(self, index: int) -> dict[str, str]:
+        if not self._accounts[index]:
+            return None
+        details = {"destinationAccountID": self._strings[self._accounts[index]]}
+        if self._routingNumbers[index]:
+            details["destinationRoutingNumber"] = self._strings[self._routingNumbers[index]]
+            details["destinationBank"] = self._strings[self._banks[index]]
+        return details
+
+
+# Returns the passed strings encoded into one heap, and the offsets each string starts at (with the end of the heap last)
+def _buildHeap(strings) -> tuple[array, array]:
+    encoded = [value.encode() for value in strings]
+    offsets = array("Q", [0])
+    position = 0
+    for value in encoded:
+        position += len(value)
+        offsets.append(position)
+    return array("B", b"".join(encoded)), offsets
+
+# Rounds the passed offset up to the next section boundary
+def _align(offset: int) -> int:
+    return -(-offset // _ALIGNMENT) * _ALIGNMENT
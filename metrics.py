@@ -0,0 +1,254 @@
+# Jack Timmons, 27 Dec 2024, Winter Break
+# The purpose of this program is to provide users with a simulated bank managment interface, gaining
+# expierence with OOP, full-stack development, and my first expierence creating both a local GUI and
+# web-based application
+
+# The purpose of this file is to contain the instrumentation of the program's hot paths- timers with percentile
+# histograms and error counters on postings, transaction ID generation, password hashing, and email validation,
+# which can be switched on and off at runtime and exported in the Prometheus text format or as JSON
+
+import functools
+import json
+import threading
+import time
+from bisect import bisect_left
+from accounts import Account, Transaction
+from user import Customer, User
+from utilities import PasswordService
+
+# Upper bounds (in nanoseconds) of the histogram buckets- doubling from 250 nanoseconds to about 34 seconds, with a
+# final bucket for anything slower
+BUCKET_BOUNDS: list[int] = [250 * 2 ** i for i in range(28)]
+# Percentiles included in snapshots
+SNAPSHOT_PERCENTILES: list[float] = [0.5, 0.9, 0.99]
+# Prefix of every exported metric name
+METRIC_PREFIX: str = "bank"
+
+
+# A histogram of durations with fixed exponential buckets, from which percentiles are estimated- observations are
+# only counted, so a histogram uses the same memory however many durations it records
+class Histogram:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buckets: list[int] = [0] * (len(BUCKET_BOUNDS) + 1)
+        self._count: int = 0
+        self._sum: int = 0
+        self._max: int = 0
+
+    # Records a duration, in nanoseconds
+    def observe(self, nanoseconds: int) -> None:
+        index = bisect_left(BUCKET_BOUNDS, nanoseconds)
+        with self._lock:
+            self._buckets[index] += 1
+            self._count += 1
+            self._sum += nanoseconds
+            if nanoseconds > self._max:
+                self._max = nanoseconds
+
+    # Removes every recorded duration
+    def reset(self) -> None:
+        with self._lock:
+            self._buckets = [0] * (len(BUCKET_BOUNDS) + 1)
+            self._count = self._sum = self._max = 0
+
+    # Getter for the number of recorded durations
+    @property
+    def count(self) -> int:
+        return self._count
+
+    # Getter for the total of the recorded durations, in seconds
+    @property
+    def sum(self) -> float:
+        return self._sum / 1e9
+
+    # Getter for the longest recorded duration, in seconds
+    @property
+    def max(self) -> float:
+        return self._max / 1e9
+
+    # Returns the estimated duration (in seconds) that the passed fraction of recorded durations are at most,
+    # interpolating within the bucket it falls in- None if nothing has been recorded
+    def percentile(self, fraction: float) -> float | None:
+        if not 0 <= fraction <= 1:
+            raise ValueError("Percentile must be a fraction between 0 and 1")
+        with self._lock:
+            buckets, count, longest = list(self._buckets), self._count, self._max
+        if count == 0:
+            return None
+        rank = fraction * count
+        seen = 0
+        for index, bucketCount in enumerate(buckets):
+            if bucketCount and seen + bucketCount >= rank:
+                lower = BUCKET_BOUNDS[index - 1] if index > 0 else 0
+                upper = min(BUCKET_BOUNDS[index] if index < len(BUCKET_BOUNDS) else longest, longest)
+                return (lower + (upper - lower) * max(rank - seen, 0) / bucketCount) / 1e9
+            seen += bucketCount
+        return longest / 1e9
+
+    # Returns the cumulative count of recorded durations at or below each bucket bound (in seconds), ending with
+    # the total count for the unbounded bucket
+    def cumulativeBuckets(self) -> list[tuple[float, int]]:
+        with self._lock:
+            buckets = list(self._buckets)
+        cumulative, total = [], 0
+        for bound, bucketCount in zip(BUCKET_BOUNDS + [float("inf")], buckets):
+            total += bucketCount
+            cumulative.append((bound / 1e9, total))
+        return cumulative
+
+
+# The metrics registry holds a duration histogram for each instrumented operation and a count of the errors raised
+# by each operation, by error type (for the posting operations, these are the rejected postings)
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms: dict[str, Histogram] = {}
+        self._errors: dict[tuple[str, str], int] = {}
+
+    # Returns the histogram of the passed operation, creating it if needed
+    def histogram(self, operation: str) -> Histogram:
+        histogram = self._histograms.get(operation)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(operation, Histogram())
+        return histogram
+
+    # Counts an error of the passed type raised by the passed operation
+    def countError(self, operation: str, errorType: str) -> None:
+        with self._lock:
+            key = (operation, errorType)
+            self._errors[key] = self._errors.get(key, 0) + 1
+
+    # Returns the number of errors of the passed type raised by the passed operation, or of every type if none is passed
+    def errorCount(self, operation: str, errorType: str = None) -> int:
+        with self._lock:
+            return sum(count for (name, error), count in self._errors.items()
+                       if name == operation and errorType in (None, error))
+
+    # Removes every recorded duration and error- histograms are emptied rather than removed, as the instrumented
+    # operations keep recording to them
+    def reset(self) -> None:
+        with self._lock:
+            for histogram in self._histograms.values():
+                histogram.reset()
+            self._errors.clear()
+
+    # Returns a snapshot of every metric- for each operation, the number of calls, the total and longest duration,
+    # the estimated percentiles (in seconds), and the errors raised by type
+    def snapshot(self) -> dict:
+        with self._lock:
+            histograms = dict(self._histograms)
+            errors = dict(self._errors)
+        operations = {}
+        for operation, histogram in sorted(histograms.items()):
+            operations[operation] = {"count": histogram.count, "sum": histogram.sum, "max": histogram.max,
+                                     **{f"p{round(fraction * 100)}": histogram.percentile(fraction)
+                                        for fraction in SNAPSHOT_PERCENTILES},
+                                     "errors": {}}
+        for (operation, errorType), count in sorted(errors.items()):
+            operations.setdefault(operation, {"count": 0, "errors": {}})["errors"][errorType] = count
+        return {"enabled": metricsEnabled(), "operations": operations}
+
+    # Returns every metric in the Prometheus text exposition format
+    def toPrometheus(self) -> str:
+        with self._lock:
+            histograms = dict(self._histograms)
+            errors = dict(self._errors)
+        name = f"{METRIC_PREFIX}_operation_duration_seconds"
+        lines = [f"# HELP {name} Duration of instrumented operations", f"# TYPE {name} histogram"]
+        for operation, histogram in sorted(histograms.items()):
+            for bound, count in histogram.cumulativeBuckets():
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f'{name}_bucket{{operation="{operation}",le="{le}"}} {count}')
+            lines.append(f'{name}_sum{{operation="{operation}"}} {histogram.sum!r}')
+            lines.append(f'{name}_count{{operation="{operation}"}} {histogram.count}')
+        name = f"{METRIC_PREFIX}_operation_errors_total"
+        lines += [f"# HELP {name} Errors raised by instrumented operations, by error type", f"# TYPE {name} counter"]
+        for (operation, errorType), count in sorted(errors.items()):
+            lines.append(f'{name}{{operation="{operation}",error="{errorType}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+    # Returns a snapshot of every metric as a JSON string
+    def toJSON(self) -> str:
+        return json.dumps(self.snapshot(), indent=2)
+
+
+# The registry the instrumented operations record to
+_registry: MetricsRegistry = MetricsRegistry()
+# Instrumentation points- the owning class, the attribute name, and the operation name of each instrumented function
+_points: list[tuple[type, str, str]] = []
+# The original attribute of each instrumentation point, while metrics are enabled
+_originals: dict[tuple[type, str], object] = {}
+_enableLock = threading.Lock()
+
+# Getter for the registry the instrumented operations record to
+def getRegistry() -> MetricsRegistry:
+    return _registry
+
+# Returns whether metrics are being recorded
+def metricsEnabled() -> bool:
+    return bool(_originals)
+
+# Registers the passed function of the passed class (a method, staticmethod, or classmethod defined on the class
+# itself) as an instrumentation point recorded under the passed operation name- it is timed once metrics are enabled
+def instrument(owner: type, attribute: str, operation: str) -> None:
+    if attribute not in vars(owner):
+        raise ValueError(f"{owner.__name__} does not define {attribute}")
+    with _enableLock:
+        _points.append((owner, attribute, operation))
+        if _originals:
+            _wrap(owner, attribute, operation)
+
+# Starts recording metrics- each instrumentation point is replaced with a timed version of itself
+def enableMetrics() -> None:
+    with _enableLock:
+        for owner, attribute, operation in _points:
+            if (owner, attribute) not in _originals:
+                _wrap(owner, attribute, operation)
+
+# Stops recording metrics- the original functions are put back, so instrumentation costs nothing while disabled
+def disableMetrics() -> None:
+    with _enableLock:
+        for (owner, attribute), original in _originals.items():
+            setattr(owner, attribute, original)
+        _originals.clear()
+
+# Replaces an instrumentation point with a timed version of itself
+def _wrap(owner: type, attribute: str, operation: str) -> None:
+    original = vars(owner)[attribute]
+    if isinstance(original, (staticmethod, classmethod)):
+        timed = type(original)(_timed(original.__func__, operation))
+    else:
+        timed = _timed(original, operation)
+    _originals[(owner, attribute)] = original
+    setattr(owner, attribute, timed)
+
+# Returns a version of the passed function that records its duration and the type of any error it raises
+def _timed(function, operation: str):
+    histogram = _registry.histogram(operation)
+    countError = _registry.countError
+    clock = time.perf_counter_ns
+    @functools.wraps(function)
+    def timed(*args, **kwargs):
+        start = clock()
+        try:
+            return function(*args, **kwargs)
+        except Exception as e:
+            countError(operation, type(e).__name__)
+            raise
+        finally:
+            histogram.observe(clock() - start)
+    return timed
+
+
+# The instrumented hot paths- posting and transfers (whose errors are the rejected postings), transaction ID
+# generation, password hashing and checking, and email validation (the normalization shared by user construction and
+# the email setter)
+instrument(Account, "makeDeposit", "makeDeposit")
+instrument(Account, "makeWithdrawal", "makeWithdrawal")
+instrument(Account, "postBatch", "postBatch")
+instrument(Customer, "transfer", "transfer")
+instrument(Transaction, "_generateTransactionID", "generateTransactionID")
+instrument(PasswordService, "hashPassword", "hashPassword")
+instrument(PasswordService, "checkPassword", "checkPassword")
+instrument(User, "_normalizeEmail", "validateEmail")
@@ -0,0 +1,186 @@
+# Jack Timmons, 27 Dec 2024, Winter Break
+# The purpose of this program is to provide users with a simulated bank managment interface, gaining
+# expierence with OOP, full-stack development, and my first expierence creating both a local GUI and
+# web-based application
+
+# The purpose of this file is to contain the Money class, an exact fixed-point type used for account balances
+# and transaction amounts
+
+from decimal import Decimal, InvalidOperation, ROUND_HALF_EVEN
+from math import isfinite
+from errors import *
+
+# Number of minor units (cents) in one major unit (dollar)
+CENTS_PER_UNIT: int = 100
+
+
+# The Money class represents an amount of money as an exact integer number of cents, so sums of any number of
+# amounts never drift the way floating point sums do
+# Money can be built from a float, string, Decimal, int (whole dollars), or another Money- values with fractions
+# of a cent are rounded half to even. For compatibility with code written against float balances, Money compares
+# equal to, and can be added to or compared with, plain numbers, and converts to float with float()- numbers are
+# compared at cent precision, so Money(0.10) equals the float 0.1 and Decimal("0.10")
+class Money:
+    __slots__ = ("_cents",)
+
+    def __init__(self, value=0):
+        self._cents: int = toCents(value)
+
+    # Creates a Money from an integer number of cents without any conversion
+    @classmethod
+    def fromCents(cls, cents: int) -> "Money":
+        money = object.__new__(cls)
+        money._cents = cents
+        return money
+
+    # Returns the sum of the passed amounts (Money or numbers) as a Money, adding whole cents
+    @staticmethod
+    def sum(values) -> "Money":
+        return Money.fromCents(sum(value._cents if type(value) is Money else toCents(value) for value in values))
+
+    # Getter for the amount in cents
+    @property
+    def cents(self) -> int:
+        return self._cents
+
+    # Returns the amount as an exact Decimal with two decimal places
+    def toDecimal(self) -> Decimal:
+        return Decimal(self._cents).scaleb(-2)
+
+    def __add__(self, other):
+        try: return Money.fromCents(self._cents + _otherCents(other))
+        except (InputError, TypeError): return NotImplemented
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        try: return Money.fromCents(self._cents - _otherCents(other))
+        except (InputError, TypeError): return NotImplemented
+
+    def __rsub__(self, other):
+        try: return Money.fromCents(_otherCents(other) - self._cents)
+        except (InputError, TypeError): return NotImplemented
+
+    # Multiplies the amount by a number (such as a rate), rounding the result to the nearest cent
+    def __mul__(self, factor):
+        if isinstance(factor, Money) or isinstance(factor, bool):
+            return NotImplemented
+        if isinstance(factor, int):
+            return Money.fromCents(self._cents * factor)
+        if isinstance(factor, (float, Decimal)):
+            return Money.fromCents(_roundDecimal(Decimal(self._cents) * Decimal(factor)))
+        return NotImplemented
+    __rmul__ = __mul__
+
+    # Divides the amount by a number, rounding the result to the nearest cent
+    def __truediv__(self, divisor):
+        if isinstance(divisor, Money) or isinstance(divisor, bool) or not isinstance(divisor, (int, float, Decimal)):
+            return NotImplemented
+        if not divisor:
+            raise ZeroDivisionError("Money cannot be divided by zero")
+        return Money.fromCents(_roundDecimal(Decimal(self._cents) / Decimal(divisor)))
+
+    def __neg__(self):
+        return Money.fromCents(-self._cents)
+
+    def __pos__(self):
+        return self
+
+    def __abs__(self):
+        return Money.fromCents(abs(self._cents))
+
+    def __bool__(self) -> bool:
+        return self._cents != 0
+
+    def __eq__(self, other) -> bool:
+        try: return self._cents == _comparedCents(other)
+        except (InputError, TypeError): return NotImplemented
+
+    def __lt__(self, other) -> bool:
+        try: return self._cents < _comparedCents(other)
+        except (InputError, TypeError): return NotImplemented
+
+    def __le__(self, other) -> bool:
+        try: return self._cents <= _comparedCents(other)
+        except (InputError, TypeError): return NotImplemented
+
+    def __gt__(self, other) -> bool:
+        try: return self._cents > _comparedCents(other)
+        except (InputError, TypeError): return NotImplemented
+
+    def __ge__(self, other) -> bool:
+        try: return self._cents >= _comparedCents(other)
+        except (InputError, TypeError): return NotImplemented
+
+    # Hashes consistently with the int of a whole number of dollars, and otherwise with the float of the same amount
+    # (such as 0.1 for ten cents), so Money and the float amounts it stands in for can be used as the same keys
+    def __hash__(self) -> int:
+        if self._cents % CENTS_PER_UNIT == 0:
+            return hash(self._cents // CENTS_PER_UNIT)
+        return hash(self._cents / CENTS_PER_UNIT)
+
+    def __float__(self) -> float:
+        return self._cents / CENTS_PER_UNIT
+
+    def __round__(self, ndigits: int = None):
+        return round(float(self), ndigits)
+
+    def __reduce__(self):
+        return (Money.fromCents, (self._cents,))
+
+    def __format__(self, spec: str) -> str:
+        return format(self.toDecimal(), spec) if spec else str(self)
+
+    # Returns the amount as a string with two decimal places, such as 1234.50 or -0.05
+    def __str__(self) -> str:
+        sign = "-" if self._cents < 0 else ""
+        dollars, cents = divmod(abs(self._cents), CENTS_PER_UNIT)
+        return f"{sign}{dollars}.{cents:02d}"
+
+    def __repr__(self) -> str:
+        return f"Money('{self}')"
+
+
+# Rounds a Decimal number of cents to a whole number of cents, half to even
+def _roundDecimal(cents: Decimal) -> int:
+    return int(cents.quantize(Decimal(1), rounding=ROUND_HALF_EVEN))
+
+# Returns the number of cents in the other operand of an arithmetic or comparison operation
+def _otherCents(other) -> int:
+    if type(other) is Money:
+        return other._cents
+    if isinstance(other, str):
+        raise TypeError("Strings must be converted to Money explicitly")
+    return toCents(other)
+
+# Returns the number of cents in the other operand of a comparison, rounded to the cent as in toCents- infinities
+# and NaNs are returned as floats, so they compare as they would with a float balance
+def _comparedCents(other):
+    if (type(other) is float and not isfinite(other)) or (type(other) is Decimal and not other.is_finite()):
+        return float(other)
+    return _otherCents(other)
+
+# Converts the passed value (Money, float, string, Decimal, or int number of dollars) into an integer number of
+# cents- raises an InputError if the value is not a finite amount
+def toCents(value) -> int:
+    if type(value) is Money:
+        return value._cents
+    if type(value) is float:
+        # Fast path for amounts that are already a whole number of cents (almost every amount)
+        cents = value * CENTS_PER_UNIT
+        try: rounded = round(cents)
+        except (ValueError, OverflowError): raise InputError("Money amount must be finite")
+        if -1e-6 < cents - rounded < 1e-6:
+            return rounded
+        value = Decimal(repr(value))
+    elif isinstance(value, bool):
+        raise InputError("Money amount cannot be a boolean")
+    elif isinstance(value, int):
+        return value * CENTS_PER_UNIT
+    elif isinstance(value, str):
+        try: value = Decimal(value.strip())
+        except InvalidOperation: raise InputError(f"Invalid money amount: {value!r}")
+    elif not isinstance(value, Decimal):
+        raise InputError("Money amount must be a number, string, Decimal, or Money")
+    if not value.is_finite():
+        raise InputError("Money amount must be finite")
+    return _roundDecimal(value * CENTS_PER_UNIT)
@@ -0,0 +1,90 @@
+# Jack Timmons, 27 Dec 2024, Winter Break
+# The purpose of this program is to provide users with a simulated bank managment interface, gaining
+# expierence with OOP, full-stack development, and my first expierence creating both a local GUI and
+# web-based application
+
+# The purpose of this file is to contain the bulk onboarding interface, which creates many customers at once by
+# spreading the validation and password hashing of each customer across a pool of processes
+
+import os
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from itertools import islice
+from typing import Iterable, Iterator, NamedTuple
+from user import Customer
+
+# Fields of a customer record, in the order they are passed to the Customer constructor
+CUSTOMER_FIELDS: list[str] = ["userID", "rawPassword", "firstName", "lastName", "DOB", "email"]
+
+
+# The result of onboarding one customer record- the position of the record in the input, and either the created
+# customer or the error that stopped it from being created
+class OnboardingResult(NamedTuple):
+    index: int
+    customer: Customer | None
+    error: Exception | None
+
+    # Returns whether the customer was created
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+# The onboardCustomers function creates a customer from each of the passed records (dictionaries with the keys in
+# CUSTOMER_FIELDS), yielding an OnboardingResult for every record in input order as soon as it is ready
+# Records are sent to the worker processes in chunks of chunkSize, where the customer is validated and its password
+# hashed, and only a few chunks per worker are in flight at once, so records are read and results returned as a stream
+# An invalid record does not stop the others- its result holds the error instead of a customer
+# By default a process pool with one worker per core is used- another executor can be passed in its place
+# The arguments are checked when the function is called, before any record is read
+def onboardCustomers(records: Iterable[dict], workers: int = None, chunkSize: int = 16,
+                     executor: Executor = None) -> Iterator[OnboardingResult]:
+    if isinstance(chunkSize, bool) or not isinstance(chunkSize, int) or chunkSize <= 0:
+        raise ValueError("Chunk size must be a positive integer")
+    if workers is not None and (isinstance(workers, bool) or not isinstance(workers, int) or workers <= 0):
+        raise ValueError("Workers must be a positive integer")
+    workers = workers if workers is not None else os.cpu_count() or 1
+    return _onboard(iter(records), workers, chunkSize, executor)
+
+# Yields the results of onboarding the passed records (see onboardCustomers)
+def _onboard(records: Iterator[dict], workers: int, chunkSize: int, executor: Executor) -> Iterator[OnboardingResult]:
+    ownExecutor = executor is None
+    if ownExecutor:
+        executor = ProcessPoolExecutor(max_workers=workers)
+    inFlight: deque = deque()
+    index = 0
+    try:
+        while True:
+            # Keep two chunks per worker in flight, so workers never wait for the caller
+            while len(inFlight) < 2 * workers:
+                chunk = list(islice(records, chunkSize))
+                if not chunk:
+                    break
+                inFlight.append((index, executor.submit(_onboardChunk, chunk)))
+                index += len(chunk)
+            if not inFlight:
+                return
+            start, future = inFlight.popleft()
+            for offset, (customer, error) in enumerate(future.result()):
+                yield OnboardingResult(start + offset, customer, error)
+    finally:
+        for _, future in inFlight:
+            future.cancel()
+        if ownExecutor:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+# Creates a customer from each record in the chunk, returning the customer or the error for each record- runs in a
+# worker process
+def _onboardChunk(records: list[dict]) -> list[tuple[Customer | None, Exception | None]]:
+    results = []
+    for record in records:
+        try:
+            if not isinstance(record, dict):
+                raise TypeError("Customer record must be a dictionary")
+            missing = [field for field in CUSTOMER_FIELDS if field not in record]
+            if missing:
+                raise ValueError(f"Customer record is missing {', '.join(missing)}")
+            results.append((Customer(*(record[field] for field in CUSTOMER_FIELDS)), None))
+        except (ValueError, TypeError) as e:
+            results.append((None, e))
+    return results
@@ -0,0 +1,268 @@
+# Jack Timmons, 27 Dec 2024, Winter Break
+# The purpose of this program is to provide users with a simulated bank managment interface, gaining
+# expierence with OOP, full-stack development, and my first expierence creating both a local GUI and
+# web-based application
+
+# The purpose of this file is to contain the SQLite repository used to save and load users, customers, accounts,
+# and transactions, and the connection pool it uses
+
+import json
+import queue
+import sqlite3
+from contextlib import contextmanager
+from datetime import date
+from accounts import Account, Transaction, restoreAccount, restoreTransaction
+from errors import *
+from ledger import ColumnarLedger
+from user import User, Customer
+from utilities import *
+
+# Schema of the repository- amounts are stored as whole cents and time stamps as epoch microseconds, and each
+# account's transactions are numbered by their position in the account's history. Each account is stored with its kind,
+# its tier, and the state of its kind (see Account._savedState) as JSON
+SCHEMA: str = """
+CREATE TABLE IF NOT EXISTS users (
+    userID TEXT PRIMARY KEY,
+    hashedPassword TEXT NOT NULL,
+    firstName TEXT NOT NULL,
+    lastName TEXT NOT NULL,
+    DOB TEXT NOT NULL,
+    email TEXT NOT NULL,
+    role TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS accounts (
+    accountID TEXT PRIMARY KEY,
+    userID TEXT NOT NULL,
+    openingBalance INTEGER NOT NULL,
+    balance INTEGER NOT NULL,
+    dateCreated TEXT NOT NULL,
+    status TEXT NOT NULL,
+    transactionCount INTEGER NOT NULL DEFAULT 0,
+    kind TEXT NOT NULL DEFAULT 'Account',
+    state TEXT NOT NULL DEFAULT '{}',
+    tier TEXT NOT NULL DEFAULT 'Standard'
+);
+CREATE TABLE IF NOT EXISTS transactions (
+    transactionID TEXT PRIMARY KEY,
+    accountID TEXT NOT NULL REFERENCES accounts (accountID),
+    position INTEGER NOT NULL,
+    userID TEXT NOT NULL,
+    transactionType TEXT NOT NULL,
+    method TEXT,
+    timeStamp INTEGER NOT NULL,
+    amount INTEGER NOT NULL,
+    fee INTEGER NOT NULL,
+    origin TEXT,
+    description TEXT,
+    destinationAccountID TEXT,
+    destinationRoutingNumber TEXT,
+    destinationBank TEXT,
+    UNIQUE (accountID, position)
+);
+CREATE INDEX IF NOT EXISTS accountsByUser ON accounts (userID);
+CREATE INDEX IF NOT EXISTS transactionsByUser ON transactions (userID);
+CREATE INDEX IF NOT EXISTS transactionsByAccountTime ON transactions (accountID, timeStamp);
+CREATE INDEX IF NOT EXISTS transactionsByTime ON transactions (timeStamp);
+"""
+
+_TRANSACTION_COLUMNS: str = ("transactionID, accountID, position, userID, transactionType, method, timeStamp, amount, fee, "
+                             "origin, description, destinationAccountID, destinationRoutingNumber, destinationBank")
+# Columns added to the accounts table after it was first made, and their definitions- they are added to the accounts
+# table of a database made before them when it is opened
+_ADDED_ACCOUNT_COLUMNS: dict[str, str] = {"kind": "TEXT NOT NULL DEFAULT 'Account'", "state": "TEXT NOT NULL DEFAULT '{}'",
+                                           "tier": "TEXT NOT NULL DEFAULT 'Standard'"}
+_SELECT_ACCOUNTS: str = "SELECT accountID, userID, openingBalance, balance, dateCreated, status, kind, state, tier FROM accounts"
+_SELECT_TRANSACTIONS: str = f"SELECT {_TRANSACTION_COLUMNS} FROM transactions"
+_INSERT_TRANSACTION: str = f"INSERT INTO transactions ({_TRANSACTION_COLUMNS}) VALUES ({', '.join('?' * 14)})"
+
+
+# The connection pool keeps a fixed number of SQLite connections to one database file that threads borrow and return
+# Every connection uses write-ahead journaling, so readers are never blocked by a writer
+class ConnectionPool:
+    # The constructor takes the path of the database file and the number of connections to keep
+    def __init__(self, path: str, size: int = 4):
+        if isinstance(size, bool) or not isinstance(size, int) or size <= 0:
+            raise RepositoryError("Repository Error: Pool size must be a positive integer")
+        self._path: str = path
+        self._size: int = size
+        self._connections: queue.LifoQueue = queue.LifoQueue()
+        for _ in range(size):
+            self._connections.put(self._connect())
+
+    # Getter for the number of connections in the pool
+    @property
+    def size(self) -> int:
+        return self._size
+
+    # Opens a new connection to the database
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self._path, timeout=30, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.execute("PRAGMA foreign_keys=ON")
+        return connection
+
+    # Borrows a connection for the duration of a with block, waiting for one to be returned if all are in use
+    @contextmanager
+    def connection(self):
+        connection = self._connections.get()
+        try:
+            yield connection
+        finally:
+            self._connections.put(connection)
+
+    # Closes every connection in the pool
+    def close(self) -> None:
+        for _ in range(self._size):
+            self._connections.get().close()
+
+
+# The repository saves and loads users, customers, accounts, and transactions in an SQLite database
+# Accounts are loaded with their balance but without their transactions- an account's transactions are read from the
+# database the first time they are needed, so loading a customer does not load the history of every account. Saving an
+# account only writes the transactions posted since it was last saved, with a single executemany
+class Repository:
+    # The constructor takes the path of the database file (created with the schema if needed) and the number of
+    # pooled connections
+    def __init__(self, path: str, poolSize: int = 4):
+        self._pool = ConnectionPool(path, poolSize)
+        with self._pool.connection() as connection:
+            connection.executescript(SCHEMA)
+            columns = {row[1] for row in connection.execute("PRAGMA table_info(accounts)")}
+            with connection:
+                for column, definition in _ADDED_ACCOUNT_COLUMNS.items():
+                    if column not in columns:
+                        connection.execute(f"ALTER TABLE accounts ADD COLUMN {column} {definition}")
+
+    # Getter for the connection pool
+    @property
+    def pool(self) -> ConnectionPool:
+        return self._pool
+
+    # Closes the repository's connections
+    def close(self) -> None:
+        self._pool.close()
+
+    def __enter__(self) -> "Repository":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # Saves the passed user, replacing any saved copy- a customer's accounts are saved as well
+    def saveUser(self, user: User) -> None:
+        with self._pool.connection() as connection, connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO users (userID, hashedPassword, firstName, lastName, DOB, email, role) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (user.userID, user.hashedPassword, user.firstName, user.lastName, user.DOB.isoformat(), user.email, user.role))
+            if isinstance(user, Customer):
+                for account in user.accounts.values():
+                    self._saveAccount(connection, account)
+
+    # Loads the user with the passed user ID, or returns None if there is no such user- customers are loaded with
+    # their accounts, whose transactions are loaded when they are first needed
+    def loadUser(self, userID: str) -> User:
+        with self._pool.connection() as connection:
+            row = connection.execute(
+                "SELECT userID, hashedPassword, firstName, lastName, DOB, email, role FROM users WHERE userID = ?", (userID,)).fetchone()
+            if row is None:
+                return None
+            userID, hashedPassword, firstName, lastName, DOB, email, role = row
+            if role != "customer":
+                return User.restore(userID, hashedPassword, firstName, lastName, date.fromisoformat(DOB), email, role)
+            customer = Customer.restore(userID, hashedPassword, firstName, lastName, date.fromisoformat(DOB), email)
+            rows = connection.execute(f"{_SELECT_ACCOUNTS} WHERE userID = ? ORDER BY accountID", (userID,)).fetchall()
+        for row in rows:
+            customer.addAccount(self._restoreAccount(row))
+        return customer
+
+    # Saves the passed account and the transactions posted to it since it was last saved
+    def saveAccount(self, account: Account) -> None:
+        with self._pool.connection() as connection, connection:
+            self._saveAccount(connection, account)
+
+    # Saves each of the passed accounts in a single database transaction
+    def saveAccounts(self, accounts: list[Account]) -> None:
+        with self._pool.connection() as connection, connection:
+            for account in accounts:
+                self._saveAccount(connection, account)
+
+    # Saves an account on the passed connection- the caller commits. The account's lock is held while it is read, so
+    # its balance, records, and state are saved as of the same posting
+    def _saveAccount(self, connection: sqlite3.Connection, account: Account) -> None:
+        row = connection.execute("SELECT transactionCount FROM accounts WHERE accountID = ?", (account.accountID,)).fetchone()
+        saved = row[0] if row else 0
+        with account.lock:
+            # Transactions that have not been loaded have not changed since they were saved
+            records = account.transactions[saved:] if account.transactionsLoaded else []
+            values = (account.accountID, account.userID, account.openingBalance.cents, account.balance.cents,
+                      account.dateCreated.isoformat(), account.status, saved + len(records), account.kind,
+                      json.dumps(account._savedState()), account.tier)
+        connection.execute(
+            "INSERT INTO accounts (accountID, userID, openingBalance, balance, dateCreated, status, transactionCount, kind, state, tier) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (accountID) DO UPDATE SET balance = excluded.balance, status = excluded.status, "
+            "transactionCount = excluded.transactionCount, state = excluded.state, tier = excluded.tier", values)
+        connection.executemany(_INSERT_TRANSACTION, (_transactionRow(record, saved + offset) for offset, record in enumerate(records)))
+
+    # Loads the account with the passed account ID, or returns None if there is no such account- the account's
+    # transactions are loaded when they are first needed, into a ColumnarLedger if columnar is set
+    def loadAccount(self, accountID: str, columnar: bool = False) -> Account:
+        with self._pool.connection() as connection:
+            row = connection.execute(f"{_SELECT_ACCOUNTS} WHERE accountID = ?", (accountID,)).fetchone()
+        return self._restoreAccount(row, columnar) if row else None
+
+    # Rebuilds an account of its kind from its row, deferring its transactions
+    def _restoreAccount(self, row: tuple, columnar: bool = False) -> Account:
+        accountID, userID, openingBalance, balance, dateCreated, status, kind, state, tier = row
+        account = restoreAccount(kind, accountID, userID, Money.fromCents(openingBalance), date.fromisoformat(dateCreated),
+                                 ColumnarLedger() if columnar else None, json.loads(state), tier)
+        account.status = status
+        account.deferTransactions(lambda: self.loadTransactions(accountID), Money.fromCents(balance))
+        return account
+
+    # Returns the transactions of the passed account in posting order, optionally only those made between start and
+    # end (inclusive), read with the account and time stamp index
+    def loadTransactions(self, accountID: str, start=None, end=None) -> list[Transaction]:
+        query = f"{_SELECT_TRANSACTIONS} WHERE accountID = ?"
+        parameters = [accountID]
+        if start is not None:
+            query += " AND timeStamp >= ?"
+            parameters.append(toEpochMicros(start))
+        if end is not None:
+            query += " AND timeStamp <= ?"
+            parameters.append(toEpochMicros(end))
+        with self._pool.connection() as connection:
+            rows = connection.execute(query + " ORDER BY position", parameters).fetchall()
+        return [_restoreTransactionRow(row) for row in rows]
+
+    # Returns every transaction made by the passed user, in time order
+    def loadUserTransactions(self, userID: str) -> list[Transaction]:
+        with self._pool.connection() as connection:
+            rows = connection.execute(f"{_SELECT_TRANSACTIONS} WHERE userID = ? ORDER BY timeStamp, position", (userID,)).fetchall()
+        return [_restoreTransactionRow(row) for row in rows]
+
+
+# Returns the database row of the passed transaction record, at the passed position in its account's history
+def _transactionRow(record: Transaction, position: int) -> tuple:
+    transactionType = record.transactionType
+    method = destination = routingNumber = bank = None
+    if transactionType == "Deposit":
+        method = record.depositMethod
+    elif transactionType == "Withdrawal":
+        method = record.withdrawalMethod
+    else:
+        destination = record.destinationAccountID
+        if transactionType == "External-Transfer":
+            routingNumber = record.destinationRoutingNumber
+            bank = record.destinationBank
+    return (record.transactionID, record.accountID, position, record.userID, transactionType, method,
+            toEpochMicros(record.timeStamp), record.amount.cents, record.fee.cents, record.origin, record.description,
+            destination, routingNumber, bank)
+
+# Rebuilds a transaction record from its database row
+def _restoreTransactionRow(row: tuple) -> Transaction:
+    (transactionID, accountID, _, userID, transactionType, method, timeStamp, amount, fee, origin, description,
+     destination, routingNumber, bank) = row
+    return restoreTransaction(transactionType, transactionID, fromEpochMicros(timeStamp), userID, accountID, amount, fee,
+                              method, origin, description, destination, routingNumber, bank)
@@ -0,0 +1,264 @@
+# Jack Timmons, 27 Dec 2024, Winter Break
+# The purpose of this program is to provide users with a simulated bank managment interface, gaining
+# expierence with OOP, full-stack development, and my first expierence creating both a local GUI and
+# web-based application
+
+# The purpose of this file is to contain the declarative field rules and schemas that transactions, accounts, and
+# users validate their fields with- each class declares its rules once, and its schema compiles them into a single
+# validator function
+
+from abc import ABC, abstractmethod
+from decimal import Decimal
+from typing import Callable
+from errors import *
+from money import Money, toCents
+
+# Messages for each error code- a code is only turned into a message when a field fails validation
+_MESSAGES: dict[str, str] = {
+    "type": "{label} must be a string",
+    "empty": "{label} cannot be empty",
+    "length": "{label} must be less than {maxLength} characters long",
+    "alnum": "{label} must be alphanumeric",
+    "money": "{label} must be a number or Money amount",
+    "positive": "{label} must be greater than 0",
+    "nonNegative": "{label} must be greater than or equal to 0",
+    "digits": "{label} must be {length} digits",
+    "numeric": "{label} must be numeric",
+}
+
+
+# Raised by a rule's check when its field is not valid, with the rule and the error code- the schema turns it into
+# the rule's error type, or into an error code for validateMany
+class _Invalid(Exception):
+    def __init__(self, rule: "Rule", code: str, message: str = None):
+        self.rule = rule
+        self.code = code
+        self.message = message
+
+
+# Base class for field rules- each rule has a label used in its error messages, and the error type and message
+# prefix of its failures (taken from its schema if not set). Subclasses implement _compile, returning a check
+# function that takes the field's value and returns its validated (and possibly converted) value, raising _Invalid
+# if it is not valid
+class Rule(ABC):
+    def __init__(self, label: str, error: type = None, prefix: str = None):
+        self.label: str = label
+        self.error: type = error
+        self.prefix: str = prefix
+        self.check: Callable = self._compile()
+
+    # Returns the check function of the rule
+    @abstractmethod
+    def _compile(self) -> Callable:
+        pass
+
+    # Returns the error message for the passed error code
+    def message(self, code: str) -> str:
+        return _MESSAGES[code].format(**vars(self))
+
+    # Returns a copy of the rule with the passed error type and prefix, unless the rule has its own
+    def bind(self, error: type, prefix: str) -> "Rule":
+        rule = object.__new__(type(self))
+        rule.__dict__.update(self.__dict__)
+        rule.error = self.error or error
+        rule.prefix = self.prefix or prefix
+        rule.check = rule._compile()
+        return rule
+
+    # Returns the error raised for the passed failure
+    def _failure(self, invalid: _Invalid) -> ValueError:
+        message = invalid.message or self.message(invalid.code)
+        return self.error(f"{self.prefix}: {message}" if self.prefix else message)
+
+    # Validates a single value against the rule, raising the rule's error type if it is not valid
+    def __call__(self, value):
+        try: return self.check(value)
+        except _Invalid as e: raise self._failure(e) from None
+
+
+# A string of at most maxLength characters that must be alphanumeric if alnum is set (the same checks as
+# validateString and validateAlnumString in utilities.py)- if optional is set, an empty value (such as None or "")
+# is allowed and returned as None
+class Text(Rule):
+    def __init__(self, label: str, maxLength: int, optional: bool = False, alnum: bool = False, error: type = None,
+                 prefix: str = None):
+        self.maxLength: int = maxLength
+        self.optional: bool = optional
+        self.alnum: bool = alnum
+        super().__init__(label, error, prefix)
+
+    def _compile(self) -> Callable:
+        rule, maxLength, optional, alnum = self, self.maxLength, self.optional, self.alnum
+        def check(value):
+            if not value and optional:
+                return None
+            if type(value) is not str and not isinstance(value, str):
+                raise _Invalid(rule, "type")
+            if not value:
+                raise _Invalid(rule, "empty")
+            if len(value) > maxLength:
+                raise _Invalid(rule, "length")
+            if alnum and not value.isalnum():
+                raise _Invalid(rule, "alnum")
+            return value
+        return check
+
+
+# One of a fixed set of string values- if a code table is passed (see utilities.py) the value's code is returned in
+# its place, and if any other collection is passed the value itself is returned. Values that are not in the set fail
+# with the passed message, unless text is set, in which case values that are not non-empty strings of at most 50
+# characters fail with the Text messages first
+class Choice(Rule):
+    def __init__(self, label: str, codes: dict[str, int] | list[str], message: str, text: bool = False,
+                 error: type = None, prefix: str = None):
+        self.codes: dict = codes if isinstance(codes, dict) else {value: value for value in codes}
+        self.invalid: str = message
+        self.text: Text = Text(label, 50) if text else None
+        super().__init__(label, error, prefix)
+
+    def _compile(self) -> Callable:
+        rule, codes, text = self, self.codes, self.text
+        get = codes.get
+        def check(value):
+            code = get(value) if type(value) is str else None
+            if code is not None:
+                return code
+            if text is not None:
+                try: text.check(value)
+                except _Invalid as e: raise _Invalid(rule, e.code, text.message(e.code))
+            raise _Invalid(rule, "choice", rule.invalid)
+        return check
+
+
+# An amount of money (a float, int, Decimal, or Money, but not a bool or string), returned as a whole number of
+# cents- minimum is None for any amount, "positive" for amounts greater than 0, or "nonNegative" for amounts of 0 or more
+class Amount(Rule):
+    def __init__(self, label: str, minimum: str = None, error: type = None, prefix: str = None):
+        if minimum not in (None, "positive", "nonNegative"):
+            raise ValueError("Minimum must be None, 'positive', or 'nonNegative'")
+        self.minimum: str = minimum
+        super().__init__(label, error, prefix)
+
+    def _compile(self) -> Callable:
+        rule, minimum = self, self.minimum
+        lowest = {None: None, "positive": 1, "nonNegative": 0}[minimum]
+        def check(value):
+            valueType = type(value)
+            # Fast path for floats that are already a whole number of cents, as in toCents
+            if valueType is float and -1e15 < value < 1e15:
+                cents = round(value * 100)
+                if not -1e-6 < value * 100 - cents < 1e-6:
+                    cents = toCents(value)
+            elif valueType is Money:
+                cents = value._cents
+            elif valueType is float or valueType is int or valueType is Decimal or (
+                    not isinstance(value, bool) and isinstance(value, (float, int, Decimal))):
+                try: cents = toCents(value)
+                except InputError as e: raise _Invalid(rule, "money", str(e))
+            else:
+                raise _Invalid(rule, "money")
+            if lowest is not None and cents < lowest:
+                raise _Invalid(rule, minimum)
+            return cents
+        return check
+
+
+# A string of exactly length digits (such as a routing number)
+class Digits(Rule):
+    def __init__(self, label: str, length: int, error: type = None, prefix: str = None):
+        self.length: int = length
+        super().__init__(label, error, prefix)
+
+    def _compile(self) -> Callable:
+        rule, length = self, self.length
+        def check(value):
+            if not isinstance(value, str):
+                raise _Invalid(rule, "type")
+            if len(value) != length:
+                raise _Invalid(rule, "digits")
+            if not value.isnumeric():
+                raise _Invalid(rule, "numeric")
+            return value
+        return check
+
+
+# Returns the passed positional and named values of a compiled validator in the order of its fields, raising
+# TypeError as a function call would if a field is missing, passed twice, or not one of the validator's fields
+def _bindFields(fields: tuple[str, ...], values: tuple, named: dict) -> list:
+    if len(values) > len(fields):
+        raise TypeError(f"validate() takes {len(fields)} positional arguments but {len(values)} were given")
+    bound = list(values)
+    for name in fields[len(values):]:
+        if name not in named:
+            raise TypeError(f"validate() missing required argument: {name!r}")
+        bound.append(named.pop(name))
+    if named:
+        name = next(iter(named))
+        if name in fields:
+            raise TypeError(f"validate() got multiple values for argument {name!r}")
+        raise TypeError(f"validate() got an unexpected keyword argument {name!r}")
+    return bound
+
+
+# A schema is an ordered set of named field rules with a default error type and message prefix. compile returns a
+# validator that takes the fields' values in order and returns their validated values as a tuple, raising the error
+# type of the first field that fails. validateMany checks many rows at once without raising, returning the error
+# codes of each row
+class Schema:
+    # The constructor takes the error type and message prefix used by rules without their own, and the rules by field name
+    def __init__(self, error: type, prefix: str, **rules: Rule):
+        self._error: type = error
+        self._prefix: str = prefix
+        self._rules: dict[str, Rule] = {name: rule.bind(error, prefix) for name, rule in rules.items()}
+
+    # Getter for the rules by field name
+    @property
+    def rules(self) -> dict[str, Rule]:
+        return dict(self._rules)
+
+    # Returns the rule of the passed field
+    def __getitem__(self, name: str) -> Rule:
+        return self._rules[name]
+
+    # Returns a new schema with the rules of this schema followed by the passed rules- rules without their own error
+    # type use those passed here
+    def extend(self, error: type, prefix: str, **rules: Rule) -> "Schema":
+        schema = Schema(error, prefix, **rules)
+        schema._rules = {**self._rules, **schema._rules}
+        return schema
+
+    # Returns the validator of the schema, or of only the passed fields (in the passed order)- the validator is a
+    # closure over the fields' check functions, and takes the fields' values in order or by field name
+    def compile(self, *fields: str) -> Callable:
+        fields = fields or tuple(self._rules)
+        checks = tuple(self._rules[name].check for name in fields)
+        count = len(checks)
+        def validate(*values, **named):
+            if named or len(values) != count:
+                values = _bindFields(fields, values, named)
+            try: return tuple([check(value) for check, value in zip(checks, values)])
+            except _Invalid as e: raise e.rule._failure(e) from None
+        return validate
+
+    # Validates each of the passed rows (dictionaries of field values by name) without raising, returning a tuple of
+    # error codes for each row- empty if the row is valid. Codes are "field:code", such as "amount:positive", with
+    # "field:missing" for missing fields, or the single code "row:type" if the row is not a dictionary
+    def validateMany(self, rows) -> list[tuple[str, ...]]:
+        fields = [(name, f"{name}:missing", rule.check) for name, rule in self._rules.items()]
+        missing = object()
+        results = []
+        for row in rows:
+            if not isinstance(row, dict):
+                results.append(("row:type",))
+                continue
+            errors = ()
+            get = row.get
+            for name, missingCode, check in fields:
+                value = get(name, missing)
+                if value is missing:
+                    errors += (missingCode,)
+                    continue
+                try: check(value)
+                except _Invalid as e: errors += (f"{name}:{e.code}",)
+            results.append(errors)
+        return results
@@ -0,0 +1,279 @@
+# Jack Timmons, 27 Dec 2024, Winter Break
+# The purpose of this program is to provide users with a simulated bank managment interface, gaining
+# expierence with OOP, full-stack development, and my first expierence creating both a local GUI and
+# web-based application
+
+# The purpose of this file is to contain the outbound settlement pipeline- external transfers are queued by cut-off
+# window and destination routing number, and each window is streamed into a fixed width (NACHA style) batch file with
+# the batch and file totals and entry hashes that receiving banks check
+
+import os
+import threading
+from datetime import datetime, date, time, timedelta
+from typing import Iterable, Iterator, NamedTuple
+from accounts import ExternalTransfer
+from errors import *
+
+# Times of day at which a settlement window closes- transfers made after the last cut-off go in the next day's first
+DEFAULT_CUTOFFS: list[time] = [time(10, 30), time(14, 45), time(16, 45)]
+# Length of every record in a batch file, and the number of records in a block (files are padded to whole blocks)
+RECORD_LENGTH: int = 94
+BLOCKING_FACTOR: int = 10
+# Service class code of batches that only hold credits, and transaction code of a credit to a checking account
+SERVICE_CLASS_CREDITS: str = "220"
+TRANSACTION_CODE_CREDIT: str = "22"
+# Largest amount a single entry can hold- ten digits of cents
+MAX_ENTRY_CENTS: int = 9_999_999_999
+# Longest destination account number an entry can hold
+MAX_DFI_ACCOUNT_LENGTH: int = 17
+# Weights of the routing number check digit, applied to each of the nine digits
+_ROUTING_WEIGHTS: tuple[int, ...] = (3, 7, 1, 3, 7, 1, 3, 7, 1)
+# Record that pads a file to a whole number of blocks
+_PADDING: str = "9" * RECORD_LENGTH
+
+
+# The totals of a written batch file- the entry hash is the sum of the receiving bank identifiers (the first eight
+# digits of each destination routing number) of every entry, keeping the last ten digits
+class FileTotals(NamedTuple):
+    batchCount: int
+    blockCount: int
+    entryCount: int
+    entryHash: int
+    totalDebit: int
+    totalCredit: int
+
+
+# Returns whether the passed routing number is nine digits with a valid check digit
+def validRoutingNumber(routingNumber: str) -> bool:
+    if not isinstance(routingNumber, str) or len(routingNumber) != 9 or not routingNumber.isdigit() \
+            or not routingNumber.isascii():
+        return False
+    return sum(int(digit) * weight for digit, weight in zip(routingNumber, _ROUTING_WEIGHTS)) % 10 == 0
+
+# Returns the settlement window the passed time falls in- the first cut-off at or after it, on the same or the next day
+def settlementWindow(timeStamp: datetime, cutoffs: list[time] = DEFAULT_CUTOFFS) -> datetime:
+    moment = timeStamp.time()
+    for cutoff in cutoffs:
+        if moment <= cutoff:
+            return datetime.combine(timeStamp.date(), cutoff)
+    return datetime.combine(timeStamp.date() + timedelta(days=1), cutoffs[0])
+
+
+# The settlement queue holds external transfers until their settlement window closes, grouped by window and by
+# destination routing number- transfers are checked when they are queued, so everything queued can be written
+# The queue can be shared between threads
+class SettlementQueue:
+    # The constructor takes the cut-off times of the settlement windows (see DEFAULT_CUTOFFS)
+    def __init__(self, cutoffs: list[time] = None):
+        self._cutoffs: list[time] = self._validateCutoffs(DEFAULT_CUTOFFS if cutoffs is None else cutoffs)
+        self._lock = threading.Lock()
+        # Queued transfers, by window and then by destination routing number, in the order they were queued
+        self._pending: dict[datetime, dict[str, list[ExternalTransfer]]] = {}
+        # Transaction IDs of every queued transfer, so a transfer cannot be queued twice
+        self._queued: set[str] = set()
+
+    # Getter for the cut-off times
+    @property
+    def cutoffs(self) -> list[time]:
+        return list(self._cutoffs)
+
+    # Getter for the number of queued transfers
+    @property
+    def pending(self) -> int:
+        return len(self._queued)
+
+    # Validates that the cut-offs are a non-empty list of times, returning them in order
+    def _validateCutoffs(self, cutoffs: list[time]) -> list[time]:
+        if not isinstance(cutoffs, (list, tuple)) or not cutoffs or not all(isinstance(cutoff, time) for cutoff in cutoffs):
+            raise SettlementError("Settlement Error: Cut-offs must be a non-empty list of times")
+        return sorted(set(cutoffs))
+
+    # Queues the passed external transfer in the window its time stamp falls in, returning the window
+    def enqueue(self, record: ExternalTransfer) -> datetime:
+        self._checkTransfer(record)
+        window = settlementWindow(record.timeStamp, self._cutoffs)
+        with self._lock:
+            if record.transactionID in self._queued:
+                raise SettlementError(f"Settlement Error: Transfer {record.transactionID} is already queued")
+            self._queued.add(record.transactionID)
+            self._pending.setdefault(window, {}).setdefault(record.destinationRoutingNumber, []).append(record)
+        return window
+
+    # Queues each of the passed external transfers (see enqueue), returning the number queued
+    def enqueueMany(self, records: Iterable[ExternalTransfer]) -> int:
+        count = 0
+        for record in records:
+            self.enqueue(record)
+            count += 1
+        return count
+
+    # Validates that the passed record is an external transfer a batch file entry can hold
+    def _checkTransfer(self, record: ExternalTransfer) -> None:
+        if not isinstance(record, ExternalTransfer):
+            raise SettlementError("Settlement Error: Only external transfers can be settled")
+        if not validRoutingNumber(record.destinationRoutingNumber):
+            raise SettlementError(f"Settlement Error: Routing number {record.destinationRoutingNumber} has an invalid check digit")
+        if len(record.destinationAccountID) > MAX_DFI_ACCOUNT_LENGTH:
+            raise SettlementError(f"Settlement Error: Destination Account ID must be at most {MAX_DFI_ACCOUNT_LENGTH} characters long")
+        if not 0 < record.amount.cents <= MAX_ENTRY_CENTS:
+            raise SettlementError("Settlement Error: Transfer amount must be greater than 0 and at most 99,999,999.99")
+
+    # Returns the windows with queued transfers, in order
+    def windows(self) -> list[datetime]:
+        with self._lock:
+            return sorted(self._pending)
+
+    # Returns the windows with queued transfers whose cut-off has passed at the passed time (default is now), in order
+    def due(self, now: datetime = None) -> list[datetime]:
+        now = datetime.now() if now is None else now
+        return [window for window in self.windows() if window <= now]
+
+    # Removes the transfers queued in the passed window, returning them as batches- one per destination routing number,
+    # in routing number order, each holding its transfers in the order they were queued
+    def take(self, window: datetime) -> list[tuple[str, list[ExternalTransfer]]]:
+        with self._lock:
+            batches = self._pending.pop(window, {})
+            for records in batches.values():
+                self._queued.difference_update(record.transactionID for record in records)
+        return sorted(batches.items())
+
+    # Puts batches taken from the passed window back in the queue (such as after their file could not be written)
+    def restore(self, window: datetime, batches: list[tuple[str, list[ExternalTransfer]]]) -> None:
+        with self._lock:
+            pending = self._pending.setdefault(window, {})
+            for routingNumber, records in batches:
+                self._queued.update(record.transactionID for record in records)
+                pending[routingNumber] = records + pending.get(routingNumber, [])
+
+    # Writes a batch file for every window whose cut-off has passed at the passed time (default is now) to the passed
+    # directory with the passed writer, returning the path and totals of each file- a window whose file cannot be
+    # written is put back in the queue
+    def exportDue(self, writer: "NachaWriter", directory: str, now: datetime = None) -> list[tuple[str, FileTotals]]:
+        exported = []
+        for window in self.due(now):
+            batches = self.take(window)
+            path = os.path.join(directory, f"settlement-{window:%Y%m%d-%H%M}.ach")
+            try:
+                totals = writer.write(path, batches, window.date())
+            except BaseException:
+                self.restore(window, batches)
+                raise
+            exported.append((path, totals))
+        return exported
+
+
+# The NACHA writer streams batches of external transfers into a fixed width batch file- a file header, then for each
+# batch a batch header, an entry for each transfer, and a batch control record with the batch totals, then a file
+# control record with the file totals, padded to a whole number of blocks
+# Records are produced one at a time by a generator and the totals are kept as running sums, so a batch is never held
+# in memory as a whole- batches and their transfers can be any iterables, such as generators reading from storage
+class NachaWriter:
+    # The constructor takes the routing number and name of the originating bank, the name and identifier of the company
+    # sending the transfers, the routing number and name of the bank the file is sent to (default is the originating
+    # bank), the entry description and standard entry class of the batches, and the file ID modifier
+    def __init__(self, originRoutingNumber: str, originName: str, companyName: str, companyID: str,
+                 destinationRoutingNumber: str = None, destinationName: str = None, entryDescription: str = "TRANSFER",
+                 entryClass: str = "PPD", fileIDModifier: str = "A"):
+        destinationRoutingNumber = originRoutingNumber if destinationRoutingNumber is None else destinationRoutingNumber
+        for routingNumber in (originRoutingNumber, destinationRoutingNumber):
+            if not validRoutingNumber(routingNumber):
+                raise SettlementError(f"Settlement Error: {routingNumber} is not a valid routing number")
+        for value, label, length in [(originName, "Origin Name", 23), (companyName, "Company Name", 16),
+                                     (companyID, "Company ID", 10), (entryDescription, "Entry Description", 10),
+                                     (entryClass, "Entry Class", 3)]:
+            if not isinstance(value, str) or not value or len(value) > length:
+                raise SettlementError(f"Settlement Error: {label} must be a string of 1 to {length} characters")
+        if not isinstance(fileIDModifier, str) or len(fileIDModifier) != 1 or not fileIDModifier.isalnum():
+            raise SettlementError("Settlement Error: File ID Modifier must be a single letter or digit")
+        self._originRoutingNumber: str = originRoutingNumber
+        self._originName: str = originName
+        self._companyName: str = companyName
+        self._companyID: str = companyID
+        self._destinationRoutingNumber: str = destinationRoutingNumber
+        self._destinationName: str = originName if destinationName is None else destinationName
+        self._entryDescription: str = entryDescription
+        self._entryClass: str = entryClass
+        self._fileIDModifier: str = fileIDModifier.upper()
+        self._totals: FileTotals = None
+
+    # Getter for the totals of the last file the writer finished
+    @property
+    def totals(self) -> FileTotals:
+        return self._totals
+
+    # Yields the records of a batch file holding the passed batches (pairs of a destination routing number and its
+    # transfers), settling on the passed effective date- the totals are available once the last record is yielded
+    def records(self, batches: Iterable[tuple[str, Iterable[ExternalTransfer]]], effectiveDate: date,
+                created: datetime = None) -> Iterator[str]:
+        created = datetime.now() if created is None else created
+        originDFI = self._originRoutingNumber[:8]
+        companyID = _alpha(self._companyID, 10)
+        effective = f"{effectiveDate:%y%m%d}"
+        self._totals = None
+        yield (f"101 {self._destinationRoutingNumber} {self._originRoutingNumber}{created:%y%m%d%H%M}"
+               f"{self._fileIDModifier}094101{_alpha(self._destinationName, 23)}{_alpha(self._originName, 23)}{' ' * 8}")
+        recordCount = 2
+        batchCount = entryCount = fileHash = fileCredit = 0
+        for routingNumber, transfers in batches:
+            batchCount += 1
+            batchNumber = _numeric(batchCount, 7)
+            yield (f"5{SERVICE_CLASS_CREDITS}{_alpha(self._companyName, 16)}{' ' * 20}{companyID}"
+                   f"{_alpha(self._entryClass, 3)}{_alpha(self._entryDescription, 10)}{effective}{effective}   1"
+                   f"{originDFI}{batchNumber}")
+            receivingDFI, checkDigit = routingNumber[:8], routingNumber[8]
+            batchEntries = batchCredit = 0
+            for transfer in transfers:
+                if transfer.destinationRoutingNumber != routingNumber:
+                    raise SettlementError(f"Settlement Error: Transfer {transfer.transactionID} is not to routing number {routingNumber}")
+                entryCount += 1
+                batchEntries += 1
+                cents = transfer.amount.cents
+                batchCredit += cents
+                yield (f"6{TRANSACTION_CODE_CREDIT}{receivingDFI}{checkDigit}{_alpha(transfer.destinationAccountID, 17)}"
+                       f"{_numeric(cents, 10)}{_alpha(transfer.accountID, 15)}{_alpha(transfer.userID, 22)}  0"
+                       f"{originDFI}{_numeric(entryCount, 7)}")
+            batchHash = (int(receivingDFI) * batchEntries) % 10 ** 10
+            yield (f"8{SERVICE_CLASS_CREDITS}{_numeric(batchEntries, 6)}{_numeric(batchHash, 10)}{_numeric(0, 12)}"
+                   f"{_numeric(batchCredit, 12)}{companyID}{' ' * 25}{originDFI}{batchNumber}")
+            recordCount += batchEntries + 2
+            fileHash = (fileHash + batchHash) % 10 ** 10
+            fileCredit += batchCredit
+        blockCount = -(-recordCount // BLOCKING_FACTOR)
+        yield (f"9{_numeric(batchCount, 6)}{_numeric(blockCount, 6)}{_numeric(entryCount, 8)}{_numeric(fileHash, 10)}"
+               f"{_numeric(0, 12)}{_numeric(fileCredit, 12)}{' ' * 39}")
+        for _ in range(blockCount * BLOCKING_FACTOR - recordCount):
+            yield _PADDING
+        self._totals = FileTotals(batchCount, blockCount, entryCount, fileHash, 0, fileCredit)
+
+    # Writes a batch file holding the passed batches to the passed path (see records), returning its totals
+    # The file is written beside the path and moved into place, so readers never see a partly written file
+    def write(self, path: str, batches: Iterable[tuple[str, Iterable[ExternalTransfer]]], effectiveDate: date,
+              created: datetime = None) -> FileTotals:
+        temporaryPath = f"{path}.tmp"
+        try:
+            with open(temporaryPath, "w", encoding="ascii", newline="\n") as file:
+                for record in self.records(batches, effectiveDate, created):
+                    file.write(record)
+                    file.write("\n")
+            os.replace(temporaryPath, path)
+        except BaseException:
+            if os.path.exists(temporaryPath):
+                os.remove(temporaryPath)
+            raise
+        return self._totals
+
+
+# Returns the passed value as an upper case, left justified alphanumeric field of the passed width- characters a batch
+# file cannot hold are replaced with spaces, and longer values are cut to the width
+def _alpha(value: str, width: int) -> str:
+    value = value.upper()
+    if not (value.isascii() and value.isprintable()):
+        value = "".join(character if " " <= character <= "~" else " " for character in value)
+    return value[:width].ljust(width)
+
+# Returns the passed whole number as a zero filled numeric field of the passed width
+def _numeric(value: int, width: int) -> str:
+    field = str(value).zfill(width)
+    if len(field) > width:
+        raise SettlementError(f"Settlement Error: {value} does not fit in a field of {width} digits")
+    return field
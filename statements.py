@@ -0,0 +1,100 @@
+# Jack Timmons, 27 Dec 2024, Winter Break
+# The purpose of this program is to provide users with a simulated bank managment interface, gaining
+# expierence with OOP, full-stack development, and my first expierence creating both a local GUI and
+# web-based application
+
+# The purpose of this file is to contain the statement export- an account's transaction records for a date range are
+# streamed a page at a time into CSV or JSON lines files, with the running balance after each record
+
+import csv
+import json
+import os
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Iterator, TextIO
+from accounts import Account, DEFAULT_PAGE_SIZE
+from errors import *
+from money import Money
+
+# Columns of a statement, in order
+STATEMENT_FIELDS: list[str] = ["transactionID", "timeStamp", "transactionType", "method", "amount", "fee", "balance",
+                               "origin", "description", "destinationAccountID"]
+
+
+# The statementRows function yields a row (a dictionary of STATEMENT_FIELDS) for each of the passed account's
+# transaction records made between start and end (inclusive, either can be None for an open range), in time order
+# Amounts are strings with two decimal places, and the balance is the account balance after the record
+# Records are read through Account.iterTransactions, so only one page of them is held at a time
+def statementRows(account: Account, start: datetime = None, end: datetime = None,
+                  pageSize: int = DEFAULT_PAGE_SIZE) -> Iterator[dict]:
+    if not isinstance(account, Account):
+        raise AccountError("Statement Error: Statements can only be made for accounts")
+    if start is not None and end is not None and start > end:
+        raise AccountError("Statement Error: Start must not be after end")
+    pages = account.iterTransactions(None, pageSize, start, end)
+    # Time stamps are stored to the microsecond, so the balance before start is the balance a microsecond earlier
+    balance = account.balanceAt(start - timedelta(microseconds=1)) if start is not None else account.openingBalance
+    return _rows(pages, balance.cents)
+
+# Yields the statement rows of the passed pages of records, starting from the passed balance (in cents)
+def _rows(pages: Iterator, balance: int) -> Iterator[dict]:
+    for page in pages:
+        for record in page.transactions:
+            transactionType = record.transactionType
+            amount = record.amount
+            if transactionType == "Deposit":
+                balance += amount.cents - record.fee.cents
+                method = record.depositMethod
+            else:
+                balance -= amount.cents + record.fee.cents
+                method = record.withdrawalMethod if transactionType == "Withdrawal" else None
+            yield {"transactionID": record.transactionID, "timeStamp": record.timeStamp.isoformat(),
+                   "transactionType": transactionType, "method": method, "amount": str(amount), "fee": str(record.fee),
+                   "balance": str(Money.fromCents(balance)), "origin": record.origin, "description": record.description,
+                   "destinationAccountID": getattr(record, "destinationAccountID", None)}
+
+# Writes a statement of the passed account (see statementRows) to the passed path or open text file as CSV, with a
+# header row- missing values are left empty. Returns the number of records written
+def writeStatementCSV(account: Account, output: str | TextIO, start: datetime = None, end: datetime = None,
+                      pageSize: int = DEFAULT_PAGE_SIZE) -> int:
+    rows = statementRows(account, start, end, pageSize)
+    count = 0
+    with _openOutput(output) as file:
+        writer = csv.DictWriter(file, STATEMENT_FIELDS, lineterminator="\n")
+        writer.writeheader()
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+    return count
+
+# Writes a statement of the passed account (see statementRows) to the passed path or open text file as JSON lines-
+# one JSON object per record, with missing values as null. Returns the number of records written
+def writeStatementJSONLines(account: Account, output: str | TextIO, start: datetime = None, end: datetime = None,
+                            pageSize: int = DEFAULT_PAGE_SIZE) -> int:
+    rows = statementRows(account, start, end, pageSize)
+    encode = json.JSONEncoder(separators=(",", ":")).encode
+    count = 0
+    with _openOutput(output) as file:
+        for row in rows:
+            file.write(encode(row))
+            file.write("\n")
+            count += 1
+    return count
+
+# Opens the passed output for writing- a path is written beside itself and moved into place once complete, so readers
+# never see a partly written statement, and an open file is written to as it is
+@contextmanager
+def _openOutput(output: str | TextIO):
+    if not isinstance(output, str):
+        yield output
+        return
+    temporaryPath = f"{output}.tmp"
+    try:
+        with open(temporaryPath, "w", encoding="utf-8", newline="") as file:
+            yield file
+        os.replace(temporaryPath, output)
+    except BaseException:
+        if os.path.exists(temporaryPath):
+            os.remove(temporaryPath)
+        raise
+
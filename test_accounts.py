@@ -6,15 +6,21 @@
 # The purpose of this file is to contain the test interface for the account, checking, savings, credit,
 # investment, and transaction classes
 
+import pickle
+import sys
+import threading
 import unittest
 import pytest
+from random import Random
 from passlib.hash import bcrypt
-from datetime import datetime, date
+from datetime import datetime, date, timedelta
 from unittest.mock import patch
 from user import *
 from utilities import *
 from accounts import *
 from errors import *
+from identifiers import *
+from ledger import ColumnarLedger
 
 
 # Test Transaction class
@@ -39,7 +45,7 @@ class TestTransaction(unittest.TestCase):
         self.assertEqual(transaction.amount, self.validAmount)
         self.assertEqual(transaction.transactionType, self.validTransactionType)
         self.assertEqual(transaction._timeStamp.date(), date.today())
-        self.assertTrue(bcrypt.verify((self.validUserID + "-" + self.validTransactionType + "-" + transaction._timeStamp.isoformat()).encode(), transaction.transactionID))
+        self.assertEqual(len(transaction.transactionID), SORTABLE_ID_LENGTH)
         self.assertEqual(transaction.description, self.validDescription)
         self.assertEqual(transaction.origin, self.validOrigin)
         self.assertEqual(transaction.fee, self.validFee)
@@ -51,7 +57,7 @@ class TestTransaction(unittest.TestCase):
         self.assertEqual(transaction.amount, self.validAmount)
         self.assertEqual(transaction.transactionType, self.validTransactionType)
         self.assertEqual(transaction._timeStamp.date(), date.today())
-        self.assertTrue(bcrypt.verify((self.validUserID + "-" + self.validTransactionType + "-" + transaction._timeStamp.isoformat()).encode(), transaction.transactionID))
+        self.assertEqual(len(transaction.transactionID), SORTABLE_ID_LENGTH)
         self.assertIsNone(transaction.description)
         self.assertIsNone(transaction.origin)
         self.assertEqual(transaction.fee, 0.00)
@@ -96,7 +102,7 @@ class TestDeposit(TestTransaction):
         self.assertEqual(deposit.origin, self.validOrigin)
         self.assertEqual(deposit.description, self.validDescription)
         self.assertEqual(deposit._timeStamp.date(), date.today())
-        self.assertTrue(bcrypt.verify((self.validUserID + "-" + self.validTransactionType + "-" + deposit._timeStamp.isoformat()).encode(), deposit.transactionID))
+        self.assertEqual(len(deposit.transactionID), SORTABLE_ID_LENGTH)
     # Test constructor with valid values (no fee, origin, or description)
     def test_deposit_constructor_valid_no_fee_origin_description(self):
         deposit = Deposit(self.validUserID, self.validAccountID, self.validAmount, self.validDepositMethod)
@@ -109,7 +115,7 @@ class TestDeposit(TestTransaction):
         self.assertIsNone(deposit.origin)
         self.assertIsNone(deposit.description)
         self.assertEqual(deposit._timeStamp.date(), date.today())
-        self.assertTrue(bcrypt.verify((self.validUserID + "-" + self.validTransactionType + "-" + deposit._timeStamp.isoformat()).encode(), deposit.transactionID))
+        self.assertEqual(len(deposit.transactionID), SORTABLE_ID_LENGTH)
    # Test constructuor with invalid (non-string) deposit method
     def test_deposit_constructor_invalid_deposit_method_non_string(self):
         with self.assertRaises(DepositError, msg = "Invalid deposit method"):
@@ -123,6 +129,20 @@ class TestDeposit(TestTransaction):
         with self.assertRaises(DepositError, msg = "Invalid deposit method"):
             Deposit(self.validUserID, self.validAccountID, self.validAmount, "Invalid")
 
+    # Test that deposits use slots and store their type and method as codes
+    def test_deposit_compact_representation(self):
+        deposit = Deposit(self.validUserID, self.validAccountID, self.validAmount, self.validDepositMethod)
+        self.assertFalse(hasattr(deposit, "__dict__"))
+        self.assertEqual(deposit._transactionTypeCode, TRANSACTION_TYPE_CODES["Deposit"])
+        self.assertEqual(deposit._depositMethodCode, DEPOSIT_METHOD_CODES[self.validDepositMethod])
+    # Test storing time stamps as epoch integers
+    def test_deposit_epoch_time_stamp(self):
+        Transaction.storeEpochTimeStamps = True
+        try: deposit = Deposit(self.validUserID, self.validAccountID, self.validAmount, self.validDepositMethod)
+        finally: Transaction.storeEpochTimeStamps = False
+        self.assertIsInstance(deposit._timeStamp, int)
+        self.assertEqual(deposit.timeStamp.date(), date.today())
+
 # Test Withdrawal class
 class TestWithdrawal(TestTransaction):
     def setUp(self):
@@ -142,7 +162,7 @@ class TestWithdrawal(TestTransaction):
         self.assertEqual(withdrawal.origin, self.validOrigin)
         self.assertEqual(withdrawal.description, self.validDescription)
         self.assertEqual(withdrawal._timeStamp.date(), date.today())
-        self.assertTrue(bcrypt.verify((self.validUserID + "-" + self.validTransactionType + "-" + withdrawal._timeStamp.isoformat()).encode(), withdrawal.transactionID))
+        self.assertEqual(len(withdrawal.transactionID), SORTABLE_ID_LENGTH)
     # Test constructor with valid values (no fee, origin, or description)
     def test_withdrawl_constructor_valid_no_fee_origin_description(self):
         withdrawal = Withdrawal(self.validUserID, self.validAccountID, self.validAmount, self.validWithdrawalMethod)
@@ -155,7 +175,7 @@ class TestWithdrawal(TestTransaction):
         self.assertIsNone(withdrawal.origin)
         self.assertIsNone(withdrawal.description)
         self.assertEqual(withdrawal._timeStamp.date(), date.today())
-        self.assertTrue(bcrypt.verify((self.validUserID + "-" + self.validTransactionType + "-" + withdrawal._timeStamp.isoformat()).encode(), withdrawal.transactionID))
+        self.assertEqual(len(withdrawal.transactionID), SORTABLE_ID_LENGTH)
     # Test constructuor with invalid (non-string) withdrawal method
     def test_withdrawal_constructor_invalid_withdrawal_method_non_string(self):
         with self.assertRaises(WithdrawalError, msg = "Invalid withdrawal method"):
@@ -189,7 +209,7 @@ class TestInternalTransfer(TestTransaction):
         self.assertEqual(transfer.origin, self.validOrigin)
         self.assertEqual(transfer.description, self.validDescription)
         self.assertEqual(transfer._timeStamp.date(), date.today())
-        self.assertTrue(bcrypt.verify((self.validUserID + "-" + self.validTransactionType + "-" + transfer._timeStamp.isoformat()).encode(), transfer.transactionID))
+        self.assertEqual(len(transfer.transactionID), SORTABLE_ID_LENGTH)
     # Test constructor with valid values (no transaction type, fee, origin, or description)
     def test_internal_transfer_constructor_valid_no_fee_origin_description(self):
         transfer = InternalTransfer(self.validUserID, self.validAccountID, self.validDestinationAccountID, self.validAmount)
@@ -202,7 +222,7 @@ class TestInternalTransfer(TestTransaction):
         self.assertIsNone(transfer.origin)
         self.assertIsNone(transfer.description)
         self.assertEqual(transfer._timeStamp.date(), date.today())
-        self.assertTrue(bcrypt.verify((self.validUserID + "-" + self.validTransactionType + "-" + transfer._timeStamp.isoformat()).encode(), transfer.transactionID))
+        self.assertEqual(len(transfer.transactionID), SORTABLE_ID_LENGTH)
     # Test constructor with invalid (non-string) destination account ID
     def test_internal_transfer_constructor_invalid_destination_accountID_non_string(self):
         with self.assertRaises(TransferError, msg = "Transaction Error: Destination Account ID must be a string"):
@@ -219,6 +239,11 @@ class TestInternalTransfer(TestTransaction):
     def test_internal_transfer_constructor_invalid_destination_accountID_same_as_source(self):
         with self.assertRaises(TransferError, msg = "Transaction Error: Destination Account ID cannot be the same as the source account ID"):
             InternalTransfer(self.validUserID, self.validAccountID, self.validAccountID, self.validAmount)
+    # Test __str__ method
+    def test_internal_transfer_str(self):
+        transfer = InternalTransfer(self.validUserID, self.validAccountID, self.validDestinationAccountID, self.validAmount)
+        self.assertTrue(str(transfer).startswith(f"Transaction ID: {transfer.transactionID}"))
+        self.assertTrue(str(transfer).endswith(f"\nDestination Account ID: {self.validDestinationAccountID}"))
 
 
 # Test Account class
@@ -260,3 +285,599 @@ class TestAccount(TestTransaction):
 
 
 
+    # Test makeDeposit and makeWithdrawal:
+    # Test a deposit followed by a withdrawal
+    def test_make_deposit_and_withdrawal(self):
+        account = Account(self.validAccountID, self.validUserID, self.validInitialDeposit)
+        account.makeDeposit(self.validUserID, 250.00, "Cash", origin=self.validOrigin)
+        account.makeWithdrawal(self.validUserID, 100.00, "Cash")
+        self.assertEqual(account.balance, 1150.00)
+        self.assertEqual([t.transactionType for t in account.transactions], ["Deposit", "Withdrawal"])
+        self.assertEqual(account.transactions[0].origin, self.validOrigin)
+    # Test withdrawal exceeding the balance
+    def test_make_withdrawal_overdraft(self):
+        account = Account(self.validAccountID, self.validUserID, self.validInitialDeposit)
+        with self.assertRaises(WithdrawalError, msg = "Withdrawal Error: Withdrawal amount exceeds account balance"):
+            account.makeWithdrawal(self.validUserID, 2000.00, "Cash")
+        self.assertEqual(account.balance, self.validInitialDeposit)
+    # Test deposits and withdrawals of amounts that are not positive
+    def test_make_deposit_and_withdrawal_not_positive(self):
+        account = Account(self.validAccountID, self.validUserID, self.validInitialDeposit)
+        for amount in (-50.00, 0.00):
+            with self.assertRaisesRegex(DepositError, "Deposit Error: Deposit amount must be greater than 0"):
+                account.makeDeposit(self.validUserID, amount, "Cash")
+            with self.assertRaisesRegex(WithdrawalError, "Withdrawal Error: Withdrawal amount must be greater than 0"):
+                account.makeWithdrawal(self.validUserID, amount, "Cash")
+        self.assertEqual(account.balance, self.validInitialDeposit)
+        self.assertEqual(account.transactions, [])
+    # Test that the methods only the bank's own postings use can not be posted directly
+    def test_make_deposit_and_withdrawal_system_method(self):
+        account = Account(self.validAccountID, self.validUserID, self.validInitialDeposit)
+        for method in SYSTEM_METHODS:
+            with self.assertRaisesRegex(DepositError, f"Deposit Error: {method} deposits can only be posted by the bank"):
+                account.makeDeposit(self.validUserID, 10.00, method)
+            with self.assertRaisesRegex(WithdrawalError, f"Withdrawal Error: {method} withdrawals can only be posted by the bank"):
+                account.makeWithdrawal(self.validUserID, 10.00, method)
+            with self.assertRaisesRegex(DepositError, f"Batch Error: Entry 1: Deposit Error: {method} deposits"):
+                account.postBatch([{"transactionType": "Deposit", "userID": self.validUserID, "amount": 10.00, "method": "Cash"},
+                                   {"transactionType": "Deposit", "userID": self.validUserID, "amount": 10.00, "method": method}])
+            with self.assertRaisesRegex(WithdrawalError, f"Batch Error: Entry 0: Withdrawal Error: {method} withdrawals"):
+                account.postBatch([{"transactionType": "Withdrawal", "userID": self.validUserID, "amount": 10.00, "method": method}])
+        self.assertEqual(account.balance, self.validInitialDeposit)
+        self.assertEqual(account.transactions, [])
+    # Test that many small deposits add up exactly
+    def test_make_deposit_exact_balance(self):
+        account = Account(self.validAccountID, self.validUserID, 0.10)
+        for _ in range(9):
+            account.makeDeposit(self.validUserID, 0.10, "Cash")
+        self.assertEqual(account.balance, Money("1.00"))
+        self.assertIsInstance(account.balance, Money)
+    # Test postBatch:
+    # Test a valid batch of deposits and withdrawals
+    def test_post_batch_valid(self):
+        account = Account(self.validAccountID, self.validUserID, self.validInitialDeposit)
+        account.postBatch([{"transactionType": "Deposit", "userID": self.validUserID, "amount": 500.00, "method": "Direct-Deposit"},
+                           {"transactionType": "Withdrawal", "userID": self.validUserID, "amount": 1400.00, "method": "Wire"},
+                           {"transactionType": "Deposit", "userID": self.validUserID, "amount": 25.00, "method": "Cash", "description": self.validDescription}])
+        self.assertEqual(account.balance, 125.00)
+        self.assertEqual(len(account.transactions), 3)
+        self.assertEqual(account.transactions[2].description, self.validDescription)
+        # Entries of a large batch are each given a distinct, increasing time stamp and transaction ID
+        account.postBatch([{"transactionType": "Deposit", "userID": self.validUserID, "amount": 1.00, "method": "Cash"}] * 1000)
+        for field in ("timeStamp", "transactionID"):
+            values = [getattr(record, field) for record in account.transactions]
+            self.assertEqual((len(set(values)), values), (1003, sorted(values)))
+    # Test a batch that overdraws the running balance part way through
+    def test_post_batch_overdraft_rolls_back(self):
+        account = Account(self.validAccountID, self.validUserID, self.validInitialDeposit)
+        with self.assertRaises(WithdrawalError, msg = "Batch Error: Entry 1: Withdrawal Error: Withdrawal amount exceeds account balance"):
+            account.postBatch([{"transactionType": "Withdrawal", "userID": self.validUserID, "amount": 600.00, "method": "Cash"},
+                               {"transactionType": "Withdrawal", "userID": self.validUserID, "amount": 600.00, "method": "Cash"}])
+        self.assertEqual(account.balance, self.validInitialDeposit)
+        self.assertEqual(account.transactions, [])
+    # Test a batch with an invalid entry
+    def test_post_batch_invalid_entry_rolls_back(self):
+        account = Account(self.validAccountID, self.validUserID, self.validInitialDeposit)
+        with self.assertRaises(DepositError, msg = "Batch Error: Entry 1: Deposit Error: Invalid deposit method"):
+            account.postBatch([{"transactionType": "Deposit", "userID": self.validUserID, "amount": 10.00, "method": "Cash"},
+                               {"transactionType": "Deposit", "userID": self.validUserID, "amount": 10.00, "method": "Invalid"}])
+        with self.assertRaises(TransactionError, msg = "Transaction Error: Batch entries must be a Deposit or Withdrawal"):
+            account.postBatch([{"transactionType": "Intra-Transfer", "userID": self.validUserID, "amount": 10.00, "method": "Cash"}])
+        self.assertEqual(account.balance, self.validInitialDeposit)
+        self.assertEqual(account.transactions, [])
+    # Test a batch with an entry whose amount is not positive
+    def test_post_batch_not_positive(self):
+        account = Account(self.validAccountID, self.validUserID, self.validInitialDeposit)
+        with self.assertRaisesRegex(WithdrawalError, "Batch Error: Entry 1: Withdrawal Error: Withdrawal amount must be greater than 0"):
+            account.postBatch([{"transactionType": "Deposit", "userID": self.validUserID, "amount": 10.00, "method": "Cash"},
+                               {"transactionType": "Withdrawal", "userID": self.validUserID, "amount": -50.00, "method": "Cash"}])
+        with self.assertRaisesRegex(DepositError, "Batch Error: Entry 0: Deposit Error: Deposit amount must be greater than 0"):
+            account.postBatch([{"transactionType": "Deposit", "userID": self.validUserID, "amount": 0.00, "method": "Cash"}])
+        self.assertEqual(account.balance, self.validInitialDeposit)
+        self.assertEqual(account.transactions, [])
+    # Test posting a batch to an inactive account
+    def test_post_batch_inactive_account(self):
+        account = Account(self.validAccountID, self.validUserID, self.validInitialDeposit)
+        account.status = "Frozen"
+        with self.assertRaises(AccountError, msg = "Account Error: Account is not active"):
+            account.postBatch([{"transactionType": "Deposit", "userID": self.validUserID, "amount": 10.00, "method": "Cash"}])
+    # Test a batch with a missing field or an entry that is not a dictionary
+    def test_post_batch_malformed_entry(self):
+        account = Account(self.validAccountID, self.validUserID, self.validInitialDeposit)
+        with self.assertRaises(TransactionError, msg = "Batch Error: Entry 0: Entry is missing required field 'method'"):
+            account.postBatch([{"transactionType": "Deposit", "userID": self.validUserID, "amount": 10.00}])
+        with self.assertRaisesRegex(TransactionError, "^Batch Error: Entry 1: Transaction Error: Batch entries must be dictionaries$"):
+            account.postBatch([{"transactionType": "Deposit", "userID": self.validUserID, "amount": 10.00, "method": "Cash"},
+                               ("Deposit", self.validUserID, 10.00, "Cash")])
+        # Other errors raised while reading an entry keep their own type and message
+        class BrokenEntry(dict):
+            def __getitem__(self, key):
+                raise TypeError("Entry could not be read")
+        with self.assertRaisesRegex(TypeError, "^Entry could not be read$"):
+            account.postBatch([BrokenEntry()])
+        self.assertEqual(account.transactions, [])
+    # Test transactionsBetween:
+    # Post a deposit or withdrawal on each of the first ten days of January
+    def postDailyHistory(self, account: Account) -> None:
+        with patch("accounts.datetime") as mockDateTime:
+            mockDateTime.now.side_effect = [datetime(2024, 1, day, 12) for day in range(1, 11)]
+            for day in range(1, 11):
+                if day % 2:
+                    account.makeDeposit(self.validUserID, float(day), "Cash" if day % 3 else "Check")
+                else:
+                    account.makeWithdrawal(self.validUserID, float(day), "Wire")
+    # Test a time window with and without type and method filters
+    def test_transactions_between(self):
+        for ledger in (None, ColumnarLedger()):
+            account = Account(self.validAccountID, self.validUserID, self.validInitialDeposit, ledger)
+            self.postDailyHistory(account)
+            window = account.transactionsBetween(datetime(2024, 1, 3), datetime(2024, 1, 7, 23))
+            self.assertEqual([t.amount for t in window], [3.00, 4.00, 5.00, 6.00, 7.00])
+            deposits = account.transactionsBetween(datetime(2024, 1, 3), datetime(2024, 1, 7, 23), types=["Deposit"])
+            self.assertEqual([t.amount for t in deposits], [3.00, 5.00, 7.00])
+            self.assertEqual([t.amount for t in account.transactionsBetween(types="Withdrawal")], [2.00, 4.00, 6.00, 8.00, 10.00])
+            self.assertEqual([t.amount for t in account.transactionsBetween(methods=["Check"])], [3.00, 9.00])
+            self.assertEqual([t.amount for t in account.transactionsBetween(end=datetime(2024, 1, 6), types=["Deposit", "Withdrawal"], methods=["Cash", "Wire"])], [1.00, 2.00, 4.00, 5.00])
+    # Test windows and filters that match nothing
+    def test_transactions_between_empty(self):
+        account = Account(self.validAccountID, self.validUserID, self.validInitialDeposit)
+        self.postDailyHistory(account)
+        self.assertEqual(account.transactionsBetween(datetime(2025, 1, 1)), [])
+        self.assertEqual(account.transactionsBetween(datetime(2024, 1, 5), datetime(2024, 1, 4)), [])
+        self.assertEqual(account.transactionsBetween(types=["Intra-Transfer"]), [])
+    # Test that postBatch keeps the indexes up to date
+    def test_transactions_between_after_batch(self):
+        account = Account(self.validAccountID, self.validUserID, self.validInitialDeposit)
+        account.makeDeposit(self.validUserID, 1.00, "Cash")
+        account.postBatch([{"transactionType": "Withdrawal", "userID": self.validUserID, "amount": 2.00, "method": "Cash"},
+                           {"transactionType": "Deposit", "userID": self.validUserID, "amount": 3.00, "method": "Wire"}])
+        self.assertEqual([t.amount for t in account.transactionsBetween(types=["Deposit"])], [1.00, 3.00])
+        self.assertEqual([t.amount for t in account.transactionsBetween(methods=["Cash"])], [1.00, 2.00])
+    # Test historical balances with every combination of ledger and checkpoint density
+    def test_balance_at(self):
+        for columnar in (False, True):
+            for interval, daily in ((1, False), (3, False), (1000, True), (1000, False)):
+                account = Account(self.validAccountID, self.validUserID, self.validInitialDeposit,
+                                  ColumnarLedger() if columnar else None, interval, daily)
+                self.postDailyHistory(account)
+                opening = Money(self.validInitialDeposit)
+                self.assertEqual(account.balanceAt(datetime(2023, 12, 31)), opening)
+                self.assertEqual(account.balanceAt(datetime(2024, 1, 1, 12)), opening + 1)
+                self.assertEqual(account.balanceAt(datetime(2024, 1, 4)), opening + 2)
+                self.assertEqual(account.balanceAt(datetime(2024, 1, 8, 11)), opening + 4)
+                self.assertEqual(account.balanceAt(datetime(2024, 1, 8, 12)), opening - 4)
+                self.assertEqual(account.balanceAt(datetime(2025, 1, 1)), account.balance)
+    # Test that checkpoints are recorded every N postings and at day boundaries
+    def test_balance_checkpoints(self):
+        account = Account(self.validAccountID, self.validUserID, self.validInitialDeposit, checkpointInterval=4, dailyCheckpoints=False)
+        account.postBatch([{"transactionType": "Deposit", "userID": self.validUserID, "amount": 1.00, "method": "Cash"}] * 10)
+        self.assertEqual(account._checkpointPositions, [0, 4, 8])
+        self.assertEqual(account._checkpointBalances, [account._checkpointBalances[0] + 400 * i for i in range(3)])
+        daily = Account(self.validAccountID, self.validUserID, self.validInitialDeposit)
+        self.postDailyHistory(daily)
+        self.assertEqual(daily._checkpointPositions, list(range(10)))
+    # Test constructor with an invalid checkpoint interval
+    def test_invalid_checkpoint_interval(self):
+        for interval in (0, -1, 2.5, True, "1000"):
+            with self.assertRaises(AccountError):
+                Account(self.validAccountID, self.validUserID, self.validInitialDeposit, checkpointInterval=interval)
+    # Test balanceAt with an invalid time stamp
+    def test_balance_at_invalid(self):
+        account = Account(self.validAccountID, self.validUserID, self.validInitialDeposit)
+        with self.assertRaises(AccountError):
+            account.balanceAt("2024-01-01")
+    # Test paging through a time window with cursors, with both ledgers
+    def test_iter_transactions(self):
+        for ledger in (None, ColumnarLedger()):
+            account = Account(self.validAccountID, self.validUserID, self.validInitialDeposit, ledger)
+            self.postDailyHistory(account)
+            pages = list(account.iterTransactions(pageSize=3, start=datetime(2024, 1, 2), end=datetime(2024, 1, 9, 23)))
+            self.assertEqual([[t.amount for t in page.transactions] for page in pages], [[2.00, 3.00, 4.00], [5.00, 6.00, 7.00], [8.00, 9.00]])
+            self.assertEqual([page.hasMore for page in pages], [True, True, False])
+            # Resuming from a cursor continues after its page
+            resumed = account.transactionPage(pages[0].cursor, 4, start=datetime(2024, 1, 2))
+            self.assertEqual([t.amount for t in resumed.transactions], [5.00, 6.00, 7.00, 8.00])
+            self.assertEqual([t.amount for t in account.transactionPage(pages[-1].cursor).transactions], [10.00])
+            # The last cursor of a range picks up records posted later
+            end = account.transactionPage(pageSize=100)
+            self.assertEqual((len(end.transactions), end.hasMore), (10, False))
+            account.makeDeposit(self.validUserID, 11.00, "Cash")
+            self.assertEqual([t.amount for t in account.transactionPage(end.cursor).transactions], [11.00])
+            empty = account.transactionPage(start=datetime(2100, 1, 1))
+            self.assertEqual((list(empty.transactions), empty.hasMore), ([], False))
+    # Test invalid page sizes and cursors
+    def test_iter_transactions_invalid(self):
+        account = Account(self.validAccountID, self.validUserID, self.validInitialDeposit)
+        self.postDailyHistory(account)
+        other = Account("Smit0001", self.validUserID, self.validInitialDeposit)
+        self.postDailyHistory(other)
+        for pageSize in (0, MAX_PAGE_SIZE + 1, 2.5, True):
+            with self.assertRaises(AccountError):
+                account.iterTransactions(pageSize=pageSize)
+        for cursor in ("not a cursor", "", 5, other.transactionPage(pageSize=2).cursor, account.transactionPage(pageSize=2).cursor[:-2]):
+            with self.assertRaises(AccountError):
+                account.iterTransactions(cursor)
+    # Test that the string representation only shows the most recent transactions
+    def test_str(self):
+        account = Account(self.validAccountID, self.validUserID, self.validInitialDeposit)
+        self.assertTrue(str(account).endswith("Status: Active\nTransactions: 0"))
+        self.postDailyHistory(account)
+        lines = str(account).splitlines()
+        self.assertEqual(lines[:7], [f"Account ID: {self.validAccountID}", f"User ID: {self.validUserID}", "Balance: 995.00",
+                                     f"Date Created: {date.today()}", "Status: Active", "Transactions: 10", "Most Recent 5:"])
+        self.assertEqual(len(lines), 7 + RECENT_TRANSACTIONS_SHOWN)
+        self.assertEqual(lines[7], f"  2024-01-10 12:00:00 Withdrawal 10.00 ({account.transactions[-1].transactionID})")
+
+# Test SavingsAccount class
+class TestSavingsAccount(unittest.TestCase):
+    def setUp(self):
+        self.validUserID = "TimmonsJ1996"
+        self.tiers = [(10_000.00, 0.04), (0, 0.01), (1_000.00, 0.02)]
+
+    # Test constructor with valid values, including tiers out of order and a single rate
+    def test_savings_account_constructor_valid(self):
+        account = SavingsAccount("Timm0001", self.validUserID, 500.00, interestRates=self.tiers, compounding="monthly")
+        self.assertEqual(account.interestTiers, ((0, 0.01), (100_000, 0.02), (1_000_000, 0.04)))
+        self.assertEqual((account.compounding, account.accruedInterest, account.balance), ("monthly", 0.0, 500.00))
+        self.assertEqual(SavingsAccount("Timm0001", self.validUserID, 500.00, interestRates=0.03).interestTiers, ((0, 0.03),))
+        self.assertEqual([account.interestRate(Money(balance)) for balance in ("999.99", "1000.00", "9999.99", "10000.00")],
+                         [0.01, 0.02, 0.02, 0.04])
+    # Test constructor with invalid rates and compounding
+    def test_savings_account_constructor_invalid(self):
+        for rates in ([], [(5.00, 0.01)], [(0, 1.5)], [(0, -0.01)], [(0, 0.01), (0, 0.02)], [(-1.00, 0.01)], "0.01",
+                      [(0, True)], [0.01]):
+            with self.assertRaises(AccountError):
+                SavingsAccount("Timm0001", self.validUserID, 500.00, interestRates=rates)
+        with self.assertRaises(AccountError):
+            SavingsAccount("Timm0001", self.validUserID, 500.00, interestRates=0.01, compounding="yearly")
+    # Test daily and monthly compounding, carrying fractional cents forward
+    def test_accrue_interest(self):
+        daily = SavingsAccount("Timm0001", self.validUserID, 1000.00, interestRates=0.0365)
+        self.assertIsNone(daily.accrueInterest(post=False))
+        self.assertAlmostEqual(daily.accruedInterest, 10.0)
+        deposit = daily.accrueInterest(2)
+        self.assertEqual((deposit.amount, deposit.depositMethod, deposit.description), (0.30, "Interest", "Interest"))
+        self.assertAlmostEqual(daily.accruedInterest, 0.0030001, places=6)
+        self.assertEqual(daily.balance, 1000.30)
+        monthly = SavingsAccount("Timm0002", self.validUserID, 1000.00, interestRates=0.0365, compounding="monthly")
+        monthly.accrueInterest(3, post=False)
+        self.assertAlmostEqual(monthly.accruedInterest, 30.0)
+        self.assertIsNone(SavingsAccount("Timm0003", self.validUserID, 1.00, interestRates=0.01).accrueInterest())
+        monthly.status = "Frozen"
+        self.assertIsNone(monthly.accrueInterest(30))
+        self.assertAlmostEqual(monthly.accruedInterest, 30.0)
+        for days in (-1, 1.5, True):
+            with self.assertRaises(AccountError):
+                monthly.accrueInterest(days)
+        self.assertEqual(daily.transactionsBetween(methods="Interest"), [deposit])
+
+# Test CreditAccount class
+class TestCreditAccount(unittest.TestCase):
+    def setUp(self):
+        self.validUserID = "TimmonsJ1996"
+
+    # Test constructor with valid and invalid values
+    def test_credit_account_constructor(self):
+        account = CreditAccount("Cred0001", self.validUserID, creditLimit=1_000.00, apr=0.2499, statementDay=15,
+                                cycleStart=date(2025, 1, 16))
+        self.assertEqual((account.balance, account.creditLimit, account.availableCredit), (0.00, 1_000.00, 1_000.00))
+        self.assertEqual((account.apr, account.statementDay, account.minimumPaymentRate, account.minimumPaymentFloor),
+                         (0.2499, 15, 0.01, 25.00))
+        self.assertEqual((account.cycleStart, account.lastStatement), (date(2025, 1, 16), None))
+        self.assertEqual(account.nextClosingDate(), date(2025, 2, 15))
+        self.assertEqual(account.nextClosingDate(date(2025, 12, 3)), date(2025, 12, 15))
+        self.assertEqual(CreditAccount("Cred0002", self.validUserID).cycleStart, date.today())
+        invalid = [{"creditLimit": -1.00}, {"apr": 1.5}, {"apr": "0.2"}, {"statementDay": 29}, {"statementDay": 0},
+                   {"minimumPaymentRate": -0.01}, {"minimumPaymentFloor": "25"}, {"cycleStart": datetime(2025, 1, 1)}]
+        for options in invalid:
+            with self.assertRaises(AccountError):
+                CreditAccount("Cred0001", self.validUserID, **options)
+        with self.assertRaises(DepositError):
+            CreditAccount("Cred0001", self.validUserID, -1.00)
+        with self.assertRaises(DepositError):
+            Account("Timm0001", self.validUserID, 0.00)
+    # Test that withdrawals, batches, and transfers can use the credit limit but not go past it
+    def test_credit_limit(self):
+        account = CreditAccount("Cred0001", self.validUserID, creditLimit=500.00)
+        account.makeWithdrawal(self.validUserID, 400.00, "Cash")
+        self.assertEqual((account.balance, account.availableCredit), (-400.00, 100.00))
+        with self.assertRaises(WithdrawalError):
+            account.makeWithdrawal(self.validUserID, 100.01, "Cash")
+        with self.assertRaises(WithdrawalError):
+            account.postBatch([{"transactionType": "Withdrawal", "userID": self.validUserID, "amount": 60.00, "method": "Check"},
+                               {"transactionType": "Withdrawal", "userID": self.validUserID, "amount": 40.01, "method": "Check"}])
+        checking = Account("Timm0001", self.validUserID, 10.00)
+        account.transferTo(checking, self.validUserID, 100.00)
+        self.assertEqual((account.balance, checking.balance), (-500.00, 110.00))
+        with self.assertRaises(TransferError):
+            account.transferTo(checking, self.validUserID, 0.01)
+        account.makeDeposit(self.validUserID, 600.00, "Check")
+        self.assertEqual(account.availableCredit, 600.00)
+    # Test that postings are added to the day of the open cycle they were made on
+    def test_daily_changes(self):
+        account = CreditAccount("Cred0001", self.validUserID, 5.00, creditLimit=500.00, cycleStart=date(2025, 3, 2))
+        records = [restoreTransaction(transactionType, f"T{index}", timeStamp, self.validUserID, "Cred0001", cents,
+                                      method="Cash")
+                   for index, (transactionType, timeStamp, cents) in enumerate([
+                       ("Withdrawal", datetime(2025, 3, 1, 12), 100), ("Withdrawal", datetime(2025, 3, 2, 9), 2_000),
+                       ("Deposit", datetime(2025, 3, 2, 18), 500), ("Withdrawal", datetime(2025, 3, 5), 700)])]
+        account.restoreTransactions(records)
+        account.restoreTransactions([restoreTransaction("Deposit", "T4", datetime(2025, 3, 5, 1), self.validUserID,
+                                                        "Cred0001", 50, method="Check")])
+        self.assertEqual(account._cycleOpening, 400)
+        self.assertEqual(account._dailyChanges.tolist(), [-1_500, 0, 0, -650])
+        self.assertEqual(account._cycleOpening + sum(account._dailyChanges), account.balance.cents)
+
+# Test InvestmentAccount class
+class TestInvestmentAccount(unittest.TestCase):
+    def setUp(self):
+        self.validUserID = "TimmonsJ1996"
+        self.account = InvestmentAccount("Inve0001", self.validUserID, 1_000.00)
+
+    # Test buying, adding to, and selling positions at their average cost
+    def test_trades(self):
+        withdrawal = self.account.buy(self.validUserID, "aapl", 2, 150.25, fee=1.00)
+        self.assertEqual((withdrawal.amount, withdrawal.fee, withdrawal.withdrawalMethod), (300.50, 1.00, "Trade"))
+        self.assertEqual(withdrawal.description, "Buy 2 AAPL @ 150.25")
+        self.account.buy(self.validUserID, "AAPL", 1, 100.00)
+        self.account.buy(self.validUserID, "BRK.B", 0.5, 400.00)
+        self.assertEqual(self.account.positions, [Position("AAPL", 3.0, Money("401.50")), Position("BRK.B", 0.5, Money("200.00"))])
+        self.assertEqual(self.account.balance, 398.50)
+        deposit = self.account.sell(self.validUserID, "AAPL", 1.5, 200.00)
+        self.assertEqual((deposit.amount, deposit.depositMethod), (300.00, "Trade"))
+        self.assertEqual(self.account.position("aapl"), Position("AAPL", 1.5, Money("200.75")))
+        self.account.sell(self.validUserID, "AAPL", 1.5, 200.00)
+        self.assertIsNone(self.account.position("AAPL"))
+        self.assertEqual(self.account.positions, [Position("BRK.B", 0.5, Money("200.00"))])
+        self.assertEqual(self.account.balance, 998.50)
+        self.assertEqual(len(self.account.transactionsBetween(methods="Trade")), 5)
+    # Test trades at prices in fractions of a cent, where only the value of the trade is rounded to the cent
+    def test_trades_fractional_price(self):
+        withdrawal = self.account.buy(self.validUserID, "PENNY", 1_000, 0.004, fee=0.00)
+        self.assertEqual((withdrawal.amount, withdrawal.description), (4.00, "Buy 1000 PENNY @ 0.004"))
+        self.account.buy(self.validUserID, "PENNY", 3, Money("0.01"), fee=0.00)
+        self.account.buy(self.validUserID, "MSFT", 0.5, 401.333, fee=0.00)
+        self.assertEqual(self.account.positions, [Position("PENNY", 1_003.0, Money("4.03")), Position("MSFT", 0.5, Money("200.67"))])
+        deposit = self.account.sell(self.validUserID, "PENNY", 500, 0.0125, fee=0.00)
+        self.assertEqual((deposit.amount, deposit.description), (6.25, "Sell 500 PENNY @ 0.0125"))
+        self.assertEqual(self.account.balance, 801.55)
+        for price in (0.004, float("inf"), -0.004, True):
+            with self.assertRaises(InvestmentError):
+                self.account.buy(self.validUserID, "PENNY", 1, price)
+    # Test trades that are not valid
+    def test_trades_invalid(self):
+        self.account.buy(self.validUserID, "MSFT", 1, 400.00)
+        for symbol, quantity, price in [("", 1, 1.00), ("TOOLONGSYMBOL1", 1, 1.00), ("1ABC", 1, 1.00), (None, 1, 1.00),
+                                        ("MSFT", 0, 1.00), ("MSFT", float("nan"), 1.00), ("MSFT", True, 1.00),
+                                        ("MSFT", 1, 0.00), ("MSFT", 1, "1.00"), ("MSFT", 0.001, 1.00)]:
+            with self.assertRaises(InvestmentError):
+                self.account.buy(self.validUserID, symbol, quantity, price)
+        with self.assertRaises(InvestmentError):
+            self.account.buy(self.validUserID, "MSFT", 2, 300.01)
+        with self.assertRaises(InvestmentError):
+            self.account.sell(self.validUserID, "MSFT", 1.5, 400.00)
+        with self.assertRaises(InvestmentError):
+            self.account.sell(self.validUserID, "AAPL", 1, 400.00)
+        self.account.status = "Frozen"
+        with self.assertRaises(AccountError):
+            self.account.sell(self.validUserID, "MSFT", 1, 400.00)
+        self.assertEqual((self.account.balance, self.account.positions), (600.00, [Position("MSFT", 1.0, Money("400.00"))]))
+    # Test restoring positions from saved state
+    def test_restore_positions(self):
+        self.account.restorePositions([("VTI", 10, 2_000.00), ("bnd", 2.5, Money("180.00"))])
+        self.assertEqual(self.account.positions, [Position("VTI", 10.0, Money("2000.00")), Position("BND", 2.5, Money("180.00"))])
+        for positions in ([("VTI", 1, 1.00), ("VTI", 2, 2.00)], [("VTI", -1, 1.00)], [("VTI", 1, -1.00)]):
+            with self.assertRaises(InvestmentError):
+                self.account.restorePositions(positions)
+        self.assertEqual(len(self.account.positions), 2)
+        self.assertEqual(symbolOf(symbolCode("VTI")), "VTI")
+
+# Test that accounts can be shared between threads- the interpreter switches threads as often as possible, so any
+# unsynchronized check-and-post would overdraw the account or lose updates
+class TestAccountConcurrency(unittest.TestCase):
+    def setUp(self):
+        self.validUserID = "TimmonsJ1996"
+        self.switchInterval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+
+    def tearDown(self):
+        sys.setswitchinterval(self.switchInterval)
+
+    # Runs the passed function on the passed number of threads at once, returning the results of each thread
+    def runThreads(self, count: int, function) -> list:
+        barrier = threading.Barrier(count)
+        results = [None] * count
+        errors = []
+        def run(index):
+            barrier.wait()
+            try: results[index] = function(index)
+            except Exception as e: errors.append(e)
+        threads = [threading.Thread(target=run, args=(index,)) for index in range(count)]
+        for thread in threads: thread.start()
+        for thread in threads: thread.join()
+        self.assertEqual(errors, [])
+        return results
+
+    # Test that concurrent withdrawals never overdraw the account- twice as many withdrawals as the balance covers are
+    # attempted, over several rounds so a race would show up
+    def test_concurrent_withdrawals(self):
+        for _ in range(5):
+            account = Account("Timm0001", self.validUserID, 1000.00)
+            def withdraw(index):
+                succeeded = 0
+                for _ in range(250):
+                    try:
+                        account.makeWithdrawal(self.validUserID, 1.00, "Cash")
+                        succeeded += 1
+                    except WithdrawalError:
+                        pass
+                return succeeded
+            self.assertEqual(sum(self.runThreads(8, withdraw)), 1000)
+            self.assertEqual(account.balance, 0.00)
+            self.assertEqual(len(account.transactions), 1000)
+    # Test that no posting is lost when deposits, withdrawals, and batches are made at once, and that readers see a
+    # consistent history while they are
+    def test_no_lost_updates(self):
+        account = Account("Timm0001", self.validUserID, 50.00, checkpointInterval=16)
+        stop = threading.Event()
+        readings = []
+        def read():
+            while not stop.is_set():
+                balance = account.balance
+                readings.append(balance)
+                records = account.transactions
+                if records:
+                    account.balanceAt(records[-1].timeStamp)
+                account.transactionsBetween(types="Withdrawal")
+        reader = threading.Thread(target=read)
+        reader.start()
+        def post(index):
+            random = Random(index)
+            posted = 0
+            for _ in range(200):
+                amount = random.randint(1, 500)
+                try:
+                    choice = random.random()
+                    if choice < 0.4:
+                        account.makeDeposit(self.validUserID, Money.fromCents(amount), "Cash")
+                        posted += amount
+                    elif choice < 0.8:
+                        account.makeWithdrawal(self.validUserID, Money.fromCents(amount), "Cash")
+                        posted -= amount
+                    else:
+                        account.postBatch([{"transactionType": "Deposit", "userID": self.validUserID, "amount": Money.fromCents(amount), "method": "Cash"},
+                                           {"transactionType": "Withdrawal", "userID": self.validUserID, "amount": Money.fromCents(2 * amount), "method": "Cash"}])
+                        posted -= amount
+                except WithdrawalError:
+                    pass
+            return posted
+        try:
+            net = sum(self.runThreads(8, post))
+        finally:
+            stop.set()
+            reader.join()
+        self.assertEqual(account.balance.cents, 5000 + net)
+        replayed = account.openingBalance.cents + sum(t.amount.cents if t.transactionType == "Deposit" else -t.amount.cents
+                                                      for t in account.transactions)
+        self.assertEqual(replayed, account.balance.cents)
+        self.assertEqual(account.balanceAt(account.transactions[-1].timeStamp), account.balance)
+        self.assertTrue(all(balance.cents >= 0 for balance in readings))
+    # Test that records posted from many threads are stamped and given their IDs together, so the records' time
+    # stamps and sortable IDs are both in posting order
+    def test_posting_time_order(self):
+        account = Account("Timm0001", self.validUserID, 50.00)
+        other = Account("Timm0002", self.validUserID, 50.00)
+        def post(index):
+            for _ in range(100):
+                if index % 2:
+                    account.makeDeposit(self.validUserID, 1.00, "Cash")
+                else:
+                    other.transferTo(account, self.validUserID, 0.01)
+        self.runThreads(8, post)
+        timeStamps = [record.timeStamp for record in account.transactions]
+        transactionIDs = [record.transactionID for record in account.transactions]
+        self.assertEqual(timeStamps, sorted(timeStamps))
+        self.assertEqual(transactionIDs, sorted(transactionIDs))
+        self.assertEqual(len(set(timeStamps)), len(timeStamps))
+    # Test that a record posted when the clock reads earlier than the last record is stamped just after it, and that
+    # its ID is generated from that time stamp
+    def test_posting_clock_set_back(self):
+        class RecordingGenerator(SortableIDGenerator):
+            def generate(self, userID, transactionType, timeStamp):
+                stamps.append(timeStamp)
+                return super().generate(userID, transactionType, timeStamp)
+        stamps = []
+        previous = setTransactionIDGenerator(RecordingGenerator())
+        try:
+            account = Account("Timm0001", self.validUserID, 50.00)
+            account.makeDeposit(self.validUserID, 1.00, "Cash")
+            last = account.transactions[-1].timeStamp + timedelta(hours=1)
+            account._lastTimeStamp = last
+            account.makeWithdrawal(self.validUserID, 1.00, "Cash")
+        finally:
+            setTransactionIDGenerator(previous)
+        self.assertEqual(account.transactions[-1].timeStamp, last + timedelta(microseconds=1))
+        self.assertEqual(stamps[-1], account.transactions[-1].timeStamp)
+    # Test that deferred records are only loaded once when many threads read them at once
+    def test_concurrent_loading(self):
+        source = Account("Timm0001", self.validUserID, 10.00)
+        source.postBatch([{"transactionType": "Deposit", "userID": self.validUserID, "amount": 1.00, "method": "Cash"}] * 20)
+        loads = []
+        def loader():
+            loads.append(1)
+            return list(source.transactions)
+        account = Account.restore("Timm0001", self.validUserID, Money("10.00"), source.dateCreated)
+        account.deferTransactions(loader, source.balance)
+        self.assertEqual(self.runThreads(8, lambda index: len(account.transactions)), [20] * 8)
+        self.assertEqual(len(loads), 1)
+    # Test that accounts can be copied and pickled, with a new lock
+    def test_copy(self):
+        account = Account("Timm0001", self.validUserID, 10.00)
+        account.makeDeposit(self.validUserID, 5.00, "Cash")
+        copied = pickle.loads(pickle.dumps(account))
+        self.assertEqual(copied.balance, 15.00)
+        self.assertIsNot(copied.lock, account.lock)
+        copied.makeWithdrawal(self.validUserID, 15.00, "Cash")
+        self.assertEqual(account.balance, 15.00)
+    # Test that an overdraft in a batch is reported before a later entry that is not valid
+    def test_batch_error_order(self):
+        account = Account("Timm0001", self.validUserID, 10.00)
+        with self.assertRaises(WithdrawalError) as context:
+            account.postBatch([{"transactionType": "Withdrawal", "userID": self.validUserID, "amount": 20.00, "method": "Cash"},
+                               {"transactionType": "Deposit", "userID": self.validUserID, "amount": 1.00, "method": "Crypto"}])
+        self.assertTrue(str(context.exception).startswith("Batch Error: Entry 0:"))
+        with self.assertRaises(DepositError) as context:
+            account.postBatch([{"transactionType": "Withdrawal", "userID": self.validUserID, "amount": 5.00, "method": "Cash"},
+                               {"transactionType": "Deposit", "userID": self.validUserID, "amount": 1.00, "method": "Crypto"}])
+        self.assertTrue(str(context.exception).startswith("Batch Error: Entry 1:"))
+        self.assertEqual(account.balance, 10.00)
+    # Test a transfer between two accounts- both legs are posted with linked transaction IDs, and a transfer that
+    # would overdraw the source account or involves an inactive account posts neither leg
+    def test_transfer(self):
+        source = Account("Timm0001", self.validUserID, 100.00)
+        destination = Account("Timm0002", self.validUserID, 5.00)
+        debit, credit = source.transferTo(destination, self.validUserID, 40.00, description="Rent")
+        self.assertEqual((source.balance, destination.balance), (60.00, 45.00))
+        self.assertIsInstance(debit, InternalTransfer)
+        self.assertEqual((debit.accountID, debit.destinationAccountID), ("Timm0001", "Timm0002"))
+        self.assertEqual((credit.accountID, credit.depositMethod, credit.amount), ("Timm0002", "Transfer", 40.00))
+        self.assertEqual((debit.origin, credit.origin), (credit.transactionID, debit.transactionID))
+        self.assertEqual(credit.description, "Rent")
+        self.assertEqual(source.transactionsBetween(types="Intra-Transfer"), [debit])
+        self.assertEqual(destination.transactionsBetween(methods="Transfer"), [credit])
+        with self.assertRaises(TransferError):
+            source.transferTo(destination, self.validUserID, 60.01)
+        destination.status = "Frozen"
+        with self.assertRaises(AccountError):
+            source.transferTo(destination, self.validUserID, 1.00)
+        with self.assertRaises(TransferError):
+            source.transferTo(source, self.validUserID, 1.00)
+        self.assertEqual((source.balance, destination.balance), (60.00, 45.00))
+        self.assertEqual((len(source.transactions), len(destination.transactions)), (1, 1))
+    # Test that concurrent transfers in every direction between a few accounts neither deadlock nor create or lose
+    # funds, and never overdraw an account
+    def test_concurrent_transfers(self):
+        accounts = [Account(f"Timm000{i}", self.validUserID, 100.00) for i in range(4)]
+        def transfer(index):
+            random = Random(index)
+            posted = 0
+            for _ in range(300):
+                source, destination = random.sample(accounts, 2)
+                try:
+                    source.transferTo(destination, self.validUserID, Money.fromCents(random.randint(1, 2000)))
+                    posted += 1
+                except TransferError:
+                    pass
+            return posted
+        results = []
+        worker = threading.Thread(target=lambda: results.append(self.runThreads(8, transfer)), daemon=True)
+        worker.start()
+        worker.join(60)
+        self.assertFalse(worker.is_alive(), "Transfers deadlocked")
+        self.assertEqual(sum(account.balance.cents for account in accounts), 40000)
+        self.assertEqual(sum(len(account.transactions) for account in accounts), 2 * sum(results[0]))
+        for account in accounts:
+            self.assertGreaterEqual(account.balance.cents, 0)
+            replayed = account.openingBalance.cents + sum(t.amount.cents if t.transactionType == "Deposit" else -t.amount.cents
+                                                          for t in account.transactions)
+            self.assertEqual(replayed, account.balance.cents)
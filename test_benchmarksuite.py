@@ -0,0 +1,97 @@
+# Jack Timmons, 27 Dec 2024, Winter Break
+# The purpose of this program is to provide users with a simulated bank managment interface, gaining
+# expierence with OOP, full-stack development, and my first expierence creating both a local GUI and
+# web-based application
+
+# The purpose of this file is to contain the test interface for the benchmark suite found in the benchmarksuite.py file
+
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+from benchmarksuite import *
+from utilities import PasswordPolicy, PasswordService
+
+# Test the benchmark suite
+class TestBenchmarkSuite(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "results.json")
+        # Use a cheap password policy so the password benchmarks run quickly
+        self.previousPolicy = PasswordService.setPolicy(PasswordPolicy("pbkdf2", pbkdf2Iterations=1000))
+
+    def tearDown(self):
+        PasswordService.setPolicy(self.previousPolicy)
+        self.directory.cleanup()
+
+    # Test that every benchmark is run at every scale, and each result is reported
+    def test_run_suite(self):
+        reported = []
+        results = runSuite([10, 20], samples=1, report=reported.append)
+        self.assertEqual(results, reported)
+        names = {(result.name, result.scale) for result in results}
+        for name in ["construct.transaction", "construct.deposit", "construct.withdrawal", "account.makeDeposit",
+                     "account.makeWithdrawal", "memory.deposit"]:
+            self.assertIn((name, 10), names)
+            self.assertIn((name, 20), names)
+        self.assertIn(("construct.customer", None), names)
+        self.assertIn(("login.checkPassword", None), names)
+        self.assertTrue(all(result.value > 0 for result in results))
+        self.assertFalse(next(result for result in results if result.name == "memory.deposit").higherIsBetter)
+    # Test invalid scales and samples
+    def test_invalid_arguments(self):
+        for scales, samples in [([0], 1), ([10.5], 1), ([True], 1), ([10], 0)]:
+            with self.assertRaises(BenchmarkError):
+                runSuite(scales, samples)
+    # Test that results are saved and loaded unchanged
+    def test_save_load(self):
+        results = [BenchmarkResult("construct.deposit", 1000, 150000.0, "ops/s", True),
+                   BenchmarkResult("login.checkPassword", None, 250.0, "ms", False)]
+        saveResults(results, self.path)
+        self.assertEqual(loadResults(self.path), results)
+        with open(self.path) as file:
+            document = json.load(file)
+        self.assertEqual(document["version"], RESULTS_VERSION)
+        self.assertIn("python", document)
+    # Test loading files that are not results files
+    def test_load_invalid(self):
+        for contents in ["not json", json.dumps({"version": 0, "results": []}), json.dumps({"version": RESULTS_VERSION}),
+                         json.dumps({"version": RESULTS_VERSION, "results": [{"name": "x"}]})]:
+            with open(self.path, "w") as file:
+                file.write(contents)
+            with self.assertRaises(BenchmarkError):
+                loadResults(self.path)
+        with self.assertRaises(BenchmarkError):
+            loadResults(os.path.join(self.directory.name, "missing.json"))
+    # Test that results worse than the baseline by more than the threshold are flagged, in either direction
+    def test_compare(self):
+        baseline = [BenchmarkResult("construct.deposit", 1000, 100.0, "ops/s", True),
+                    BenchmarkResult("construct.deposit", 100000, 100.0, "ops/s", True),
+                    BenchmarkResult("memory.deposit", 1000, 200.0, "bytes", False),
+                    BenchmarkResult("login.checkPassword", None, 250.0, "ms", False)]
+        results = [BenchmarkResult("construct.deposit", 1000, 85.0, "ops/s", True),
+                   BenchmarkResult("construct.deposit", 100000, 95.0, "ops/s", True),
+                   BenchmarkResult("memory.deposit", 1000, 150.0, "bytes", False),
+                   BenchmarkResult("login.checkPassword", None, 300.0, "ms", False),
+                   BenchmarkResult("account.makeDeposit", 1000, 1.0, "ops/s", True)]
+        regressions = compareResults(results, baseline, 0.10)
+        self.assertEqual([(r.name, r.scale) for r in regressions], [("construct.deposit", 1000), ("login.checkPassword", None)])
+        self.assertAlmostEqual(regressions[0].change, -0.15)
+        self.assertAlmostEqual(regressions[1].change, 0.20)
+        self.assertIn("construct.deposit @ 1,000", str(regressions[0]))
+        self.assertEqual(compareResults(results, baseline, 0.25), [])
+        with self.assertRaises(BenchmarkError):
+            compareResults(results, baseline, -0.1)
+    # Test the command line interface- the exit status is 1 only if there are regressions
+    def test_main(self):
+        baselinePath = os.path.join(self.directory.name, "baseline.json")
+        saveResults([BenchmarkResult("construct.deposit", 10, 1e12, "ops/s", True)], baselinePath)
+        with contextlib.redirect_stdout(io.StringIO()) as output:
+            status = main(["--scales", "10", "--samples", "1", "--output", self.path, "--baseline", baselinePath])
+        self.assertEqual(status, 1)
+        self.assertIn("construct.deposit @ 10", output.getvalue())
+        self.assertTrue(loadResults(self.path))
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertEqual(main(["--scales", "10", "--samples", "1", "--baseline", self.path, "--threshold", "1000"]), 0)
@@ -0,0 +1,140 @@
+# Jack Timmons, 27 Dec 2024, Winter Break
+# The purpose of this program is to provide users with a simulated bank managment interface, gaining
+# expierence with OOP, full-stack development, and my first expierence creating both a local GUI and
+# web-based application
+
+# The purpose of this file is to contain the test interface for the statement cycle close found in the credit.py file
+
+import tempfile
+import unittest
+from datetime import date, datetime, timedelta
+from random import Random
+import credit
+from accounts import *
+from credit import *
+from wal import WriteAheadLog
+
+# Test the closeCycles function
+class TestCloseCycles(unittest.TestCase):
+    def setUp(self):
+        self.validUserID = "TimmonsJ1996"
+        self.cycleStart = date(2025, 1, 16)
+        self.closingDate = date(2025, 2, 15)
+
+    # Opens a credit account with the passed terms and a history of purchases and payments in and after its cycle
+    def openAccount(self, index: int, random: Random, **terms) -> CreditAccount:
+        account = CreditAccount(f"Cred{index:04d}", self.validUserID, random.choice([0.00, 150.00]), creditLimit=5_000.00,
+                                statementDay=15, cycleStart=self.cycleStart, **terms)
+        records = []
+        for number in range(random.randrange(0, 12)):
+            timeStamp = datetime(2025, 1, 10) + timedelta(minutes=random.randrange(0, 60 * 24 * 40))
+            transactionType = random.choice(["Withdrawal", "Withdrawal", "Deposit"])
+            records.append(restoreTransaction(transactionType, f"{index}-{number}", timeStamp, self.validUserID,
+                                              account.accountID, random.randrange(1, 80_000), method="Check"))
+        records.sort(key=lambda record: record.timeStamp)
+        account.restoreTransactions(records)
+        return account
+
+    # Works out the statement of the passed account's cycle from its transaction records, a day at a time
+    def expectedStatement(self, account: CreditAccount) -> tuple[int, int, int, int]:
+        end = datetime.combine(self.closingDate, datetime.max.time())
+        totalOwed, day = 0, self.cycleStart
+        while day <= self.closingDate:
+            totalOwed += max(-account.balanceAt(datetime.combine(day, datetime.max.time())).cents, 0)
+            day += timedelta(days=1)
+        interest = round(totalOwed * account.apr / DAYS_PER_YEAR)
+        newBalance = interest - account.balanceAt(end).cents
+        minimum = 0 if newBalance <= 0 else min(newBalance, max(account.minimumPaymentFloor.cents,
+                                                                -(-newBalance * account.minimumPaymentRate // 1)))
+        return newBalance, interest, round(totalOwed / 31), int(minimum)
+
+    # Test that the batched statements match statements worked out from each account's records
+    def test_matches_records(self):
+        random = Random(23)
+        accounts = [self.openAccount(index, random, apr=random.choice([0.0, 0.1999, 0.2999]),
+                                     minimumPaymentRate=random.choice([0.01, 0.03]))
+                    for index in range(40)]
+        expected = [self.expectedStatement(account) for account in accounts]
+        balances = [account.balance.cents for account in accounts]
+        statements = closeCycles(accounts, self.closingDate)
+        self.assertEqual(len(statements), 40)
+        for account, statement, (newBalance, interest, average, minimum), balance in zip(accounts, statements, expected, balances):
+            self.assertEqual(statement.accountID, account.accountID)
+            self.assertEqual((statement.periodStart, statement.periodEnd), (self.cycleStart, self.closingDate))
+            self.assertEqual(statement.paymentDueDate, date(2025, 3, 8))
+            self.assertEqual((statement.newBalance.cents, statement.interestCharged.cents), (newBalance, interest))
+            self.assertEqual((statement.averageDailyBalance.cents, statement.minimumDue.cents), (average, minimum))
+            self.assertEqual(account.lastStatement, statement)
+            self.assertEqual(account.balance.cents, balance - interest)
+            self.assertEqual(account.cycleStart, date(2025, 2, 16))
+            # Postings after the closing date, and the interest charge, are carried into the new cycle
+            self.assertEqual(account._cycleOpening + sum(account._dailyChanges), account.balance.cents)
+        charged = [statement for statement in statements if statement.interestCharged > 0]
+        self.assertTrue(charged)
+        charge = accounts[statements.index(charged[0])].transactionsBetween(methods="Interest")
+        self.assertEqual([record.amount for record in charge], [charged[0].interestCharged])
+        self.assertEqual(closeCycles(accounts, self.closingDate), [])
+    # Test that the close works through the accounts a chunk at a time
+    def test_chunks(self):
+        random, otherRandom = Random(7), Random(7)
+        accounts = [self.openAccount(index, random, apr=0.2) for index in range(10)]
+        others = [self.openAccount(index, otherRandom, apr=0.2) for index in range(10)]
+        original = credit.CLOSE_CHUNK_SIZE
+        credit.CLOSE_CHUNK_SIZE = 3
+        try:
+            statements = closeCycles(accounts, self.closingDate)
+        finally:
+            credit.CLOSE_CHUNK_SIZE = original
+        self.assertEqual(statements, closeCycles(others, self.closingDate))
+    # Test the minimum payment, credit balances, and accounts opened part way through the cycle
+    def test_minimum_payment(self):
+        small = CreditAccount("Cred0001", self.validUserID, creditLimit=1_000.00, apr=0.365, statementDay=15,
+                              cycleStart=self.cycleStart)
+        large = CreditAccount("Cred0002", self.validUserID, creditLimit=10_000.00, apr=0.0, statementDay=15,
+                              minimumPaymentRate=0.02, cycleStart=self.cycleStart)
+        paidUp = CreditAccount("Cred0003", self.validUserID, 40.00, statementDay=15, cycleStart=self.cycleStart)
+        late = CreditAccount("Cred0004", self.validUserID, creditLimit=1_000.00, apr=0.365, statementDay=15,
+                             cycleStart=date(2025, 2, 6))
+        small.restoreTransactions([restoreTransaction("Withdrawal", "S1", datetime(2025, 2, 6, 12), self.validUserID,
+                                                      "Cred0001", 1_000, method="Cash")])
+        large.restoreTransactions([restoreTransaction("Withdrawal", "L1", datetime(2025, 1, 16), self.validUserID,
+                                                      "Cred0002", 600_000, method="Wire")])
+        late.restoreTransactions([restoreTransaction("Withdrawal", "D1", datetime(2025, 2, 6), self.validUserID,
+                                                     "Cred0004", 1_000, method="Cash")])
+        statements = closeCycles([small, large, paidUp, late], self.closingDate)
+        # $10.00 owed for 10 days at 0.1% a day
+        self.assertEqual(statements[0][3:8], (Money("0.00"), Money("10.10"), Money("3.23"), Money("0.10"), Money("10.10")))
+        self.assertEqual(statements[1][4:8], (Money("6000.00"), Money("6000.00"), Money("0.00"), Money("120.00")))
+        self.assertEqual(statements[2][4:8], (Money("-40.00"), Money("0.00"), Money("0.00"), Money("0.00")))
+        self.assertEqual(statements[3][1], date(2025, 2, 6))
+        self.assertEqual(statements[3][4:8], (Money("10.10"), Money("10.00"), Money("0.10"), Money("10.10")))
+    # Test that other cycle groups, other accounts, and closed accounts are skipped
+    def test_skipped_accounts(self):
+        other = CreditAccount("Cred0001", self.validUserID, statementDay=1, cycleStart=self.cycleStart)
+        closed = CreditAccount("Cred0002", self.validUserID, statementDay=15, cycleStart=self.cycleStart)
+        closed.status = "Closed"
+        future = CreditAccount("Cred0003", self.validUserID, statementDay=15, cycleStart=date(2025, 2, 16))
+        checking = Account("Timm0001", self.validUserID, 100.00)
+        self.assertEqual(closeCycles([other, closed, future, checking], self.closingDate), [])
+        self.assertEqual(len(closeCycles([other], date(2025, 2, 1))), 1)
+        for closingDate in (datetime(2025, 2, 15), "2025-02-15"):
+            with self.assertRaises(AccountError):
+                closeCycles([other], closingDate)
+    # Test that a cycle whose interest can not be charged is left open to be closed again
+    def test_charge_failure(self):
+        account = CreditAccount("Cred0001", self.validUserID, creditLimit=1_000.00, apr=0.365, statementDay=15,
+                                cycleStart=self.cycleStart)
+        account.restoreTransactions([restoreTransaction("Withdrawal", "S1", datetime(2025, 2, 6, 12), self.validUserID,
+                                                        "Cred0001", 1_000, method="Cash")])
+        with tempfile.TemporaryDirectory() as directory:
+            log = WriteAheadLog(directory)
+            log.close()
+            account.wal = log
+            with self.assertRaises(WriteAheadLogError):
+                closeCycles([account], self.closingDate)
+        self.assertEqual((account.cycleStart, account.lastStatement, account.balance), (self.cycleStart, None, -10.00))
+        account.wal = None
+        self.assertEqual(closeCycles([account], self.closingDate)[0].interestCharged, 0.10)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+# Jack Timmons, 27 Dec 2024, Winter Break
+# The purpose of this program is to provide users with a simulated bank managment interface, gaining
+# expierence with OOP, full-stack development, and my first expierence creating both a local GUI and
+# web-based application
+
+# The purpose of this file is to contain the test interface for the cached email validation found in the emails.py file
+
+import unittest
+from email_validator import validate_email, EmailNotValidError
+from emails import *
+
+# Addresses covering the fast path, internationalized and quoted addresses, and invalid addresses
+SAMPLE_ADDRESSES: list[str] = [
+    "jacktimmonsemail@gmail.com", "Jack.Timmons@Gmail.COM", "jack+bank@mail.example.co.uk", "o'neil@example.org",
+    "a@x.c0m", "a@xn--bcher-kva.de", "jack@bücher.de", "jäck@example.com", '"jack timmons"@example.com',
+    "jack@localhost", "jack@foo.test", "a..b@example.com", ".jack@example.com", "jack.@example.com", "jack@-x.com",
+    "jack@x-.com", "jack@[1.2.3.4]", "jack@example..com", "jack@@example.com", "jack", "@example.com",
+    "jack@example", "jack@example.com.", "x" * 65 + "@example.com", "x" * 64 + "@example.com",
+    "jack@" + "a" * 64 + ".com", "jack@" + ".".join(["a" * 60] * 5) + ".com", "jack@123.com", "jack@exa_mple.com",
+]
+
+# Test the EmailNormalizer class
+class TestEmailNormalizer(unittest.TestCase):
+    def setUp(self):
+        self.normalizer = EmailNormalizer(maxAddresses=4, maxDomains=2)
+
+    # Returns the normalized address from the email_validator library, or None if it is not valid
+    def expected(self, email: str) -> str:
+        try: return validate_email(email, check_deliverability=False).normalized
+        except EmailNotValidError: return None
+
+    # Returns the normalized address from the passed normalizer, or None if it is not valid
+    def actual(self, normalizer: EmailNormalizer, email: str) -> str:
+        try: return normalizer.normalize(email)
+        except EmailNotValidError: return None
+
+    # Test that every address is normalized or rejected exactly as the email_validator library does, both when
+    # uncached and when cached
+    def test_matches_email_validator(self):
+        normalizer = EmailNormalizer()
+        for _ in range(2):
+            for email in SAMPLE_ADDRESSES:
+                self.assertEqual(self.actual(normalizer, email), self.expected(email), email)
+        self.assertEqual(normalizer.stats["addressHits"], len(SAMPLE_ADDRESSES))
+    # Test that errors have the same message as those of the email_validator library
+    def test_error_messages(self):
+        for email in ["jack@foo.test", "a..b@example.com", "jack@example"]:
+            with self.assertRaises(EmailNotValidError) as expected:
+                validate_email(email, check_deliverability=False)
+            with self.assertRaises(EmailNotValidError) as actual:
+                self.normalizer.normalize(email)
+            self.assertEqual(str(actual.exception), str(expected.exception))
+    # Test the hit and miss counters and that domains are shared between addresses
+    def test_stats(self):
+        self.assertEqual(self.normalizer.stats["hitRate"], 0.0)
+        self.normalizer.normalize("jack@example.com")
+        self.normalizer.normalize("jill@Example.com")
+        self.normalizer.normalize("jack@example.com")
+        stats = self.normalizer.stats
+        self.assertEqual((stats["addressHits"], stats["addressMisses"]), (1, 2))
+        self.assertEqual((stats["domainHits"], stats["domainMisses"]), (0, 2))
+        self.assertEqual(stats["fastPath"], 2)
+        self.assertEqual(stats["fullValidations"], 2)
+        self.assertAlmostEqual(stats["hitRate"], 1 / 3)
+        self.normalizer.normalize("john@example.com")
+        self.assertEqual(self.normalizer.stats["domainHits"], 1)
+        self.normalizer.clear()
+        self.assertEqual(self.normalizer.stats["addresses"], 0)
+        self.assertEqual(self.normalizer.stats["addressMisses"], 0)
+    # Test that the caches never grow past their sizes
+    def test_bounded(self):
+        for i in range(10):
+            self.normalizer.normalize(f"jack{i}@example{i % 3}.com")
+        self.assertEqual(self.normalizer.stats["addresses"], 4)
+        self.assertEqual(self.normalizer.stats["domains"], 2)
+        # The most recently used address is still cached
+        self.normalizer.normalize("jack9@example0.com")
+        self.assertEqual(self.normalizer.stats["addressHits"], 1)
+    # Test constructor with invalid cache sizes
+    def test_invalid_sizes(self):
+        for sizes in [(0, 1), (1, -1), (True, 1), (1, 2.5)]:
+            with self.assertRaises(ValueError):
+                EmailNormalizer(*sizes)
+    # Test replacing the shared normalizer
+    def test_shared_normalizer(self):
+        previous = setEmailNormalizer(self.normalizer)
+        try:
+            self.assertEqual(normalizeEmail("Jack@Example.COM"), "Jack@example.com")
+            self.assertIs(getEmailNormalizer(), self.normalizer)
+        finally:
+            setEmailNormalizer(previous)
+        with self.assertRaises(TypeError):
+            setEmailNormalizer("normalizer")
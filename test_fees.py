@@ -0,0 +1,169 @@
+# Jack Timmons, 27 Dec 2024, Winter Break
+# The purpose of this program is to provide users with a simulated bank managment interface, gaining
+# expierence with OOP, full-stack development, and my first expierence creating both a local GUI and
+# web-based application
+
+# The purpose of this file is to contain the test interface for the fee schedule found in the fees.py file
+
+import os
+import tempfile
+import unittest
+from accounts import *
+from fees import *
+from repository import Repository
+from wal import WriteAheadLog
+
+# Test FeeSchedule class
+class TestFeeSchedule(unittest.TestCase):
+    def setUp(self):
+        self.schedule = FeeSchedule([
+            {"transactionType": "Withdrawal", "flat": 1.00},
+            {"transactionType": "Withdrawal", "tier": "Premium"},
+            {"transactionType": "Withdrawal", "method": "Wire", "flat": 15.00},
+            {"transactionType": "Withdrawal", "method": "Wire", "tier": "Business", "flat": 10.00},
+            {"transactionType": "Deposit", "method": "Mobile-Deposit", "rate": 0.01, "minimum": 0.25, "maximum": 5.00},
+            {"transactionType": "Intra-Transfer", "tier": "Standard", "flat": 0.50, "rate": 0.001}])
+
+    # Test that the most specific rule matching a posting sets its fee, and postings no rule matches are free
+    def test_precedence(self):
+        fee = self.schedule.fee
+        self.assertEqual(fee("Withdrawal", "Cash", "Standard", 100.00), 1.00)
+        self.assertEqual(fee("Withdrawal", "Cash", "Premium", 100.00), 0.00)
+        self.assertEqual(fee("Withdrawal", "Wire", "Premium", 100.00), 15.00)
+        self.assertEqual(fee("Withdrawal", "Wire", "Business", 100.00), 10.00)
+        self.assertEqual(fee("Deposit", "Cash", "Standard", 100.00), 0.00)
+        self.assertEqual(fee("External-Transfer", None, "Standard", 100.00), 0.00)
+        self.assertEqual(FeeSchedule().fee("Withdrawal", "Wire", "Standard", 100.00), 0.00)
+    # Test fees that are a share of the amount, kept between the minimum and maximum
+    def test_rate(self):
+        fee = self.schedule.fee
+        self.assertEqual([fee("Deposit", "Mobile-Deposit", "Standard", amount) for amount in (10.00, 123.45, 1_000.00)],
+                         [0.25, 1.23, 5.00])
+        self.assertEqual(fee("Intra-Transfer", None, "Standard", 1_000.00), 1.50)
+        self.assertEqual(fee("Intra-Transfer", None, "Premium", 1_000.00), 0.00)
+        self.assertEqual(self.schedule.feeOf(TRANSACTION_TYPE_CODES["Deposit"], DEPOSIT_METHOD_CODES["Mobile-Deposit"],
+                                             ACCOUNT_TIER_CODES["Business"], 12_345), 123)
+        self.assertEqual(len(self.schedule.rules), 6)
+    # Test rules and lookups that are not valid
+    def test_invalid(self):
+        for rules in [{"transactionType": "Deposit"}, ["Deposit"], [{"transactionType": "Refund"}],
+                      [{"transactionType": "Withdrawal", "method": "Direct-Deposit"}], [{"transactionType": "Deposit", "tier": "Gold"}],
+                      [{"transactionType": "Deposit", "flat": -1.00}], [{"transactionType": "Deposit", "rate": 1.5}],
+                      [{"transactionType": "Deposit", "minimum": 2.00, "maximum": 1.00}],
+                      [{"transactionType": "Deposit", "fee": 1.00}],
+                      [{"transactionType": "Deposit", "flat": 1.00}, {"transactionType": "Deposit", "flat": 2.00}],
+                      [{"transactionType": "Deposit", "method": "Cash", "flat": 1.00},
+                       {"transactionType": "Deposit", "method": "Cash", "tier": ANY, "flat": 2.00}]]:
+            with self.assertRaises(FeeError):
+                FeeSchedule(rules)
+        for transactionType, method, tier, amount in [("Refund", None, "Standard", 1.00), ("Withdrawal", "Mobile-Deposit", "Standard", 1.00),
+                                                      ("Deposit", "Cash", "Gold", 1.00), ("Deposit", "Cash", "Standard", "1")]:
+            with self.assertRaises(FeeError):
+                self.schedule.fee(transactionType, method, tier, amount)
+        with self.assertRaises(FeeError):
+            setFeeSchedule([])
+
+# Test that the fee schedule is applied to postings
+class TestFeePosting(unittest.TestCase):
+    def setUp(self):
+        self.validUserID = "TimmonsJ1996"
+        self.previous = setFeeSchedule(FeeSchedule([
+            {"transactionType": "Deposit", "method": "Check", "flat": 0.50},
+            {"transactionType": "Withdrawal", "method": "Wire", "flat": 15.00},
+            {"transactionType": "Withdrawal", "method": "Wire", "tier": "Premium"},
+            {"transactionType": "Withdrawal", "method": "Trade", "rate": 0.01, "minimum": 1.00},
+            {"transactionType": "Intra-Transfer", "flat": 0.25}]))
+        self.account = Account("Timm0001", self.validUserID, 100.00)
+
+    def tearDown(self):
+        setFeeSchedule(self.previous)
+
+    # Test that single postings are charged the scheduled fee unless one is passed
+    def test_postings(self):
+        self.account.makeDeposit(self.validUserID, 10.00, "Check")
+        self.account.makeDeposit(self.validUserID, 10.00, "Cash")
+        self.account.makeWithdrawal(self.validUserID, 20.00, "Wire")
+        self.account.makeWithdrawal(self.validUserID, 20.00, "Wire", fee=0.00)
+        self.assertEqual([record.fee for record in self.account.transactions], [0.50, 0.00, 15.00, 0.00])
+        self.assertEqual(self.account.balance, 64.50)
+        premium = Account("Timm0002", self.validUserID, 100.00, tier="Premium")
+        premium.makeWithdrawal(self.validUserID, 20.00, "Wire")
+        self.assertEqual((premium.tier, premium.balance), ("Premium", 80.00))
+        premium.tier = "Standard"
+        premium.makeWithdrawal(self.validUserID, 20.00, "Wire")
+        self.assertEqual(premium.balance, 45.00)
+        with self.assertRaises(AccountError):
+            premium.tier = "Gold"
+    # Test that a posting whose fee can not be covered is refused, leaving the account as it was
+    def test_fee_exceeds_balance(self):
+        with self.assertRaises(WithdrawalError):
+            self.account.makeWithdrawal(self.validUserID, 90.00, "Wire")
+        with self.assertRaises(DepositError):
+            self.account.makeDeposit(self.validUserID, 1.00, "Cash", fee=101.01)
+        self.assertEqual((self.account.balance, len(self.account.transactions)), (100.00, 0))
+    # Test that every entry of a batch is charged its fee, and a batch whose fees can not be covered posts nothing
+    def test_batch(self):
+        self.account.postBatch([{"transactionType": "Deposit", "userID": self.validUserID, "amount": 1.00, "method": "Check"},
+                                {"transactionType": "Withdrawal", "userID": self.validUserID, "amount": 5.00, "method": "Wire"},
+                                {"transactionType": "Withdrawal", "userID": self.validUserID, "amount": 5.00, "method": "Wire",
+                                 "fee": 1.00}])
+        self.assertEqual([record.fee for record in self.account.transactions], [0.50, 15.00, 1.00])
+        self.assertEqual(self.account.balance, 74.50)
+        with self.assertRaises(WithdrawalError):
+            self.account.postBatch([{"transactionType": "Withdrawal", "userID": self.validUserID, "amount": 50.00, "method": "Wire"}] * 2)
+        self.assertEqual((self.account.balance, len(self.account.transactions)), (74.50, 3))
+    # Test that a transfer's fee is taken from the source account, and trades are charged their fee
+    def test_transfer_and_trades(self):
+        other = Account("Timm0002", self.validUserID, 10.00)
+        debit, credit = self.account.transferTo(other, self.validUserID, 10.00)
+        self.assertEqual((debit.fee, credit.fee), (0.25, 0.00))
+        self.assertEqual((self.account.balance, other.balance), (89.75, 20.00))
+        investment = InvestmentAccount("Inve0001", self.validUserID, 1_000.00)
+        self.assertEqual(investment.buy(self.validUserID, "VTI", 2, 250.00).fee, 5.00)
+        self.assertEqual(investment.buy(self.validUserID, "VTI", 0.1, 50.00).fee, 1.00)
+        self.assertEqual(investment.position("VTI").costBasis, 511.00)
+        self.assertEqual(investment.sell(self.validUserID, "VTI", 1, 250.00).fee, 0.00)
+        self.assertEqual(investment.balance, 739.00)
+    # Test that recovering an account from its write-ahead log keeps the fees it was charged
+    def test_recover(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with WriteAheadLog(directory) as log:
+                account = Account("Timm0003", self.validUserID, 100.00, wal=log)
+                account.makeWithdrawal(self.validUserID, 20.00, "Wire")
+                account.makeDeposit(self.validUserID, 5.00, "Check")
+            setFeeSchedule(FeeSchedule())
+            with WriteAheadLog(directory) as log:
+                recovered = log.recover()["Timm0003"]
+            self.assertEqual(recovered.balance, account.balance)
+            self.assertEqual(recovered.balance, 69.50)
+    # Test that accounts recovered from their write-ahead log keep their tier, and are charged its fees
+    def test_recover_tier(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with WriteAheadLog(directory) as log:
+                Account("Timm0003", self.validUserID, 100.00, wal=log, tier="Premium")
+                Account("Timm0004", self.validUserID, 100.00, wal=log).tier = "Premium"
+                Account("Timm0005", self.validUserID, 100.00, wal=log, tier="Premium").tier = "Standard"
+            with WriteAheadLog(directory) as log:
+                recovered = log.recover()
+                accounts = [recovered[accountID] for accountID in ("Timm0003", "Timm0004", "Timm0005")]
+                for account in accounts:
+                    account.makeWithdrawal(self.validUserID, 20.00, "Wire")
+            self.assertEqual([account.tier for account in accounts], ["Premium", "Premium", "Standard"])
+            self.assertEqual([account.balance for account in accounts], [80.00, 80.00, 65.00])
+    # Test that accounts loaded from a repository keep their tier, and are charged its fees
+    def test_load_tier(self):
+        with tempfile.TemporaryDirectory() as directory, Repository(os.path.join(directory, "bank.db")) as repository:
+            premium = Account("Timm0003", self.validUserID, 100.00, tier="Premium")
+            repository.saveAccount(premium)
+            loaded = repository.loadAccount("Timm0003")
+            self.assertEqual(loaded.tier, "Premium")
+            loaded.makeWithdrawal(self.validUserID, 20.00, "Wire")
+            self.assertEqual((loaded.transactions[0].fee, loaded.balance), (0.00, 80.00))
+            loaded.tier = "Standard"
+            repository.saveAccount(loaded)
+            reloaded = repository.loadAccount("Timm0003")
+            reloaded.makeWithdrawal(self.validUserID, 20.00, "Wire")
+            self.assertEqual((reloaded.tier, reloaded.transactions[-1].fee, reloaded.balance), ("Standard", 15.00, 45.00))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,116 @@
+# Jack Timmons, 27 Dec 2024, Winter Break
+# The purpose of this program is to provide users with a simulated bank managment interface, gaining
+# expierence with OOP, full-stack development, and my first expierence creating both a local GUI and
+# web-based application
+
+# The purpose of this file is to contain the test interface for the transaction ID generators found in
+# the identifiers.py file
+
+import unittest
+import threading
+import time
+from passlib.hash import bcrypt
+from datetime import datetime
+from identifiers import *
+from accounts import *
+
+# Test SortableIDGenerator class
+class TestSortableIDGenerator(unittest.TestCase):
+    def setUp(self):
+        self.generator = SortableIDGenerator(42)
+
+    # Test that IDs are 26 character alphanumeric strings
+    def test_generate_format(self):
+        transactionID = self.generator.generate("TimmonsJ1996", "Deposit", datetime.now())
+        self.assertEqual(len(transactionID), SORTABLE_ID_LENGTH)
+        self.assertTrue(transactionID.isalnum())
+    # Test that IDs created back to back are unique and strictly increasing
+    def test_generate_monotonic(self):
+        ids = [self.generator.generate("TimmonsJ1996", "Deposit", datetime.now()) for _ in range(10000)]
+        self.assertEqual(len(set(ids)), len(ids))
+        self.assertEqual(ids, sorted(ids))
+    # Test that IDs created from several threads never collide
+    def test_generate_unique_across_threads(self):
+        results = []
+        def worker():
+            results.extend(self.generator.generate("TimmonsJ1996", "Deposit", datetime.now()) for _ in range(2000))
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads: thread.start()
+        for thread in threads: thread.join()
+        self.assertEqual(len(set(results)), 8000)
+    # Test that the node ID and timestamp can be read back out of an ID
+    def test_decode(self):
+        before = datetime.now().replace(microsecond=0)
+        value = decodeSortableID(self.generator.generate("TimmonsJ1996", "Deposit", datetime.now()))
+        self.assertEqual((value >> 64) & 0xFFFF, 42)
+        self.assertGreaterEqual(datetime.fromtimestamp((value >> 80) / 1000), before)
+    # Test that IDs built from the cached prefix match encoding the whole value, including large sequence numbers
+    def test_generate_matches_encoding(self):
+        generator = SortableIDGenerator(0xFFFF)
+        ids = [generator.generate("TimmonsJ1996", "Deposit", datetime.now()) for _ in range(100)]
+        generator._lastMillis, generator._sequence = time.time_ns() // 1_000_000 + 1000, 0xFFFFFFFFFFFFFFF0
+        ids += [generator.generate("TimmonsJ1996", "Deposit", datetime.now()) for _ in range(100)]
+        self.assertEqual(ids, [encodeSortableID(decodeSortableID(transactionID)) for transactionID in ids])
+        self.assertEqual(ids, sorted(ids))
+        self.assertEqual(len(set(ids)), 200)
+    # Test that IDs created in bulk are unique, increasing, and ordered with IDs created one at a time
+    def test_generate_many(self):
+        before = self.generator.generate("TimmonsJ1996", "Deposit", datetime.now())
+        ids = self.generator.generateMany(["TimmonsJ1996"] * 5000, ["Deposit"] * 5000, [datetime.now()] * 5000)
+        after = self.generator.generate("TimmonsJ1996", "Deposit", datetime.now())
+        self.assertEqual(len(set(ids)), 5000)
+        self.assertEqual([before] + ids + [after], sorted([before] + ids + [after]))
+        self.assertEqual(ids, [encodeSortableID(decodeSortableID(transactionID)) for transactionID in ids])
+        self.assertEqual(self.generator.generateMany([], [], []), [])
+        self.generator._lastMillis, self.generator._sequence = time.time_ns() // 1_000_000 + 1000, 0xFFFFFFFFFFFFFFF0
+        ids = self.generator.generateMany(["TimmonsJ1996"] * 100, ["Deposit"] * 100, [datetime.now()] * 100)
+        self.assertEqual((len(set(ids)), ids), (100, sorted(ids)))
+        self.assertEqual(decodeSortableID(ids[0]) & 0xFFFFFFFFFFFFFFFF, 0)
+    # Test constructor with invalid node ID
+    def test_invalid_node_id(self):
+        with self.assertRaises(ValueError):
+            SortableIDGenerator(70000)
+        with self.assertRaises(ValueError):
+            SortableIDGenerator("node")
+
+# Test HMACIDGenerator class
+class TestHMACIDGenerator(unittest.TestCase):
+    # Test that IDs are opaque 32 character hex strings and unique
+    def test_generate(self):
+        generator = HMACIDGenerator(b"secret-key")
+        ids = {generator.generate("TimmonsJ1996", "Deposit", datetime.now()) for _ in range(1000)}
+        self.assertEqual(len(ids), 1000)
+        self.assertTrue(all(len(transactionID) == 32 for transactionID in ids))
+        self.assertEqual(len(set(generator.generateMany(["TimmonsJ1996"] * 100, ["Deposit"] * 100, [datetime.now()] * 100)) - ids), 100)
+    # Test constructor with invalid key
+    def test_invalid_key(self):
+        with self.assertRaises(ValueError):
+            HMACIDGenerator("secret-key")
+
+# Test installing a generator for new transactions
+class TestTransactionIDGeneratorSetting(unittest.TestCase):
+    def tearDown(self):
+        setTransactionIDGenerator(SortableIDGenerator())
+
+    # Test that the legacy bcrypt generator still creates verifiable IDs
+    def test_bcrypt_generator(self):
+        setTransactionIDGenerator(BcryptIDGenerator())
+        deposit = Deposit("TimmonsJ1996", "Timm0001", 100.00, "Cash")
+        self.assertTrue(bcrypt.verify(("TimmonsJ1996-Deposit-" + deposit.timeStamp.isoformat()).encode(), deposit.transactionID))
+    # Test that the previous generator is returned when a new one is set
+    def test_set_returns_previous(self):
+        generator = HMACIDGenerator(b"secret-key")
+        previous = setTransactionIDGenerator(generator)
+        self.assertIsInstance(previous, TransactionIDGenerator)
+        self.assertIs(getTransactionIDGenerator(), generator)
+    # Test setting an invalid generator
+    def test_set_invalid(self):
+        with self.assertRaises(TypeError):
+            setTransactionIDGenerator("bcrypt")
+    # Test that the base class can not be used, or extended without implementing generate
+    def test_abstract_base(self):
+        class Incomplete(TransactionIDGenerator):
+            pass
+        for generatorClass in (TransactionIDGenerator, Incomplete):
+            with self.assertRaises(TypeError):
+                generatorClass()
@@ -0,0 +1,143 @@
+# Jack Timmons, 27 Dec 2024, Winter Break
+# The purpose of this program is to provide users with a simulated bank managment interface, gaining
+# expierence with OOP, full-stack development, and my first expierence creating both a local GUI and
+# web-based application
+
+# The purpose of this file is to contain the test interface for the interest accrual engine found in the interest.py file
+
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import patch
+import interest
+from accounts import *
+from interest import *
+from wal import WriteAheadLog
+
+# A savings account whose deferred records can not be loaded, so its interest deposits can not be posted
+class FailingSavingsAccount(SavingsAccount):
+    def _loadTransactions(self):
+        raise TransactionError("Transaction Error: Posting failed")
+
+# A write-ahead log that can not be written to
+class FailingLog(WriteAheadLog):
+    def logPostings(self, records, states=None):
+        raise OSError("Disk full")
+
+# Test the accrueInterest function
+class TestAccrueInterest(unittest.TestCase):
+    def setUp(self):
+        self.validUserID = "TimmonsJ1996"
+        self.tiers = [(0, 0.01), (1_000.00, 0.025), (10_000.00, 0.04)]
+
+    # Opens savings accounts with a spread of balances over two groups of tiers and compounding
+    def openAccounts(self) -> list[SavingsAccount]:
+        accounts = []
+        for index, balance in enumerate([0.50, 999.99, 1_000.00, 5_432.10, 10_000.00, 250_000.00]):
+            accounts.append(SavingsAccount(f"Save{index:04d}", self.validUserID, balance, interestRates=self.tiers))
+            accounts.append(SavingsAccount(f"Mont{index:04d}", self.validUserID, balance, interestRates=0.03,
+                                           compounding="monthly"))
+        return accounts
+
+    # Test that a vectorized run matches accruing each account on its own
+    def test_matches_scalar(self):
+        accounts, expected = self.openAccounts(), self.openAccounts()
+        result = accrueInterest(accounts, 3, post=False)
+        self.assertEqual((result.accounts, result.posted, result.postedCents), (12, 0, 0))
+        for account in expected:
+            account.accrueInterest(3, post=False)
+        for account, other in zip(accounts, expected):
+            self.assertAlmostEqual(account.accruedInterest, other.accruedInterest, places=6)
+        self.assertAlmostEqual(result.accrued, sum(account.accruedInterest for account in expected), places=4)
+        result = accrueInterest(accounts, 28)
+        for account in expected:
+            account.accrueInterest(28)
+        self.assertEqual(result.postedCents, sum(Money(str(account.balance)).cents -
+                                                 Money(str(account.openingBalance)).cents for account in accounts))
+        for account, other in zip(accounts, expected):
+            self.assertEqual(account.balance, other.balance)
+            self.assertAlmostEqual(account.accruedInterest, other.accruedInterest, places=6)
+            self.assertLess(account.accruedInterest, 1.0)
+        self.assertEqual(result.posted, 10)
+        self.assertEqual(accounts[-1].transactionsBetween(methods="Interest")[0].description, "Interest")
+    # Test that other accounts, inactive accounts, and accounts with a negative balance earn no interest
+    def test_skipped_accounts(self):
+        checking = Account("Timm0001", self.validUserID, 1_000.00)
+        frozen = SavingsAccount("Timm0002", self.validUserID, 1_000.00, interestRates=0.05)
+        frozen.status = "Frozen"
+        overdrawn = SavingsAccount("Timm0003", self.validUserID, 1.00, interestRates=0.05)
+        overdrawn._balance = Money("-100.00")
+        result = accrueInterest([checking, frozen, overdrawn], 365)
+        self.assertEqual(result, AccrualResult(1, 0.0, 0, 0))
+        self.assertEqual((frozen.accruedInterest, overdrawn.accruedInterest), (0.0, 0.0))
+        self.assertEqual(accrueInterest([]), AccrualResult(0, 0.0, 0, 0))
+        for days in (-1, 1.5, True):
+            with self.assertRaises(AccountError):
+                accrueInterest([frozen], days)
+    # Test that interest which could not be posted is left accrued for a later run- a batch that fails posts none of
+    # its deposits, and later batches are not posted, but earlier batches stay posted
+    def test_post_failure(self):
+        account = SavingsAccount("Timm0001", self.validUserID, 1_000.00, interestRates=0.0365)
+        failing = FailingSavingsAccount("Timm0002", self.validUserID, 1_000.00, interestRates=0.073)
+        same = SavingsAccount("Timm0003", self.validUserID, 1_000.00, interestRates=0.073)
+        later = SavingsAccount("Timm0004", self.validUserID, 1_000.00, interestRates=0.0365, compounding="monthly")
+        with self.assertRaises(TransactionError):
+            accrueInterest([account, same, failing, later])
+        self.assertEqual((account.balance, account.accruedInterest), (1_000.10, 0.0))
+        for unposted in (same, failing):
+            self.assertEqual(unposted.balance, 1_000.00)
+            self.assertAlmostEqual(unposted.accruedInterest, 20.0)
+        self.assertEqual((later.balance, later.accruedInterest), (1_000.00, 0.0))
+    # Test that the deposits of the accounts on a write-ahead log are written as a single frame and recovered, and that
+    # if the log can not be written no deposit is posted
+    def test_post_logged(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with WriteAheadLog(directory) as log:
+                accounts = [SavingsAccount(f"Save{index:04d}", self.validUserID, 1_000.00, interestRates=0.0365, wal=log)
+                            for index in range(5)]
+                other = SavingsAccount("Othe0001", self.validUserID, 1_000.00, interestRates=0.0365)
+                frames = log._written
+                result = accrueInterest(accounts + [other], 3)
+                self.assertEqual((result.posted, result.postedCents, log._written - frames), (6, 180, 1))
+                transactionIDs = [account.transactions[0].transactionID for account in accounts + [other]]
+                self.assertEqual(transactionIDs, sorted(transactionIDs))
+                self.assertEqual(len(set(transactionIDs)), 6)
+            with WriteAheadLog(directory) as log:
+                recovered = log.recover()
+            self.assertTrue(all(account.balance == 1000.30 for account in recovered.values()))
+            self.assertEqual(recovered["Save0000"].transactions[0].depositMethod, "Interest")
+            with FailingLog(directory) as failing:
+                accounts = [SavingsAccount(f"Fail{index:04d}", self.validUserID, 1_000.00, interestRates=0.0365, wal=failing)
+                            for index in range(3)]
+                with self.assertRaises(OSError):
+                    accrueInterest(accounts, 3)
+            self.assertTrue(all(account.balance == 1_000.00 and not account.transactions for account in accounts))
+            self.assertTrue(all(abs(account.accruedInterest - 30.0) < 0.01 for account in accounts))
+    # Test that an account frozen after it was accrued is not paid, keeping its interest accrued, and that deposits are
+    # stamped after their account's last record before they are logged, so recovery finds the same time stamps
+    def test_post_checks_accounts(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with WriteAheadLog(directory) as log:
+                accounts = [SavingsAccount(f"Save{index:04d}", self.validUserID, 1_000.00, interestRates=0.0365, wal=log)
+                            for index in range(3)]
+                frozen, later = accounts[1], accounts[2]
+                later._lastTimeStamp = datetime.now() + timedelta(hours=1)
+                postingBatches = interest._postingBatches
+                def freezing(*args):
+                    frozen.status = "Frozen"
+                    return postingBatches(*args)
+                with patch("interest._postingBatches", freezing):
+                    result = accrueInterest(accounts, 3)
+                self.assertEqual((result.posted, result.postedCents), (2, 60))
+                self.assertEqual((frozen.balance, len(frozen.transactions)), (1_000.00, 0))
+                self.assertAlmostEqual(frozen.accruedInterest, 30.0, 2)
+                self.assertEqual(later.transactions[0].timeStamp, later._lastTimeStamp)
+                self.assertGreater(later.transactions[0].timeStamp, datetime.now())
+                timeStamps = {account.accountID: account.transactions[0].timeStamp for account in (accounts[0], later)}
+            with WriteAheadLog(directory) as log:
+                recovered = log.recover()
+            self.assertEqual({accountID: recovered[accountID].transactions[0].timeStamp for accountID in timeStamps}, timeStamps)
+            self.assertEqual(len(recovered["Save0001"].transactions), 0)
+
+if __name__ == "__main__":
+    unittest.main()
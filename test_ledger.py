@@ -0,0 +1,87 @@
+# Jack Timmons, 27 Dec 2024, Winter Break
+# The purpose of this program is to provide users with a simulated bank managment interface, gaining
+# expierence with OOP, full-stack development, and my first expierence creating both a local GUI and
+# web-based application
+
+# The purpose of this file is to contain the test interface for the columnar ledger found in the ledger.py file
+
+import unittest
+from datetime import datetime, timedelta
+from accounts import *
+from ledger import *
+
+# Test ColumnarLedger class
+class TestColumnarLedger(unittest.TestCase):
+    def setUp(self):
+        self.validUserID = "TimmonsJ1996"
+        self.validAccountID = "Timm0001"
+        self.account = Account(self.validAccountID, self.validUserID, 1000.00, ColumnarLedger())
+        self.account.makeDeposit(self.validUserID, 250.00, "Direct-Deposit", origin="XYZ Corporation", description="Payroll")
+        self.account.makeWithdrawal(self.validUserID, 100.00, "Cash", fee=2.50)
+        self.account.makeDeposit(self.validUserID, 50.00, "Cash")
+
+    # Test that an account with a columnar ledger posts like a list-backed account
+    def test_account_postings(self):
+        self.assertEqual(self.account.balance, 1197.50)
+        self.assertEqual(len(self.account.transactions), 3)
+    # Test that views return the fields of the stored transactions
+    def test_view_fields(self):
+        deposit = self.account.transactions[0]
+        self.assertEqual(deposit.userID, self.validUserID)
+        self.assertEqual(deposit.accountID, self.validAccountID)
+        self.assertEqual(deposit.amount, 250.00)
+        self.assertEqual(deposit.transactionType, "Deposit")
+        self.assertEqual(deposit.depositMethod, "Direct-Deposit")
+        self.assertEqual(deposit.origin, "XYZ Corporation")
+        self.assertEqual(deposit.description, "Payroll")
+        self.assertEqual(deposit.fee, 0.00)
+        self.assertEqual(deposit.timeStamp.date(), date.today())
+        withdrawal = self.account.transactions[1]
+        self.assertEqual(withdrawal.withdrawalMethod, "Cash")
+        self.assertEqual(withdrawal.fee, 2.50)
+        self.assertIsNone(withdrawal.origin)
+        with self.assertRaises(AttributeError):
+            withdrawal.depositMethod
+    # Test that timestamps and transaction IDs match the original transaction objects exactly
+    def test_round_trip(self):
+        ledger = ColumnarLedger()
+        deposit = Deposit(self.validUserID, self.validAccountID, 10.00, "Cash")
+        ledger.append(deposit)
+        self.assertEqual(ledger[0].timeStamp, deposit.timeStamp)
+        self.assertEqual(ledger[0].transactionID, deposit.transactionID)
+    # Test that transfer details are kept in the side table
+    def test_transfer_details(self):
+        ledger = ColumnarLedger([ExternalTransfer(self.validUserID, self.validAccountID, "Smit0001", "123456789", "First Bank", 10.00)])
+        self.assertEqual(ledger[0].destinationAccountID, "Smit0001")
+        self.assertEqual(ledger[0].destinationRoutingNumber, "123456789")
+        self.assertEqual(ledger[0].destinationBank, "First Bank")
+    # Test sums and counts over the arrays
+    def test_aggregates(self):
+        ledger = self.account.transactions
+        self.assertEqual(ledger.count(), 3)
+        self.assertEqual(ledger.count("Deposit"), 2)
+        self.assertEqual(ledger.count("Intra-Transfer"), 0)
+        self.assertEqual(ledger.totalAmount(), 400.00)
+        self.assertEqual(ledger.totalAmount("Deposit"), 300.00)
+        self.assertEqual(ledger.totalFees("Withdrawal"), 2.50)
+        self.assertEqual(ledger.netAmount(), 197.50)
+        self.assertEqual(ledger.netAmount(1, 2), -102.50)
+    # Test filtering by type, method, and time window
+    def test_filter(self):
+        ledger = self.account.transactions
+        self.assertEqual([t.amount for t in ledger.filter(transactionType="Deposit")], [250.00, 50.00])
+        self.assertEqual([t.amount for t in ledger.filter(method="Cash")], [100.00, 50.00])
+        self.assertEqual(ledger.filter(end=datetime.now() - timedelta(days=1)), [])
+        self.assertEqual(len(ledger.filter(start=ledger[1].timeStamp)), 2)
+    # Test that a failed batch leaves the columnar ledger unchanged
+    def test_post_batch_rolls_back(self):
+        with self.assertRaises(WithdrawalError):
+            self.account.postBatch([{"transactionType": "Withdrawal", "userID": self.validUserID, "amount": 5000.00, "method": "Cash"}])
+        self.assertEqual(len(self.account.transactions), 3)
+    # Test indexing and slicing
+    def test_indexing(self):
+        ledger = self.account.transactions
+        self.assertEqual(ledger[-1].amount, 50.00)
+        self.assertEqual([t.amount for t in ledger[1:]], [100.00, 50.00])
+        with self.assertRaises(IndexError):
+            ledger[3]
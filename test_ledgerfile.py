@@ -0,0 +1,105 @@
+# Jack Timmons, 27 Dec 2024, Winter Break
+# The purpose of this program is to provide users with a simulated bank managment interface, gaining
+# expierence with OOP, full-stack development, and my first expierence creating both a local GUI and
+# web-based application
+
+# The purpose of this file is to contain the test interface for the ledger file format found in the ledgerfile.py file
+
+import os
+import tempfile
+import unittest
+from datetime import timedelta
+from accounts import *
+from ledger import ColumnarLedger
+from ledgerfile import *
+
+# Test writeLedgerFile and the MappedLedger class
+class TestMappedLedger(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "history.ledger")
+        self.validUserID = "TimmonsJ1996"
+        self.checking = Account("Timm0001", self.validUserID, 1000.00)
+        self.checking.makeDeposit(self.validUserID, 250.00, "Direct-Deposit", origin="XYZ Corporation", description="Payroll")
+        self.savings = Account("Timm0002", self.validUserID, 500.00)
+        self.savings.makeDeposit(self.validUserID, 20.00, "Cash")
+        self.checking.makeWithdrawal(self.validUserID, 100.00, "Cash", fee=2.50)
+        self.transfer = ExternalTransfer(self.validUserID, "Timm0001", "Smit0001", "123456789", "First Bank", 40.00)
+        self.records = [*self.checking.transactions, *self.savings.transactions, self.transfer]
+        writeLedgerFile(self.path, self.records)
+        self.ledger = MappedLedger(self.path)
+
+    def tearDown(self):
+        self.ledger.close()
+        self.directory.cleanup()
+
+    # Test that records are read back in time order with every field intact
+    def test_records(self):
+        self.assertEqual(len(self.ledger), 4)
+        ordered = sorted(self.records, key=lambda record: record.timeStamp)
+        self.assertEqual([t.transactionID for t in self.ledger], [t.transactionID for t in ordered])
+        self.assertEqual([t.timeStamp for t in self.ledger], [t.timeStamp for t in ordered])
+        deposit = self.ledger[0]
+        self.assertEqual(deposit.amount, 250.00)
+        self.assertEqual(deposit.depositMethod, "Direct-Deposit")
+        self.assertEqual(deposit.origin, "XYZ Corporation")
+        self.assertEqual(deposit.description, "Payroll")
+        self.assertEqual(self.ledger[2].fee, 2.50)
+        self.assertIsNone(self.ledger[2].origin)
+        transfer = self.ledger[-1]
+        self.assertEqual(transfer.destinationAccountID, "Smit0001")
+        self.assertEqual(transfer.destinationRoutingNumber, "123456789")
+        self.assertEqual(transfer.destinationBank, "First Bank")
+        with self.assertRaises(AttributeError):
+            deposit.destinationAccountID
+        self.assertEqual(len(self.ledger[1:3]), 2)
+    # Test aggregates and filters over the mapped columns
+    def test_aggregates(self):
+        self.assertEqual(self.ledger.count("Deposit"), 2)
+        self.assertEqual(self.ledger.count("Intra-Transfer"), 0)
+        self.assertEqual(self.ledger.totalAmount(), 410.00)
+        self.assertEqual(self.ledger.totalAmount("Deposit"), 270.00)
+        self.assertEqual(self.ledger.totalFees(), 2.50)
+        self.assertEqual(self.ledger.netAmount(), 127.50)
+        self.assertEqual([t.amount for t in self.ledger.filter(method="Cash")], [20.00, 100.00])
+        self.assertEqual(self.ledger.filter(end=datetime.now() - timedelta(days=1)), [])
+    # Test the per-account index
+    def test_account_index(self):
+        self.assertEqual(sorted(self.ledger.accountIDs), ["Timm0001", "Timm0002"])
+        self.assertEqual(list(self.ledger.accountPositions("Timm0001")), [0, 2, 3])
+        self.assertEqual([t.amount for t in self.ledger.accountTransactions("Timm0002")], [20.00])
+        self.assertEqual([t.amount for t in self.ledger.accountTransactions("Timm0001", start=self.ledger[1].timeStamp)], [100.00, 40.00])
+        self.assertEqual(self.ledger.accountTransactions("Jone0001"), [])
+    # Test that a columnar ledger is written as is and that an account can read its history from a mapped ledger
+    def test_columnar_source(self):
+        account = Account("Timm0003", self.validUserID, 10.00, ColumnarLedger())
+        account.postBatch([{"transactionType": "Deposit", "userID": self.validUserID, "amount": 1.00, "method": "Cash"}] * 5)
+        path = os.path.join(self.directory.name, "columnar.ledger")
+        writeLedgerFile(path, account.transactions)
+        with MappedLedger(path) as ledger:
+            self.assertEqual(ledger, account.transactions)
+            self.assertEqual(ledger.indexRange(ledger[1].timeStamp, ledger[3].timeStamp), range(1, 4))
+    # Test that mapped ledgers cannot be changed
+    def test_read_only(self):
+        with self.assertRaises(LedgerFileError):
+            self.ledger.append(self.transfer)
+        with self.assertRaises(LedgerFileError):
+            self.ledger.extend([self.transfer])
+    # Test an empty ledger file
+    def test_empty(self):
+        path = os.path.join(self.directory.name, "empty.ledger")
+        writeLedgerFile(path, [])
+        with MappedLedger(path) as ledger:
+            self.assertEqual(len(ledger), 0)
+            self.assertEqual(ledger.totalAmount(), 0.00)
+            self.assertEqual(list(ledger), [])
+    # Test opening files that are not ledger files
+    def test_invalid_file(self):
+        path = os.path.join(self.directory.name, "invalid.ledger")
+        with open(self.path, "rb") as file:
+            truncated = file.read(200)
+        for contents in (b"", b"not a ledger file at all" * 10, truncated):
+            with open(path, "wb") as file:
+                file.write(contents)
+            with self.assertRaises(LedgerFileError):
+                MappedLedger(path)
@@ -0,0 +1,124 @@
+# Jack Timmons, 27 Dec 2024, Winter Break
+# The purpose of this program is to provide users with a simulated bank managment interface, gaining
+# expierence with OOP, full-stack development, and my first expierence creating both a local GUI and
+# web-based application
+
+# The purpose of this file is to contain the test interface for the instrumentation found in the metrics.py file
+
+import json
+import unittest
+from accounts import *
+from metrics import *
+from user import User
+
+# Test the Histogram class
+class TestHistogram(unittest.TestCase):
+    # Test counts, totals, and percentile estimates
+    def test_percentiles(self):
+        histogram = Histogram()
+        self.assertIsNone(histogram.percentile(0.5))
+        for _ in range(90):
+            histogram.observe(1_000)
+        for _ in range(10):
+            histogram.observe(1_000_000)
+        self.assertEqual(histogram.count, 100)
+        self.assertAlmostEqual(histogram.sum, (90 * 1_000 + 10 * 1_000_000) / 1e9)
+        self.assertEqual(histogram.max, 1_000_000 / 1e9)
+        # Estimates fall within the bucket of the true value
+        self.assertTrue(500e-9 < histogram.percentile(0.5) <= 1_000e-9)
+        self.assertTrue(512_000e-9 < histogram.percentile(0.99) <= 1_000_000e-9)
+        self.assertEqual(histogram.percentile(1.0), 1_000_000 / 1e9)
+        with self.assertRaises(ValueError):
+            histogram.percentile(1.5)
+    # Test durations longer than the last bucket bound
+    def test_overflow(self):
+        histogram = Histogram()
+        histogram.observe(BUCKET_BOUNDS[-1] * 4)
+        self.assertAlmostEqual(histogram.percentile(0.5), BUCKET_BOUNDS[-1] * 2.5 / 1e9)
+        self.assertEqual(histogram.cumulativeBuckets()[-2][1], 0)
+        self.assertEqual(histogram.cumulativeBuckets()[-1], (float("inf"), 1))
+
+# Test the instrumentation of the hot paths
+class TestInstrumentation(unittest.TestCase):
+    def setUp(self):
+        getRegistry().reset()
+        self.originalDeposit = Account.__dict__["makeDeposit"]
+        self.originalCheck = PasswordService.__dict__["checkPassword"]
+
+    def tearDown(self):
+        disableMetrics()
+        getRegistry().reset()
+
+    # Test that nothing is recorded, and the original functions are in place, while metrics are disabled
+    def test_disabled(self):
+        self.assertFalse(metricsEnabled())
+        account = Account("Timm0001", "TimmonsJ1996", 100.00)
+        account.makeDeposit("TimmonsJ1996", 10.00, "Cash")
+        self.assertIs(Account.__dict__["makeDeposit"], self.originalDeposit)
+        self.assertEqual(getRegistry().snapshot()["operations"].get("makeDeposit", {"count": 0})["count"], 0)
+    # Test that postings, transaction IDs, and rejected postings are recorded while enabled, and that disabling puts
+    # the original functions back
+    def test_postings(self):
+        enableMetrics()
+        enableMetrics()
+        self.assertTrue(metricsEnabled())
+        account = Account("Timm0001", "TimmonsJ1996", 100.00)
+        account.makeDeposit("TimmonsJ1996", 10.00, "Cash")
+        account.makeWithdrawal("TimmonsJ1996", 5.00, "Cash")
+        with self.assertRaises(WithdrawalError):
+            account.makeWithdrawal("TimmonsJ1996", 500.00, "Cash")
+        with self.assertRaises(DepositError):
+            account.makeDeposit("TimmonsJ1996", 10.00, "Crypto")
+        with self.assertRaises(TransactionError):
+            account.postBatch([{"transactionType": "Refund"}])
+        operations = getRegistry().snapshot()["operations"]
+        self.assertEqual(operations["makeDeposit"]["count"], 2)
+        self.assertEqual(operations["makeWithdrawal"]["count"], 2)
+        self.assertEqual(operations["makeWithdrawal"]["errors"], {"WithdrawalError": 1})
+        self.assertEqual(operations["makeDeposit"]["errors"], {"DepositError": 1})
+        self.assertEqual(getRegistry().errorCount("postBatch"), 1)
+        self.assertGreaterEqual(operations["generateTransactionID"]["count"], 2)
+        self.assertGreater(operations["makeDeposit"]["p50"], 0)
+        disableMetrics()
+        self.assertIs(Account.__dict__["makeDeposit"], self.originalDeposit)
+        account.makeDeposit("TimmonsJ1996", 10.00, "Cash")
+        self.assertEqual(getRegistry().snapshot()["operations"]["makeDeposit"]["count"], 2)
+    # Test that static methods are instrumented and restored as static methods
+    def test_password_and_email(self):
+        previous = PasswordService.setPolicy(PasswordPolicy("pbkdf2", pbkdf2Iterations=1000))
+        try:
+            enableMetrics()
+            self.assertIsInstance(PasswordService.__dict__["checkPassword"], staticmethod)
+            user = User("TimmonsJ1996", "J@cksPassword1234", "Jack", "Timmons", "03/27/1996", "jack@example.com", "customer")
+            self.assertTrue(user.checkPassword("J@cksPassword1234"))
+            with self.assertRaises(ValueError):
+                user.email = "not-an-email"
+            operations = getRegistry().snapshot()["operations"]
+            self.assertEqual(operations["hashPassword"]["count"], 1)
+            self.assertEqual(operations["checkPassword"]["count"], 1)
+            self.assertEqual(operations["validateEmail"]["count"], 2)
+            self.assertEqual(operations["validateEmail"]["errors"], {"ValueError": 1})
+        finally:
+            PasswordService.setPolicy(previous)
+        disableMetrics()
+        self.assertIs(PasswordService.__dict__["checkPassword"], self.originalCheck)
+    # Test the Prometheus and JSON exports
+    def test_export(self):
+        enableMetrics()
+        account = Account("Timm0001", "TimmonsJ1996", 100.00)
+        account.makeDeposit("TimmonsJ1996", 10.00, "Cash")
+        with self.assertRaises(WithdrawalError):
+            account.makeWithdrawal("TimmonsJ1996", 500.00, "Cash")
+        text = getRegistry().toPrometheus()
+        self.assertIn("# TYPE bank_operation_duration_seconds histogram", text)
+        self.assertIn('bank_operation_duration_seconds_bucket{operation="makeDeposit",le="+Inf"} 1', text)
+        self.assertIn('bank_operation_duration_seconds_count{operation="makeDeposit"} 1', text)
+        self.assertIn('bank_operation_errors_total{operation="makeWithdrawal",error="WithdrawalError"} 1', text)
+        snapshot = json.loads(getRegistry().toJSON())
+        self.assertTrue(snapshot["enabled"])
+        self.assertEqual(snapshot["operations"]["makeDeposit"]["count"], 1)
+        self.assertIn("p99", snapshot["operations"]["makeDeposit"])
+    # Test instrumenting a function the class does not define
+    def test_instrument_invalid(self):
+        with self.assertRaises(ValueError):
+            instrument(Deposit, "makeDeposit", "makeDeposit")
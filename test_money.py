@@ -0,0 +1,92 @@
+# Jack Timmons, 27 Dec 2024, Winter Break
+# The purpose of this program is to provide users with a simulated bank managment interface, gaining
+# expierence with OOP, full-stack development, and my first expierence creating both a local GUI and
+# web-based application
+
+# The purpose of this file is to contain the test interface for the Money class found in the money.py file
+
+import unittest
+import pickle
+from decimal import Decimal
+from money import *
+from errors import *
+
+# Test Money class
+class TestMoney(unittest.TestCase):
+    # Test building Money from each accepted type
+    def test_constructor_valid(self):
+        self.assertEqual(Money(12.34).cents, 1234)
+        self.assertEqual(Money("12.34").cents, 1234)
+        self.assertEqual(Money(Decimal("12.34")).cents, 1234)
+        self.assertEqual(Money(12).cents, 1200)
+        self.assertEqual(Money(Money(12.34)).cents, 1234)
+        self.assertEqual(Money.fromCents(1234).cents, 1234)
+    # Test that fractions of a cent are rounded half to even
+    def test_constructor_rounding(self):
+        self.assertEqual(Money("0.125").cents, 12)
+        self.assertEqual(Money("0.135").cents, 14)
+        self.assertEqual(Money(2.675).cents, 268)
+    # Test building Money from invalid values
+    def test_constructor_invalid(self):
+        with self.assertRaises(InputError):
+            Money("twelve")
+        with self.assertRaises(InputError):
+            Money(float("nan"))
+        with self.assertRaises(InputError):
+            Money(True)
+        with self.assertRaises(InputError):
+            Money([12])
+    # Test that sums are exact where float sums drift
+    def test_sum_exact(self):
+        total = 0.0
+        for _ in range(10): total += 0.1
+        self.assertNotEqual(total, 1.0)
+        self.assertEqual(Money.sum([0.1] * 10), Money("1.00"))
+        self.assertEqual(sum([Money(0.1)] * 10, Money(0)).cents, 100)
+    # Test arithmetic with Money and plain numbers
+    def test_arithmetic(self):
+        self.assertEqual(Money(10.50) + Money(0.25), Money(10.75))
+        self.assertEqual(Money(10.50) - 0.25, 10.25)
+        self.assertEqual(1.00 - Money(0.25), 0.75)
+        self.assertEqual(Money(10.00) * 3, 30.00)
+        self.assertEqual(Money(10.00) * 0.015, 0.15)
+        self.assertEqual(Money(10.00) / 3, 3.33)
+        self.assertEqual(-Money(1.50), Money(-1.50))
+        with self.assertRaises(TypeError):
+            Money(1.00) + "1.00"
+        with self.assertRaises(TypeError):
+            Money(1.00) * Money(2.00)
+    # Test comparisons and the float compatibility layer
+    def test_compatibility(self):
+        self.assertEqual(Money(1000.00), 1000.00)
+        self.assertEqual(hash(Money(1000.00)), hash(1000.00))
+        self.assertTrue(Money(5.00) > 4.99)
+        self.assertTrue(Money(5.00) <= Money(5.00))
+        self.assertEqual(float(Money(12.34)), 12.34)
+        self.assertEqual(round(Money(12.34), 1), 12.3)
+        self.assertFalse(Money(0))
+    # Test that comparisons with numbers are made at cent precision, and that amounts hash like their floats
+    def test_cent_comparison(self):
+        self.assertEqual(Money(0.10), 0.1)
+        self.assertEqual(Money(0.7), 0.7)
+        self.assertEqual(Money(0.10), Decimal("0.10"))
+        self.assertTrue(Money(1000.30) <= 1000.30 <= Money(1000.30))
+        self.assertTrue(Money(0.10) < 0.11 and Money(0.10) > 0.09)
+        self.assertTrue(Money(1_000_000) < float("inf"))
+        self.assertFalse(Money(0) == float("nan") or Money(0) < float("nan"))
+        for value in (Money(0.10), Money(0.50), Money(-7.25), Money(1000.30), Money(3), Money(0)):
+            self.assertEqual(hash(value), hash(float(value)))
+        self.assertEqual(len({Money(0.30), 0.3, Money(3), 3, 3.0}), 2)
+        self.assertNotEqual(Money(1.00), True)
+        with self.assertRaises(TypeError):
+            Money(1.00) < "1.00"
+    # Test string conversion and formatting
+    def test_str(self):
+        self.assertEqual(str(Money(1234.5)), "1234.50")
+        self.assertEqual(str(Money(-0.05)), "-0.05")
+        self.assertEqual(repr(Money(1.5)), "Money('1.50')")
+        self.assertEqual(f"{Money(1234.5):,.2f}", "1,234.50")
+        self.assertEqual(Money(1.5).toDecimal(), Decimal("1.50"))
+    # Test that Money survives pickling
+    def test_pickle(self):
+        self.assertEqual(pickle.loads(pickle.dumps(Money(12.34))), Money(12.34))
@@ -0,0 +1,58 @@
+# Jack Timmons, 27 Dec 2024, Winter Break
+# The purpose of this program is to provide users with a simulated bank managment interface, gaining
+# expierence with OOP, full-stack development, and my first expierence creating both a local GUI and
+# web-based application
+
+# The purpose of this file is to contain the test interface for the bulk onboarding function found in the
+# onboarding.py file
+
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from errors import *
+from onboarding import *
+
+# Test onboardCustomers function
+class TestOnboardCustomers(unittest.TestCase):
+    # Returns a valid customer record with the passed user ID
+    def record(self, userID: str, **changes) -> dict:
+        record = {"userID": userID, "rawPassword": "J@cksPassword1234", "firstName": "Jack", "lastName": "Timmons",
+                  "DOB": "03/27/1996", "email": "jacktimmonsemail@gmail.com"}
+        record.update(changes)
+        return record
+
+    # Test that valid and invalid records are returned in input order on a process pool
+    def test_onboard_process_pool(self):
+        records = [self.record("Timmons001"), self.record("Timmons002", DOB="2020-01-01"), self.record("Timmons003"),
+                   self.record("Timmons004", email="not-an-email"), {"userID": "Timmons005"}, "Timmons006"]
+        results = list(onboardCustomers(records, workers=2, chunkSize=2))
+        self.assertEqual([result.index for result in results], list(range(6)))
+        self.assertEqual([result.ok for result in results], [True, False, True, False, False, False])
+        self.assertEqual(results[0].customer.userID, "Timmons001")
+        self.assertTrue(results[2].customer.checkPassword("J@cksPassword1234"))
+        self.assertIsInstance(results[1].error, InvalidDOBError)
+        self.assertIsInstance(results[3].error, ValueError)
+        self.assertIn("rawPassword", str(results[4].error))
+        self.assertIsInstance(results[5].error, TypeError)
+        self.assertIsNone(results[1].customer)
+    # Test that records are read as a stream, and that another executor can be used
+    def test_onboard_stream(self):
+        read = []
+        def records():
+            for i in range(20):
+                read.append(i)
+                yield self.record(f"Timmons{i:03d}")
+        with ThreadPoolExecutor(2) as executor:
+            results = onboardCustomers(records(), workers=1, chunkSize=2, executor=executor)
+            first = next(results)
+            self.assertEqual(first.customer.userID, "Timmons000")
+            self.assertLess(len(read), 20)
+            results.close()
+    # Test an invalid chunk size or number of workers- both are rejected when the function is called, before any
+    # result is requested
+    def test_invalid_arguments(self):
+        for arguments in [{"chunkSize": 0}, {"chunkSize": True}, {"workers": 0}, {"workers": 1.5}, {"workers": True}]:
+            with self.assertRaises(ValueError):
+                onboardCustomers([], **arguments)
+    # Test an empty input
+    def test_empty(self):
+        self.assertEqual(list(onboardCustomers([], workers=1)), [])
@@ -0,0 +1,207 @@
+# Jack Timmons, 27 Dec 2024, Winter Break
+# The purpose of this program is to provide users with a simulated bank managment interface, gaining
+# expierence with OOP, full-stack development, and my first expierence creating both a local GUI and
+# web-based application
+
+# The purpose of this file is to contain the test interface for the SQLite repository found in the repository.py file
+
+import os
+import sqlite3
+import tempfile
+import threading
+import unittest
+from datetime import date, datetime
+from accounts import *
+from credit import closeCycles
+from valuation import PriceTable, valuePortfolios
+from ledger import ColumnarLedger
+from repository import *
+from user import *
+
+# Test the Repository class
+class TestRepository(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.repository = Repository(os.path.join(self.directory.name, "bank.db"))
+        self.validUserID = "TimmonsJ1996"
+
+    def tearDown(self):
+        self.repository.close()
+        self.directory.cleanup()
+
+    # Creates an account with a few postings
+    def createAccount(self, accountID: str = "Timm0001") -> Account:
+        account = Account(accountID, self.validUserID, 1000.00)
+        account.makeDeposit(self.validUserID, 250.00, "Direct-Deposit", origin="XYZ Corporation", description="Payroll")
+        account.makeWithdrawal(self.validUserID, 100.00, "Cash", fee=2.50)
+        return account
+
+    # Test that accounts are saved and loaded with their transactions
+    def test_account_round_trip(self):
+        account = self.createAccount()
+        self.repository.saveAccount(account)
+        loaded = self.repository.loadAccount("Timm0001")
+        self.assertEqual(loaded.balance, account.balance)
+        self.assertEqual(loaded.openingBalance, 1000.00)
+        self.assertEqual(loaded.dateCreated, account.dateCreated)
+        self.assertEqual([t.transactionID for t in loaded.transactions], [t.transactionID for t in account.transactions])
+        self.assertEqual([t.timeStamp for t in loaded.transactions], [t.timeStamp for t in account.transactions])
+        self.assertEqual(loaded.transactions[0].depositMethod, "Direct-Deposit")
+        self.assertEqual(loaded.transactions[0].description, "Payroll")
+        self.assertEqual(loaded.transactions[1].fee, 2.50)
+        self.assertIsNone(self.repository.loadAccount("Jone0001"))
+    # Test that a credit account opened with a zero balance is loaded as a credit account, with its terms, open cycle,
+    # and last statement- its transactions are not counted in the open cycle again when they are loaded
+    def test_credit_round_trip(self):
+        account = CreditAccount("Cred0001", self.validUserID, creditLimit=1_000.00, apr=0.365, statementDay=15,
+                                minimumPaymentRate=0.02, minimumPaymentFloor=10.00, cycleStart=date(2025, 1, 16))
+        account.restoreTransactions([restoreTransaction("Withdrawal", f"P{day}", datetime(2025, 2, day, 12), self.validUserID,
+                                                        "Cred0001", 1_000, method="Cash") for day in (6, 20)])
+        statement = closeCycles([account], date(2025, 2, 15))[0]
+        self.repository.saveAccount(account)
+        loaded = self.repository.loadAccount("Cred0001")
+        self.assertIsInstance(loaded, CreditAccount)
+        self.assertEqual((loaded.openingBalance, loaded.balance), (0.00, account.balance))
+        self.assertEqual((loaded.creditLimit, loaded.apr, loaded.statementDay, loaded.minimumPaymentRate,
+                          loaded.minimumPaymentFloor), (1_000.00, 0.365, 15, 0.02, 10.00))
+        self.assertEqual(loaded.lastStatement, statement)
+        self.assertEqual(len(loaded.transactions), 3)
+        self.assertEqual((loaded.cycleStart, loaded._cycleOpening, loaded._dailyChanges),
+                         (date(2025, 2, 16), account._cycleOpening, account._dailyChanges))
+        self.assertEqual(closeCycles([loaded], date(2025, 3, 15))[0][1:], closeCycles([account], date(2025, 3, 15))[0][1:])
+    # Test that a savings account is loaded as a savings account, with its interest tiers, compounding, and accrued
+    # interest
+    def test_savings_round_trip(self):
+        account = SavingsAccount("Save0001", self.validUserID, 1_234.56, interestRates=[(0, 0.01), (1_000.00, 0.04)],
+                                 compounding="monthly")
+        account.accrueInterest(days=45)
+        account.accrueInterest(days=10, post=False)
+        self.repository.saveAccount(account)
+        loaded = self.repository.loadAccount("Save0001")
+        self.assertIsInstance(loaded, SavingsAccount)
+        self.assertEqual((loaded.balance, loaded.interestTiers, loaded.compounding, loaded.accruedInterest),
+                         (account.balance, account.interestTiers, account.compounding, account.accruedInterest))
+        self.assertGreater(loaded.accruedInterest, 0)
+        self.assertEqual(loaded.accrueInterest(days=20).amount, account.accrueInterest(days=20).amount)
+        self.repository.saveAccount(loaded)
+        self.assertEqual(self.repository.loadAccount("Save0001").accruedInterest, loaded.accruedInterest)
+    # Test that an investment account is loaded as an investment account, with its positions, and is valued
+    def test_investment_round_trip(self):
+        account = InvestmentAccount("Inve0001", self.validUserID, 10_000.00)
+        account.restorePositions([("MSFT", 4, 1_500.00)])
+        account.buy(self.validUserID, "VTI", 12.5, 250.00, fee=1.00)
+        account.sell(self.validUserID, "VTI", 2.25, 260.00)
+        self.repository.saveAccount(account)
+        loaded = self.repository.loadAccount("Inve0001")
+        self.assertIsInstance(loaded, InvestmentAccount)
+        self.assertEqual((loaded.balance, loaded.positions), (account.balance, account.positions))
+        prices = PriceTable({"MSFT": 401.333, "VTI": 250.00}, {"MSFT": "Equity", "VTI": "Fund"})
+        valuation, expected = valuePortfolios([loaded], prices), valuePortfolios([account], prices)
+        self.assertEqual(valuation.accountIDs, ["Inve0001"])
+        self.assertEqual((valuation.marketValue.tolist(), valuation.costBasis.tolist()),
+                         (expected.marketValue.tolist(), expected.costBasis.tolist()))
+        loaded.sell(self.validUserID, "MSFT", 4, 410.00)
+        self.repository.saveAccount(loaded)
+        self.assertEqual([position.symbol for position in self.repository.loadAccount("Inve0001").positions], ["VTI"])
+    # Test that a database made before accounts were saved with their kind is given the new columns when opened
+    def test_added_columns(self):
+        path = os.path.join(self.directory.name, "old.db")
+        with sqlite3.connect(path) as connection:
+            connection.execute("CREATE TABLE accounts (accountID TEXT PRIMARY KEY, userID TEXT NOT NULL, openingBalance INTEGER NOT NULL, "
+                               "balance INTEGER NOT NULL, dateCreated TEXT NOT NULL, status TEXT NOT NULL, "
+                               "transactionCount INTEGER NOT NULL DEFAULT 0)")
+            connection.execute("INSERT INTO accounts VALUES ('Timm0001', ?, 1000, 1000, '2025-01-02', 'Active', 0)", (self.validUserID,))
+        connection.close()
+        with Repository(path) as repository:
+            loaded = repository.loadAccount("Timm0001")
+        self.assertEqual((type(loaded), loaded.tier, loaded.balance, loaded.dateCreated), (Account, "Standard", 10.00, date(2025, 1, 2)))
+    # Test that an account's transactions are only loaded when they are needed
+    def test_lazy_loading(self):
+        self.repository.saveAccount(self.createAccount())
+        loaded = self.repository.loadAccount("Timm0001")
+        self.assertFalse(loaded.transactionsLoaded)
+        self.assertEqual(loaded.balance, 1147.50)
+        # Saving an account whose transactions were never loaded does not load them
+        loaded.status = "Frozen"
+        self.repository.saveAccount(loaded)
+        self.assertFalse(loaded.transactionsLoaded)
+        self.assertEqual(self.repository.loadAccount("Timm0001").status, "Frozen")
+        self.assertEqual(len(loaded.transactionsBetween(types="Deposit")), 1)
+        self.assertTrue(loaded.transactionsLoaded)
+    # Test that only new transactions are written when an account is saved again
+    def test_incremental_save(self):
+        account = self.createAccount()
+        self.repository.saveAccount(account)
+        loaded = self.repository.loadAccount("Timm0001", columnar=True)
+        loaded.postBatch([{"transactionType": "Deposit", "userID": self.validUserID, "amount": 1.00, "method": "Cash"}] * 50)
+        self.assertIsInstance(loaded.transactions, ColumnarLedger)
+        self.repository.saveAccount(loaded)
+        self.repository.saveAccount(loaded)
+        reloaded = self.repository.loadAccount("Timm0001")
+        self.assertEqual(len(reloaded.transactions), 52)
+        self.assertEqual(reloaded.balance, 1197.50)
+        self.assertEqual(reloaded.balanceAt(account.transactions[-1].timeStamp), 1147.50)
+    # Test that transfers are saved with their destination details
+    def test_transfer_records(self):
+        account = self.createAccount()
+        transfer = ExternalTransfer(self.validUserID, "Timm0001", "Smit0001", "123456789", "First Bank", 40.00)
+        account.restoreTransactions([transfer])
+        self.repository.saveAccount(account)
+        loaded = self.repository.loadTransactions("Timm0001", start=transfer.timeStamp)
+        self.assertEqual(len(loaded), 1)
+        self.assertIsInstance(loaded[0], ExternalTransfer)
+        self.assertEqual(loaded[0].destinationRoutingNumber, "123456789")
+        self.assertEqual(loaded[0].destinationBank, "First Bank")
+        self.assertEqual(self.repository.loadTransactions("Timm0001", end=transfer.timeStamp)[-1].transactionID, transfer.transactionID)
+    # Test that a loaded balance that does not match the stored history is reported
+    def test_balance_mismatch(self):
+        self.repository.saveAccount(self.createAccount())
+        with self.repository.pool.connection() as connection, connection:
+            connection.execute("UPDATE accounts SET balance = 0 WHERE accountID = 'Timm0001'")
+        loaded = self.repository.loadAccount("Timm0001")
+        with self.assertRaises(AccountError):
+            loaded.transactions
+    # Test that customers are saved and loaded with their accounts
+    def test_customer_round_trip(self):
+        customer = Customer(self.validUserID, "J@cksPassword1234", "Jack", "Timmons", "03/27/1996", "jacktimmonsemail@gmail.com")
+        customer.addAccount(self.createAccount("Timm0001"))
+        customer.addAccount(self.createAccount("Timm0002"))
+        self.repository.saveUser(customer)
+        loaded = self.repository.loadUser(self.validUserID)
+        self.assertIsInstance(loaded, Customer)
+        self.assertEqual(loaded.email, customer.email)
+        self.assertEqual(loaded.DOB, customer.DOB)
+        self.assertTrue(loaded.checkPassword("J@cksPassword1234"))
+        self.assertEqual(sorted(loaded.accounts), ["Timm0001", "Timm0002"])
+        self.assertFalse(any(account.transactionsLoaded for account in loaded.accounts.values()))
+        self.assertEqual(len(self.repository.loadUserTransactions(self.validUserID)), 4)
+        self.assertIsNone(self.repository.loadUser("Nobody"))
+    # Test that other users are loaded as plain users
+    def test_user_round_trip(self):
+        user = User("Admin0001", "J@cksPassword1234", "Jack", "Timmons", "03/27/1996", "jacktimmonsemail@gmail.com", "admin")
+        self.repository.saveUser(user)
+        loaded = self.repository.loadUser("Admin0001")
+        self.assertNotIsInstance(loaded, Customer)
+        self.assertEqual(loaded.role, "admin")
+    # Test saving from several threads at once through the pool
+    def test_concurrent_saves(self):
+        accounts = [self.createAccount(f"Timm000{i}") for i in range(8)]
+        threads = [threading.Thread(target=self.repository.saveAccount, args=(account,)) for account in accounts]
+        for thread in threads: thread.start()
+        for thread in threads: thread.join()
+        self.assertTrue(all(self.repository.loadAccount(f"Timm000{i}").balance == 1147.50 for i in range(8)))
+    # Test constructor with an invalid pool size
+    def test_invalid_pool_size(self):
+        with self.assertRaises(RepositoryError):
+            ConnectionPool(os.path.join(self.directory.name, "other.db"), 0)
+
+# Test the Customer account methods used by the repository
+class TestCustomerAccounts(unittest.TestCase):
+    # Test adding accounts that do not belong to the customer
+    def test_add_account_invalid(self):
+        customer = Customer.restore("TimmonsJ1996", "hash", "Jack", "Timmons", date(1996, 3, 27), "jack@example.com")
+        with self.assertRaises(AccountError):
+            customer.addAccount(Account("Smit0001", "SmithJ1990", 10.00))
+        customer.addAccount(Account("Timm0001", "TimmonsJ1996", 10.00))
+        with self.assertRaises(AccountError):
+            customer.addAccount(Account("Timm0001", "TimmonsJ1996", 10.00))
@@ -0,0 +1,129 @@
+# Jack Timmons, 27 Dec 2024, Winter Break
+# The purpose of this program is to provide users with a simulated bank managment interface, gaining
+# expierence with OOP, full-stack development, and my first expierence creating both a local GUI and
+# web-based application
+
+# The purpose of this file is to contain the test interface for the field rules and schemas found in the schema.py file
+
+import unittest
+from decimal import Decimal
+from accounts import *
+from schema import *
+from user import USER_SCHEMA
+
+# Test the field rules
+class TestRules(unittest.TestCase):
+    # Test the Text rule against the messages of validateString and validateAlnumString
+    def test_text(self):
+        rule = Text("Origin", 5, error=TransactionError, prefix="Transaction Error")
+        alnum = Text("Account ID", 5, alnum=True, error=AccountError, prefix="Account ID Error")
+        self.assertEqual(rule("ab c"), "ab c")
+        for value, message in [(5, "Origin must be a string"), ("", "Origin cannot be empty"),
+                               ("abcdef", "Origin must be less than 5 characters long")]:
+            with self.assertRaises(TransactionError) as context:
+                rule(value)
+            self.assertEqual(str(context.exception), f"Transaction Error: {message}")
+            with self.assertRaises(InputError) as expected:
+                validateString(value, "Origin", 5)
+            self.assertEqual(str(expected.exception), message)
+        with self.assertRaises(AccountError) as context:
+            alnum("ab c")
+        self.assertEqual(str(context.exception), "Account ID Error: Account ID must be alphanumeric")
+        optional = Text("Origin", 5, optional=True, error=TransactionError, prefix="Transaction Error")
+        self.assertIsNone(optional(""))
+        self.assertIsNone(optional(None))
+    # Test the Choice rule with a code table and with a list of values
+    def test_choice(self):
+        codes = Choice("Deposit Method", DEPOSIT_METHOD_CODES, "Invalid deposit method", error=DepositError, prefix="Deposit Error")
+        self.assertEqual(codes("Check"), DEPOSIT_METHOD_CODES["Check"])
+        for value in ["Crypto", 5, None, ["Cash"]]:
+            with self.assertRaises(DepositError) as context:
+                codes(value)
+            self.assertEqual(str(context.exception), "Deposit Error: Invalid deposit method")
+        values = Choice("Role", VALID_ROLES, "Invalid role", error=ValueError)
+        self.assertEqual(values("admin"), "admin")
+        with self.assertRaises(ValueError) as context:
+            values("owner")
+        self.assertEqual(str(context.exception), "Invalid role")
+        text = Choice("Transaction Type", TRANSACTION_TYPE_CODES, "Invalid Transaction Type", text=True, error=TransactionError,
+                      prefix="Transaction Error")
+        for value, message in [(5, "Transaction Type must be a string"), ("", "Transaction Type cannot be empty"),
+                               ("Refund", "Invalid Transaction Type")]:
+            with self.assertRaises(TransactionError) as context:
+                text(value)
+            self.assertEqual(str(context.exception), f"Transaction Error: {message}")
+    # Test the Amount rule against validateMoney, validatePositiveMoney, and validateNonNegativeMoney
+    def test_amount(self):
+        rules = [(Amount("Amount", error=InputError), validateMoney), (Amount("Amount", "positive", error=InputError), validatePositiveMoney),
+                 (Amount("Amount", "nonNegative", error=InputError), validateNonNegativeMoney)]
+        values = [12.5, 0.1 + 0.2, 1.005, -3.0, 0.0, 7, 0, Decimal("2.675"), Money("4.20"), float("nan"), float("inf"),
+                  1e20, True, "12.50", None]
+        for rule, validate in rules:
+            for value in values:
+                try: expected = validate(value, "Amount").cents
+                except InputError as e: expected = str(e)
+                try: actual = rule(value)
+                except InputError as e: actual = str(e)
+                self.assertEqual(actual, expected, (rule.minimum, value))
+        with self.assertRaises(ValueError):
+            Amount("Amount", "negative")
+    # Test the Digits rule
+    def test_digits(self):
+        rule = Digits("Routing Number", 9, error=TransferError, prefix="Transfer Error")
+        self.assertEqual(rule("123456789"), "123456789")
+        for value, message in [(123456789, "must be a string"), ("12345678", "must be 9 digits"), ("12345678a", "must be numeric")]:
+            with self.assertRaises(TransferError) as context:
+                rule(value)
+            self.assertEqual(str(context.exception), f"Transfer Error: Routing Number {message}")
+    # Test that the base class can not be used, or extended without implementing _compile
+    def test_abstract_rule(self):
+        class Incomplete(Rule):
+            pass
+        for ruleClass in (Rule, Incomplete):
+            with self.assertRaises(TypeError):
+                ruleClass("Label")
+
+# Test the Schema class
+class TestSchema(unittest.TestCase):
+    # Test a compiled validator, including per-rule error types
+    def test_compile(self):
+        validate = ACCOUNT_SCHEMA.compile()
+        self.assertEqual(validate("Timm0001", 10.00), ("Timm0001", 1000))
+        self.assertEqual(validate(accountID="Timm0001", initialDeposit=Money("0.01")), ("Timm0001", 1))
+        with self.assertRaises(AccountError):
+            validate("Timm 0001", 10.00)
+        with self.assertRaises(DepositError) as context:
+            validate("Timm0001", 0.00)
+        self.assertEqual(str(context.exception), "Initial Deposit Error: Initial Deposit must be greater than 0")
+        for args, named in [(("Timm0001",), {}), (("Timm0001", 10.00, 1), {}), (("Timm0001", 10.00), {"accountID": "Timm0001"}),
+                            (("Timm0001",), {"balance": 10.00})]:
+            with self.assertRaises(TypeError):
+                validate(*args, **named)
+        self.assertEqual(ACCOUNT_SCHEMA.compile("initialDeposit")(1), (100,))
+    # Test that extended schemas keep the rules and error types of the schemas they extend
+    def test_extend(self):
+        self.assertEqual(list(EXTERNAL_TRANSFER_SCHEMA.rules), ["amount", "transactionType", "fee", "origin", "description",
+                                                                "destinationAccountID", "destinationRoutingNumber", "destinationBank"])
+        self.assertIs(EXTERNAL_TRANSFER_SCHEMA["amount"].error, TransactionError)
+        self.assertIs(EXTERNAL_TRANSFER_SCHEMA["destinationBank"].error, TransferError)
+        self.assertIs(USER_SCHEMA["role"].error, ValueError)
+        self.assertEqual(USER_SCHEMA["firstName"].prefix, "Invalid Name")
+    # Test validating many rows without raising
+    def test_validate_many(self):
+        rows = [{"amount": 10.00, "transactionType": "Deposit", "fee": 0.00, "origin": None, "description": "Payroll", "depositMethod": "Cash"},
+                {"amount": "ten", "transactionType": "Deposit", "fee": -1.00, "origin": "", "description": "x" * 101, "depositMethod": "Crypto"},
+                {"amount": 10.00, "transactionType": "Refund", "depositMethod": "Cash"},
+                "not a row"]
+        self.assertEqual(DEPOSIT_SCHEMA.validateMany(rows), [
+            (),
+            ("amount:money", "fee:nonNegative", "description:length", "depositMethod:choice"),
+            ("transactionType:choice", "fee:missing", "origin:missing", "description:missing"),
+            ("row:type",)])
+        self.assertEqual(DEPOSIT_SCHEMA.validateMany(iter([])), [])
+    # Test that any field name can be compiled, including keywords, and that fields the schema does not have are rejected
+    def test_invalid_field(self):
+        self.assertEqual(Schema(ValueError, None, **{"not a name": Text("Name", 5)}).compile()("Jack"), ("Jack",))
+        validate = Schema(ValueError, None, **{"class": Text("Class", 5), "from": Text("From", 5)}).compile()
+        self.assertEqual(validate("A", **{"from": "B"}), ("A", "B"))
+        with self.assertRaises(KeyError):
+            ACCOUNT_SCHEMA.compile("balance")
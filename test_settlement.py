@@ -0,0 +1,144 @@
+# Jack Timmons, 27 Dec 2024, Winter Break
+# The purpose of this program is to provide users with a simulated bank managment interface, gaining
+# expierence with OOP, full-stack development, and my first expierence creating both a local GUI and
+# web-based application
+
+# The purpose of this file is to contain the test interface for the settlement pipeline found in the settlement.py file
+
+import os
+import tempfile
+import unittest
+from datetime import datetime, date, time
+from accounts import *
+from settlement import *
+
+# Returns an external transfer to the passed routing number, made at the passed time
+def makeTransfer(routingNumber: str, amount: float, timeStamp: datetime, destinationAccountID: str = "Smit0001") -> ExternalTransfer:
+    transfer = ExternalTransfer("TimmonsJ1996", "Timm0001", destinationAccountID, routingNumber, "First Bank", amount)
+    transfer._timeStamp = timeStamp
+    return transfer
+
+# Test the routing number and settlement window functions
+class TestSettlementFunctions(unittest.TestCase):
+    # Test routing number check digits
+    def test_valid_routing_number(self):
+        for routingNumber in ["021000021", "011000015", "121000248"]:
+            self.assertTrue(validRoutingNumber(routingNumber))
+        for routingNumber in ["123456789", "02100002", "0210000210", "02100002a", 21000021, None, "٠٢١٠٠٠٠٢١"]:
+            self.assertFalse(validRoutingNumber(routingNumber))
+    # Test that transfers fall in the first window closing at or after them
+    def test_settlement_window(self):
+        day = date(2025, 1, 6)
+        for moment, window in [(time(9, 0), datetime(2025, 1, 6, 10, 30)), (time(10, 30), datetime(2025, 1, 6, 10, 30)),
+                               (time(10, 31), datetime(2025, 1, 6, 14, 45)), (time(17, 0), datetime(2025, 1, 7, 10, 30))]:
+            self.assertEqual(settlementWindow(datetime.combine(day, moment)), window)
+
+# Test the SettlementQueue class
+class TestSettlementQueue(unittest.TestCase):
+    def setUp(self):
+        self.queue = SettlementQueue()
+        self.morning = datetime(2025, 1, 6, 9, 0)
+        self.afternoon = datetime(2025, 1, 6, 12, 0)
+
+    # Test that transfers are grouped by window and routing number
+    def test_grouping(self):
+        first = makeTransfer("121000248", 10.00, self.morning)
+        second = makeTransfer("021000021", 20.00, self.morning)
+        third = makeTransfer("121000248", 30.00, self.morning)
+        later = makeTransfer("121000248", 40.00, self.afternoon)
+        self.assertEqual(self.queue.enqueueMany([first, second, third, later]), 4)
+        self.assertEqual(self.queue.pending, 4)
+        self.assertEqual(self.queue.windows(), [datetime(2025, 1, 6, 10, 30), datetime(2025, 1, 6, 14, 45)])
+        self.assertEqual(self.queue.due(datetime(2025, 1, 6, 11, 0)), [datetime(2025, 1, 6, 10, 30)])
+        batches = self.queue.take(datetime(2025, 1, 6, 10, 30))
+        self.assertEqual(batches, [("021000021", [second]), ("121000248", [first, third])])
+        self.assertEqual(self.queue.pending, 1)
+        self.queue.restore(datetime(2025, 1, 6, 10, 30), batches)
+        self.assertEqual(self.queue.pending, 4)
+    # Test transfers that cannot be settled
+    def test_enqueue_invalid(self):
+        transfer = makeTransfer("121000248", 10.00, self.morning)
+        self.queue.enqueue(transfer)
+        for record in [transfer, InternalTransfer("TimmonsJ1996", "Timm0001", "Timm0002", 10.00),
+                       makeTransfer("123456789", 10.00, self.morning), makeTransfer("121000248", 10.00, self.morning, "A" * 18),
+                       makeTransfer("121000248", 0.00, self.morning), makeTransfer("121000248", 100_000_000.00, self.morning)]:
+            with self.assertRaises(SettlementError):
+                self.queue.enqueue(record)
+        self.assertEqual(self.queue.pending, 1)
+        for cutoffs in [[], [10], "10:30"]:
+            with self.assertRaises(SettlementError):
+                SettlementQueue(cutoffs)
+
+# Test the NachaWriter class
+class TestNachaWriter(unittest.TestCase):
+    def setUp(self):
+        self.writer = NachaWriter("011000015", "First Origin Bank", "Timmons Bank", "1234567890")
+        self.created = datetime(2025, 1, 6, 10, 31)
+        self.batches = [("021000021", [makeTransfer("021000021", 20.00, self.created)]),
+                        ("121000248", [makeTransfer("121000248", 10.00, self.created), makeTransfer("121000248", 30.05, self.created)])]
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    # Test the layout of every record and the batch and file totals
+    def test_records(self):
+        records = list(self.writer.records(self.batches, date(2025, 1, 6), self.created))
+        self.assertEqual(len(records), 10)
+        self.assertTrue(all(len(record) == RECORD_LENGTH for record in records))
+        self.assertEqual([record[0] for record in records], list("1568566899"))
+        self.assertEqual(records[0][:40], "101 011000015 0110000152501061031A094101")
+        self.assertEqual(records[1][50:53] + records[1][69:75], "PPD250106")
+        entry = records[6]
+        self.assertEqual((entry[1:3], entry[3:11], entry[11], entry[12:29].rstrip(), entry[29:39]), ("22", "12100024", "8", "SMIT0001", "0000003005"))
+        self.assertEqual(entry[79:94], "011000010000003")
+        control = records[7]
+        self.assertEqual((control[4:10], control[10:20], control[32:44]), ("000002", "0024200048", "000000004005"))
+        fileControl = records[8]
+        self.assertEqual((fileControl[1:7], fileControl[7:13], fileControl[13:21], fileControl[21:31], fileControl[43:55]),
+                         ("000002", "000001", "00000003", "0026300050", "000000006005"))
+        self.assertEqual(records[9:], ["9" * RECORD_LENGTH])
+        self.assertEqual(self.writer.totals, FileTotals(2, 1, 3, 26300050, 0, 6005))
+    # Test that transfers are read one at a time as records are produced, so a batch is never held whole
+    def test_streaming(self):
+        read = []
+        def transfers():
+            for index in range(3):
+                read.append(index)
+                yield makeTransfer("121000248", 1.00, self.created)
+        records = self.writer.records([("121000248", transfers())], date(2025, 1, 6), self.created)
+        next(records), next(records), next(records)
+        self.assertEqual(read, [0])
+        self.assertIsNone(self.writer.totals)
+        self.assertEqual(len(list(records)), 7)
+        self.assertEqual(self.writer.totals.entryCount, 3)
+    # Test writing a file, and that a transfer in the wrong batch leaves no file behind
+    def test_write(self):
+        path = os.path.join(self.directory.name, "settlement.ach")
+        totals = self.writer.write(path, self.batches, date(2025, 1, 6), self.created)
+        with open(path) as file:
+            self.assertEqual(file.read().splitlines(), list(self.writer.records(self.batches, date(2025, 1, 6), self.created)))
+        self.assertEqual(totals.totalCredit, 6005)
+        with self.assertRaises(SettlementError):
+            self.writer.write(path + "2", [("021000021", self.batches[1][1])], date(2025, 1, 6))
+        self.assertEqual(os.listdir(self.directory.name), ["settlement.ach"])
+    # Test exporting the due windows of a queue, one file each
+    def test_export_due(self):
+        queue = SettlementQueue()
+        queue.enqueueMany(transfer for _, transfers in self.batches for transfer in transfers)
+        queue.enqueue(makeTransfer("021000021", 5.00, datetime(2025, 1, 6, 15, 0)))
+        exported = queue.exportDue(self.writer, self.directory.name, datetime(2025, 1, 6, 15, 0))
+        self.assertEqual([(os.path.basename(path), totals.entryCount) for path, totals in exported],
+                         [("settlement-20250106-1445.ach", 3)])
+        self.assertEqual(queue.pending, 1)
+        with self.assertRaises(FileNotFoundError):
+            queue.exportDue(self.writer, os.path.join(self.directory.name, "missing"), datetime(2025, 1, 7))
+        self.assertEqual(queue.pending, 1)
+    # Test invalid writer settings
+    def test_invalid_settings(self):
+        for arguments in [("123456789", "Bank", "Company", "1"), ("011000015", "", "Company", "1"),
+                          ("011000015", "Bank", "Company", "12345678901")]:
+            with self.assertRaises(SettlementError):
+                NachaWriter(*arguments)
+        with self.assertRaises(SettlementError):
+            NachaWriter("011000015", "Bank", "Company", "1", fileIDModifier="AB")
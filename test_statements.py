@@ -0,0 +1,87 @@
+# Jack Timmons, 27 Dec 2024, Winter Break
+# The purpose of this program is to provide users with a simulated bank managment interface, gaining
+# expierence with OOP, full-stack development, and my first expierence creating both a local GUI and
+# web-based application
+
+# The purpose of this file is to contain the test interface for the statement export found in the statements.py file
+
+import csv
+import io
+import json
+import os
+import tempfile
+import unittest
+from datetime import datetime
+from unittest.mock import patch
+from accounts import *
+from ledger import ColumnarLedger
+from statements import *
+
+# Test the statement export
+class TestStatements(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.validUserID = "TimmonsJ1996"
+        self.account = Account("Timm0001", self.validUserID, 100.00)
+        self.postHistory(self.account)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    # Posts a deposit, withdrawal, and transfer on each of three days
+    def postHistory(self, account: Account) -> None:
+        other = Account("Timm0002", self.validUserID, 10.00)
+        with patch("accounts.datetime") as mockDateTime:
+            mockDateTime.now.side_effect = [datetime(2024, 1, day, hour) for day in range(1, 4) for hour in (9, 10, 11, 11)]
+            for day in range(1, 4):
+                account.makeDeposit(self.validUserID, 10.00 * day, "Cash", origin="XYZ Corporation", description="Payroll")
+                account.makeWithdrawal(self.validUserID, 2.50, "Wire", fee=1.00)
+                account.transferTo(other, self.validUserID, 1.00)
+
+    # Test the rows of a date range, with the running balance
+    def test_statement_rows(self):
+        for ledger in (None, ColumnarLedger()):
+            account = Account("Timm0001", self.validUserID, 100.00, ledger)
+            self.postHistory(account)
+            rows = list(statementRows(account, datetime(2024, 1, 2), datetime(2024, 1, 3, 10), pageSize=2))
+            self.assertEqual([(row["transactionType"], row["method"], row["amount"], row["balance"]) for row in rows],
+                             [("Deposit", "Cash", "20.00", "125.50"), ("Withdrawal", "Wire", "2.50", "122.00"),
+                              ("Intra-Transfer", None, "1.00", "121.00"), ("Deposit", "Cash", "30.00", "151.00"),
+                              ("Withdrawal", "Wire", "2.50", "147.50")])
+            self.assertEqual(rows[1]["fee"], "1.00")
+            self.assertEqual(rows[0]["timeStamp"], "2024-01-02T09:00:00")
+            self.assertEqual((rows[0]["origin"], rows[0]["description"]), ("XYZ Corporation", "Payroll"))
+            self.assertEqual(rows[2]["destinationAccountID"], "Timm0002")
+            self.assertEqual(list(rows[0]), STATEMENT_FIELDS)
+            whole = list(statementRows(account))
+            self.assertEqual(len(whole), 9)
+            self.assertEqual(whole[-1]["balance"], str(account.balance))
+    # Test the CSV statement, written to a path and to an open file
+    def test_write_csv(self):
+        path = os.path.join(self.directory.name, "statement.csv")
+        self.assertEqual(writeStatementCSV(self.account, path, datetime(2024, 1, 3)), 3)
+        with open(path, newline="") as file:
+            rows = list(csv.DictReader(file))
+        self.assertEqual([row["amount"] for row in rows], ["30.00", "2.50", "1.00"])
+        self.assertEqual(rows[2]["method"], "")
+        output = io.StringIO()
+        self.assertEqual(writeStatementCSV(self.account, output, end=datetime(2023, 12, 31)), 0)
+        self.assertEqual(output.getvalue(), ",".join(STATEMENT_FIELDS) + "\n")
+    # Test the JSON lines statement
+    def test_write_json_lines(self):
+        path = os.path.join(self.directory.name, "statement.jsonl")
+        self.assertEqual(writeStatementJSONLines(self.account, path), 9)
+        with open(path) as file:
+            rows = [json.loads(line) for line in file]
+        self.assertEqual(rows, list(statementRows(self.account)))
+        self.assertIsNone(rows[2]["method"])
+    # Test that an invalid statement leaves no file behind
+    def test_invalid(self):
+        path = os.path.join(self.directory.name, "statement.csv")
+        with self.assertRaises(AccountError):
+            writeStatementCSV(self.account, path, datetime(2024, 1, 3), datetime(2024, 1, 2))
+        with self.assertRaises(AccountError):
+            writeStatementJSONLines(self.account, path, pageSize=0)
+        with self.assertRaises(AccountError):
+            statementRows("Timm0001")
+        self.assertEqual(os.listdir(self.directory.name), [])
@@ -6,6 +6,7 @@
 # The purpose of this file is to contain the test interface for the user class and its derived customer
 # and admin classes
 
+import asyncio
 import unittest
 import pytest
 from passlib.hash import bcrypt
@@ -224,7 +225,69 @@ class TestUser(unittest.TestCase):
         with self.assertRaises(TypeError, msg = "Password must be a string"):
             self.validUser.changePassword("J@cksPassword1234", 12345)
     
+    # Test the async password methods
+    def test_password_async(self):
+        async def scenario():
+            self.assertTrue(await self.validUser.checkPasswordAsync("J@cksPassword1234"))
+            self.assertFalse(await self.validUser.checkPasswordAsync("J@cksPassword12345"))
+            with self.assertRaises(InvalidPasswordError):
+                await self.validUser.changePasswordAsync("J@cksPassword12345", "J@cksNewPassword1234")
+            with self.assertRaises(InvalidPasswordError):
+                await self.validUser.changePasswordAsync("J@cksPassword1234", "pass")
+            await self.validUser.changePasswordAsync("J@cksPassword1234", "J@cksNewPassword1234")
+        asyncio.run(scenario())
+        self.assertTrue(self.validUser.checkPassword("J@cksNewPassword1234"))
+
+    # Test that a hash made under an older policy is replaced after a successful login
+    def test_rehash_on_login(self):
+        previous = PasswordService.setPolicy(PasswordPolicy("pbkdf2", pbkdf2Iterations=1000))
+        try:
+            oldHash = self.validUser.hashedPassword
+            self.assertFalse(self.validUser.checkPassword("J@cksPassword12345"))
+            self.assertEqual(self.validUser.hashedPassword, oldHash)
+            self.assertTrue(self.validUser.checkPassword("J@cksPassword1234"))
+            self.assertTrue(self.validUser.hashedPassword.startswith("$pbkdf2-sha256$1000$"))
+            self.assertTrue(self.validUser.checkPassword("J@cksPassword1234"))
+            PasswordService.setPolicy(PasswordPolicy("pbkdf2", pbkdf2Iterations=2000))
+            self.assertTrue(asyncio.run(self.validUser.checkPasswordAsync("J@cksPassword1234")))
+            self.assertTrue(self.validUser.hashedPassword.startswith("$pbkdf2-sha256$2000$"))
+        finally:
+            PasswordService.setPolicy(previous)
+
     # Test __str__ method
     def test_str(self):
         # Check that the string representation of the user is correct
         self.assertEqual(str(self.validUser), f"User ID: Timmons001\nName: Jack Timmons\nEmail: jacktimmonsemail@gmail.com\nRole: customer\nDOB: 03/27/1996")
+
+# Test the customer class
+class TestCustomer(unittest.TestCase):
+    # Create a customer with two accounts for testing- restored, so no password is hashed
+    def setUp(self):
+        self.customer = Customer.restore("TimmonsJ1996", "hashedPassword", "Jack", "Timmons", date(1996, 3, 27), "jacktimmonsemail@gmail.com")
+        self.customer.addAccount(Account("Timm0001", "TimmonsJ1996", 100.00))
+        self.customer.addAccount(Account("Timm0002", "TimmonsJ1996", 10.00))
+
+    # Test a transfer between the customer's accounts
+    def test_transfer(self):
+        debit, credit = self.customer.transfer("Timm0002", "Timm0001", 7.50, description="Savings")
+        accounts = self.customer.accounts
+        self.assertEqual((accounts["Timm0001"].balance, accounts["Timm0002"].balance), (107.50, 2.50))
+        self.assertEqual((debit.userID, debit.accountID, debit.destinationAccountID), ("TimmonsJ1996", "Timm0002", "Timm0001"))
+        self.assertEqual((credit.accountID, credit.depositMethod), ("Timm0001", "Transfer"))
+        self.assertEqual((debit.origin, credit.origin), (credit.transactionID, debit.transactionID))
+    # Test transfers with accounts the customer does not have, to the same account, and beyond the balance
+    def test_transfer_invalid(self):
+        with self.assertRaises(AccountError):
+            self.customer.transfer("Timm0001", "Smit0001", 1.00)
+        with self.assertRaises(AccountError):
+            self.customer.transfer("Smit0001", "Timm0001", 1.00)
+        with self.assertRaises(TransferError):
+            self.customer.transfer("Timm0001", "Timm0001", 1.00)
+        with self.assertRaises(TransferError):
+            self.customer.transfer("Timm0002", "Timm0001", 10.01)
+        for amount in [-1.00, 0.00]:
+            with self.assertRaises(TransferError):
+                self.customer.transfer("Timm0001", "Timm0002", amount)
+        accounts = self.customer.accounts
+        self.assertEqual((accounts["Timm0001"].balance, accounts["Timm0002"].balance), (100.00, 10.00))
+        self.assertEqual(len(accounts["Timm0001"].transactions) + len(accounts["Timm0002"].transactions), 0)
@@ -6,6 +6,9 @@
 # The purpose of this file is to contain the test interface for the reusable utility functions found in
 # the utilities.py file
 
+import asyncio
+import threading
+import time
 import unittest
 from user import *
 from utilities import *
@@ -49,4 +52,104 @@ class TestPasswordService(unittest.TestCase):
         with self.assertRaises(InvalidPasswordError):
             PasswordService.validatePassword("Password!")
         with self.assertRaises(InvalidPasswordError):
-            PasswordService.validatePassword("Password 123!")
\ No newline at end of file
+            PasswordService.validatePassword("Password 123!")
+    # Test the async hash and check functions
+    def test_password_async(self):
+        async def scenario():
+            hashedPassword = await PasswordService.hashPasswordAsync("Password123!")
+            results = await asyncio.gather(*(PasswordService.checkPasswordAsync(password, hashedPassword)
+                                             for password in ("Password123!", "Password123?", "Password123!")))
+            self.assertEqual(results, [True, False, True])
+        asyncio.run(scenario())
+    # Test setting an invalid executor
+    def test_set_executor_invalid(self):
+        with self.assertRaises(TypeError):
+            PasswordService.setExecutor(None)
+
+# Test PasswordPolicy class
+class TestPasswordPolicy(unittest.TestCase):
+    # Test that each scheme hashes and verifies passwords
+    def test_schemes(self):
+        for policy in (PasswordPolicy("bcrypt", bcryptRounds=4), PasswordPolicy("scrypt", scryptCost=2 ** 10),
+                       PasswordPolicy("pbkdf2", pbkdf2Iterations=1000)):
+            hashedPassword = policy.hash("Password123!")
+            self.assertTrue(policy.verify("Password123!", hashedPassword))
+            self.assertFalse(policy.verify("Password123?", hashedPassword))
+            self.assertFalse(policy.needsRehash(hashedPassword))
+        self.assertTrue(PasswordPolicy("scrypt").hash("Password123!").startswith("$scrypt$n=16384,r=8,p=1$"))
+        self.assertTrue(PasswordPolicy("pbkdf2").hash("Password123!").startswith("$pbkdf2-sha256$600000$"))
+    # Test that hashes made with another scheme or cost need a rehash but still verify
+    def test_needs_rehash(self):
+        policy = PasswordPolicy("bcrypt", bcryptRounds=5)
+        for old in (PasswordPolicy("bcrypt", bcryptRounds=4), PasswordPolicy("pbkdf2", pbkdf2Iterations=1000),
+                    PasswordPolicy("scrypt", scryptCost=2 ** 10)):
+            hashedPassword = old.hash("Password123!")
+            self.assertTrue(policy.needsRehash(hashedPassword))
+            self.assertTrue(policy.verify("Password123!", hashedPassword))
+        self.assertTrue(PasswordPolicy("pbkdf2", pbkdf2Iterations=2000).needsRehash(PasswordPolicy("pbkdf2", pbkdf2Iterations=1000).hash("Password123!")))
+    # Test that calibration picks a cost within the target
+    def test_calibrate(self):
+        policy = PasswordPolicy.calibrate(targetMillis=20, scheme="pbkdf2")
+        self.assertEqual(policy.scheme, "pbkdf2")
+        self.assertGreaterEqual(policy.cost, 1000)
+        policy = PasswordPolicy.calibrate(targetMillis=1, scheme="bcrypt")
+        self.assertEqual(policy.scheme, "bcrypt")
+        self.assertLessEqual(policy.cost, 6)
+    # Test invalid settings and hashes
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            PasswordPolicy("md5")
+        with self.assertRaises(ValueError):
+            PasswordPolicy(bcryptRounds=3)
+        with self.assertRaises(ValueError):
+            PasswordPolicy(scryptCost=1000)
+        with self.assertRaises(ValueError):
+            PasswordPolicy(pbkdf2Iterations=0)
+        with self.assertRaises(ValueError):
+            PasswordPolicy().verify("Password123!", "$md5$abc")
+        with self.assertRaises(ValueError):
+            PasswordPolicy().needsRehash("$scrypt$n=abc$$")
+
+# Test BoundedExecutor class
+class TestBoundedExecutor(unittest.TestCase):
+    def setUp(self):
+        self.executor = BoundedExecutor(workers=1, maxPending=2)
+        self.release = threading.Event()
+
+    def tearDown(self):
+        self.release.set()
+        self.executor.shutdown()
+
+    # Test that tasks run and return their results
+    def test_submit(self):
+        self.assertEqual(self.executor.submit(pow, 2, 10).result(), 1024)
+        self.assertEqual(asyncio.run(self.executor.run(pow, 2, 8)), 256)
+        self.assertEqual(self.executor.pending, 0)
+    # Test that a full executor blocks and then rejects new tasks
+    def test_backpressure(self):
+        blocked = [self.executor.submit(self.release.wait) for _ in range(2)]
+        with self.assertRaises(ExecutorBusyError):
+            self.executor.submit(pow, 2, 2, timeout=0.05)
+        with self.assertRaises(ExecutorBusyError):
+            asyncio.run(self.executor.run(pow, 2, 2, timeout=0.05))
+        self.release.set()
+        self.assertTrue(all(future.result() for future in blocked))
+        self.assertEqual(self.executor.submit(pow, 2, 2, timeout=1).result(), 4)
+    # Test that waiting coroutines run once slots free up, without blocking the event loop
+    def test_async_waiters(self):
+        async def scenario():
+            blocked = [asyncio.ensure_future(self.executor.run(self.release.wait)) for _ in range(2)]
+            waiting = [asyncio.ensure_future(self.executor.run(pow, 2, i)) for i in range(5)]
+            await asyncio.sleep(0.05)
+            self.assertFalse(any(task.done() for task in waiting))
+            self.release.set()
+            self.assertEqual(await asyncio.gather(*waiting), [1, 2, 4, 8, 16])
+            await asyncio.gather(*blocked)
+        asyncio.run(scenario())
+        self.assertEqual(self.executor.pending, 0)
+    # Test constructor with invalid settings
+    def test_invalid_settings(self):
+        with self.assertRaises(ValueError):
+            BoundedExecutor(workers=0)
+        with self.assertRaises(ValueError):
+            BoundedExecutor(maxPending=-1)
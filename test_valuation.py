@@ -0,0 +1,118 @@
+# Jack Timmons, 27 Dec 2024, Winter Break
+# The purpose of this program is to provide users with a simulated bank managment interface, gaining
+# expierence with OOP, full-stack development, and my first expierence creating both a local GUI and
+# web-based application
+
+# The purpose of this file is to contain the test interface for the portfolio valuation engine found in the
+# valuation.py file
+
+import os
+import tempfile
+import unittest
+from random import Random
+import numpy as np
+import valuation
+from accounts import *
+from valuation import *
+
+# Test the PriceTable class
+class TestPriceTable(unittest.TestCase):
+    # Test building a table, and loading one from a CSV file
+    def test_price_table(self):
+        table = PriceTable({"AAPL": 187.25, "bnd": 72.0, "GOOG": 0.0005}, {"AAPL": "Equity", "BND": "Bond"})
+        self.assertEqual((table.symbols, table.assetClasses, len(table)), (["AAPL", "BND", "GOOG"], ["Equity", "Bond", "Unclassified"], 3))
+        self.assertEqual((table.price("AAPL"), table.price("GOOG"), table.price("MSFT")), (187.25, 0.0005, None))
+        self.assertEqual((table.assetClass("BND"), table.assetClass("MSFT")), ("Bond", None))
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "prices.csv")
+            with open(path, "w") as file:
+                file.write("symbol,price,assetClass\nAAPL,187.25,Equity\nvti,250.10,\n")
+            table = PriceTable.fromCSV(path)
+            self.assertEqual((table.symbols, table.price("VTI"), table.assetClass("VTI")), (["AAPL", "VTI"], 250.1, "Unclassified"))
+            for contents in ["symbol,cost\nAAPL,1\n", "symbol,price\nAAPL,1\naapl,2\n", "symbol,price\nAAPL,one\n",
+                             "symbol,price\nAAPL,-1\n", "symbol,price\n!!,1\n", ""]:
+                with open(path, "w") as file:
+                    file.write(contents)
+                with self.assertRaises(InvestmentError):
+                    PriceTable.fromCSV(path)
+        for prices, classes in [({"AAPL": True}, None), ({"AAPL": float("inf")}, None), ({"AAPL": 1.0}, {"AAPL": "Cash"}),
+                                ({"AAPL": 1.0, "aapl": 2.0}, None), ([("AAPL", 1.0)], None)]:
+            with self.assertRaises(InvestmentError):
+                PriceTable(prices, classes)
+
+# Test the valuePortfolios function
+class TestValuePortfolios(unittest.TestCase):
+    def setUp(self):
+        self.validUserID = "TimmonsJ1996"
+        self.prices = PriceTable({"AAPL": 187.25, "MSFT": 401.333, "BND": 72.10, "VTI": 250.00},
+                                 {"AAPL": "Equity", "MSFT": "Equity", "BND": "Bond", "VTI": "Fund"})
+
+    # Opens investment accounts holding random positions, some in symbols that are not priced
+    def openAccounts(self, count: int, random: Random) -> list[InvestmentAccount]:
+        accounts = []
+        for index in range(count):
+            account = InvestmentAccount(f"Inve{index:04d}", self.validUserID, random.choice([0.01, 500.00, 12_345.67]))
+            symbols = random.sample(["AAPL", "MSFT", "BND", "VTI", "NOPE"], random.randrange(0, 5))
+            account.restorePositions([(symbol, random.randrange(1, 10_000) / 8, random.randrange(0, 5_000_000) / 100)
+                                      for symbol in symbols])
+            accounts.append(account)
+        return accounts
+
+    # Test that every account's valuation matches valuing its positions one at a time
+    def test_matches_positions(self):
+        accounts = self.openAccounts(50, Random(24))
+        result = valuePortfolios(accounts + [Account("Timm0001", self.validUserID, 10.00)], self.prices)
+        self.assertEqual(result.accountIDs, [account.accountID for account in accounts])
+        self.assertEqual(result.assetClasses, ["Equity", "Bond", "Fund", "Cash"])
+        totals = [0.0] * 4
+        for row, account in enumerate(accounts):
+            byClass = {"Equity": 0.0, "Bond": 0.0, "Fund": 0.0, "Cash": account.balance.cents}
+            cost, unpriced = 0, 0
+            for position in account.positions:
+                price = self.prices.price(position.symbol)
+                if price is None:
+                    unpriced += 1
+                    continue
+                byClass[self.prices.assetClass(position.symbol)] += position.quantity * price * 100
+                cost += position.costBasis.cents
+            marketValue = round(byClass["Equity"] + byClass["Bond"] + byClass["Fund"])
+            self.assertEqual((result.cash[row], result.marketValue[row]), (account.balance.cents, marketValue))
+            self.assertEqual((result.costBasis[row], result.unrealizedGain[row]), (cost, marketValue - cost))
+            self.assertEqual(result.unpriced[row], unpriced)
+            total = sum(byClass.values())
+            for column, assetClass in enumerate(result.assetClasses):
+                self.assertAlmostEqual(result.allocation[row, column], byClass[assetClass] / total)
+                totals[column] += byClass[assetClass]
+            self.assertAlmostEqual(result.allocation[row].sum(), 1.0)
+        for column in range(4):
+            self.assertAlmostEqual(result.assetClassTotals[column], totals[column], delta=len(accounts))
+    # Test that valuing in chunks gives the same result, and that an empty set of accounts can be valued
+    def test_chunks(self):
+        accounts = self.openAccounts(20, Random(5))
+        original = valuation.VALUATION_CHUNK_SIZE
+        valuation.VALUATION_CHUNK_SIZE = 3
+        try:
+            chunked = valuePortfolios(accounts, self.prices)
+        finally:
+            valuation.VALUATION_CHUNK_SIZE = original
+        whole = valuePortfolios(accounts, self.prices)
+        for chunkedColumn, wholeColumn in zip(chunked, whole):
+            self.assertTrue((np.asarray(chunkedColumn) == np.asarray(wholeColumn)).all())
+        empty = valuePortfolios([], self.prices)
+        self.assertEqual((empty.accountIDs, empty.marketValue.shape, empty.allocation.shape), ([], (0,), (0, 4)))
+        self.assertEqual(empty.assetClassTotals.tolist(), [0, 0, 0, 0])
+        with self.assertRaises(InvestmentError):
+            valuePortfolios(accounts, {"AAPL": 1.0})
+    # Test an account with no positions and no cash
+    def test_empty_account(self):
+        account = InvestmentAccount("Inve0001", self.validUserID, 1.00)
+        account.buy(self.validUserID, "VTI", 0.004, 250.00)
+        result = valuePortfolios([account], self.prices)
+        self.assertEqual((result.marketValue[0], result.cash[0]), (100, 0))
+        self.assertEqual(result.allocation[0].tolist(), [0.0, 0.0, 1.0, 0.0])
+        account.sell(self.validUserID, "VTI", 0.004, 250.00)
+        account.makeWithdrawal(self.validUserID, 1.00, "Cash")
+        self.assertEqual(valuePortfolios([account], self.prices).allocation[0].tolist(), [0.0, 0.0, 0.0, 0.0])
+
+if __name__ == "__main__":
+    unittest.main()
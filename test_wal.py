@@ -0,0 +1,286 @@
+# Jack Timmons, 27 Dec 2024, Winter Break
+# The purpose of this program is to provide users with a simulated bank managment interface, gaining
+# expierence with OOP, full-stack development, and my first expierence creating both a local GUI and
+# web-based application
+
+# The purpose of this file is to contain the test interface for the write-ahead log found in the wal.py file
+
+import os
+import tempfile
+import threading
+import time
+import unittest
+from datetime import date, datetime
+from accounts import *
+from credit import closeCycles
+from interest import accrueInterest
+from ledger import ColumnarLedger
+from wal import *
+
+# Flips the bits of the last byte of the passed open segment file
+def damageLastByte(file) -> None:
+    file.seek(-1, os.SEEK_END)
+    value = file.read(1)[0]
+    file.seek(-1, os.SEEK_END)
+    file.write(bytes([value ^ 0xFF]))
+
+# Test WriteAheadLog class
+class TestWriteAheadLog(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = self.directory.name
+        self.validUserID = "TimmonsJ1996"
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    # Opens an account on the passed log and posts a few deposits and withdrawals to it
+    def postHistory(self, log: WriteAheadLog) -> Account:
+        account = Account("Timm0001", self.validUserID, 100.00, wal=log)
+        account.makeDeposit(self.validUserID, 250.00, "Direct-Deposit", origin="XYZ Corporation", description="Payroll")
+        account.makeWithdrawal(self.validUserID, 50.25, "Cash", fee=2.50)
+        account.postBatch([{"transactionType": "Deposit", "userID": self.validUserID, "amount": 1.00, "method": "Check"},
+                           {"transactionType": "Withdrawal", "userID": self.validUserID, "amount": 2.00, "method": "Wire"}])
+        return account
+
+    # Test that recovery rebuilds accounts exactly
+    def test_recover(self):
+        with WriteAheadLog(self.path) as log:
+            account = self.postHistory(log)
+            other = Account("Smit0001", "SmithJ1990", 10.00, wal=log)
+            other.status = "Frozen"
+        with WriteAheadLog(self.path) as log:
+            accounts = log.recover()
+            self.assertEqual(set(accounts), {"Timm0001", "Smit0001"})
+            recovered = accounts["Timm0001"]
+            self.assertEqual(recovered.balance, account.balance)
+            self.assertEqual(recovered.userID, self.validUserID)
+            self.assertEqual(recovered.dateCreated, account.dateCreated)
+            self.assertEqual([t.transactionID for t in recovered.transactions], [t.transactionID for t in account.transactions])
+            self.assertEqual([t.timeStamp for t in recovered.transactions], [t.timeStamp for t in account.transactions])
+            self.assertEqual(recovered.transactions[0].origin, "XYZ Corporation")
+            self.assertEqual(recovered.transactions[0].depositMethod, "Direct-Deposit")
+            self.assertEqual(recovered.transactions[1].fee, 2.50)
+            self.assertEqual(recovered.transactionsBetween(methods=["Wire"])[0].amount, 2.00)
+            self.assertEqual(accounts["Smit0001"].status, "Frozen")
+            # Recovered accounts keep writing to the log
+            self.assertIs(recovered.wal, log)
+            recovered.makeDeposit(self.validUserID, 5.00, "Cash")
+        with WriteAheadLog(self.path) as log:
+            self.assertEqual(log.recover()["Timm0001"].balance, account.balance + 5)
+    # Test that a credit account opened with a zero balance is recovered as a credit account, with its terms, open
+    # cycle, and last statement
+    def test_recover_credit(self):
+        with WriteAheadLog(self.path) as log:
+            account = CreditAccount("Cred0001", self.validUserID, creditLimit=1_000.00, apr=0.365, statementDay=15,
+                                    minimumPaymentRate=0.02, minimumPaymentFloor=10.00, cycleStart=date(2025, 1, 16),
+                                    wal=log)
+            purchases = [restoreTransaction("Withdrawal", f"P{day}", datetime(2025, 2, day, 12), self.validUserID,
+                                            "Cred0001", 1_000, method="Cash") for day in (6, 20)]
+            log.logPostings(purchases)
+            account.restoreTransactions(purchases)
+            statement = closeCycles([account], date(2025, 2, 15))[0]
+            account.makeDeposit(self.validUserID, 5.00, "Cash")
+        with WriteAheadLog(self.path) as log:
+            recovered = log.recover()["Cred0001"]
+        self.assertIsInstance(recovered, CreditAccount)
+        self.assertEqual((recovered.openingBalance, recovered.balance), (0.00, account.balance))
+        self.assertEqual((recovered.creditLimit, recovered.apr, recovered.statementDay, recovered.minimumPaymentRate,
+                          recovered.minimumPaymentFloor), (1_000.00, 0.365, 15, 0.02, 10.00))
+        self.assertEqual(recovered.lastStatement, statement)
+        self.assertEqual((recovered.cycleStart, recovered._cycleOpening, recovered._dailyChanges),
+                         (date(2025, 2, 16), account._cycleOpening, account._dailyChanges))
+    # Test that savings accounts are recovered as savings accounts, with their interest tiers, compounding, and the
+    # interest accrued by single accounts and by the interest accrual engine
+    def test_recover_savings(self):
+        with WriteAheadLog(self.path) as log:
+            daily = SavingsAccount("Save0001", self.validUserID, 1_234.56, interestRates=[(0, 0.01), (1_000.00, 0.04)], wal=log)
+            monthly = SavingsAccount("Save0002", self.validUserID, 99.99, interestRates=0.03, compounding="monthly", wal=log)
+            accrueInterest([daily, monthly], days=20, post=False)
+            daily.accrueInterest(days=11)
+            monthly.accrueInterest(days=3, post=False)
+            accrueInterest([daily, monthly], days=2)
+        with WriteAheadLog(self.path) as log:
+            recovered = log.recover()
+            for account in (daily, monthly):
+                other = recovered[account.accountID]
+                self.assertIsInstance(other, SavingsAccount)
+                self.assertEqual((other.balance, other.interestTiers, other.compounding, other.accruedInterest),
+                                 (account.balance, account.interestTiers, account.compounding, account.accruedInterest))
+                self.assertGreater(other.accruedInterest, 0)
+                self.assertEqual(len(other.transactionsBetween(methods="Interest")), 2 if account is daily else 1)
+                account.wal = None
+                self.assertEqual(other.accrueInterest(days=30).amount, account.accrueInterest(days=30).amount)
+    # Test that investment accounts are recovered as investment accounts, with the positions left by their trades
+    def test_recover_investment(self):
+        with WriteAheadLog(self.path) as log:
+            account = InvestmentAccount("Inve0001", self.validUserID, 10_000.00, wal=log)
+            account.buy(self.validUserID, "VTI", 12.5, 250.00, fee=1.00)
+            account.buy(self.validUserID, "BND", 30, 72.10)
+            account.sell(self.validUserID, "VTI", 2.25, 260.00)
+            account.sell(self.validUserID, "BND", 30, 73.00)
+            account.buy(self.validUserID, "AAPL", 0.125, 187.25)
+            with self.assertRaises(InvestmentError):
+                account.sell(self.validUserID, "AAPL", 1, 187.25)
+        with WriteAheadLog(self.path) as log:
+            recovered = log.recover()["Inve0001"]
+            self.assertIsInstance(recovered, InvestmentAccount)
+            self.assertEqual(recovered.balance, account.balance)
+            self.assertEqual(recovered.positions, account.positions)
+            self.assertEqual([position.symbol for position in recovered.positions], ["VTI", "AAPL"])
+            recovered.sell(self.validUserID, "VTI", 10.25, 255.00)
+        with WriteAheadLog(self.path) as log:
+            self.assertEqual([position.symbol for position in log.recover()["Inve0001"].positions], ["AAPL"])
+    # Test that a trade that can not be logged leaves the cash and positions unchanged
+    def test_trade_log_failure(self):
+        log = WriteAheadLog(self.path)
+        account = InvestmentAccount("Inve0001", self.validUserID, 1_000.00, wal=log)
+        account.buy(self.validUserID, "VTI", 2, 250.00)
+        log.close()
+        for trade in (account.buy, account.sell):
+            with self.assertRaises(WriteAheadLogError):
+                trade(self.validUserID, "VTI", 1, 250.00)
+        self.assertEqual((account.balance, account.positions), (500.00, [Position("VTI", 2.0, Money("500.00"))]))
+        self.assertEqual(len(account.transactions), 1)
+    # Test recovering into columnar ledgers with other account options
+    def test_recover_with_options(self):
+        with WriteAheadLog(self.path) as log:
+            account = self.postHistory(log)
+        with WriteAheadLog(self.path) as log:
+            recovered = log.recover(ColumnarLedger, checkpointInterval=2)["Timm0001"]
+            self.assertIsInstance(recovered.transactions, ColumnarLedger)
+            self.assertEqual(recovered.checkpointInterval, 2)
+            self.assertEqual(recovered.balance, account.balance)
+    # Test that transfers are logged with their destination details
+    def test_transfer_records(self):
+        with WriteAheadLog(self.path) as log:
+            internal = InternalTransfer(self.validUserID, "Timm0001", "Timm0002", 10.00)
+            external = ExternalTransfer(self.validUserID, "Timm0001", "Smit0001", "123456789", "First Bank", 20.00)
+            log.logPostings([internal, external])
+            records = list(log.readTransactions())
+        self.assertIsInstance(records[0], InternalTransfer)
+        self.assertEqual(records[0].destinationAccountID, "Timm0002")
+        self.assertIsInstance(records[1], ExternalTransfer)
+        self.assertEqual(records[1].destinationRoutingNumber, "123456789")
+        self.assertEqual(records[1].destinationBank, "First Bank")
+        self.assertEqual(records[1].transactionID, external.transactionID)
+    # Test that both legs of a transfer between accounts on the same log are written as one frame, and recovered
+    def test_transfer(self):
+        with WriteAheadLog(self.path) as log:
+            source = Account("Timm0001", self.validUserID, 100.00, wal=log)
+            destination = Account("Timm0002", self.validUserID, 10.00, wal=log)
+            debit, credit = source.transferTo(destination, self.validUserID, 25.00)
+            self.assertEqual(sum(payload[0] == RECORD_POSTINGS for payload in log._payloads()), 1)
+        with WriteAheadLog(self.path) as log:
+            accounts = log.recover()
+        self.assertEqual((accounts["Timm0001"].balance, accounts["Timm0002"].balance), (75.00, 35.00))
+        self.assertEqual(accounts["Timm0001"].transactions[0].origin, credit.transactionID)
+        self.assertEqual(accounts["Timm0002"].transactions[0].origin, debit.transactionID)
+    # Test that a transfer whose records can not be logged posts neither leg, and that transfers between accounts
+    # on different logs are refused
+    def test_transfer_log_failure(self):
+        class FailingLog(WriteAheadLog):
+            def logPostings(self, records):
+                raise OSError("Disk full")
+        with WriteAheadLog(self.path) as log, FailingLog(os.path.join(self.path, "failing")) as failing:
+            source = Account("Timm0001", self.validUserID, 100.00)
+            destination = Account("Timm0002", self.validUserID, 10.00, wal=failing)
+            shared = Account("Timm0003", self.validUserID, 100.00, wal=failing)
+            logged = Account("Timm0004", self.validUserID, 100.00, wal=log)
+            for account, error in [(source, OSError), (shared, OSError), (logged, TransferError)]:
+                with self.assertRaises(error):
+                    account.transferTo(destination, self.validUserID, 50.00)
+            self.assertEqual([account.balance for account in (source, destination, shared, logged)],
+                             [100.00, 10.00, 100.00, 100.00])
+            self.assertEqual([len(account.transactions) for account in (source, destination, shared, logged)], [0, 0, 0, 0])
+            source.transferTo(logged, self.validUserID, 50.00)
+            self.assertEqual((source.balance, logged.balance), (50.00, 150.00))
+    # Test that a frame left incomplete by a crash is discarded and the log can be appended to again
+    def test_torn_tail(self):
+        with WriteAheadLog(self.path) as log:
+            account = self.postHistory(log)
+        segment = os.path.join(self.path, "segment-00000001.wal")
+        size = os.path.getsize(segment)
+        with open(segment, "ab") as file:
+            file.write(b"\x40\x00\x00\x00\x01\x02\x03")
+        with WriteAheadLog(self.path) as log:
+            self.assertEqual(os.path.getsize(segment), size)
+            recovered = log.recover()["Timm0001"]
+            self.assertEqual(recovered.balance, account.balance)
+            recovered.makeDeposit(self.validUserID, 1.00, "Cash")
+        with WriteAheadLog(self.path) as log:
+            self.assertEqual(log.recover()["Timm0001"].balance, account.balance + 1)
+    # Test that a damaged frame at the end of the log drops the whole batch it belongs to
+    def test_damaged_batch(self):
+        with WriteAheadLog(self.path) as log:
+            account = Account("Timm0001", self.validUserID, 100.00, wal=log)
+            account.postBatch([{"transactionType": "Deposit", "userID": self.validUserID, "amount": 1.00, "method": "Cash"}] * 5)
+        segment = os.path.join(self.path, "segment-00000001.wal")
+        with open(segment, "r+b") as file:
+            damageLastByte(file)
+        with WriteAheadLog(self.path) as log:
+            recovered = log.recover()["Timm0001"]
+            self.assertEqual(recovered.balance, 100.00)
+            self.assertEqual(len(recovered.transactions), 0)
+    # Test that damage to a segment before the last one is reported
+    def test_damaged_segment(self):
+        with WriteAheadLog(self.path, segmentSize=256) as log:
+            self.postHistory(log)
+            self.assertGreater(log.segmentCount, 1)
+        with open(os.path.join(self.path, "segment-00000001.wal"), "r+b") as file:
+            damageLastByte(file)
+        with WriteAheadLog(self.path) as log:
+            with self.assertRaises(WriteAheadLogError):
+                log.recover()
+    # Test that segments roll over and are replayed in order
+    def test_segments(self):
+        with WriteAheadLog(self.path, segmentSize=256) as log:
+            account = self.postHistory(log)
+            for _ in range(20):
+                account.makeDeposit(self.validUserID, 1.00, "Cash")
+            segments = log.segmentCount
+        self.assertGreater(segments, 5)
+        with WriteAheadLog(self.path, segmentSize=256) as log:
+            self.assertEqual(log.recover()["Timm0001"].balance, account.balance)
+    # Test every durability level
+    def test_durability_levels(self):
+        for durability in DURABILITY_LEVELS:
+            with tempfile.TemporaryDirectory() as path:
+                with WriteAheadLog(path, durability=durability, intervalMillis=1) as log:
+                    account = self.postHistory(log)
+                with WriteAheadLog(path) as log:
+                    self.assertEqual(log.recover()["Timm0001"].balance, account.balance)
+    # Test that postings made while another thread is syncing are covered by a single fsync
+    def test_group_commit(self):
+        with WriteAheadLog(self.path) as log:
+            accounts = [Account(f"Timm000{i}", self.validUserID, 100.00, wal=log) for i in range(8)]
+            syncs = log.syncCount
+            written = log._written
+            # Hold the sync lock as a syncing thread would, so every posting is written and waiting to be synced
+            with log._syncLock:
+                threads = [threading.Thread(target=account.makeDeposit, args=(self.validUserID, 1.00, "Cash")) for account in accounts]
+                for thread in threads: thread.start()
+                while log._written < written + len(accounts):
+                    time.sleep(0.001)
+            for thread in threads: thread.join()
+            self.assertEqual(log.syncCount - syncs, 1)
+        with WriteAheadLog(self.path) as log:
+            recovered = log.recover()
+            self.assertTrue(all(account.balance == 101.00 for account in recovered.values()))
+    # Test that a posting that cannot be logged leaves the account unchanged
+    def test_closed_log(self):
+        log = WriteAheadLog(self.path)
+        account = Account("Timm0001", self.validUserID, 100.00, wal=log)
+        log.close()
+        with self.assertRaises(WriteAheadLogError):
+            account.makeDeposit(self.validUserID, 1.00, "Cash")
+        self.assertEqual(account.balance, 100.00)
+        self.assertEqual(len(account.transactions), 0)
+    # Test constructor with invalid settings
+    def test_invalid_settings(self):
+        with self.assertRaises(WriteAheadLogError):
+            WriteAheadLog(self.path, durability="never")
+        with self.assertRaises(WriteAheadLogError):
+            WriteAheadLog(self.path, intervalMillis=0)
+        with self.assertRaises(WriteAheadLogError):
+            WriteAheadLog(self.path, segmentSize=4)
@@ -7,10 +7,24 @@
 # and admin classes
 
 from datetime import datetime, date
-from email_validator import validate_email, EmailNotValidError
+from email_validator import EmailNotValidError
+from emails import normalizeEmail
 from utilities import *
 from errors import *
-from accounts import Account
+from accounts import Account, Deposit, InternalTransfer
+from schema import *
+
+# Field rules of users (see schema.py)- the date of birth and password have their own checks
+USER_SCHEMA: Schema = Schema(
+    ValueError, None,
+    email=Text("Email", 100, prefix="Invalid email address"),
+    role=Choice("Role", VALID_ROLES, "Invalid role"),
+    firstName=Text("Name", 50, alnum=True, prefix="Invalid Name"),
+    lastName=Text("Name", 50, alnum=True, prefix="Invalid Name"))
+
+_validateUser = USER_SCHEMA.compile()
+_validateEmailText = USER_SCHEMA["email"]
+_validateName = USER_SCHEMA["firstName"]
 
 
 # The user class is the base class for the customer and admin classes, containing the basic information
@@ -20,12 +34,24 @@ class User:
     def __init__(self, userID: str, rawPassword: str, firstName: str, lastName: str, DOB: str, email: str, role: str):
         self._userID: str = self._validateUserID(userID) 
         self._hashedPassword: str = self._hashPassword(rawPassword)
-        self._email: str = self._validateEmail(email) 
-        self._role: str = self._validateRole(role) 
-        self._firstName: str = self._validateName(firstName) 
-        self._lastName: str = self._validateName(lastName)  
+        email, self._role, self._firstName, self._lastName = _validateUser(email, role, firstName, lastName)
+        self._email: str = self._normalizeEmail(email)
         self._DOB: date  = self._validateDOB(DOB) 
 
+    # The restore method rebuilds a user from saved state (such as a database row)- the stored password hash is used
+    # as is, and the saved values are not validated again
+    @classmethod
+    def restore(cls, userID: str, hashedPassword: str, firstName: str, lastName: str, DOB: date, email: str, role: str) -> "User":
+        user = object.__new__(cls)
+        user._userID = userID
+        user._hashedPassword = hashedPassword
+        user._email = email
+        user._role = role
+        user._firstName = firstName
+        user._lastName = lastName
+        user._DOB = DOB
+        return user
+
     # Getter for the user's userID
     @property
     def userID(self) -> str:
@@ -66,6 +92,11 @@ class User:
     def role(self) -> str:
         return self._role
 
+    # Getter for the user's hashed password- used to save the user
+    @property
+    def hashedPassword(self) -> str:
+        return self._hashedPassword
+
     # Validates the input userID, ensuring it is a non-empty string
     def _validateUserID(self, userID: str) -> str:
         if not isinstance(userID, str):
@@ -90,9 +121,31 @@ class User:
         PasswordService.validatePassword(newRawPassword)
         self._hashedPassword = self._hashPassword(newRawPassword)
 
-    # Checks if the passed raw password matches the hashed password using the PasswordService class
+    # Checks if the passed raw password matches the hashed password using the PasswordService class- after a
+    # successful check, a hash made under an older password policy is replaced with one made under the current policy
     def checkPassword(self, rawPassword: str) -> bool:
-        return PasswordService.checkPassword(rawPassword, self._hashedPassword)
+        if not PasswordService.checkPassword(rawPassword, self._hashedPassword):
+            return False
+        if PasswordService.needsRehash(self._hashedPassword):
+            self._hashedPassword = PasswordService.hashPassword(rawPassword)
+        return True
+
+    # Async version of checkPassword- bcrypt runs on the PasswordService executor, so the event loop is not blocked
+    async def checkPasswordAsync(self, rawPassword: str) -> bool:
+        if not await PasswordService.checkPasswordAsync(rawPassword, self._hashedPassword):
+            return False
+        if PasswordService.needsRehash(self._hashedPassword):
+            self._hashedPassword = await PasswordService.hashPasswordAsync(rawPassword)
+        return True
+
+    # Async version of changePassword- the old password is checked and the new one hashed on the PasswordService executor
+    async def changePasswordAsync(self, oldRawPassword: str, newRawPassword: str) -> None:
+        # Check the user's previous password
+        if not await self.checkPasswordAsync(oldRawPassword):
+            raise InvalidPasswordError("Incorrect password")
+        # Validate and hash the new password, set as the user's stored password
+        PasswordService.validatePassword(newRawPassword)
+        self._hashedPassword = await PasswordService.hashPasswordAsync(newRawPassword)
     
     # Validates the passed date of birth, ensuring it is a non-empty string in the format MM/DD/YYYY and that the
     # user is at least 18 years old
@@ -114,27 +167,18 @@ class User:
     
     # Validates the passed name, ensuring it is a non-empty string containing only letters
     def _validateName(self, name: str) -> str:
-        # Validate the name is a non-empty alphanumeric string
-        try: name = validateAlnumString(name, "Name", 50)
-        except InputError as e: raise ValueError(f"Invalid Name: {e}")
-        return name
+        return _validateName(name)
 
     # Validates the passed email, ensuring it is a non-empty string in a valid email format
-    # using the email_validator library
     def _validateEmail(self, email: str) -> str:
-        # Validate the the email is a non-empty string
-        try: email = validateString(email, "Email", 100)
-        except InputError as e: raise ValueError(f"Invalid email address: {e}")
+        return self._normalizeEmail(_validateEmailText(email))
+
+    # Normalizes an email that has passed the USER_SCHEMA checks, ensuring it is in a valid email format using the
+    # shared cached normalizer (see emails.py)
+    def _normalizeEmail(self, email: str) -> str:
         try:
-          emailInfo = validate_email(email, check_deliverability=False)
-          return emailInfo.normalized  
+          return normalizeEmail(email)
         except EmailNotValidError as e: raise ValueError(f"Invalid email addresss: {e}")
-        
-    # Validates the passed role, ensuring it is a string in the list of valid roles
-    def _validateRole(self, role: str) -> str:
-        if role not in VALID_ROLES:
-            raise ValueError("Invalid role")
-        return role    
    
     # Returns a string representation of the user, including their ID, name, email, role, and date of birth
     def __str__(self) -> str:
@@ -151,5 +195,39 @@ class Customer(User):
         super().__init__(userID, rawPassword, firstName, lastName, DOB, email, "customer")
         # The customer class also includes a dictionary of the customer's accounts, indexed by account ID
         self._accounts: dict[str, Account] = {}
-    
-  
\ No newline at end of file
+
+    # Rebuilds a customer from saved state, with no accounts- see User.restore
+    @classmethod
+    def restore(cls, userID: str, hashedPassword: str, firstName: str, lastName: str, DOB: date, email: str, role: str = "customer") -> "Customer":
+        customer = super().restore(userID, hashedPassword, firstName, lastName, DOB, email, role)
+        customer._accounts = {}
+        return customer
+
+    # Getter for the customer's accounts, indexed by account ID
+    @property
+    def accounts(self) -> dict[str, Account]:
+        return self._accounts
+
+    # Adds the passed account to the customer's accounts- the account must belong to the customer
+    def addAccount(self, account: Account) -> None:
+        if not isinstance(account, Account):
+            raise AccountError("Account Error: Only accounts can be added to a customer")
+        if account.userID != self._userID:
+            raise AccountError("Account Error: Account belongs to a different user")
+        if account.accountID in self._accounts:
+            raise AccountError(f"Account Error: Customer already has account {account.accountID}")
+        self._accounts[account.accountID] = account
+
+    # Moves funds between two of the customer's accounts, posting both legs atomically (see Account.transferTo)- returns
+    # the Intra-Transfer debiting the source account and the Transfer deposit crediting the destination account, which
+    # hold each other's transaction ID as their origin- the fee (default is None, for the fee schedule's fee) is taken
+    # from the source account
+    def transfer(self, fromAccountID: str, toAccountID: str, amount: float | Money, fee: float | Money = None,
+                 description: str = None) -> tuple[InternalTransfer, Deposit]:
+        accounts = self._accounts
+        for accountID in (fromAccountID, toAccountID):
+            if accountID not in accounts:
+                raise AccountError(f"Account Error: Customer has no account {accountID}")
+        if fromAccountID == toAccountID:
+            raise TransferError("Transfer Error: Destination Account ID cannot be the same as the source account ID")
+        return accounts[fromAccountID].transferTo(accounts[toAccountID], self._userID, amount, fee, description)
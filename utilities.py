@@ -6,8 +6,20 @@
 # The purpose of this file is to contain reusable utility functions that are used throughout the program
 
 
+import asyncio
+import base64
+import hashlib
+import hmac
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timedelta
+from decimal import Decimal
 from passlib.hash import bcrypt
 from errors import *
+from money import Money, toCents
 
 # List of valid user roles, for checks in the user constructor
 VALID_ROLES: list[str] = ["customer", "admin"]
@@ -16,9 +28,22 @@ VALID_STATUSES: list[str] = ["Active", "Frozen", "Closed"]
 # List of valid transaction types, for checks in the transaction type setter
 VALID_TRANSACTION_TYPES: list[str] = ["Deposit", "Withdrawal", "Intra-Transfer", "External-Transfer"]
 # List of valid deposit methods
-VALID_DEPOSIT_METHODS: list[str] = ["Cash", "Check", "Wire", "Transfer", "Direct-Deposit", "Mobile-Deposit"]
+VALID_DEPOSIT_METHODS: list[str] = ["Cash", "Check", "Wire", "Transfer", "Direct-Deposit", "Mobile-Deposit", "Interest", "Trade"]
 # List of valid withdrawal methods
-VALID_WITHDRAWAL_METHODS: list[str] = ["Cash", "Check", "Wire", "Transfer"]
+VALID_WITHDRAWAL_METHODS: list[str] = ["Cash", "Check", "Wire", "Transfer", "Interest", "Trade"]
+# List of valid interest compounding periods of savings accounts
+VALID_COMPOUNDING: list[str] = ["daily", "monthly"]
+# List of valid account tiers, which set the fees charged on an account's postings (see fees.py)
+VALID_ACCOUNT_TIERS: list[str] = ["Standard", "Premium", "Business"]
+
+# Compact codes for the valid transaction types, deposit methods, withdrawal methods, and account statuses-
+# each value is stored on records as its small integer code (its position in the list above), and the code
+# tables map values to codes for constant time validation
+TRANSACTION_TYPE_CODES: dict[str, int] = {value: code for code, value in enumerate(VALID_TRANSACTION_TYPES)}
+DEPOSIT_METHOD_CODES: dict[str, int] = {value: code for code, value in enumerate(VALID_DEPOSIT_METHODS)}
+WITHDRAWAL_METHOD_CODES: dict[str, int] = {value: code for code, value in enumerate(VALID_WITHDRAWAL_METHODS)}
+STATUS_CODES: dict[str, int] = {value: code for code, value in enumerate(VALID_STATUSES)}
+ACCOUNT_TIER_CODES: dict[str, int] = {value: code for code, value in enumerate(VALID_ACCOUNT_TIERS)}
 
 
 # Determines if the passed string (such as a description or origin) is a string of less than
@@ -67,19 +92,349 @@ def validatePositiveFloat(value: float, valueName: str) -> float:
     if value <= 0:
         raise InputError(f"{valueName} must be greater than or equal to 0")
     return value
+
+# Converts the passed amount (a float, int, Decimal, or Money) into Money, and raises an InputError if it is not
+# an amount- strings are not accepted here, they must be converted with Money() explicitly
+def validateMoney(value, valueName: str) -> Money:
+    if type(value) is float:
+        return Money.fromCents(toCents(value))
+    if type(value) is Money:
+        return value
+    if isinstance(value, bool) or not isinstance(value, (float, int, Decimal)):
+        raise InputError(f"{valueName} must be a number or Money amount")
+    return Money.fromCents(toCents(value))
+
+# Determines if the passed amount is a positive amount of money, and raises an InputError if it is not
+def validatePositiveMoney(value, valueName: str) -> Money:
+    value = validateMoney(value, valueName)
+    if value.cents <= 0:
+        raise InputError(f"{valueName} must be greater than 0")
+    return value
+
+# Determines if the passed amount is a non-negative amount of money, and raises an InputError if it is not
+def validateNonNegativeMoney(value, valueName: str) -> Money:
+    value = validateMoney(value, valueName)
+    if value.cents < 0:
+        raise InputError(f"{valueName} must be greater than or equal to 0")
+    return value
     
 
+# The naive datetime that epoch timestamps are counted from
+EPOCH: datetime = datetime(1970, 1, 1)
+
+# Converts a naive datetime into an exact integer count of microseconds since the epoch, for compact storage
+def toEpochMicros(timeStamp: datetime) -> int:
+    return (timeStamp - EPOCH) // timedelta(microseconds=1)
+
+# Converts an integer count of microseconds since the epoch back into a naive datetime
+def fromEpochMicros(micros: int) -> datetime:
+    return EPOCH + timedelta(microseconds=micros)
+
+
+# The bounded executor runs blocking work (such as bcrypt hashing) on a fixed pool of worker threads, with at most
+# maxPending tasks queued or running at once- when it is full, submit blocks the calling thread and run waits without
+# blocking the event loop, until a task finishes or the timeout passes (raising an ExecutorBusyError), so a burst of
+# work backs up at the caller instead of growing an unbounded queue
+class BoundedExecutor:
+    # The constructor takes the number of worker threads and the number of tasks that can be queued or running
+    def __init__(self, workers: int = None, maxPending: int = None):
+        workers = workers if workers is not None else min(8, os.cpu_count() or 1)
+        maxPending = maxPending if maxPending is not None else workers * 8
+        for value, name in ((workers, "Workers"), (maxPending, "Maximum pending tasks")):
+            if isinstance(value, bool) or not isinstance(value, int) or value <= 0:
+                raise ValueError(f"{name} must be a positive integer")
+        self._workers: int = workers
+        self._maxPending: int = maxPending
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bounded-executor")
+        self._condition = threading.Condition()
+        self._pending: int = 0
+        # Event loops and futures of coroutines waiting in run for a free slot
+        self._asyncWaiters: deque = deque()
+
+    # Getter for the number of worker threads
+    @property
+    def workers(self) -> int:
+        return self._workers
+
+    # Getter for the number of tasks that can be queued or running
+    @property
+    def maxPending(self) -> int:
+        return self._maxPending
+
+    # Getter for the number of tasks queued or running
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    # Submits fn(*args) to the executor, blocking for up to timeout seconds (forever if None) while the executor is full
+    def submit(self, fn, *args, timeout: float = None) -> Future:
+        with self._condition:
+            if not self._condition.wait_for(lambda: self._pending < self._maxPending, timeout):
+                raise ExecutorBusyError("Executor Busy Error: Too many tasks are pending")
+            self._pending += 1
+        return self._start(fn, args)
+
+    # Runs fn(*args) on the executor and returns its result, waiting asynchronously for up to timeout seconds (forever
+    # if None) while the executor is full
+    async def run(self, fn, *args, timeout: float = None):
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+        while True:
+            with self._condition:
+                if self._pending < self._maxPending:
+                    self._pending += 1
+                    break
+                waiter = loop.create_future()
+                self._asyncWaiters.append((loop, waiter))
+            try:
+                await asyncio.wait_for(waiter, None if deadline is None else max(0, deadline - loop.time()))
+            except BaseException as e:
+                with self._condition:
+                    try: self._asyncWaiters.remove((loop, waiter))
+                    # The waiter was already woken- pass the free slot on to the next waiter
+                    except ValueError: self._wakeNext()
+                if isinstance(e, TimeoutError):
+                    raise ExecutorBusyError("Executor Busy Error: Too many tasks are pending") from None
+                raise
+        return await asyncio.wrap_future(self._start(fn, args))
+
+    # Starts a task that already holds a slot, freeing the slot when it finishes
+    def _start(self, fn, args: tuple) -> Future:
+        try:
+            future = self._executor.submit(fn, *args)
+        except BaseException:
+            self._release()
+            raise
+        future.add_done_callback(self._release)
+        return future
+
+    # Frees a slot and wakes one waiting thread and one waiting coroutine to claim it
+    def _release(self, future: Future = None) -> None:
+        with self._condition:
+            self._pending -= 1
+            self._condition.notify()
+            self._wakeNext()
+
+    # Wakes the longest waiting coroutine- must be called holding the condition
+    def _wakeNext(self) -> None:
+        if self._asyncWaiters:
+            loop, waiter = self._asyncWaiters.popleft()
+            loop.call_soon_threadsafe(_wakeWaiter, waiter)
+
+    # Waits for running tasks to finish and stops the worker threads
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=True)
+
+# Completes a waiting coroutine's future, unless it has already timed out or been cancelled
+def _wakeWaiter(waiter: asyncio.Future) -> None:
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+# List of password hashing schemes supported by password policies
+VALID_HASH_SCHEMES: list[str] = ["bcrypt", "scrypt", "pbkdf2"]
+
+# The password policy decides how new passwords are hashed- the scheme (bcrypt, or scrypt or PBKDF2-SHA256 through
+# hashlib) and its cost. A policy can verify a hash made with any supported scheme and cost, and reports hashes that
+# were made with a different scheme or cost as needing a rehash, so stored hashes can be migrated as users log in
+# Hashes made by hashlib are stored in the formats $scrypt$n=N,r=R,p=P$salt$hash and $pbkdf2-sha256$iterations$salt$hash
+class PasswordPolicy:
+    # The constructor takes the scheme new passwords are hashed with and the cost settings of each scheme
+    def __init__(self, scheme: str = "bcrypt", bcryptRounds: int = 12, scryptCost: int = 2 ** 14, scryptBlockSize: int = 8,
+                 scryptParallelism: int = 1, pbkdf2Iterations: int = 600_000):
+        if scheme not in VALID_HASH_SCHEMES:
+            raise ValueError(f"Password hash scheme must be one of {', '.join(VALID_HASH_SCHEMES)}")
+        if isinstance(bcryptRounds, bool) or not isinstance(bcryptRounds, int) or not 4 <= bcryptRounds <= 31:
+            raise ValueError("bcrypt rounds must be an integer between 4 and 31")
+        if isinstance(scryptCost, bool) or not isinstance(scryptCost, int) or scryptCost < 2 or scryptCost & (scryptCost - 1):
+            raise ValueError("scrypt cost must be a power of 2 greater than 1")
+        for value, name in ((scryptBlockSize, "scrypt block size"), (scryptParallelism, "scrypt parallelism"),
+                            (pbkdf2Iterations, "PBKDF2 iterations")):
+            if isinstance(value, bool) or not isinstance(value, int) or value <= 0:
+                raise ValueError(f"{name} must be a positive integer")
+        self._scheme: str = scheme
+        self._bcryptRounds: int = bcryptRounds
+        self._scryptCost: int = scryptCost
+        self._scryptBlockSize: int = scryptBlockSize
+        self._scryptParallelism: int = scryptParallelism
+        self._pbkdf2Iterations: int = pbkdf2Iterations
+        self._bcrypt = bcrypt.using(rounds=bcryptRounds)
+
+    # Getter for the scheme new passwords are hashed with
+    @property
+    def scheme(self) -> str:
+        return self._scheme
+
+    # Getter for the cost of the scheme new passwords are hashed with (rounds, scrypt cost, or iterations)
+    @property
+    def cost(self) -> int:
+        return {"bcrypt": self._bcryptRounds, "scrypt": self._scryptCost, "pbkdf2": self._pbkdf2Iterations}[self._scheme]
+
+    # Hashes the passed password with the policy's scheme and cost
+    def hash(self, rawPassword: str) -> str:
+        if self._scheme == "bcrypt":
+            return self._bcrypt.hash(rawPassword.encode())
+        salt = os.urandom(16)
+        if self._scheme == "scrypt":
+            n, r, p = self._scryptCost, self._scryptBlockSize, self._scryptParallelism
+            return f"$scrypt$n={n},r={r},p={p}${_encodeHashPart(salt)}${_encodeHashPart(_scrypt(rawPassword, salt, n, r, p))}"
+        iterations = self._pbkdf2Iterations
+        digest = hashlib.pbkdf2_hmac("sha256", rawPassword.encode(), salt, iterations)
+        return f"$pbkdf2-sha256${iterations}${_encodeHashPart(salt)}${_encodeHashPart(digest)}"
+
+    # Checks the passed password against a hash made with any supported scheme and cost
+    def verify(self, rawPassword: str, hashedPassword: str) -> bool:
+        scheme, settings, salt, digest = _parsePasswordHash(hashedPassword)
+        if scheme == "bcrypt":
+            return bcrypt.verify(rawPassword.encode(), hashedPassword)
+        if scheme == "scrypt":
+            computed = _scrypt(rawPassword, salt, *settings)
+        else:
+            computed = hashlib.pbkdf2_hmac("sha256", rawPassword.encode(), salt, settings[0])
+        return hmac.compare_digest(computed, digest)
+
+    # Returns whether the passed hash was made with a different scheme or cost than the policy's
+    def needsRehash(self, hashedPassword: str) -> bool:
+        scheme, settings, _, _ = _parsePasswordHash(hashedPassword)
+        if scheme != self._scheme:
+            return True
+        if scheme == "bcrypt":
+            return settings != (self._bcryptRounds,)
+        if scheme == "scrypt":
+            return settings != (self._scryptCost, self._scryptBlockSize, self._scryptParallelism)
+        return settings != (self._pbkdf2Iterations,)
+
+    # The calibrate method returns a policy for the passed scheme with the highest cost whose verify time on this host
+    # is within targetMillis (but never below the scheme's minimum cost)- bcrypt rounds and the scrypt cost are raised
+    # one doubling at a time, and PBKDF2 iterations are scaled from a measured sample
+    @classmethod
+    def calibrate(cls, targetMillis: float = 250, scheme: str = "bcrypt") -> "PasswordPolicy":
+        if scheme not in VALID_HASH_SCHEMES:
+            raise ValueError(f"Password hash scheme must be one of {', '.join(VALID_HASH_SCHEMES)}")
+        target = targetMillis / 1000
+        if scheme == "pbkdf2":
+            sample = 100_000
+            elapsed = _timeVerify(cls("pbkdf2", pbkdf2Iterations=sample))
+            return cls("pbkdf2", pbkdf2Iterations=max(1000, int(sample * target / elapsed) // 1000 * 1000))
+        option, cost, limit = ("bcryptRounds", 4, 31) if scheme == "bcrypt" else ("scryptCost", 2 ** 10, 2 ** 24)
+        best = cost
+        while cost <= limit:
+            if _timeVerify(cls(scheme, **{option: cost})) > target:
+                break
+            best = cost
+            cost = cost + 1 if scheme == "bcrypt" else cost * 2
+        return cls(scheme, **{option: best})
+
+    def __repr__(self) -> str:
+        return f"PasswordPolicy({self._scheme!r}, cost={self.cost})"
+
+# Returns the seconds taken to verify a password hashed with the passed policy
+def _timeVerify(policy: PasswordPolicy) -> float:
+    hashedPassword = policy.hash("Calibrate123!")
+    began = time.perf_counter()
+    policy.verify("Calibrate123!", hashedPassword)
+    return time.perf_counter() - began
+
+# Runs scrypt with enough memory allowed for the passed settings
+def _scrypt(rawPassword: str, salt: bytes, n: int, r: int, p: int) -> bytes:
+    return hashlib.scrypt(rawPassword.encode(), salt=salt, n=n, r=r, p=p, maxmem=128 * r * (n + p + 2) + 1024 * 1024, dklen=32)
+
+# Encodes part of a hashlib password hash as unpadded base64
+def _encodeHashPart(value: bytes) -> str:
+    return base64.b64encode(value).decode().rstrip("=")
+
+# Decodes part of a hashlib password hash from unpadded base64
+def _decodeHashPart(value: str) -> bytes:
+    return base64.b64decode(value + "=" * (-len(value) % 4))
+
+# Splits a password hash into its scheme, cost settings, salt, and digest (the salt and digest are None for bcrypt
+# hashes, which are checked by passlib)- raises a ValueError if the hash is not in a supported format
+def _parsePasswordHash(hashedPassword: str) -> tuple[str, tuple, bytes, bytes]:
+    if not isinstance(hashedPassword, str):
+        raise ValueError("Password hash must be a string")
+    parts = hashedPassword.split("$")
+    try:
+        if parts[1] in ("2a", "2b", "2y") and len(parts) == 4:
+            return "bcrypt", (int(parts[2]),), None, None
+        if parts[1] == "scrypt" and len(parts) == 5:
+            settings = dict(setting.split("=") for setting in parts[2].split(","))
+            return "scrypt", (int(settings["n"]), int(settings["r"]), int(settings["p"])), _decodeHashPart(parts[3]), _decodeHashPart(parts[4])
+        if parts[1] == "pbkdf2-sha256" and len(parts) == 5:
+            return "pbkdf2", (int(parts[2]),), _decodeHashPart(parts[3]), _decodeHashPart(parts[4])
+    except (IndexError, KeyError, ValueError):
+        pass
+    raise ValueError("Unsupported password hash format")
+
+
 # Class PasswordService will manage the hasing, checking, and verification of passwords
+# The async variants run bcrypt on a bounded executor, so an event loop or request thread is not blocked while a
+# password is hashed or checked
 class PasswordService:
-    # Hash the passed password string using bcrypt and returns a hex string
+    # The executor used by the async variants- created when first needed
+    _executor: BoundedExecutor = None
+    _executorLock = threading.Lock()
+    # The policy new passwords are hashed with
+    _policy: PasswordPolicy = PasswordPolicy()
+
+    # Getter for the policy new passwords are hashed with
+    @staticmethod
+    def getPolicy() -> PasswordPolicy:
+        return PasswordService._policy
+
+    # Sets the policy new passwords are hashed with, returning the previous policy- existing hashes still verify, and
+    # are reported by needsRehash so they can be replaced when their users next log in
+    @staticmethod
+    def setPolicy(policy: PasswordPolicy) -> PasswordPolicy:
+        if not isinstance(policy, PasswordPolicy):
+            raise TypeError("Policy must be a PasswordPolicy")
+        previous = PasswordService._policy
+        PasswordService._policy = policy
+        return previous
+
+    # Getter for the executor used by the async variants
+    @staticmethod
+    def getExecutor() -> BoundedExecutor:
+        with PasswordService._executorLock:
+            if PasswordService._executor is None:
+                PasswordService._executor = BoundedExecutor()
+            return PasswordService._executor
+
+    # Sets the executor used by the async variants, returning the previous executor (None if none was created)
+    @staticmethod
+    def setExecutor(executor: BoundedExecutor) -> BoundedExecutor:
+        if not isinstance(executor, BoundedExecutor):
+            raise TypeError("Executor must be a BoundedExecutor")
+        with PasswordService._executorLock:
+            previous = PasswordService._executor
+            PasswordService._executor = executor
+            return previous
+
+    # Hash the passed password string using the password policy (bcrypt by default) and returns the hash string
     @staticmethod
     def hashPassword(rawPassword: str) -> str:
-        return bcrypt.hash(rawPassword.encode())
+        return PasswordService._policy.hash(rawPassword)
     
     # Check if the passed password matches the hashed password
     @staticmethod
     def checkPassword(rawPassword: str, hashedPassword: str) -> bool:
-        return bcrypt.verify(rawPassword.encode(), hashedPassword)
+        return PasswordService._policy.verify(rawPassword, hashedPassword)
+
+    # Check if the passed hash was made with a different scheme or cost than the password policy
+    @staticmethod
+    def needsRehash(hashedPassword: str) -> bool:
+        return PasswordService._policy.needsRehash(hashedPassword)
+
+    # Hashes the passed password on the password executor- raises an ExecutorBusyError if no slot frees up within
+    # timeout seconds
+    @staticmethod
+    async def hashPasswordAsync(rawPassword: str, timeout: float = None) -> str:
+        return await PasswordService.getExecutor().run(PasswordService.hashPassword, rawPassword, timeout=timeout)
+
+    # Checks the passed password against the hashed password on the password executor- raises an ExecutorBusyError if
+    # no slot frees up within timeout seconds
+    @staticmethod
+    async def checkPasswordAsync(rawPassword: str, hashedPassword: str, timeout: float = None) -> bool:
+        return await PasswordService.getExecutor().run(PasswordService.checkPassword, rawPassword, hashedPassword, timeout=timeout)
     
     # Check if the passed password is a valid password based on the following criteria:
     # - At least 8 characters long
@@ -0,0 +1,183 @@
+# Jack Timmons, 27 Dec 2024, Winter Break
+# The purpose of this program is to provide users with a simulated bank managment interface, gaining
+# expierence with OOP, full-stack development, and my first expierence creating both a local GUI and
+# web-based application
+
+# The purpose of this file is to contain the portfolio valuation engine- the positions of many investment accounts are
+# pulled into NumPy arrays and valued against a table of prices in one vectorized pass, giving each account's market
+# value, unrealized gain, and the share of its value in each asset class
+
+import csv
+import math
+from typing import Iterable, NamedTuple
+import numpy as np
+import accounts
+from accounts import Account, InvestmentAccount
+from errors import *
+
+# Number of accounts whose positions are valued together, which bounds the memory a valuation uses
+VALUATION_CHUNK_SIZE: int = 65_536
+# Asset class of securities the price table gives none for, and the asset class of each account's cash
+DEFAULT_ASSET_CLASS: str = "Unclassified"
+CASH_ASSET_CLASS: str = "Cash"
+
+
+# The price table class holds the price per share of each security, and the asset class (such as "Equity" or
+# "Bond") it is counted in for allocations- prices can be in fractions of a cent
+class PriceTable:
+    # The constructor takes a dictionary of symbol to price, and optionally a dictionary of symbol to asset class
+    # (securities not in it are DEFAULT_ASSET_CLASS)
+    def __init__(self, prices: dict[str, float], assetClasses: dict[str, str] = None):
+        assetClasses = assetClasses or {}
+        if not isinstance(prices, dict) or not isinstance(assetClasses, dict):
+            raise InvestmentError("Price Table Error: Prices and asset classes must be dictionaries")
+        self._symbols: list[str] = []
+        self._assetClasses: list[str] = []
+        self._index: dict[str, int] = {}
+        cents, classCodes, classIndex = [], [], {}
+        for symbol, price in prices.items():
+            symbol = InvestmentAccount._validateSymbol(symbol)
+            if symbol in self._index:
+                raise InvestmentError(f"Price Table Error: {symbol} is priced more than once")
+            if isinstance(price, bool) or not isinstance(price, (int, float)) or not math.isfinite(price) or price <= 0:
+                raise InvestmentError(f"Price Table Error: Price of {symbol} must be a positive number")
+            assetClass = assetClasses.get(symbol, DEFAULT_ASSET_CLASS)
+            if not isinstance(assetClass, str) or not assetClass or assetClass == CASH_ASSET_CLASS:
+                raise InvestmentError(f"Price Table Error: Asset class of {symbol} must be a name other than "
+                                      f"{CASH_ASSET_CLASS}")
+            if assetClass not in classIndex:
+                classIndex[assetClass] = len(self._assetClasses)
+                self._assetClasses.append(assetClass)
+            self._index[symbol] = len(self._symbols)
+            self._symbols.append(symbol)
+            cents.append(price * 100)
+            classCodes.append(classIndex[assetClass])
+        # Prices: the price per share of each symbol, in (fractional) cents, and the asset class code of each
+        self._prices: np.ndarray = np.array(cents, np.float64)
+        self._classCodes: np.ndarray = np.array(classCodes, np.int64)
+
+    # The fromCSV method loads a price table from the passed CSV file, which has a header row with the columns
+    # symbol and price, and optionally assetClass
+    @classmethod
+    def fromCSV(cls, path: str) -> "PriceTable":
+        prices, assetClasses = {}, {}
+        with open(path, newline="", encoding="utf-8") as file:
+            reader = csv.DictReader(file)
+            if reader.fieldnames is None or not {"symbol", "price"} <= set(reader.fieldnames):
+                raise InvestmentError("Price Table Error: Price file must have symbol and price columns")
+            for row in reader:
+                symbol = (row["symbol"] or "").strip().upper()
+                if symbol in prices:
+                    raise InvestmentError(f"Price Table Error: Line {reader.line_num}: {symbol} is priced more than "
+                                          f"once")
+                try:
+                    prices[symbol] = float(row["price"])
+                except (TypeError, ValueError):
+                    raise InvestmentError(f"Price Table Error: Line {reader.line_num}: Price must be a number")
+                if row.get("assetClass"):
+                    assetClasses[symbol] = row["assetClass"].strip()
+        return cls(prices, assetClasses)
+
+    # Getter for the symbols priced
+    @property
+    def symbols(self) -> list[str]:
+        return list(self._symbols)
+
+    # Getter for the asset classes of the securities priced, in the order they were first listed
+    @property
+    def assetClasses(self) -> list[str]:
+        return list(self._assetClasses)
+
+    # Returns the price per share of the passed symbol, or None if it is not priced
+    def price(self, symbol: str) -> float | None:
+        index = self._index.get(symbol)
+        return None if index is None else float(self._prices[index]) / 100
+
+    # Returns the asset class of the passed symbol, or None if it is not priced
+    def assetClass(self, symbol: str) -> str | None:
+        index = self._index.get(symbol)
+        return None if index is None else self._assetClasses[self._classCodes[index]]
+
+    # Returns the number of symbols priced
+    def __len__(self) -> int:
+        return len(self._symbols)
+
+    # Returns the position in the table of every symbol code (see accounts.symbolCode) known so far, -1 for symbols
+    # that are not priced
+    def _lookup(self) -> np.ndarray:
+        codes = accounts._symbolCodes
+        lookup = np.full(len(accounts._symbols), -1, np.int64)
+        for symbol, index in self._index.items():
+            code = codes.get(symbol)
+            if code is not None:
+                lookup[code] = index
+        return lookup
+
+
+# The valuation of a set of investment accounts (see valuePortfolios)- one entry per account, in the order they were
+# passed, with amounts in cents. The allocation holds a row per account of the share of its total value (cash and
+# market value) in each of the asset classes, and the asset class totals are the value in each across every account
+class PortfolioValuation(NamedTuple):
+    accountIDs: list[str]
+    cash: np.ndarray
+    marketValue: np.ndarray
+    costBasis: np.ndarray
+    unrealizedGain: np.ndarray
+    unpriced: np.ndarray
+    assetClasses: list[str]
+    allocation: np.ndarray
+    assetClassTotals: np.ndarray
+
+
+# The valuePortfolios function values the positions of every investment account passed (other accounts are skipped)
+# against the passed price table
+# A position's market value is its quantity times its price, and its unrealized gain is its market value less its cost
+# basis- positions in symbols the table has no price for are left out of both, and counted in unpriced. Allocations
+# are across the table's asset classes, with each account's cash last (as CASH_ASSET_CLASS)
+# Each account's positions and cash are read together while its lock is held, so a trade is either wholly in or
+# wholly out of its valuation
+def valuePortfolios(portfolios: Iterable[Account], prices: PriceTable) -> PortfolioValuation:
+    if not isinstance(prices, PriceTable):
+        raise InvestmentError("Valuation Error: Prices must be a price table")
+    portfolios = [account for account in portfolios if isinstance(account, InvestmentAccount)]
+    snapshots = [account._positionSnapshot() for account in portfolios]
+    # The lookup is built after the snapshots, so it covers every symbol they hold
+    lookup = prices._lookup()
+    classes = len(prices._assetClasses) + 1
+    chunks = [_valueChunk(snapshots[offset:offset + VALUATION_CHUNK_SIZE], prices, lookup, classes)
+              for offset in range(0, len(snapshots), VALUATION_CHUNK_SIZE)]
+    if chunks:
+        columns = [np.concatenate(column) for column in zip(*chunks)]
+    else:
+        columns = [np.zeros(0, np.int64)] * 4 + [np.zeros((0, classes), np.float64), np.zeros((0, classes), np.int64)]
+    cash, marketValue, costBasis, unpriced, allocation, byClass = columns
+    return PortfolioValuation([account._accountID for account in portfolios], cash, marketValue, costBasis,
+                              marketValue - costBasis, unpriced, prices.assetClasses + [CASH_ASSET_CLASS], allocation,
+                              byClass.sum(axis=0))
+
+# Values the passed snapshots of accounts' positions (see InvestmentAccount._positionSnapshot), returning each
+# account's cash, market value, cost basis, number of unpriced positions, allocation, and value (in cents) in each
+# asset class
+# The positions of every account are joined into flat arrays, each position tagged with the row of its account, so
+# per account totals are weighted counts over those rows
+def _valueChunk(snapshots: list[tuple], prices: PriceTable, lookup: np.ndarray, classes: int) -> tuple:
+    size = len(snapshots)
+    codes = np.frombuffer(b"".join([snapshot[0] for snapshot in snapshots]), np.int64)
+    quantities = np.frombuffer(b"".join([snapshot[1] for snapshot in snapshots]), np.float64)
+    costs = np.frombuffer(b"".join([snapshot[2] for snapshot in snapshots]), np.int64)
+    counts = np.fromiter([len(snapshot[0]) for snapshot in snapshots], np.int64, size) // 8
+    cash = np.fromiter([snapshot[3] for snapshot in snapshots], np.int64, size)
+    rows = np.repeat(np.arange(size), counts)
+    index = lookup[codes]
+    priced = index >= 0
+    rows, unpricedRows, index = rows[priced], rows[~priced], index[priced]
+    values = quantities[priced] * prices._prices[index]
+    marketValue = np.rint(np.bincount(rows, values, size)).astype(np.int64)
+    costBasis = np.bincount(rows, costs[priced], size).astype(np.int64)
+    unpriced = np.bincount(unpricedRows, minlength=size).astype(np.int64)
+    byClass = np.bincount(rows * classes + prices._classCodes[index], values, size * classes).astype(np.float64)
+    byClass = byClass.reshape(size, classes)
+    byClass[:, -1] = cash
+    totals = byClass.sum(axis=1)
+    allocation = np.divide(byClass, totals[:, None], out=np.zeros_like(byClass), where=totals[:, None] > 0)
+    return cash, marketValue, costBasis, unpriced, allocation, np.rint(byClass).astype(np.int64)
@@ -0,0 +1,440 @@
+# Jack Timmons, 27 Dec 2024, Winter Break
+# The purpose of this program is to provide users with a simulated bank managment interface, gaining
+# expierence with OOP, full-stack development, and my first expierence creating both a local GUI and
+# web-based application
+
+# The purpose of this file is to contain the write-ahead log, a durable append-only record of account openings,
+# postings, status and tier changes, and changes to the state of each kind of account that accounts can be rebuilt from after
+# a crash
+
+import json
+import os
+import re
+import struct
+import threading
+import zlib
+from datetime import date
+from accounts import Account, Transaction, restoreAccount, restoreTransaction
+from errors import *
+from utilities import *
+
+# Durability levels of the write-ahead log:
+# always- every change is on disk before the call that made it returns (concurrent changes share one fsync)
+# interval- the log is written to disk every intervalMillis milliseconds, so a crash loses at most that much
+# os- changes are handed to the operating system but never forced to disk, so only an OS crash or power loss loses them
+DURABILITY_LEVELS: list[str] = ["always", "interval", "os"]
+# Size a segment file can grow to before a new segment is started
+DEFAULT_SEGMENT_SIZE: int = 64 * 1024 * 1024
+# Every segment file starts with this marker
+SEGMENT_MAGIC: bytes = b"BMWAL001"
+
+# Kinds of log record
+RECORD_OPEN: int = 1
+RECORD_STATUS: int = 2
+RECORD_POSTINGS: int = 3
+RECORD_STATE: int = 4
+RECORD_TIER: int = 5
+
+# Frame header: payload length and CRC-32 of the payload
+_FRAME_HEADER = struct.Struct("<II")
+# Account opening: kind, creation date ordinal, opening balance in cents, followed by the account ID, user ID, kind of
+# account, and tier, and the state of the account's kind (see Account._savedState)- openings logged before kinds were
+# saved end after the user ID, and are plain Standard accounts
+_OPEN = struct.Struct("<Biq")
+# Status change: kind, status code, followed by the account ID
+_STATUS = struct.Struct("<BB")
+# Tier change: kind, tier code, followed by the account ID
+_TIER = struct.Struct("<BB")
+# Postings: kind and number of postings, followed by each posting, and optionally the states of the accounts changed
+# with the postings
+_POSTINGS = struct.Struct("<BI")
+# States: kind, followed by the states of the accounts' kinds, as a JSON object by account ID- states are also stored
+# at the end of a frame of postings
+_STATE = struct.Struct("<B")
+# Posting: transaction type code, method code, time stamp in epoch microseconds, amount and fee in cents, followed by
+# the transaction ID, user ID, account ID, origin, description, and destination account ID, routing number, and bank
+_POSTING = struct.Struct("<BBqqq")
+_POSTING_STRINGS: int = 8
+_STRING_LENGTH = struct.Struct("<H")
+# String length used to store None, and method code used for transactions without a method
+_NONE_LENGTH: int = 0xFFFF
+_NO_METHOD: int = 0xFF
+_SEGMENT_NAME = re.compile(r"segment-(\d{8})\.wal")
+_encodeJSON = json.JSONEncoder(separators=(",", ":")).encode
+
+
+# The write-ahead log stores changes to accounts in a directory of segment files- each change is one CRC-checked frame,
+# and a batch of postings is always a single frame, so a batch is either recovered whole or not at all
+# Durability is configurable (see DURABILITY_LEVELS). With "always", the thread that forces the log to disk covers every
+# change written by other threads in the meantime (group commit), so concurrent postings share one fsync
+# Accounts write to the log when it is passed to their constructor, and recover rebuilds every account from the log
+class WriteAheadLog:
+    # The constructor takes the directory the segment files are kept in, the durability level, the sync interval used by
+    # the "interval" level, and the size at which a new segment is started
+    # An existing log in the directory is reopened- a frame left incomplete by a crash at the end of the last segment
+    # is discarded
+    def __init__(self, directory: str, durability: str = "always", intervalMillis: int = 10,
+                 segmentSize: int = DEFAULT_SEGMENT_SIZE):
+        if durability not in DURABILITY_LEVELS:
+            raise WriteAheadLogError(f"Write-Ahead Log Error: Durability must be one of {', '.join(DURABILITY_LEVELS)}")
+        if isinstance(intervalMillis, bool) or not isinstance(intervalMillis, int) or intervalMillis <= 0:
+            raise WriteAheadLogError("Write-Ahead Log Error: Sync interval must be a positive number of milliseconds")
+        if isinstance(segmentSize, bool) or not isinstance(segmentSize, int) or segmentSize <= len(SEGMENT_MAGIC):
+            raise WriteAheadLogError("Write-Ahead Log Error: Segment size is too small")
+        self._directory: str = directory
+        self._durability: str = durability
+        self._interval: float = intervalMillis / 1000
+        self._segmentSize: int = segmentSize
+        # Guards the segment file and the count of writes
+        self._lock = threading.Lock()
+        # Held by the thread forcing the log to disk, which every other thread waiting on it is covered by
+        self._syncLock = threading.Lock()
+        # Number of writes made, number of writes known to be on disk, and number of fsyncs done
+        self._written: int = 0
+        self._synced: int = 0
+        self._syncCount: int = 0
+        self._closed: bool = False
+        os.makedirs(directory, exist_ok=True)
+        segments = self._segmentIndexes()
+        if segments:
+            self._segmentIndex: int = segments[-1]
+            self._repairSegment(self._segmentPath(self._segmentIndex))
+        else:
+            self._segmentIndex = 1
+        self._file = self._openSegment(self._segmentIndex)
+        self._syncThread: threading.Thread = None
+        if durability == "interval":
+            self._stopEvent = threading.Event()
+            self._syncThread = threading.Thread(target=self._syncPeriodically, name="wal-sync", daemon=True)
+            self._syncThread.start()
+
+    # Getter for the directory
+    @property
+    def directory(self) -> str:
+        return self._directory
+
+    # Getter for the durability level
+    @property
+    def durability(self) -> str:
+        return self._durability
+
+    # Getter for the number of times the log has been forced to disk
+    @property
+    def syncCount(self) -> int:
+        return self._syncCount
+
+    # Getter for the number of segment files
+    @property
+    def segmentCount(self) -> int:
+        return len(self._segmentIndexes())
+
+    # Writes the opening of the passed account to the log, with the state of its kind
+    def logOpen(self, account: Account) -> None:
+        payload = _OPEN.pack(RECORD_OPEN, account.dateCreated.toordinal(), account.balance.cents) \
+            + _packStrings((account.accountID, account.userID, account.kind, account.tier)) \
+            + _encodeJSON(account._savedState()).encode()
+        self._log(_frame(payload))
+
+    # Writes a change of the status of the passed account to the log
+    def logStatus(self, accountID: str, status: str) -> None:
+        self._log(_frame(_STATUS.pack(RECORD_STATUS, STATUS_CODES[status]) + _packStrings((accountID,))))
+
+    # Writes a change of the tier of the passed account to the log
+    def logTier(self, accountID: str, tier: str) -> None:
+        self._log(_frame(_TIER.pack(RECORD_TIER, ACCOUNT_TIER_CODES[tier]) + _packStrings((accountID,))))
+
+    # Writes the passed transaction records to the log as a single frame- the passed states of the accounts' kinds (by
+    # account ID, see Account._savedState), if any, are written in the same frame, and are recovered before its records
+    def logPostings(self, records: list[Transaction], states: dict[str, dict] = None) -> None:
+        if not records:
+            return
+        payload = _POSTINGS.pack(RECORD_POSTINGS, len(records)) + b"".join([_encodePosting(record) for record in records])
+        if states:
+            payload += _encodeJSON(states).encode()
+        self._log(_frame(payload))
+
+    # Writes the passed states of the accounts' kinds (by account ID, see Account._savedState) to the log
+    def logStates(self, states: dict[str, dict]) -> None:
+        if states:
+            self._log(_frame(_STATE.pack(RECORD_STATE) + _encodeJSON(states).encode()))
+
+    # Writes a frame and waits for it to reach the disk if the durability level requires it
+    def _log(self, data: bytes) -> None:
+        with self._lock:
+            if self._closed:
+                raise WriteAheadLogError("Write-Ahead Log Error: Log is closed")
+            self._file.write(data)
+            self._written += 1
+            ticket = self._written
+            if self._durability == "os":
+                self._file.flush()
+            if self._file.tell() >= self._segmentSize:
+                self._rollSegment()
+        if self._durability == "always":
+            self._syncTo(ticket)
+
+    # Forces every write made so far to disk
+    def sync(self) -> None:
+        self._syncTo(self._written)
+
+    # Forces the log to disk if the passed write is not on disk yet- a thread that finds another thread already
+    # syncing waits for it, and only syncs again if its write was not covered
+    def _syncTo(self, ticket: int) -> None:
+        with self._syncLock:
+            if self._synced >= ticket:
+                return
+            with self._lock:
+                if self._closed:
+                    return
+                self._file.flush()
+                target = self._written
+                # A duplicate descriptor keeps the segment open even if it is rolled over during the fsync
+                descriptor = os.dup(self._file.fileno())
+            try:
+                os.fsync(descriptor)
+            finally:
+                os.close(descriptor)
+            self._synced = target
+            self._syncCount += 1
+
+    # Syncs the log every interval until the log is closed
+    def _syncPeriodically(self) -> None:
+        while not self._stopEvent.wait(self._interval):
+            self.sync()
+
+    # Closes the log, forcing every write to disk first
+    def close(self) -> None:
+        if self._syncThread is not None:
+            self._stopEvent.set()
+            self._syncThread.join()
+        self.sync()
+        with self._lock:
+            if not self._closed:
+                self._closed = True
+                self._file.close()
+
+    def __enter__(self) -> "WriteAheadLog":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # Returns the path of the segment file with the passed index
+    def _segmentPath(self, index: int) -> str:
+        return os.path.join(self._directory, f"segment-{index:08d}.wal")
+
+    # Returns the indexes of the segment files in the log directory, in order
+    def _segmentIndexes(self) -> list[int]:
+        matches = (_SEGMENT_NAME.fullmatch(name) for name in os.listdir(self._directory))
+        return sorted(int(match.group(1)) for match in matches if match)
+
+    # Opens the segment file with the passed index for appending, writing the segment marker to a new segment
+    def _openSegment(self, index: int):
+        segment = open(self._segmentPath(index), "ab")
+        if segment.tell() == 0:
+            segment.write(SEGMENT_MAGIC)
+            segment.flush()
+            os.fsync(segment.fileno())
+            _syncDirectory(self._directory)
+        return segment
+
+    # Finishes the current segment and starts the next one- the finished segment is forced to disk first
+    def _rollSegment(self) -> None:
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        self._segmentIndex += 1
+        self._file = self._openSegment(self._segmentIndex)
+
+    # Discards an incomplete or damaged frame left at the end of the passed segment by a crash
+    def _repairSegment(self, path: str) -> None:
+        with open(path, "rb") as segment:
+            data = segment.read()
+        _, end = _readFrames(data, path)
+        if end < len(data):
+            os.truncate(path, end)
+
+    # Returns the payloads of every frame in the log, in the order they were written
+    def _payloads(self):
+        self.sync()
+        indexes = self._segmentIndexes()
+        for index in indexes:
+            path = self._segmentPath(index)
+            with open(path, "rb") as segment:
+                data = segment.read()
+            payloads, end = _readFrames(data, path)
+            # Only the end of the last segment can be incomplete
+            if end < len(data) and index != indexes[-1]:
+                raise WriteAheadLogError(f"Write-Ahead Log Error: Segment {path} is damaged at byte {end}")
+            yield from payloads
+
+    # Returns every transaction record in the log, in the order they were posted
+    def readTransactions(self):
+        for payload in self._payloads():
+            if payload[0] == RECORD_POSTINGS:
+                yield from _decodePostings(payload)[0]
+
+    # The recover method rebuilds every account in the log as its own kind of account, replaying its opening, postings,
+    # changes to the state of its kind, and latest status and tier, and attaches the log to the rebuilt accounts so later changes
+    # are written to it- each state replaces the account's state at the point it was logged, so the postings before it
+    # are added first
+    # An optional ledgerFactory creates the ledger each account stores its records in, and any other keyword arguments
+    # (such as checkpointInterval) are passed to the account constructor
+    def recover(self, ledgerFactory=None, **options) -> dict[str, Account]:
+        accounts: dict[str, Account] = {}
+        # The postings of each account not yet added to it
+        postings: dict[str, list[Transaction]] = {}
+        statuses: dict[str, str] = {}
+        tiers: dict[str, str] = {}
+        # Adds the account's waiting postings, then sets the state of its kind
+        def restoreState(accountID: str, state: dict) -> None:
+            if accountID not in accounts:
+                raise WriteAheadLogError(f"Write-Ahead Log Error: State of unknown account {accountID}")
+            accounts[accountID].restoreTransactions(postings[accountID])
+            postings[accountID] = []
+            accounts[accountID]._restoreState(state)
+        for payload in self._payloads():
+            kind = payload[0]
+            if kind == RECORD_OPEN:
+                _, ordinal, cents = _OPEN.unpack_from(payload)
+                (accountID, userID), offset = _unpackStrings(payload, _OPEN.size, 2)
+                accountKind, tier, state = "Account", "Standard", {}
+                if offset < len(payload):
+                    (accountKind, tier), offset = _unpackStrings(payload, offset, 2)
+                    state = json.loads(payload[offset:])
+                accounts[accountID] = restoreAccount(accountKind, accountID, userID, Money.fromCents(cents),
+                                                     date.fromordinal(ordinal), ledgerFactory() if ledgerFactory else None,
+                                                     state, tier, **options)
+                postings[accountID] = []
+            elif kind == RECORD_STATUS:
+                accountID = _unpackStrings(payload, _STATUS.size, 1)[0][0]
+                statuses[accountID] = VALID_STATUSES[payload[1]]
+            elif kind == RECORD_TIER:
+                accountID = _unpackStrings(payload, _TIER.size, 1)[0][0]
+                tiers[accountID] = VALID_ACCOUNT_TIERS[payload[1]]
+            elif kind == RECORD_POSTINGS:
+                records, offset = _decodePostings(payload)
+                if offset < len(payload):
+                    for accountID, state in json.loads(payload[offset:]).items():
+                        restoreState(accountID, state)
+                for record in records:
+                    try: postings[record.accountID].append(record)
+                    except KeyError: raise WriteAheadLogError(f"Write-Ahead Log Error: Posting to unknown account {record.accountID}")
+            elif kind == RECORD_STATE:
+                for accountID, state in json.loads(payload[_STATE.size:]).items():
+                    restoreState(accountID, state)
+            else:
+                raise WriteAheadLogError(f"Write-Ahead Log Error: Unknown record kind {kind}")
+        for accountID, account in accounts.items():
+            account.restoreTransactions(postings[accountID])
+            if accountID in statuses:
+                account.status = statuses[accountID]
+            if accountID in tiers:
+                account.tier = tiers[accountID]
+            account.wal = self
+        return accounts
+
+
+# Returns the passed payload as a frame, with its length and CRC-32
+def _frame(payload: bytes) -> bytes:
+    return _FRAME_HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+
+# Returns the payloads of the complete, undamaged frames in the passed segment data, and the offset the valid frames
+# end at
+def _readFrames(data: bytes, path: str) -> tuple[list[bytes], int]:
+    # A crash while a segment was being created can leave it with a partial marker
+    if len(data) < len(SEGMENT_MAGIC) and SEGMENT_MAGIC.startswith(data):
+        return [], 0
+    if not data.startswith(SEGMENT_MAGIC):
+        raise WriteAheadLogError(f"Write-Ahead Log Error: {path} is not a write-ahead log segment")
+    view = memoryview(data)
+    payloads = []
+    offset = len(SEGMENT_MAGIC)
+    headerSize = _FRAME_HEADER.size
+    while offset + headerSize <= len(data):
+        length, checksum = _FRAME_HEADER.unpack_from(data, offset)
+        end = offset + headerSize + length
+        if end > len(data):
+            break
+        payload = bytes(view[offset + headerSize:end])
+        if zlib.crc32(payload) != checksum:
+            break
+        payloads.append(payload)
+        offset = end
+    return payloads, offset
+
+# Returns the passed strings encoded with their lengths- None is stored as a reserved length
+def _packStrings(values) -> bytes:
+    parts = []
+    for value in values:
+        if value is None:
+            parts.append(_STRING_LENGTH.pack(_NONE_LENGTH))
+        else:
+            encoded = value.encode()
+            if len(encoded) >= _NONE_LENGTH:
+                raise WriteAheadLogError("Write-Ahead Log Error: String is too long to log")
+            parts.append(_STRING_LENGTH.pack(len(encoded)))
+            parts.append(encoded)
+    return b"".join(parts)
+
+# Reads count strings from the passed payload starting at offset, returning the strings and the offset after them
+def _unpackStrings(payload: bytes, offset: int, count: int) -> tuple[list[str], int]:
+    values = []
+    for _ in range(count):
+        (length,) = _STRING_LENGTH.unpack_from(payload, offset)
+        offset += _STRING_LENGTH.size
+        if length == _NONE_LENGTH:
+            values.append(None)
+        else:
+            values.append(payload[offset:offset + length].decode())
+            offset += length
+    return values, offset
+
+# Encodes a transaction record as a posting
+def _encodePosting(record: Transaction) -> bytes:
+    transactionType = record.transactionType
+    routingNumber = bank = destination = None
+    if transactionType == "Deposit":
+        method = DEPOSIT_METHOD_CODES[record.depositMethod]
+    elif transactionType == "Withdrawal":
+        method = WITHDRAWAL_METHOD_CODES[record.withdrawalMethod]
+    else:
+        method = _NO_METHOD
+        destination = record.destinationAccountID
+        if transactionType == "External-Transfer":
+            routingNumber = record.destinationRoutingNumber
+            bank = record.destinationBank
+    return _POSTING.pack(TRANSACTION_TYPE_CODES[transactionType], method, toEpochMicros(record.timeStamp),
+                         record.amount.cents, record.fee.cents) \
+        + _packStrings((record.transactionID, record.userID, record.accountID, record.origin, record.description,
+                        destination, routingNumber, bank))
+
+# Decodes the transaction records of a postings payload, returning the records and the offset after them
+def _decodePostings(payload: bytes) -> tuple[list[Transaction], int]:
+    _, count = _POSTINGS.unpack_from(payload)
+    offset = _POSTINGS.size
+    records = []
+    for _ in range(count):
+        typeCode, methodCode, timeStamp, amount, fee = _POSTING.unpack_from(payload, offset)
+        strings, offset = _unpackStrings(payload, offset + _POSTING.size, _POSTING_STRINGS)
+        transactionID, userID, accountID, origin, description, destination, routingNumber, bank = strings
+        transactionType = VALID_TRANSACTION_TYPES[typeCode]
+        if transactionType == "Deposit":
+            method = VALID_DEPOSIT_METHODS[methodCode]
+        elif transactionType == "Withdrawal":
+            method = VALID_WITHDRAWAL_METHODS[methodCode]
+        else:
+            method = None
+        records.append(restoreTransaction(transactionType, transactionID, fromEpochMicros(timeStamp), userID, accountID,
+                                          amount, fee, method, origin, description, destination, routingNumber, bank))
+    return records, offset
+
+# Forces the creation of a new file in the passed directory to disk (only possible on POSIX systems)
+def _syncDirectory(directory: str) -> None:
+    if os.name != "posix":
+        return
+    descriptor = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(descriptor)
+    finally:
+        os.close(descriptor)